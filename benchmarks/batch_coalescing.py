@@ -0,0 +1,162 @@
+"""Benchmark: agent turns needed per 100 inbox messages.
+
+Replays synthetic message arrival patterns against the daemon's dispatch
+policy (``_inbox_settled``) and batch selection (``_select_batch``) on a
+simulated clock, and reports how many turns each policy needs to drain
+the inbox.  No SDK or database is involved.  Run it from the repository
+root:
+
+    python -m benchmarks.batch_coalescing
+
+The ``legacy`` policy reproduces the old behaviour (dispatch immediately,
+at most 5 messages per turn); ``adaptive`` uses the current defaults.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from delegate.agent import (
+    BATCH_DEBOUNCE_SECONDS,
+    BATCH_MAX_WAIT_SECONDS,
+    BATCH_TOKEN_BUDGET,
+    MAX_BATCH_SIZE,
+)
+from delegate.mailbox import Message
+from delegate.runtime import _inbox_settled, _select_batch
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+POLL_INTERVAL = 1.0     # daemon polling interval (seconds)
+TURN_SECONDS = 30.0     # simulated wall-clock length of one turn
+
+
+@dataclass
+class Policy:
+    name: str
+    max_size: int
+    token_budget: int | None
+    debounce: float
+    max_wait: float
+
+
+POLICIES = [
+    Policy("legacy", 5, None, 0.0, 0.0),
+    Policy("adaptive", MAX_BATCH_SIZE, BATCH_TOKEN_BUDGET,
+           BATCH_DEBOUNCE_SECONDS, BATCH_MAX_WAIT_SECONDS),
+]
+
+
+def _ts(seconds: float) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _msg(at: float, sender: str, task_id: int | None, body: str) -> tuple[float, Message]:
+    return at, Message(sender=sender, recipient="alice", time=_ts(at), body=body, task_id=task_id)
+
+
+# ---------------------------------------------------------------------------
+# Arrival patterns
+# ---------------------------------------------------------------------------
+
+def review_bursts(rng: random.Random) -> list[tuple[float, Message]]:
+    """A reviewer leaves 10–20 short comments in quick succession, per task."""
+    events, t = [], 0.0
+    task_id = 1
+    while len(events) < 100:
+        for _ in range(rng.randint(10, 20)):
+            t += rng.uniform(0.1, 0.8)
+            events.append(_msg(t, "bob", task_id, "nit: " + "x" * rng.randint(40, 400)))
+        t += rng.uniform(60, 180)
+        task_id += 1
+    return events[:100]
+
+
+def manager_bursts(rng: random.Random) -> list[tuple[float, Message]]:
+    """The manager fires clusters of 3–8 medium-length instructions."""
+    events, t = [], 0.0
+    while len(events) < 100:
+        for _ in range(rng.randint(3, 8)):
+            t += rng.uniform(0.2, 1.5)
+            events.append(_msg(t, "manager", 7, "Please " + "y" * rng.randint(200, 1500)))
+        t += rng.uniform(20, 90)
+    return events[:100]
+
+
+def steady_trickle(rng: random.Random) -> list[tuple[float, Message]]:
+    """Isolated messages spaced well apart — batching cannot help here."""
+    events, t = [], 0.0
+    for _ in range(100):
+        t += rng.uniform(40, 120)
+        events.append(_msg(t, "manager", 3, "status? " + "z" * rng.randint(20, 200)))
+    return events
+
+
+def mixed_senders(rng: random.Random) -> list[tuple[float, Message]]:
+    """Interleaved bursts from several senders across a few tasks."""
+    events, t = [], 0.0
+    senders = ["bob", "manager", "carol"]
+    while len(events) < 100:
+        task_id = rng.randint(1, 3)
+        sender = rng.choice(senders)
+        for _ in range(rng.randint(2, 10)):
+            t += rng.uniform(0.1, 2.0)
+            events.append(_msg(t, sender, task_id, "w" * rng.randint(50, 3000)))
+        t += rng.uniform(5, 60)
+    return events[:100]
+
+
+PATTERNS = {
+    "review_bursts": review_bursts,
+    "manager_bursts": manager_bursts,
+    "steady_trickle": steady_trickle,
+    "mixed_senders": mixed_senders,
+}
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+def simulate(events: list[tuple[float, Message]], policy: Policy) -> tuple[int, float]:
+    """Drain *events* under *policy*; return ``(turns, mean_wait_seconds)``."""
+    pending = sorted(events, key=lambda e: e[0])
+    inbox: list[tuple[float, Message]] = []
+    turns = 0
+    waits: list[float] = []
+    busy_until = 0.0
+    t = 0.0
+    while pending or inbox:
+        while pending and pending[0][0] <= t:
+            inbox.append(pending.pop(0))
+        if inbox and t >= busy_until:
+            settled = _inbox_settled(
+                inbox[0][1].time, inbox[-1][1].time,
+                now=EPOCH + timedelta(seconds=t),
+                debounce=policy.debounce, max_wait=policy.max_wait,
+            )
+            if settled:
+                batch = _select_batch(
+                    [m for _, m in inbox],
+                    max_size=policy.max_size,
+                    token_budget=policy.token_budget,
+                )
+                chosen = {id(m) for m in batch}
+                waits.extend(t - at for at, m in inbox if id(m) in chosen)
+                inbox = [(at, m) for at, m in inbox if id(m) not in chosen]
+                turns += 1
+                busy_until = t + TURN_SECONDS
+        t += POLL_INTERVAL
+    return turns, sum(waits) / len(waits) if waits else 0.0
+
+
+def main() -> None:
+    print(f"{'pattern':<16} {'policy':<10} {'turns/100 msgs':>15} {'mean wait (s)':>14}")
+    for name, pattern in PATTERNS.items():
+        for policy in POLICIES:
+            events = pattern(random.Random(42))
+            turns, wait = simulate(events, policy)
+            print(f"{name:<16} {policy.name:<10} {turns * 100 / len(events):>15.1f} {wait:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
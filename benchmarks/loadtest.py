@@ -0,0 +1,451 @@
+"""Synthetic orchestration load test — real daemon loop, scripted fake SDK.
+
+Boots the real ``_daemon_loop`` against N teams × M agents in a throwaway
+Delegate home and replaces the Claude SDK with a scripted fake.  The fake
+agents stream tool-use blocks, send mailbox messages and move tasks
+through the default workflow (``todo → in_progress → in_review →
+in_approval``), so every part of the orchestration path runs for real
+except the model itself.  No API calls are made.
+
+Recorded metrics:
+
+- **turns/s** and **transitions/s** — completed fake turns and successful
+  ``change_status`` calls over the measured window.
+- **dispatch latency** — ``delivered_at → seen_at`` per message (includes
+  the inbox debounce window).
+- **DB writes / lock waits** — wall time of every write statement and
+  commit; writes slower than ``LOCK_WAIT_THRESHOLD_MS`` are counted as
+  lock waits (SQLite blocks inside the statement while another writer
+  holds the lock).
+- **event-loop lag** — overshoot of a 50 ms ``asyncio.sleep`` probe.
+
+Usage:
+    python -m benchmarks.loadtest --teams 4 --agents 6 --duration 30
+    python -m benchmarks.loadtest --teams 8 --agents 8 --max-concurrent 16 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+LOCK_WAIT_THRESHOLD_MS = 10.0
+LAG_PROBE_INTERVAL = 0.05  # seconds
+
+HUMAN = "human"
+MANAGER = "mgr"
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LoadMetrics:
+    """Raw samples collected during a load run."""
+
+    turns: int = 0
+    reflections: int = 0
+    transitions: int = 0
+    transition_errors: int = 0
+    messages_sent: int = 0
+    db_write_ms: list[float] = field(default_factory=list)
+    loop_lag_ms: list[float] = field(default_factory=list)
+    dispatch_latency_s: list[float] = field(default_factory=list)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(m: LoadMetrics, elapsed: float, *, teams: int, agents: int, max_concurrent: int) -> dict:
+    """Reduce raw samples to the report dict."""
+    def dist(samples: list[float]) -> dict:
+        return {
+            "count": len(samples),
+            "p50": round(_percentile(samples, 50), 3),
+            "p99": round(_percentile(samples, 99), 3),
+            "max": round(max(samples, default=0.0), 3),
+            "mean": round(statistics.fmean(samples), 3) if samples else 0.0,
+        }
+
+    lock_waits = [ms for ms in m.db_write_ms if ms >= LOCK_WAIT_THRESHOLD_MS]
+    return {
+        "teams": teams,
+        "agents_per_team": agents,
+        "max_concurrent": max_concurrent,
+        "elapsed_s": round(elapsed, 2),
+        "turns": m.turns,
+        "reflections": m.reflections,
+        "turns_per_s": round(m.turns / elapsed, 3) if elapsed else 0.0,
+        "transitions": m.transitions,
+        "transition_errors": m.transition_errors,
+        "transitions_per_s": round(m.transitions / elapsed, 3) if elapsed else 0.0,
+        "messages_sent": m.messages_sent,
+        "dispatch_latency_s": dist(m.dispatch_latency_s),
+        "db_write_ms": dist(m.db_write_ms),
+        "db_lock_waits": len(lock_waits),
+        "db_lock_wait_total_ms": round(sum(lock_waits), 1),
+        "loop_lag_ms": dist(m.loop_lag_ms),
+    }
+
+
+# ---------------------------------------------------------------------------
+# DB write timing (installed only for the duration of a run)
+# ---------------------------------------------------------------------------
+
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "BEGIN")
+
+
+class _TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that records the wall time of writes and commits."""
+
+    samples: list[float] | None = None
+
+    def execute(self, sql, *args, **kwargs):
+        if self.samples is None or not sql.lstrip()[:7].upper().startswith(_WRITE_PREFIXES):
+            return super().execute(sql, *args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, *args, **kwargs)
+        finally:
+            self.samples.append((time.perf_counter() - t0) * 1000)
+
+    def commit(self):
+        if self.samples is None:
+            return super().commit()
+        t0 = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            self.samples.append((time.perf_counter() - t0) * 1000)
+
+
+@functools.cache
+def _real_connect():
+    return sqlite3.connect
+
+
+def _install_db_timing(samples: list[float]) -> None:
+    _TimedConnection.samples = samples
+    sqlite3.connect = functools.partial(_real_connect(), factory=_TimedConnection)
+
+
+def _remove_db_timing() -> None:
+    sqlite3.connect = _real_connect()
+    _TimedConnection.samples = None
+
+
+# ---------------------------------------------------------------------------
+# Scripted fake SDK
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Block:
+    name: str
+    input: dict
+
+
+@dataclass
+class _TextBlock:
+    text: str
+
+
+@dataclass
+class _AssistantMessage:
+    content: list
+
+
+@dataclass
+class _ResultMessage:
+    total_cost_usd: float
+    usage: dict
+
+
+class FakeOptions:
+    """Stand-in for ``ClaudeCodeOptions`` — just keeps the kwargs."""
+
+    def __init__(self, **kwargs: Any):
+        self.kwargs = kwargs
+        self.cwd = kwargs.get("cwd", "")
+
+
+class ScriptedSDK:
+    """Fake ``query()`` that acts like a busy agent.
+
+    Each call streams a few tool-use blocks (with a short think time
+    between them), then performs the agent's scripted action against the
+    real task/mailbox APIs in a worker thread — the way a real agent's
+    CLI tool calls hit the DB from another process.
+    """
+
+    def __init__(
+        self,
+        hc_home: Path,
+        metrics: LoadMetrics,
+        *,
+        tool_calls: tuple[int, int] = (2, 6),
+        think_time: tuple[float, float] = (0.01, 0.05),
+        max_tasks_per_agent: int = 50,
+        seed: int = 0,
+    ):
+        self.hc_home = hc_home
+        self.metrics = metrics
+        self.tool_calls = tool_calls
+        self.think_time = think_time
+        self.max_tasks_per_agent = max_tasks_per_agent
+        self._rng = random.Random(seed)
+        self._created: dict[tuple[str, str], int] = {}
+
+    def _identify(self, options: Any) -> tuple[str, str]:
+        """Recover (team, agent) from the turn's cwd (agent workspace)."""
+        parts = Path(getattr(options, "cwd", "")).parts
+        i = parts.index("agents")
+        return parts[i - 1], parts[i + 1]
+
+    async def query(self, prompt: str, options: Any = None):
+        team, agent = self._identify(options)
+        reflection = "REFLECTION TURN" in prompt
+
+        for i in range(self._rng.randint(*self.tool_calls)):
+            await asyncio.sleep(self._rng.uniform(*self.think_time))
+            tool = self._rng.choice(["Bash", "Read", "Edit", "Grep"])
+            inp = {"command": f"make step-{i}"} if tool == "Bash" else {"file_path": f"src/mod_{i}.py"}
+            yield _AssistantMessage(content=[_TextBlock(text=f"Working ({i})"), _Block(name=tool, input=inp)])
+
+        if reflection:
+            self.metrics.reflections += 1
+        else:
+            await asyncio.to_thread(self._act, team, agent)
+            self.metrics.turns += 1
+
+        yield _ResultMessage(
+            total_cost_usd=0.0,
+            usage={"input_tokens": 1200, "output_tokens": 300,
+                   "cache_read_input_tokens": 800, "cache_creation_input_tokens": 0},
+        )
+
+    # -- scripted behaviour ------------------------------------------------
+
+    def _transition(self, team: str, task_id: int, status: str) -> dict | None:
+        from delegate.task import change_status
+        try:
+            task = change_status(self.hc_home, team, task_id, status)
+        except Exception as exc:
+            self.metrics.transition_errors += 1
+            logger.debug("transition %s -> %s failed: %s", task_id, status, exc)
+            return None
+        self.metrics.transitions += 1
+        return task
+
+    def _send(self, team: str, sender: str, recipient: str, body: str, task_id: int | None) -> None:
+        from delegate.mailbox import send
+        send(self.hc_home, team, sender, recipient, body, task_id=task_id)
+        self.metrics.messages_sent += 1
+
+    def _act(self, team: str, agent: str) -> None:
+        from delegate.task import list_tasks, format_task_id
+
+        if agent == MANAGER:
+            self._act_manager(team)
+            return
+
+        for task in list_tasks(self.hc_home, team, assignee=agent):
+            tid, status = task["id"], task["status"]
+            label = format_task_id(tid)
+            if status == "todo" and not self._transition(team, tid, "in_progress"):
+                continue
+            if status in ("todo", "in_progress"):
+                if self._transition(team, tid, "in_review"):
+                    self._send(team, agent, MANAGER, f"{label} is ready for review", tid)
+                return
+            if status == "in_review" and task.get("dri") != agent:
+                if self._transition(team, tid, "in_approval"):
+                    self._send(team, agent, MANAGER, f"{label} approved in review", tid)
+                return
+
+    def _act_manager(self, team: str) -> None:
+        """Route reviews to a peer and hand each idle engineer a new task."""
+        from delegate.task import assign_task, create_task, format_task_id, list_tasks
+        from delegate.runtime import list_ai_agents
+
+        workers = [a for a in list_ai_agents(self.hc_home, team) if a != MANAGER]
+        tasks = list_tasks(self.hc_home, team)
+
+        for task in tasks:
+            if task["status"] != "in_review" or task["assignee"] != task.get("dri"):
+                continue
+            peers = [w for w in workers if w != task["dri"]]
+            if not peers:
+                continue
+            reviewer = self._rng.choice(peers)
+            assign_task(self.hc_home, team, task["id"], reviewer)
+            self._send(team, MANAGER, reviewer, f"Please review {format_task_id(task['id'])}", task["id"])
+
+        busy = {t["assignee"] for t in tasks if t["status"] in ("todo", "in_progress")}
+        for worker in workers:
+            key = (team, worker)
+            if worker in busy or self._created.get(key, 0) >= self.max_tasks_per_agent:
+                continue
+            self._created[key] = self._created.get(key, 0) + 1
+            task = create_task(self.hc_home, team, title=f"Synthetic work for {worker}", assignee=worker)
+            self._send(team, MANAGER, worker, "Please pick this up", task["id"])
+
+
+# ---------------------------------------------------------------------------
+# Setup + run
+# ---------------------------------------------------------------------------
+
+def setup_home(hc_home: Path, teams: int, agents: int) -> list[str]:
+    """Bootstrap *teams* teams of *agents* engineers plus a manager each.
+
+    Seeds one task and one kickoff message per engineer.  Returns the
+    team names.
+    """
+    from delegate.bootstrap import bootstrap
+    from delegate.config import add_member
+    from delegate.mailbox import send
+    from delegate.task import create_task
+
+    add_member(hc_home, HUMAN)
+    names = []
+    for t in range(teams):
+        team = f"lt{t:02d}"
+        workers = [f"w{a:02d}" for a in range(agents)]
+        bootstrap(hc_home, team, manager=MANAGER, agents=workers)
+        for w in workers:
+            task = create_task(hc_home, team, title=f"Seed task for {w}", assignee=w)
+            send(hc_home, team, MANAGER, w, "Kickoff", task_id=task["id"])
+        names.append(team)
+    return names
+
+
+def _collect_dispatch_latency(hc_home: Path, since_iso: str) -> list[float]:
+    from delegate.db import get_connection
+    conn = get_connection(hc_home)
+    try:
+        rows = conn.execute(
+            "SELECT (julianday(seen_at) - julianday(delivered_at)) * 86400 "
+            "FROM messages WHERE type = 'chat' AND seen_at IS NOT NULL AND delivered_at >= ?",
+            (since_iso,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [r[0] for r in rows if r[0] is not None and r[0] >= 0]
+
+
+async def _lag_probe(samples: list[float]) -> None:
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(max(0.0, (time.perf_counter() - t0 - LAG_PROBE_INTERVAL) * 1000))
+
+
+async def run_load(
+    hc_home: Path,
+    *,
+    teams: int = 2,
+    agents: int = 4,
+    duration: float = 20.0,
+    max_concurrent: int = 32,
+    interval: float = 0.5,
+    seed: int = 0,
+) -> dict:
+    """Run the daemon loop under synthetic load and return the summary."""
+    from datetime import datetime, timezone
+    from delegate import web
+
+    metrics = LoadMetrics()
+    started_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    setup_home(hc_home, teams, agents)
+    sdk = ScriptedSDK(hc_home, metrics, seed=seed)
+
+    _install_db_timing(metrics.db_write_ms)
+    web._shutdown_flag = False
+    probe = asyncio.create_task(_lag_probe(metrics.loop_lag_ms))
+    daemon = asyncio.create_task(web._daemon_loop(
+        hc_home, interval, max_concurrent, None,
+        sdk_query=sdk.query, sdk_options_class=FakeOptions,
+    ))
+    t0 = time.perf_counter()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        elapsed = time.perf_counter() - t0
+        daemon.cancel()
+        probe.cancel()
+        pending = list(web._active_agent_tasks) + list(web._active_merge_tasks)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(daemon, probe, *pending, return_exceptions=True)
+        _remove_db_timing()
+
+    metrics.dispatch_latency_s = _collect_dispatch_latency(hc_home, started_iso)
+    return summarize(metrics, elapsed, teams=teams, agents=agents, max_concurrent=max_concurrent)
+
+
+def _print_report(r: dict) -> None:
+    print(f"Load test: {r['teams']} teams × {r['agents_per_team']} agents, "
+          f"max_concurrent={r['max_concurrent']}, {r['elapsed_s']}s")
+    print(f"  turns            {r['turns']:>8}  ({r['turns_per_s']}/s, {r['reflections']} reflections)")
+    print(f"  transitions      {r['transitions']:>8}  ({r['transitions_per_s']}/s, "
+          f"{r['transition_errors']} rejected)")
+    print(f"  messages sent    {r['messages_sent']:>8}")
+    for key, unit in (("dispatch_latency_s", "s"), ("db_write_ms", "ms"), ("loop_lag_ms", "ms")):
+        d = r[key]
+        print(f"  {key:<16} p50={d['p50']}{unit} p99={d['p99']}{unit} max={d['max']}{unit} (n={d['count']})")
+    print(f"  db lock waits    {r['db_lock_waits']:>8}  ({r['db_lock_wait_total_ms']} ms total, "
+          f">= {LOCK_WAIT_THRESHOLD_MS} ms each)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic orchestration load test (fake SDK)")
+    parser.add_argument("--teams", type=int, default=2)
+    parser.add_argument("--agents", type=int, default=4, help="Engineers per team (plus a manager)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--max-concurrent", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=0.5, help="Daemon poll interval")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--home", type=Path, default=None, help="Delegate home (default: temp dir)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.home is not None:
+        home = contextlib.nullcontext(args.home)
+    else:
+        home = tempfile.TemporaryDirectory(prefix="delegate-load-")
+    with home as path:
+        hc_home = Path(path)
+        hc_home.mkdir(parents=True, exist_ok=True)
+        report = asyncio.run(run_load(
+            hc_home,
+            teams=args.teams, agents=args.agents, duration=args.duration,
+            max_concurrent=args.max_concurrent, interval=args.interval, seed=args.seed,
+        ))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,18 +7,29 @@ Provides:
 - ``broadcast()`` — push an entry to the ring buffer and notify all SSE
   subscribers so the frontend can show live agent activity.
 - ``subscribe()`` / ``unsubscribe()`` — manage per-client asyncio queues
-  for the SSE endpoint.
+  for the SSE endpoint, indexed by topic (all / team / agent / task) with
+  a per-subscriber backpressure policy.
+- ``next_frame()`` / ``encode_frame()`` — coalesce queued events into a
+  single compact SSE frame (one JSON array per flush window).
+- ``subscriber_stats()`` — per-subscriber delivered / dropped / lag
+  counters.
+- ``replay_since()`` — events after an SSE ``Last-Event-ID``, served from
+  the per-agent rings plus a per-team buffer of task / turn / change
+  events, so reconnecting clients resume instead of reloading.
 
 The ring buffer and subscriber list are plain module-level state.  This is
 safe because Delegate runs as a single process with a single event loop.
 
 **Team scoping**: Every broadcast includes a ``team`` field.  SSE
-subscribers are registered with a team filter so they only receive events
-for the team they are watching.
+subscribers are registered on a topic so they only receive events for the
+team (or agent, or task) they are watching.
 """
 
 import asyncio
+import itertools
+import json
 import logging
+import time
 from collections import deque
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
@@ -40,6 +51,7 @@ class ActivityEntry:
     detail: str
     task_id: int | None = None
     timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    eid: int = 0
 
     def to_dict(self) -> dict[str, Any]:
         d = asdict(self)
@@ -81,59 +93,451 @@ def get_all_recent(n: int = 100) -> list[dict[str, str]]:
 
 
 # ---------------------------------------------------------------------------
-# SSE subscriber management
+# Event ids + replay buffer
 # ---------------------------------------------------------------------------
+# Every event pushed to subscribers gets a process-wide, monotonically
+# increasing ``eid``.  On the wire the SSE id is ``<epoch>:<eid>`` — the
+# epoch changes on restart, so a Last-Event-ID from a previous process is
+# recognised as unresumable rather than silently matched against new ids.
 
-# Maps subscriber queue → team filter (None = receive everything).
-_subscribers: dict[asyncio.Queue, str | None] = {}
+EPOCH = format(int(time.time() * 1000), "x")
+REPLAY_SIZE = 512  # non-activity events kept per team
 
+# Reconnect delay hint sent to clients (``retry:`` field, milliseconds).
+RETRY_MS = 3000
 
-def subscribe(team: str | None = None) -> asyncio.Queue:
-    """Register a new SSE client, optionally filtered to *team*.
+_eids = itertools.count(1)
+_last_eid = 0
 
-    Returns a queue to await on.  Only events whose ``team`` field matches
-    (or events with no team, like keepalives) will be forwarded.
+# team -> recent task / turn / change events (activity lives in _rings)
+_replay: dict[str, deque[dict]] = {}
+
+# team -> highest eid evicted from any of the team's buffers.  A client
+# whose Last-Event-ID is below this has a gap we can't fill.
+_evicted: dict[str, int] = {}
+
+
+def _stamp() -> int:
+    global _last_eid
+    _last_eid = next(_eids)
+    return _last_eid
+
+
+def _evict(team: str, eid: int) -> None:
+    if eid > _evicted.get(team, 0):
+        _evicted[team] = eid
+
+
+def _remember(payload: dict) -> None:
+    team = payload.get("team") or ""
+    buf = _replay.get(team)
+    if buf is None:
+        buf = _replay[team] = deque(maxlen=REPLAY_SIZE)
+    if len(buf) == buf.maxlen:
+        _evict(team, buf[0]["eid"])
+    buf.append(payload)
+
+
+def format_event_id(eid: int) -> str:
+    return f"{EPOCH}:{eid}"
+
+
+def replay_since(
+    last_event_id: str | None,
+    team: str | None = None,
+    *,
+    topic: tuple | None = None,
+) -> list[dict] | None:
+    """Return buffered events after *last_event_id*, oldest first.
+
+    *team* scopes the replay (``None`` = all teams) and *topic* narrows it
+    to what a subscriber on that topic would have received.  Returns ``[]`` when
+    there is no id to resume from, and ``None`` when the gap can't be
+    covered — the id is from another process, or events after it have
+    already been evicted — in which case the client must reload.
+    """
+    if not last_event_id:
+        return []
+    epoch, _, raw = last_event_id.partition(":")
+    try:
+        since = int(raw)
+    except ValueError:
+        return None
+    if epoch != EPOCH or since > _last_eid:
+        return None
+
+    teams = [team] if team is not None else list({*_replay, *_evicted, *(k[0] for k in _rings)})
+    if any(since < _evicted.get(t, 0) for t in teams):
+        return None
+
+    events: list[dict] = []
+    for (ring_team, _agent), ring in _rings.items():
+        if team is None or ring_team == team:
+            events.extend(e.to_dict() for e in ring if e.eid > since)
+    for t in teams:
+        events.extend(e for e in _replay.get(t, ()) if e["eid"] > since)
+    if topic is not None:
+        events = [e for e in events if matches(topic, e)]
+    events.sort(key=lambda e: e["eid"])
+    return events
+
+
+# ---------------------------------------------------------------------------
+# SSE subscriber management (topic-indexed hub)
+# ---------------------------------------------------------------------------
+# Each subscriber follows exactly one topic:
+#
+#   ("all",)                   every event
+#   ("team", team)             one team
+#   ("agent", team, agent)     one agent's activity / turn events
+#   ("task", team, task_id)    one task's events, incl. change-feed deltas
+#
+# Dispatch looks up only the topics an event can match, so a broadcast
+# costs O(matching subscribers) instead of O(all subscribers).
+
+# Events are buffered per subscriber for this long after the first one
+# arrives, then flushed together as a single SSE frame.
+COALESCE_WINDOW = 0.05  # seconds
+COALESCE_MAX_EVENTS = 128
+
+# Long free-text fields are clipped in SSE frames (the ring buffer keeps
+# the full value for the /activity history endpoint).
+MAX_DETAIL_CHARS = 300
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# What to do when a subscriber's queue is full:
+#   drop_oldest — discard the oldest queued event (default)
+#   coalesce    — collapse superseded events (older activity for the same
+#                 agent, older same-field updates for the same task), then
+#                 drop oldest if still full
+#   disconnect  — end the stream; the client reconnects with Last-Event-ID
+#                 and the missed events are replayed
+BACKPRESSURE_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Maps subscriber queue → topic, and topic → subscriber queues.
+_subscribers: dict[asyncio.Queue, tuple] = {}
+_topics: dict[tuple, set[asyncio.Queue]] = {}
+
+# Queued after a "disconnect" overflow; next_frame() raises on it.
+_CLOSED = object()
+
+
+class SubscriberDisconnected(Exception):
+    """Raised by ``next_frame()`` once the hub has disconnected a subscriber."""
+
+
+@dataclass(slots=True)
+class SubscriberStats:
+    """Delivery counters for one SSE subscriber."""
+
+    team: str | None
+    topic: str = "all"
+    policy: str = "drop_oldest"
+    connected_at: float = field(default_factory=time.time)
+    delivered: int = 0
+    frames: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    disconnected: bool = False
+    max_backlog: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+
+
+_stats: dict[asyncio.Queue, SubscriberStats] = {}
+
+
+def topic_for(team: str | None = None, agent: str | None = None, task_id: int | None = None) -> tuple:
+    """Return the topic key for a subscription (most specific filter wins)."""
+    if team is None:
+        return ("all",)
+    if task_id is not None:
+        return ("task", team, task_id)
+    if agent:
+        return ("agent", team, agent)
+    return ("team", team)
+
+
+def _event_task_id(payload: dict) -> int | None:
+    if payload.get("type") == "change":
+        if payload.get("kind") == "task":
+            return payload.get("id")
+        return (payload.get("data") or {}).get("task_id")
+    return payload.get("task_id")
+
+
+def event_topics(payload: dict) -> list[tuple]:
+    """Return every topic an event is published to."""
+    team = payload.get("team")
+    topics = [("all",), ("team", team)]
+    if payload.get("agent"):
+        topics.append(("agent", team, payload["agent"]))
+    task_id = _event_task_id(payload)
+    if task_id is not None:
+        topics.append(("task", team, task_id))
+    return topics
+
+
+def matches(topic: tuple, payload: dict) -> bool:
+    """True if an event published now would reach a *topic* subscriber."""
+    return payload.get("team") is None or topic in event_topics(payload)
+
+
+def subscribe(
+    team: str | None = None,
+    *,
+    agent: str | None = None,
+    task_id: int | None = None,
+    policy: str = "drop_oldest",
+) -> asyncio.Queue:
+    """Register a new SSE client on a topic (see ``topic_for``).
+
+    Returns a queue to await on.  Events without a team are delivered to
+    every subscriber.  *policy* picks the backpressure behaviour (one of
+    ``BACKPRESSURE_POLICIES``).
     """
-    q: asyncio.Queue = asyncio.Queue(maxsize=256)
-    _subscribers[q] = team
-    logger.debug("SSE subscriber added (team=%s, total=%d)", team, len(_subscribers))
+    if policy not in BACKPRESSURE_POLICIES:
+        raise ValueError(f"Unknown backpressure policy '{policy}'")
+    topic = topic_for(team, agent, task_id)
+    q: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    _subscribers[q] = topic
+    _topics.setdefault(topic, set()).add(q)
+    _stats[q] = SubscriberStats(team=team, topic="/".join(map(str, topic)), policy=policy)
+    logger.debug("SSE subscriber added (topic=%s, total=%d)", topic, len(_subscribers))
     return q
 
 
+def _detach(q: asyncio.Queue) -> None:
+    topic = _subscribers.pop(q, None)
+    if topic is not None:
+        subs = _topics.get(topic)
+        if subs is not None:
+            subs.discard(q)
+            if not subs:
+                del _topics[topic]
+
+
 def unsubscribe(q: asyncio.Queue) -> None:
     """Remove an SSE client queue."""
-    _subscribers.pop(q, None)
+    _detach(q)
+    _stats.pop(q, None)
     logger.debug("SSE subscriber removed (total=%d)", len(_subscribers))
 
 
+def subscriber_stats() -> list[dict[str, Any]]:
+    """Return delivery counters for every connected SSE subscriber."""
+    return [asdict(st) for st in _stats.values()]
+
+
 # ---------------------------------------------------------------------------
-# Broadcast
+# Frame coalescing + compact encoding
 # ---------------------------------------------------------------------------
 
-def _push_to_subscribers(payload: dict) -> None:
-    """Push a payload dict to matching SSE subscriber queues (non-blocking).
+def _compact(event: dict) -> dict:
+    """Drop null fields and clip long details for the wire format.
 
-    If the payload contains a ``team`` key, it is only sent to subscribers
-    whose team filter matches (or to unfiltered subscribers).
+    ``eid`` travels in the SSE ``id:`` field rather than the payload.
     """
-    payload_team = payload.get("team")
-    dead: list[asyncio.Queue] = []
-    for q, sub_team in _subscribers.items():
-        # Skip if subscriber is team-filtered and payload has a different team
-        if sub_team is not None and payload_team is not None and sub_team != payload_team:
-            continue
+    out = {k: v for k, v in event.items() if v is not None and k != "eid"}
+    detail = out.get("detail")
+    if isinstance(detail, str) and len(detail) > MAX_DETAIL_CHARS:
+        out["detail"] = detail[:MAX_DETAIL_CHARS] + "…"
+    return out
+
+
+def _dumps(event: dict) -> str:
+    return json.dumps(_compact(event), separators=(",", ":"))
+
+
+class _Event(dict):
+    """A published event plus its wire encoding, serialised once and
+    shared by every subscriber queue that receives it."""
+
+    __slots__ = ("wire",)
+
+    def __init__(self, payload: dict):
+        super().__init__(payload)
+        self.wire = _dumps(payload)
+
+
+def encode_frame(events: list[dict]) -> str:
+    """Encode events as one compact SSE ``data:`` frame.
+
+    A single event is sent as a JSON object; several are sent as a JSON
+    array (clients must accept both).  Published events reuse their
+    pre-serialised ``wire`` form.
+    """
+    body = [getattr(e, "wire", None) or _dumps(e) for e in events]
+    data = f"data: {body[0] if len(body) == 1 else '[' + ','.join(body) + ']'}\n\n"
+    eid = events[-1].get("eid") if events else None
+    return f"id: {format_event_id(eid)}\n{data}" if eid else data
+
+
+def _record_flush(q: asyncio.Queue, events: list[dict]) -> None:
+    st = _stats.get(q)
+    if st is None or not events:
+        return
+    st.delivered += len(events)
+    st.frames += 1
+    ts = events[0].get("timestamp")
+    if isinstance(ts, str):
         try:
-            q.put_nowait(payload)
-        except asyncio.QueueFull:
-            # Slow consumer — drop oldest and retry
+            lag = (datetime.now(timezone.utc) - datetime.fromisoformat(ts)).total_seconds() * 1000
+        except ValueError:
+            return
+        st.last_lag_ms = round(lag, 1)
+        st.max_lag_ms = max(st.max_lag_ms, st.last_lag_ms)
+
+
+async def next_frame(
+    q: asyncio.Queue,
+    timeout: float,
+    *,
+    window: float = COALESCE_WINDOW,
+    max_events: int = COALESCE_MAX_EVENTS,
+) -> list[dict]:
+    """Wait for the next batch of events for one subscriber.
+
+    Blocks up to *timeout* seconds for a first event (raising
+    ``asyncio.TimeoutError`` if none arrives), then keeps collecting for
+    *window* seconds or until *max_events* are buffered.  Raises
+    ``SubscriberDisconnected`` if the hub has disconnected the subscriber.
+    """
+    first = await asyncio.wait_for(q.get(), timeout=timeout)
+    if first is _CLOSED:
+        raise SubscriberDisconnected()
+    events = [first]
+    deadline = time.monotonic() + window
+    while len(events) < max_events:
+        try:
+            item = q.get_nowait()
+        except asyncio.QueueEmpty:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(q.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        if item is _CLOSED:
+            q.put_nowait(item)  # surface on the next call, after this frame
+            break
+        events.append(item)
+    _record_flush(q, events)
+    return events
+
+
+# ---------------------------------------------------------------------------
+# Broadcast
+# ---------------------------------------------------------------------------
+
+def _coalesce_key(event: dict) -> tuple | None:
+    kind = event.get("type")
+    if kind == "agent_activity":
+        return (kind, event.get("team"), event.get("agent"))
+    if kind == "task_update":
+        fields = frozenset(k for k in event if k not in ("type", "task_id", "team", "timestamp", "eid"))
+        return (kind, event.get("team"), event.get("task_id"), fields)
+    return None
+
+
+def _coalesce(q: asyncio.Queue, event: dict, st: SubscriberStats) -> None:
+    """Make room by collapsing superseded events, newest wins."""
+    pending = []
+    while not q.empty():
+        pending.append(q.get_nowait())
+    pending.append(event)
+    seen: set[tuple] = set()
+    kept: list = []
+    for item in reversed(pending):
+        key = _coalesce_key(item)
+        if key is not None:
+            if key in seen:
+                st.coalesced += 1
+                continue
+            seen.add(key)
+        kept.append(item)
+    kept.reverse()
+    overflow = len(kept) - q.maxsize
+    if overflow > 0:
+        st.dropped += overflow
+        kept = kept[overflow:]
+    for item in kept:
+        q.put_nowait(item)
+
+
+def _disconnect(q: asyncio.Queue, st: SubscriberStats) -> None:
+    """Stop delivering to *q* and wake its reader with the close sentinel."""
+    _detach(q)
+    while not q.empty():
+        q.get_nowait()
+        st.dropped += 1
+    q.put_nowait(_CLOSED)
+    st.disconnected = True
+    logger.info("Disconnected slow SSE subscriber (topic=%s)", st.topic)
+
+
+def _deliver(q: asyncio.Queue, event: dict) -> bool:
+    """Enqueue *event* for one subscriber, applying its backpressure policy.
+
+    Returns False if the subscriber is unresponsive and should be removed.
+    """
+    st = _stats.get(q)
+    try:
+        q.put_nowait(event)
+    except asyncio.QueueFull:
+        policy = st.policy if st is not None else "drop_oldest"
+        if policy == "disconnect":
+            _disconnect(q, st)
+            return True
+        if policy == "coalesce":
+            _coalesce(q, event, st)
+        else:
             try:
                 q.get_nowait()
-                q.put_nowait(payload)
+                q.put_nowait(event)
             except (asyncio.QueueEmpty, asyncio.QueueFull):
-                dead.append(q)
+                return False
+            if st is not None:
+                st.dropped += 1
+    if st is not None and q.qsize() > st.max_backlog:
+        st.max_backlog = q.qsize()
+    return True
 
-    for q in dead:
-        _subscribers.pop(q, None)
+
+def _push_to_subscribers(payload: dict) -> None:
+    """Publish a payload dict to the subscribers of its topics (non-blocking).
+
+    Events are delivered to ``("all",)`` subscribers, the team's
+    subscribers, and — when the event names an agent or task — that
+    agent's / task's subscribers.  Events without a ``team`` go to every
+    subscriber.  Payloads without an ``eid`` are stamped and kept in the
+    team's replay buffer (activity entries are stamped by ``broadcast()``
+    and replayed from the rings instead).
+
+    The payload is serialised once; every receiving queue shares it.
+    """
+    if "eid" not in payload:
+        payload["eid"] = _stamp()
+        event = _Event(payload)
+        _remember(event)
+    else:
+        event = payload if isinstance(payload, _Event) else _Event(payload)
+
+    if payload.get("team") is None:
+        targets: list[asyncio.Queue] = list(_subscribers)
+    else:
+        targets = []
+        for topic in event_topics(payload):
+            subs = _topics.get(topic)
+            if subs:
+                targets.extend(subs)
+
+    for q in targets:
+        if not _deliver(q, event):
+            logger.warning("Dropping unresponsive SSE subscriber (topic=%s)", _subscribers.get(q))
+            unsubscribe(q)
 
 
 def broadcast(
@@ -152,8 +556,11 @@ def broadcast(
     Safe to call from any coroutine — the queue puts are non-blocking
     (entries are silently dropped for slow subscribers).
     """
-    entry = ActivityEntry(agent=agent, team=team, tool=tool, detail=detail, task_id=task_id)
-    _get_ring(team, agent).append(entry)
+    entry = ActivityEntry(agent=agent, team=team, tool=tool, detail=detail, task_id=task_id, eid=_stamp())
+    ring = _get_ring(team, agent)
+    if len(ring) == ring.maxlen:
+        _evict(team, ring[0].eid)
+    ring.append(entry)
     _push_to_subscribers(entry.to_dict())
 
 
@@ -176,6 +583,38 @@ def broadcast_task_update(task_id: int, team: str, changes: dict[str, Any]) -> N
     _push_to_subscribers(payload)
 
 
+def broadcast_change(team: str, change: dict[str, Any]) -> None:
+    """Broadcast a committed change-feed delta to all SSE clients.
+
+    The event has ``type: "change"`` and carries the delta's ``seq`` so
+    clients can detect gaps and resync via ``/teams/{team}/changes``.
+    """
+    payload = {
+        "type": "change",
+        "team": team,
+        "seq": change["seq"],
+        "kind": change["kind"],
+        "id": change["id"],
+        "op": change["op"],
+        "data": change["data"],
+    }
+    _push_to_subscribers(payload)
+
+
+def broadcast_shared_files(team: str, changes: list[dict[str, str]]) -> None:
+    """Broadcast a batch of ``shared/`` changes (see delegate/shared_index.py).
+
+    ``changes`` is a list of ``{"op": "added"|"modified"|"deleted", "path": rel}``.
+    """
+    payload = {
+        "type": "shared_files",
+        "team": team,
+        "changes": changes,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    _push_to_subscribers(payload)
+
+
 def broadcast_turn_event(
     event_type: str,
     agent: str,
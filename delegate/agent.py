@@ -238,19 +238,6 @@ def _write_state(ad: Path, state: dict) -> None:
     )
 
 
-def _next_worklog_number(ad: Path) -> int:
-    logs_dir = ad / "logs"
-    if not logs_dir.is_dir():
-        return 1
-    nums = []
-    for f in logs_dir.glob("*.worklog.md"):
-        try:
-            nums.append(int(f.stem.split(".")[0]))
-        except (ValueError, IndexError):
-            pass
-    return max(nums, default=0) + 1
-
-
 def _get_current_task(hc_home: Path, team: str, agent: str) -> dict | None:
     """Get the agent's current task dict, preferring in_progress then open."""
     try:
@@ -507,8 +494,19 @@ def _check_reflection_due() -> bool:
     return random.random() < REFLECTION_PROBABILITY
 
 
-# Maximum messages to batch per turn (all must share the same task_id).
-MAX_BATCH_SIZE = 5
+# Hard cap on messages batched per turn (all must share the same task_id).
+# The effective batch is usually bounded by BATCH_TOKEN_BUDGET instead.
+MAX_BATCH_SIZE = 25
+
+# Approximate token budget for the message bodies in one batch.  Many short
+# review comments fit in one turn; a couple of long reports fill it up.
+BATCH_TOKEN_BUDGET = 6000
+
+# Debounce: wait until an agent's inbox has been quiet for this long before
+# dispatching, so bursts (e.g. 15 review comments) land in a single turn...
+BATCH_DEBOUNCE_SECONDS = 2.0
+# ...but never hold the oldest unread message back longer than this.
+BATCH_MAX_WAIT_SECONDS = 10.0
 
 # Context limits for bidirectional conversation history
 HISTORY_WITH_PEER = 8       # messages with the primary sender (both directions)
@@ -0,0 +1,188 @@
+"""Agent status registry — turn state and last activity per agent.
+
+The web UI shows, for every agent, whether it is mid-turn, which task the
+turn is for and when it was last active.  Deriving that from the
+filesystem means stat-ing every worklog on every page load, so instead
+the session lifecycle feeds this registry directly:
+
+- ``chat.start_session()`` → ``turn_state = "running"``, ``task_id``,
+  ``session_id``, ``turn_started_at``
+- ``chat.update_session_task()`` → ``task_id``
+- ``chat.end_session()`` → ``turn_state = "idle"``, ``last_active_at``
+
+Each update is written to the ``agent_status`` table in the same
+transaction as the ``sessions`` row (so it survives restarts) and then
+applied to an in-memory copy, which is what readers see.  The table is
+loaded once per team per process; a ``running`` row left behind by a
+previous process is reported as ``idle``.
+
+Usage::
+
+    from delegate.agent_status import get_statuses
+    statuses = get_statuses(hc_home, team)   # {agent: {...}}
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from delegate.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+TURN_STATES = ("idle", "running")
+
+FIELDS = ("turn_state", "task_id", "session_id", "turn_started_at", "last_active_at")
+
+# (hc_home, team) -> {agent: status dict}
+_registry: dict[tuple[str, str], dict[str, dict]] = {}
+# (hc_home, team) -> bumped on every change (cache validator)
+_versions: dict[tuple[str, str], int] = {}
+_lock = threading.Lock()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _normalize_ts(ts: str | None) -> str | None:
+    # Rows backfilled from ``sessions`` use SQLite's ``...Z`` format.
+    if ts and ts.endswith("Z"):
+        return ts[:-1] + "+00:00"
+    return ts
+
+
+def _empty(agent: str) -> dict:
+    return {"agent": agent, **{f: None for f in FIELDS}, "turn_state": "idle"}
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _load(hc_home: Path, team: str) -> dict[str, dict]:
+    """Return the in-memory registry for *team*, loading it on first use."""
+    key = (str(hc_home), team)
+    with _lock:
+        entries = _registry.get(key)
+    if entries is not None:
+        return entries
+
+    loaded: dict[str, dict] = {}
+    conn = get_connection(hc_home, team)
+    try:
+        conn.row_factory = sqlite3.Row
+        for row in conn.execute(
+            f"SELECT agent, {', '.join(FIELDS)} FROM agent_status WHERE team = ?", (team,),
+        ):
+            status = {"agent": row["agent"], **{f: row[f] for f in FIELDS}}
+            status["last_active_at"] = _normalize_ts(status["last_active_at"])
+            if status["turn_state"] == "running":
+                status["turn_state"] = "idle"  # turn belonged to a previous process
+            loaded[row["agent"]] = status
+    finally:
+        conn.close()
+
+    with _lock:
+        return _registry.setdefault(key, loaded)
+
+
+# ---------------------------------------------------------------------------
+# Write side (called from delegate/chat.py session helpers)
+# ---------------------------------------------------------------------------
+
+def _upsert(conn: sqlite3.Connection, team: str, status: dict) -> None:
+    conn.execute(
+        f"INSERT INTO agent_status (team, agent, {', '.join(FIELDS)}) "
+        f"VALUES (?, ?, {', '.join('?' for _ in FIELDS)}) "
+        "ON CONFLICT(team, agent) DO UPDATE SET "
+        + ", ".join(f"{f} = excluded.{f}" for f in FIELDS),
+        (team, status["agent"], *(status[f] for f in FIELDS)),
+    )
+
+
+def _next(hc_home: Path, team: str, agent: str, **changes) -> dict:
+    current = _load(hc_home, team).get(agent) or _empty(agent)
+    return {**current, **changes}
+
+
+def _apply(hc_home: Path, team: str, status: dict) -> None:
+    key = (str(hc_home), team)
+    entries = _load(hc_home, team)
+    with _lock:
+        entries[status["agent"]] = status
+        _versions[key] = _versions.get(key, 0) + 1
+
+
+def record_turn_start(
+    conn: sqlite3.Connection,
+    hc_home: Path,
+    team: str,
+    agent: str,
+    *,
+    task_id: int | None,
+    session_id: int,
+) -> dict:
+    """Persist a ``running`` status on *conn* (not committed); returns it for ``apply``."""
+    status = _next(
+        hc_home, team, agent,
+        turn_state="running", task_id=task_id, session_id=session_id,
+        turn_started_at=_now(),
+    )
+    _upsert(conn, team, status)
+    return status
+
+
+def record_turn_end(
+    conn: sqlite3.Connection, hc_home: Path, team: str, agent: str, *, session_id: int,
+) -> dict:
+    """Persist an ``idle`` status stamped with ``last_active_at`` (not committed)."""
+    current = _next(hc_home, team, agent)
+    # A later session may already have started (e.g. reflection) — keep it.
+    running_other = current["turn_state"] == "running" and current["session_id"] != session_id
+    status = current if running_other else {**current, "turn_state": "idle"}
+    status = {**status, "last_active_at": _now()}
+    _upsert(conn, team, status)
+    return status
+
+
+def record_turn_task(
+    conn: sqlite3.Connection, hc_home: Path, team: str, agent: str, *, session_id: int, task_id: int,
+) -> dict | None:
+    """Persist the task a running session resolved to (not committed)."""
+    current = _next(hc_home, team, agent)
+    if current["session_id"] != session_id:
+        return None
+    status = {**current, "task_id": task_id}
+    _upsert(conn, team, status)
+    return status
+
+
+def apply(hc_home: Path, team: str, status: dict | None) -> None:
+    """Make a committed status visible to readers."""
+    if status is not None:
+        _apply(hc_home, team, status)
+
+
+# ---------------------------------------------------------------------------
+# Read side
+# ---------------------------------------------------------------------------
+
+def get_statuses(hc_home: Path, team: str) -> dict[str, dict]:
+    """Return ``{agent: status}`` for every agent that has ever run a turn."""
+    entries = _load(hc_home, team)
+    with _lock:
+        return {agent: dict(status) for agent, status in entries.items()}
+
+
+def get_status(hc_home: Path, team: str, agent: str) -> dict:
+    """Return *agent*'s status (an idle placeholder if it never ran a turn)."""
+    status = _load(hc_home, team).get(agent)
+    return dict(status) if status is not None else _empty(agent)
+
+
+def version(hc_home: Path, team: str) -> int:
+    """Counter bumped on every status change in this process (for ETags)."""
+    return _versions.get((str(hc_home), team), 0)
@@ -0,0 +1,213 @@
+"""Per-team change feed — a monotonic log of compact deltas.
+
+Every task, message, review and comment mutation appends one row to the
+``changes`` table **in the same transaction** as the mutation itself, so
+the feed can never disagree with the data it describes.  Rows carry a
+per-team sequence number (``seq``) that only ever increases; clients keep
+the last ``seq`` they applied and ask for everything after it:
+
+    GET /teams/{team}/changes?since=<seq>
+
+A delta is ``{seq, kind, id, op, data}`` where *kind* is one of
+``task``, ``task_comment``, ``message``, ``review`` or
+``review_comment``; *op* is ``create``, ``update`` or ``delete``; and
+*data* holds only the fields that changed (the full row for ``create``).
+
+The log is trimmed to the newest ``RETENTION`` rows per team.  A client
+whose cursor predates the retained window gets ``reset: true`` and should
+refetch the full board once, then continue from the returned ``seq``.
+
+Usage (inside a mutation)::
+
+    conn = get_connection(hc_home, team)
+    try:
+        conn.execute("UPDATE tasks SET ...")
+        change = record(conn, team, "task", task_id, "update", {"status": "done"})
+        conn.commit()
+    finally:
+        conn.close()
+    publish(team, [change])
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from delegate.db import db_generation, get_connection
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("task", "task_comment", "message", "review", "review_comment")
+OPS = ("create", "update", "delete")
+
+RETENTION = 5000     # rows kept per team
+PRUNE_EVERY = 256    # prune when seq is a multiple of this
+PAGE_LIMIT = 500     # default max deltas per response
+
+# Message columns shipped in a ``message``/``create`` delta.
+MESSAGE_FIELDS = (
+    "id", "timestamp", "sender", "recipient", "content", "type",
+    "task_id", "delivered_at",
+)
+
+HEAD_TTL = 1.0  # seconds a cached head seq is trusted without re-querying
+
+# (hc_home, team) -> (db generation, head seq, monotonic time checked)
+_head_cache: dict[tuple[str, str], tuple[tuple[int, ...], int, float]] = {}
+
+
+# ---------------------------------------------------------------------------
+# Write side
+# ---------------------------------------------------------------------------
+
+def record(
+    conn: sqlite3.Connection,
+    team: str,
+    kind: str,
+    entity_id: int | None,
+    op: str,
+    data: dict[str, Any] | None = None,
+) -> dict:
+    """Append a delta to *team*'s change log on *conn* (not committed).
+
+    The sequence number is allocated with a single ``INSERT … SELECT
+    MAX(seq) + 1`` so concurrent writers (which SQLite serialises) can't
+    hand out the same number.  Returns the delta dict for ``publish()``.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown change kind '{kind}'")
+    if op not in OPS:
+        raise ValueError(f"Unknown change op '{op}'")
+
+    payload = data or {}
+    seq = conn.execute(
+        "INSERT INTO changes (team, seq, kind, entity_id, op, data) "
+        "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ?, ? FROM changes WHERE team = ? "
+        "RETURNING seq",
+        (team, kind, entity_id, op, json.dumps(payload, separators=(",", ":")), team),
+    ).fetchone()[0]
+
+    if seq % PRUNE_EVERY == 0:
+        conn.execute(
+            "DELETE FROM changes WHERE team = ? AND seq <= ?",
+            (team, seq - RETENTION),
+        )
+
+    return {"seq": seq, "kind": kind, "id": entity_id, "op": op, "data": payload}
+
+
+def record_message(conn: sqlite3.Connection, team: str, msg_id: int) -> dict:
+    """Record a ``message``/``create`` delta for a row just inserted on *conn*."""
+    row = conn.execute(
+        f"SELECT {', '.join(MESSAGE_FIELDS)} FROM messages WHERE id = ?", (msg_id,),
+    ).fetchone()
+    return record(conn, team, "message", msg_id, "create", dict(zip(MESSAGE_FIELDS, row)))
+
+
+def publish(team: str, changes: list[dict]) -> None:
+    """Best-effort SSE notification of committed deltas.
+
+    Call only after the transaction that recorded *changes* has
+    committed — subscribers may immediately fetch ``/changes``.
+    """
+    if not changes:
+        return
+    for key in [k for k in _head_cache if k[1] == team]:
+        _head_cache.pop(key, None)
+    try:
+        from delegate.activity import broadcast_change
+        for change in changes:
+            broadcast_change(team, change)
+    except Exception:
+        logger.debug("Change broadcast failed for team %s", team, exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Read side
+# ---------------------------------------------------------------------------
+
+def _bounds(conn: sqlite3.Connection, team: str) -> tuple[int, int]:
+    """Return ``(oldest retained seq, head seq)`` — both 0 for an empty log."""
+    row = conn.execute(
+        "SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) FROM changes WHERE team = ?",
+        (team,),
+    ).fetchone()
+    return row[0], row[1]
+
+
+def head_seq(hc_home: Path, team: str) -> int:
+    """Return the latest sequence number for *team* (0 if none)."""
+    conn = get_connection(hc_home, team)
+    try:
+        return _bounds(conn, team)[1]
+    finally:
+        conn.close()
+
+
+def cached_head_seq(hc_home: Path, team: str) -> int:
+    """Like ``head_seq()`` but usually answered without touching SQLite.
+
+    The cached value is reused while the DB file generation is unchanged
+    and it is younger than ``HEAD_TTL``; ``publish()`` drops it as soon as
+    this process commits a change.  Writes from other processes are seen
+    through the generation check, and the TTL bounds staleness if two of
+    them land within one filesystem timestamp tick.  Meant for cache
+    validators (ETags), not for reading the log.
+    """
+    key = (str(hc_home), team)
+    gen = db_generation(hc_home)
+    now = time.monotonic()
+    cached = _head_cache.get(key)
+    if cached is not None and cached[0] == gen and now - cached[2] < HEAD_TTL:
+        return cached[1]
+    seq = head_seq(hc_home, team)
+    _head_cache[key] = (gen, seq, now)
+    return seq
+
+
+def changes_since(
+    hc_home: Path,
+    team: str,
+    since: int = 0,
+    *,
+    limit: int = PAGE_LIMIT,
+) -> dict:
+    """Return deltas with ``seq > since``, oldest first.
+
+    Response shape::
+
+        {"seq": <cursor to pass next time>,
+         "head": <latest seq>,
+         "changes": [{seq, kind, id, op, data}, ...],
+         "more": <True if another page is waiting>,
+         "reset": <True if the client must refetch everything>}
+
+    ``reset`` is set when *since* falls before the retained window (the
+    deltas in between were pruned) or after the head (the cursor came
+    from a different database).  In that case ``changes`` is empty and
+    ``seq`` is the current head.
+    """
+    conn = get_connection(hc_home, team)
+    try:
+        oldest, head = _bounds(conn, team)
+        if since > head or (oldest and since < oldest - 1):
+            return {"seq": head, "head": head, "changes": [], "more": False, "reset": True}
+        rows = conn.execute(
+            "SELECT seq, kind, entity_id, op, data FROM changes "
+            "WHERE team = ? AND seq > ? ORDER BY seq ASC LIMIT ?",
+            (team, since, limit + 1),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    changes = [
+        {"seq": r[0], "kind": r[1], "id": r[2], "op": r[3], "data": json.loads(r[4])}
+        for r in rows
+    ]
+    cursor = changes[-1]["seq"] if changes else since
+    return {"seq": cursor, "head": head, "changes": changes, "more": more, "reset": False}
@@ -9,6 +9,7 @@ Schema is managed by ``delegate.db`` — this module only reads/writes data.
 import argparse
 from pathlib import Path
 
+from delegate.changes import publish, record_message
 from delegate.config import SYSTEM_USER
 from delegate.db import get_connection
 
@@ -16,13 +17,17 @@ from delegate.db import get_connection
 def log_event(hc_home: Path, team: str, description: str, *, task_id: int | None = None) -> int:
     """Log a system event. Returns the event ID."""
     conn = get_connection(hc_home, team)
-    cursor = conn.execute(
-        "INSERT INTO messages (sender, recipient, content, type, task_id, team) VALUES (?, ?, ?, 'event', ?, ?)",
-        (SYSTEM_USER, SYSTEM_USER, description, task_id, team),
-    )
-    conn.commit()
-    msg_id = cursor.lastrowid
-    conn.close()
+    try:
+        cursor = conn.execute(
+            "INSERT INTO messages (sender, recipient, content, type, task_id, team) VALUES (?, ?, ?, 'event', ?, ?)",
+            (SYSTEM_USER, SYSTEM_USER, description, task_id, team),
+        )
+        msg_id = cursor.lastrowid
+        change = record_message(conn, team, msg_id)
+        conn.commit()
+    finally:
+        conn.close()
+    publish(team, [change])
     return msg_id
 
 
@@ -167,16 +172,34 @@ def get_task_timeline(
 # --- Session tracking ---
 
 
-def start_session(hc_home: Path, team: str, agent: str, task_id: int | None = None) -> int:
-    """Start a new agent session. Returns session ID."""
+def start_session(
+    hc_home: Path,
+    team: str,
+    agent: str,
+    task_id: int | None = None,
+    kind: str = "turn",
+) -> int:
+    """Start a new agent session. Returns session ID.
+
+    *kind* is ``'turn'`` for regular inbox-driven turns or
+    ``'reflection'`` for deferred reflection turns.
+    """
+    from delegate import agent_status
+
     conn = get_connection(hc_home, team)
-    cursor = conn.execute(
-        "INSERT INTO sessions (agent, task_id, team) VALUES (?, ?, ?)",
-        (agent, task_id, team),
-    )
-    conn.commit()
-    session_id = cursor.lastrowid
-    conn.close()
+    try:
+        cursor = conn.execute(
+            "INSERT INTO sessions (agent, task_id, team, kind) VALUES (?, ?, ?, ?)",
+            (agent, task_id, team, kind),
+        )
+        session_id = cursor.lastrowid
+        status = agent_status.record_turn_start(
+            conn, hc_home, team, agent, task_id=task_id, session_id=session_id,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    agent_status.apply(hc_home, team, status)
     return session_id
 
 
@@ -191,32 +214,52 @@ def end_session(
     cache_write_tokens: int = 0,
 ) -> None:
     """End an agent session, recording duration and token usage."""
+    from delegate import agent_status
+
+    status = None
     conn = get_connection(hc_home, team)
-    conn.execute(
-        """UPDATE sessions SET
-            ended_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
-            duration_seconds = (julianday('now') - julianday(started_at)) * 86400,
-            tokens_in = ?,
-            tokens_out = ?,
-            cost_usd = ?,
-            cache_read_tokens = ?,
-            cache_write_tokens = ?
-        WHERE id = ? AND team = ?""",
-        (tokens_in, tokens_out, cost_usd, cache_read_tokens, cache_write_tokens, session_id, team),
-    )
-    conn.commit()
-    conn.close()
+    try:
+        row = conn.execute(
+            """UPDATE sessions SET
+                ended_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+                duration_seconds = (julianday('now') - julianday(started_at)) * 86400,
+                tokens_in = ?,
+                tokens_out = ?,
+                cost_usd = ?,
+                cache_read_tokens = ?,
+                cache_write_tokens = ?
+            WHERE id = ? AND team = ?
+            RETURNING agent""",
+            (tokens_in, tokens_out, cost_usd, cache_read_tokens, cache_write_tokens, session_id, team),
+        ).fetchone()
+        if row is not None:
+            status = agent_status.record_turn_end(conn, hc_home, team, row[0], session_id=session_id)
+        conn.commit()
+    finally:
+        conn.close()
+    agent_status.apply(hc_home, team, status)
 
 
 def update_session_task(hc_home: Path, team: str, session_id: int, task_id: int) -> None:
     """Update the task_id on a running session."""
+    from delegate import agent_status
+
+    status = None
     conn = get_connection(hc_home, team)
-    conn.execute(
-        "UPDATE sessions SET task_id = ? WHERE id = ? AND task_id IS NULL AND team = ?",
-        (task_id, session_id, team),
-    )
-    conn.commit()
-    conn.close()
+    try:
+        row = conn.execute(
+            "UPDATE sessions SET task_id = ? WHERE id = ? AND task_id IS NULL AND team = ? "
+            "RETURNING agent",
+            (task_id, session_id, team),
+        ).fetchone()
+        if row is not None:
+            status = agent_status.record_turn_task(
+                conn, hc_home, team, row[0], session_id=session_id, task_id=task_id,
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    agent_status.apply(hc_home, team, status)
 
 
 def update_session_tokens(
@@ -281,7 +324,8 @@ def get_agent_stats(hc_home: Path, team: str, agent: str) -> dict:
             COALESCE(SUM(tokens_out), 0) as total_tokens_out,
             COALESCE(SUM(cost_usd), 0.0) as total_cost_usd,
             COALESCE(SUM(cache_read_tokens), 0) as total_cache_read,
-            COALESCE(SUM(cache_write_tokens), 0) as total_cache_write
+            COALESCE(SUM(cache_write_tokens), 0) as total_cache_write,
+            COALESCE(SUM(CASE WHEN kind = 'reflection' THEN cost_usd END), 0.0) as reflection_cost_usd
         FROM sessions WHERE agent = ? AND team = ?""",
         (agent, team),
     ).fetchone()
@@ -295,6 +339,7 @@ def get_agent_stats(hc_home: Path, team: str, agent: str) -> dict:
         "total_cost_usd": 0.0,
         "total_cache_read": 0,
         "total_cache_write": 0,
+        "reflection_cost_usd": 0.0,
     }
 
     all_tasks = list_tasks(hc_home, team, assignee=agent)
@@ -318,6 +363,7 @@ _EMPTY_AGENT_STATS = {
     "total_cost_usd": 0.0,
     "total_cache_read": 0,
     "total_cache_write": 0,
+    "reflection_cost_usd": 0.0,
 }
 
 
@@ -343,7 +389,8 @@ def get_team_agent_stats(hc_home: Path, team: str, agent_names: list[str]) -> di
                 COALESCE(SUM(tokens_out), 0) as total_tokens_out,
                 COALESCE(SUM(cost_usd), 0.0) as total_cost_usd,
                 COALESCE(SUM(cache_read_tokens), 0) as total_cache_read,
-                COALESCE(SUM(cache_write_tokens), 0) as total_cache_write
+                COALESCE(SUM(cache_write_tokens), 0) as total_cache_write,
+                COALESCE(SUM(CASE WHEN kind = 'reflection' THEN cost_usd END), 0.0) as reflection_cost_usd
             FROM sessions WHERE team = ?
             GROUP BY agent""",
             (team,),
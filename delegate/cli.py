@@ -54,11 +54,12 @@ def main(ctx: click.Context, home_override: Path | None) -> None:
 # ──────────────────────────────────────────────────────────────
 
 @main.command()
-def doctor() -> None:
-    """Verify that all runtime dependencies are installed."""
+@click.pass_context
+def doctor(ctx: click.Context) -> None:
+    """Verify runtime dependencies and report worktree disk usage."""
     from delegate.doctor import run_doctor, print_doctor_report
 
-    checks = run_doctor()
+    checks = run_doctor(_get_home(ctx))
     ok = print_doctor_report(checks)
     if not ok:
         raise SystemExit(1)
@@ -813,6 +814,81 @@ def repo_pre_merge_script(ctx: click.Context, team_name: str, repo_name: str, sc
         click.echo(f"Cleared pre-merge script for '{repo_name}' (team: {team_name})")
 
 
+# ── delegate repo clear-test-cache ──
+
+@repo.command("clear-test-cache")
+@click.argument("team_name")
+@click.argument("repo_name", required=False)
+@click.pass_context
+def repo_clear_test_cache(ctx: click.Context, team_name: str, repo_name: str | None) -> None:
+    """Forget cached test passes so the next merge re-runs its checks.
+
+    Clears every repo of TEAM_NAME, or only REPO_NAME if given.
+    """
+    from delegate.testcache import invalidate
+
+    hc_home = _get_home(ctx)
+    removed = invalidate(hc_home, team_name, repo=repo_name)
+    scope = f"repo '{repo_name}'" if repo_name else f"team '{team_name}'"
+    click.echo(f"Cleared {removed} cached test result(s) for {scope}")
+
+
+# ── delegate repo maintenance ──
+
+@repo.command("maintenance")
+@click.argument("team_name")
+@click.argument("repo_name", required=False)
+@click.pass_context
+def repo_maintenance(ctx: click.Context, team_name: str, repo_name: str | None) -> None:
+    """Run git maintenance now (prune merge leftovers, pack refs, repack).
+
+    Runs for every repo of TEAM_NAME, or only REPO_NAME if given.  Don't run
+    it while the daemon is merging for this team.
+    """
+    from delegate.config import get_repos
+    from delegate.maintenance import run
+
+    hc_home = _get_home(ctx)
+    names = [repo_name] if repo_name else list(get_repos(hc_home, team_name))
+    for name in names:
+        stats = run(hc_home, team_name, name)
+        if "seconds" not in stats:
+            click.echo(f"{name}: repository not found, skipped")
+            continue
+        click.echo(
+            f"{name}: {stats['seconds']:.1f}s, reclaimed {stats['reclaimed_bytes'] / 2**20:.1f} MiB, "
+            f"loose refs {stats['loose_refs_before']} → {stats['loose_refs_after']}, "
+            f"removed {stats['merge_worktrees']} merge worktree(s) and "
+            f"{stats['merge_branches']} _merge branch(es)"
+        )
+
+
+# ── delegate repo gc ──
+
+@repo.command("gc")
+@click.argument("team_name")
+@click.option("--dry-run", is_flag=True, help="Only list what would be removed.")
+@click.pass_context
+def repo_gc(ctx: click.Context, team_name: str, dry_run: bool) -> None:
+    """Remove orphaned worktrees of TEAM_NAME and enforce its disk quota.
+
+    Don't run it while the daemon is merging for this team.
+    """
+    from delegate.diskgc import gc
+
+    hc_home = _get_home(ctx)
+    result = gc(hc_home, team_name, dry_run=dry_run)
+    for r in result["removed"]:
+        click.echo(f"{'would remove' if dry_run else 'removed'} {r['path']} ({r['reason']}, {r['bytes'] / 2**20:.1f} MiB)")
+    usage = result["usage"]
+    quota = usage["quota_bytes"]
+    click.echo(
+        f"Freed {result['freed_bytes'] / 2**20:.1f} MiB; worktrees now use "
+        f"{usage['total_bytes'] / 2**20:.1f} MiB"
+        + (f" of a {quota / 2**20:.0f} MiB quota" if quota is not None else "")
+    )
+
+
 # ──────────────────────────────────────────────────────────────
 # delegate self-update
 # ──────────────────────────────────────────────────────────────
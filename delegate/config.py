@@ -5,6 +5,7 @@ Human members live in ``~/.delegate/members/<name>.yaml``.
 Per-team repo config lives in ``~/.delegate/teams/<team>/repos.yaml``.
 """
 
+import os
 from pathlib import Path
 
 import yaml
@@ -191,6 +192,22 @@ def set_source_repo(hc_home: Path, path: Path) -> None:
     _write(hc_home, data)
 
 
+# --- Disk quota for worktrees ---
+
+def get_disk_quota(hc_home: Path, team: str) -> int | None:
+    """Return the worktree disk quota for *team* in bytes, or None.
+
+    Read from ``disk_quota_mb`` in config.yaml — either one number for
+    every team or a ``{team: mb}`` mapping.  Unset or ``0`` means no quota.
+    """
+    quota = _read(hc_home).get("disk_quota_mb")
+    if isinstance(quota, dict):
+        quota = quota.get(team)
+    if not quota:
+        return None
+    return int(float(quota) * 2**20)
+
+
 # ---------------------------------------------------------------------------
 # Per-team repo config (teams/<team>/repos.yaml)
 # ---------------------------------------------------------------------------
@@ -330,3 +347,100 @@ def set_pre_merge_script(hc_home: Path, team: str, repo_name: str, script_path:
     data[repo_name].pop("pipeline", None)
     data[repo_name].pop("test_cmd", None)
     _write_repos(hc_home, team, data)
+
+
+# --- Worktree pool ---
+
+DEFAULT_WORKTREE_POOL_SIZE = 2
+DEFAULT_WORKTREE_POOL_MAX_MB = 4096
+
+
+def get_worktree_pool(hc_home: Path, team: str, repo_name: str) -> dict:
+    """Return ``{"size", "max_mb"}`` for a repo's pre-warmed worktree pool.
+
+    Read from the repo's ``worktree_pool`` mapping in repos.yaml; ``size: 0``
+    disables the pool.  *max_mb* bounds the disk used by parked worktrees.
+    """
+    repos = get_repos(hc_home, team)
+    pool = repos.get(repo_name, {}).get("worktree_pool") or {}
+    return {
+        "size": int(pool.get("size", DEFAULT_WORKTREE_POOL_SIZE)),
+        "max_mb": int(pool.get("max_mb", DEFAULT_WORKTREE_POOL_MAX_MB)),
+    }
+
+
+# --- Test result cache ---
+
+DEFAULT_TEST_CACHE_TTL_HOURS = 72
+
+
+def get_test_cache_ttl(hc_home: Path, team: str, repo_name: str) -> float:
+    """Return how long (seconds) a cached test pass stays valid for a repo.
+
+    Read from the repo's ``test_cache_ttl_hours`` in repos.yaml; ``0``
+    disables the cache.
+    """
+    repos = get_repos(hc_home, team)
+    hours = repos.get(repo_name, {}).get("test_cache_ttl_hours", DEFAULT_TEST_CACHE_TTL_HOURS)
+    return float(hours) * 3600
+
+
+# --- Change-aware test selection ---
+
+DEFAULT_TEST_SELECTION_IGNORE = ["*.md", "*.rst", "docs/**"]
+
+
+def get_test_selection(hc_home: Path, team: str, repo_name: str) -> dict | None:
+    """Return the repo's ``test_selection`` settings, or None if not enabled.
+
+    Keys (all optional besides ``enabled: true``):
+
+    - ``full_every`` — run the full suite after every N selective runs
+      (default 10; 0 = only when the mapping is uncertain).
+    - ``ignore`` — globs of changed files that need no tests.
+    - ``map`` — ``{glob: [test targets]}`` for files the Python import
+      graph can't see (templates, fixtures, other languages).
+    - ``command`` — subset command with a ``{targets}`` placeholder, for
+      repos whose runner isn't the auto-detected pytest.
+    """
+    repos = get_repos(hc_home, team)
+    sel = repos.get(repo_name, {}).get("test_selection") or {}
+    if not sel.get("enabled"):
+        return None
+    return {
+        "full_every": int(sel.get("full_every", 10)),
+        "ignore": list(sel.get("ignore", DEFAULT_TEST_SELECTION_IGNORE)),
+        "map": dict(sel.get("map") or {}),
+        "command": sel.get("command"),
+    }
+
+
+# --- Sharded test runs ---
+
+def get_test_shards(hc_home: Path, team: str, repo_name: str) -> int:
+    """Return how many parallel pytest shards to run a repo's tests in.
+
+    Read from the repo's ``test_shards`` in repos.yaml — a number, or
+    ``auto`` for one per CPU core.  ``1`` (the default) runs unsharded.
+    """
+    repos = get_repos(hc_home, team)
+    shards = repos.get(repo_name, {}).get("test_shards", 1)
+    if shards == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(shards))
+
+
+# --- Scheduled git maintenance ---
+
+DEFAULT_MAINTENANCE_INTERVAL_HOURS = 24
+
+
+def get_maintenance_interval(hc_home: Path, team: str, repo_name: str) -> float:
+    """Return seconds between scheduled git maintenance runs for a repo.
+
+    Read from the repo's ``maintenance_interval_hours`` in repos.yaml;
+    ``0`` disables scheduled maintenance.
+    """
+    repos = get_repos(hc_home, team)
+    hours = repos.get(repo_name, {}).get("maintenance_interval_hours", DEFAULT_MAINTENANCE_INTERVAL_HOURS)
+    return float(hours) * 3600
@@ -0,0 +1,273 @@
+"""Background conflict predictor for in-flight tasks.
+
+Content conflicts used to surface only when ``merge_task`` hit
+``SQUASH_CONFLICT`` — after implementation and review — and the work was
+redone.  This module finds them while the tasks are still in flight:
+
+- every active task branch (``ACTIVE_STATUSES``) is trial-merged against
+  ``main`` and against every other active branch of the same repo with
+  ``git merge-tree`` (see ``delegate.merge_tree``; nothing is checked
+  out).  Branch pairs are only merged when both touch a common file, and
+  results are memoized per commit pair;
+- the conflicting files are stored in ``conflict_predictions`` (one row
+  per task, counterpart, repo and file; counterpart ``0`` is ``main``,
+  pairs are stored in both directions);
+- overlaps that weren't predicted on the previous scan are sent to the
+  task's DRI and the manager (``notify.notify_predicted_conflict``) and
+  logged to the task's activity;
+- ``order_for_merge()`` lets the merge worker merge first the tasks whose
+  merge would break the fewest other in-flight branches.
+
+``predict_due()`` is run from the daemon loop at most every
+``PREDICT_INTERVAL`` seconds per team.
+"""
+
+import logging
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import combinations
+from pathlib import Path
+
+from delegate import merge_tree
+from delegate.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("in_progress", "in_review", "in_approval", "merging", "merge_failed")
+MAIN = 0  # other_task_id for conflicts against main
+PREDICT_INTERVAL = 120.0
+MAX_MEMO = 4096
+
+_lock = threading.Lock()
+_last_run: dict[tuple[str, str], float] = {}
+_running: set[tuple[str, str]] = set()
+# (repo dir, sha, sha) -> conflicting files; (repo dir, sha, main sha) -> touched files
+_merged: dict[tuple[str, str, str], list[str]] = {}
+_touched: dict[tuple[str, str, str], frozenset[str]] = {}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _git(args: list[str], cwd: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, cwd=cwd, capture_output=True, text=True, timeout=120)
+
+
+def _rev(repo_dir: str, ref: str) -> str | None:
+    result = _git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], repo_dir)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _memo(cache: dict, key, compute):
+    if key not in cache:
+        if len(cache) >= MAX_MEMO:
+            cache.pop(next(iter(cache)))
+        cache[key] = compute()
+    return cache[key]
+
+
+def _conflicts(repo_dir: str, ours: str, theirs: str) -> list[str]:
+    try:
+        merged = merge_tree.merge_trees(repo_dir, ours, theirs)
+    except RuntimeError as exc:
+        logger.debug("Trial merge of %s and %s failed: %s", ours[:8], theirs[:8], exc)
+        return []
+    return [] if merged.clean else merged.conflicts
+
+
+def _touched_files(repo_dir: str, sha: str, main_sha: str) -> frozenset[str]:
+    diff = _git(["diff", "--name-only", f"{main_sha}...{sha}"], repo_dir)
+    return frozenset(diff.stdout.split("\n")) - {""} if diff.returncode == 0 else frozenset()
+
+
+# ---------------------------------------------------------------------------
+# Scanning
+# ---------------------------------------------------------------------------
+
+def scan(hc_home: Path, team: str) -> dict[tuple[int, int, str], list[str]]:
+    """Trial-merge every active branch; ``{(task_id, other_id, repo): files}``."""
+    from delegate.repo import get_repo_path
+    from delegate.task import list_tasks
+
+    by_repo: dict[str, list[tuple[int, str]]] = {}
+    for task in list_tasks(hc_home, team):
+        if task.get("status") in ACTIVE_STATUSES and task.get("branch"):
+            for repo_name in task.get("repo", []):
+                by_repo.setdefault(repo_name, []).append((task["id"], task["branch"]))
+
+    found: dict[tuple[int, int, str], list[str]] = {}
+    if not merge_tree.has_merge_tree():
+        logger.debug("git merge-tree --write-tree unavailable; no conflict predictions")
+        return found
+
+    for repo_name, branches in by_repo.items():
+        repo_dir = str(get_repo_path(hc_home, team, repo_name).resolve())
+        main_sha = _rev(repo_dir, "main")
+        if main_sha is None:
+            continue
+        tips: dict[int, str] = {}
+        for task_id, branch in branches:
+            sha = _rev(repo_dir, branch)
+            if sha is not None and sha != main_sha:
+                tips[task_id] = sha
+        touched = {
+            tid: _memo(_touched, (repo_dir, sha, main_sha), lambda s=sha: _touched_files(repo_dir, s, main_sha))
+            for tid, sha in tips.items()
+        }
+
+        for tid, sha in tips.items():
+            if not touched[tid]:
+                continue
+            files = _memo(_merged, (repo_dir, main_sha, sha), lambda s=sha: _conflicts(repo_dir, main_sha, s))
+            if files:
+                found[(tid, MAIN, repo_name)] = files
+
+        for a, b in combinations(sorted(tips), 2):
+            common = touched[a] & touched[b]
+            if not common:
+                continue
+            key = (repo_dir, *sorted((tips[a], tips[b])))
+            files = _memo(_merged, key, lambda: _conflicts(repo_dir, key[1], key[2]))
+            # Only files both branches changed — the rest is main drift,
+            # already reported against main.
+            files = [f for f in files if f in common]
+            if files:
+                found[(a, b, repo_name)] = files
+                found[(b, a, repo_name)] = files
+    return found
+
+
+def _store(hc_home: Path, team: str, found: dict[tuple[int, int, str], list[str]]) -> set[tuple[int, int, str]]:
+    """Replace the team's predictions; returns the keys that are new."""
+    now = _now()
+    rows = {(t, o, r, f) for (t, o, r), files in found.items() for f in files}
+    conn = get_connection(hc_home, team)
+    try:
+        previous = {
+            tuple(row) for row in conn.execute(
+                "SELECT task_id, other_task_id, repo, file FROM conflict_predictions WHERE team = ?",
+                (team,),
+            )
+        }
+        conn.executemany(
+            "DELETE FROM conflict_predictions "
+            "WHERE team = ? AND task_id = ? AND other_task_id = ? AND repo = ? AND file = ?",
+            [(team, *row) for row in previous - rows],
+        )
+        conn.executemany(
+            "INSERT INTO conflict_predictions "
+            "(team, task_id, other_task_id, repo, file, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(team, task_id, other_task_id, repo, file) DO UPDATE SET last_seen = excluded.last_seen",
+            [(team, *row, now, now) for row in rows],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return {row[:3] for row in rows - previous}
+
+
+def predict(hc_home: Path, team: str, *, notify: bool = True) -> dict:
+    """Scan, store and announce predicted conflicts for *team*.
+
+    Returns ``{"predicted": n, "new": n}`` counted in (task, counterpart,
+    repo) groups.
+    """
+    from delegate.chat import log_event
+    from delegate.notify import notify_predicted_conflict
+    from delegate.task import format_task_id, get_task
+
+    found = scan(hc_home, team)
+    new = _store(hc_home, team, found)
+    if notify and new:
+        per_task: dict[int, list[dict]] = {}
+        for task_id, other, repo in sorted(new):
+            per_task.setdefault(task_id, []).append(
+                {"other": other, "repo": repo, "files": found[(task_id, other, repo)]}
+            )
+        for task_id, overlaps in per_task.items():
+            against = ", ".join(
+                "main" if o["other"] == MAIN else format_task_id(o["other"]) for o in overlaps
+            )
+            log_event(
+                hc_home, team,
+                f"{format_task_id(task_id)} conflict predicted with {against}",
+                task_id=task_id,
+            )
+            notify_predicted_conflict(hc_home, team, get_task(hc_home, team, task_id), overlaps)
+    if found:
+        logger.info("Conflict predictor %s: %d predicted, %d new", team, len(found), len(new))
+    return {"predicted": len(found), "new": len(new)}
+
+
+def predict_due(hc_home: Path, team: str) -> None:
+    """Run ``predict()`` if *team*'s interval has elapsed (daemon loop hook)."""
+    key = (str(hc_home), team)
+    with _lock:
+        last = _last_run.get(key)
+        if key in _running or (last is not None and time.monotonic() - last < PREDICT_INTERVAL):
+            return
+        _running.add(key)
+    try:
+        predict(hc_home, team)
+    except Exception:
+        logger.exception("Conflict prediction failed for team %s", team)
+    finally:
+        with _lock:
+            _running.discard(key)
+            _last_run[key] = time.monotonic()
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def predictions(hc_home: Path, team: str, task_id: int | None = None) -> list[dict]:
+    """Stored predictions, grouped per (task, counterpart, repo)."""
+    query = (
+        "SELECT task_id, other_task_id, repo, file, first_seen, last_seen "
+        "FROM conflict_predictions WHERE team = ?"
+    )
+    params: list = [team]
+    if task_id is not None:
+        query += " AND task_id = ?"
+        params.append(task_id)
+    conn = get_connection(hc_home, team)
+    try:
+        rows = conn.execute(query + " ORDER BY task_id, other_task_id, repo, file", params).fetchall()
+    finally:
+        conn.close()
+
+    grouped: dict[tuple[int, int, str], dict] = {}
+    for tid, other, repo, file, first_seen, last_seen in rows:
+        entry = grouped.setdefault((tid, other, repo), {
+            "task_id": tid, "other_task_id": other, "repo": repo,
+            "files": [], "first_seen": first_seen, "last_seen": last_seen,
+        })
+        entry["files"].append(file)
+        entry["first_seen"] = min(entry["first_seen"], first_seen)
+    return list(grouped.values())
+
+
+def order_for_merge(hc_home: Path, team: str, tasks: list[dict]) -> list[dict]:
+    """Sort merge-ready *tasks* so the least conflicting merge first.
+
+    Merging a task that conflicts with another in-flight branch forces that
+    branch to be reworked, so tasks are ordered by how many other tasks
+    they are predicted to conflict with (then by id, the old order).
+    """
+    if len(tasks) < 2:
+        return tasks
+    conn = get_connection(hc_home, team)
+    try:
+        degree = dict(conn.execute(
+            "SELECT task_id, COUNT(DISTINCT other_task_id) FROM conflict_predictions "
+            "WHERE team = ? AND other_task_id != 0 GROUP BY task_id",
+            (team,),
+        ).fetchall())
+    finally:
+        conn.close()
+    return sorted(tasks, key=lambda t: (degree.get(t["id"], 0), t["id"]))
@@ -448,6 +448,113 @@ CREATE INDEX IF NOT EXISTS idx_tasks_workflow ON tasks(workflow);
     """\
 ALTER TABLE tasks ADD COLUMN metadata TEXT NOT NULL DEFAULT '{}';
 UPDATE tasks SET workflow = 'default' WHERE workflow = 'standard';
+""",
+
+    # --- V15: Session kind (regular turn vs deferred reflection) ---
+    """\
+ALTER TABLE sessions ADD COLUMN kind TEXT NOT NULL DEFAULT 'turn';
+""",
+
+    # --- V16: Per-team change feed (see delegate/changes.py) ---
+    """\
+CREATE TABLE IF NOT EXISTS changes (
+    team        TEXT    NOT NULL,
+    seq         INTEGER NOT NULL,
+    kind        TEXT    NOT NULL,
+    entity_id   INTEGER,
+    op          TEXT    NOT NULL,
+    data        TEXT    NOT NULL DEFAULT '{}',
+    created_at  TEXT    NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    PRIMARY KEY (team, seq)
+) WITHOUT ROWID;
+""",
+
+    # --- V17: Agent status registry (see delegate/agent_status.py) ---
+    """\
+CREATE TABLE IF NOT EXISTS agent_status (
+    team            TEXT    NOT NULL,
+    agent           TEXT    NOT NULL,
+    turn_state      TEXT    NOT NULL DEFAULT 'idle',
+    task_id         INTEGER,
+    session_id      INTEGER,
+    turn_started_at TEXT,
+    last_active_at  TEXT,
+    PRIMARY KEY (team, agent)
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO agent_status (team, agent, task_id, session_id, last_active_at)
+SELECT team, agent, task_id, id, COALESCE(ended_at, started_at)
+FROM sessions s
+WHERE team IS NOT NULL
+  AND id = (SELECT MAX(id) FROM sessions WHERE team = s.team AND agent = s.agent);
+""",
+
+    # --- V18: Test result cache (see delegate/testcache.py) ---
+    """\
+CREATE TABLE IF NOT EXISTS test_results (
+    team        TEXT    NOT NULL,
+    repo        TEXT    NOT NULL,
+    tree_sha    TEXT    NOT NULL,
+    command     TEXT    NOT NULL,
+    env_hash    TEXT    NOT NULL,
+    passed      INTEGER NOT NULL,
+    output      TEXT    NOT NULL DEFAULT '',
+    duration_s  REAL    NOT NULL DEFAULT 0,
+    created_at  TEXT    NOT NULL,
+    PRIMARY KEY (team, repo, tree_sha, command, env_hash)
+) WITHOUT ROWID;
+""",
+
+    # --- V19: Test selection cadence (see delegate/testselect.py) ---
+    """\
+CREATE TABLE IF NOT EXISTS test_selection_state (
+    team             TEXT    NOT NULL,
+    repo             TEXT    NOT NULL,
+    runs_since_full  INTEGER NOT NULL DEFAULT 0,
+    full_duration_s  REAL,
+    updated_at       TEXT    NOT NULL,
+    PRIMARY KEY (team, repo)
+) WITHOUT ROWID;
+""",
+
+    # --- V20: Per-file test durations for shard balancing (see delegate/testshard.py) ---
+    """\
+CREATE TABLE IF NOT EXISTS test_durations (
+    team        TEXT    NOT NULL,
+    repo        TEXT    NOT NULL,
+    path        TEXT    NOT NULL,
+    duration_s  REAL    NOT NULL,
+    updated_at  TEXT    NOT NULL,
+    PRIMARY KEY (team, repo, path)
+) WITHOUT ROWID;
+""",
+
+    # --- V21: Predicted merge conflicts per file (see delegate/conflicts.py) ---
+    # other_task_id = 0 means "against main".
+    """\
+CREATE TABLE IF NOT EXISTS conflict_predictions (
+    team           TEXT    NOT NULL,
+    task_id        INTEGER NOT NULL,
+    other_task_id  INTEGER NOT NULL,
+    repo           TEXT    NOT NULL,
+    file           TEXT    NOT NULL,
+    first_seen     TEXT    NOT NULL,
+    last_seen      TEXT    NOT NULL,
+    PRIMARY KEY (team, task_id, other_task_id, repo, file)
+) WITHOUT ROWID;
+""",
+
+    # --- V22: Last scheduled git maintenance per repo (see delegate/maintenance.py) ---
+    """\
+CREATE TABLE IF NOT EXISTS repo_maintenance (
+    team             TEXT    NOT NULL,
+    repo             TEXT    NOT NULL,
+    last_run_at      TEXT    NOT NULL,
+    duration_s       REAL    NOT NULL,
+    reclaimed_bytes  INTEGER NOT NULL DEFAULT 0,
+    stats            TEXT    NOT NULL DEFAULT '{}',
+    PRIMARY KEY (team, repo)
+) WITHOUT ROWID;
 """,
 ]
 
@@ -567,6 +674,25 @@ def get_connection(hc_home: Path, team: str = "") -> sqlite3.Connection:
     return conn
 
 
+def db_generation(hc_home: Path) -> tuple[int, ...]:
+    """Return a cheap fingerprint that changes whenever the global DB is written.
+
+    Stats the database file and its WAL (``mtime_ns`` and size) without
+    opening a connection, so it also notices commits made by other
+    processes (CLI tools, a second daemon).  Used as a cache validator —
+    equal generations mean "probably unchanged", never the reverse.
+    """
+    path = global_db_path(hc_home)
+    parts: list[int] = []
+    for p in (path, path.with_name(path.name + "-wal")):
+        try:
+            st = p.stat()
+            parts.extend((st.st_mtime_ns, st.st_size))
+        except OSError:
+            parts.extend((0, 0))
+    return tuple(parts)
+
+
 # ---------------------------------------------------------------------------
 # Row helpers
 # ---------------------------------------------------------------------------
@@ -0,0 +1,325 @@
+"""Worktree garbage collection and per-team disk quotas.
+
+Worktrees are removed best-effort when a task merges or is cancelled, but
+crashed merges, daemon kills and tasks that never finish leave full
+checkouts behind.  ``gc()`` reconciles three views of
+``teams/<team>/worktrees/``:
+
+- the directories on disk — ``<repo>/T<id>`` (task), ``_merge/<uid>/T<id>``
+  (merge attempt) and ``_pool/<repo>/<uid>`` (pre-warmed, managed by
+  ``delegate.worktree_pool`` and never collected here),
+- ``git worktree list --porcelain`` of every registered repo,
+- the task statuses,
+
+and removes orphans: task worktrees whose task is done, cancelled or gone
+(or whose repo is no longer registered / on the task), merge worktrees of
+tasks that are no longer merging, and directories git doesn't know about.
+``git worktree prune`` then drops admin dirs of worktrees deleted by hand.
+Anything modified within ``GRACE_SECONDS`` is left alone, so a worktree
+being created right now is never mistaken for an orphan.
+
+If the team has a disk quota (``disk_quota_mb`` in config.yaml, see
+``config.get_disk_quota``) and is still over it, task worktrees are
+evicted oldest-idle first.  Only clean worktrees of tasks nobody is
+working in (``EVICTABLE_STATUSES``) qualify — their commits live on the
+branch, and ``repo.create_task_worktree()`` checks the branch out again
+when the task's next turn needs it.
+
+``usage()`` reports bytes per repo for ``GET /teams/{team}/disk`` and
+``delegate doctor``; the daemon calls ``gc_due()`` while the team is idle.
+A merge may be creating worktrees under ``_merge/`` at any moment, so the
+daemon passes ``defer_merge=True``: scanning and sizing (the slow part)
+run without the merge lock, and only ``remove_deferred()`` of the merge
+worktrees found takes it.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from delegate.config import get_disk_quota, get_repos
+from delegate.paths import team_dir
+
+logger = logging.getLogger(__name__)
+
+GC_INTERVAL = 900.0  # seconds between daemon passes per team
+GRACE_SECONDS = 600  # don't touch worktrees modified more recently
+EVICTABLE_STATUSES = ("todo", "in_approval", "rejected", "merge_failed")
+FINISHED_STATUSES = ("done", "cancelled")
+
+_lock = threading.Lock()
+_last_run: dict[tuple[str, str], float] = {}
+_running: set[tuple[str, str]] = set()
+
+
+@dataclass
+class Worktree:
+    path: Path
+    kind: str  # "task", "merge" or "pool"
+    repo: str | None
+    task_id: int | None
+    bytes: int = 0
+    touched: float = 0.0  # newest mtime inside the worktree
+
+
+def _git(args: list[str], cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, cwd=str(cwd), capture_output=True, text=True, timeout=120)
+
+
+def _task_id(name: str) -> int | None:
+    return int(name[1:]) if name.startswith("T") and name[1:].isdigit() else None
+
+
+def _du(path: Path) -> tuple[int, float]:
+    """Disk bytes and newest mtime under *path* (symlinks not followed)."""
+    total, newest = 0, 0.0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    total += getattr(st, "st_blocks", 0) * 512 or st.st_size
+                    newest = max(newest, st.st_mtime)
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+    return total, newest
+
+
+def _subdirs(path: Path) -> list[Path]:
+    try:
+        return sorted(p for p in path.iterdir() if p.is_dir())
+    except OSError:  # missing, or removed under us by a pool claim
+        return []
+
+
+# ---------------------------------------------------------------------------
+# Scanning
+# ---------------------------------------------------------------------------
+
+def scan(hc_home: Path, team: str) -> list[Worktree]:
+    """Every worktree directory of *team*, with its size and last touch."""
+    root = team_dir(hc_home, team) / "worktrees"
+    found: list[Worktree] = []
+    for top in _subdirs(root):
+        if top.name == "_merge":
+            for uid in _subdirs(top):
+                found += [Worktree(p, "merge", None, _task_id(p.name)) for p in _subdirs(uid)]
+        elif top.name == "_pool":
+            for repo in _subdirs(top):
+                found += [Worktree(p, "pool", repo.name, None) for p in _subdirs(repo)]
+        else:
+            found += [Worktree(p, "task", top.name, _task_id(p.name)) for p in _subdirs(top)]
+    sized: list[Worktree] = []
+    for wt in found:
+        try:
+            mtime = wt.path.stat().st_mtime
+        except OSError:  # claimed from the pool or cleaned up since listing
+            continue
+        wt.bytes, wt.touched = _du(wt.path)
+        wt.touched = max(wt.touched, mtime)
+        sized.append(wt)
+    return sized
+
+
+def _registered(hc_home: Path, team: str) -> dict[str, tuple[str, Path]]:
+    """``{resolved worktree path: (repo name, repo dir)}`` from git."""
+    from delegate.maintenance import _worktrees
+    from delegate.repo import get_repo_path
+
+    paths: dict[str, tuple[str, Path]] = {}
+    for repo_name in get_repos(hc_home, team):
+        real = get_repo_path(hc_home, team, repo_name).resolve()
+        if not real.is_dir():
+            continue
+        for wt in _worktrees(real):
+            paths[str(Path(wt["path"]).resolve())] = (repo_name, real)
+    return paths
+
+
+def _orphan_reason(wt: Worktree, tasks: dict[int, dict], repos: dict, owner: tuple | None) -> str | None:
+    task = tasks.get(wt.task_id) if wt.task_id is not None else None
+    if wt.kind == "merge":
+        if task is None or task["status"] != "merging":
+            return "merge attempt finished"
+    elif wt.kind == "task":
+        if wt.repo not in repos:
+            return "repo not registered"
+        if task is None:
+            return "unknown task"
+        if task["status"] in FINISHED_STATUSES:
+            return f"task {task['status']}"
+        if wt.repo not in task.get("repo", []):
+            return "repo not on task"
+    if owner is None:
+        return "not a git worktree"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+
+def _remove(wt: Worktree, owner: tuple | None) -> None:
+    if owner is not None:
+        _git(["worktree", "remove", "--force", str(wt.path)], owner[1])
+    shutil.rmtree(wt.path, ignore_errors=True)
+
+
+def _is_clean(path: Path) -> bool:
+    result = _git(["status", "--porcelain", "--untracked-files=normal"], path)
+    return result.returncode == 0 and not result.stdout.strip()
+
+
+def gc(hc_home: Path, team: str, *, dry_run: bool = False, defer_merge: bool = False) -> dict:
+    """Remove orphaned worktrees, then evict idle ones down to the quota.
+
+    Returns ``{"removed": [...], "freed_bytes", "usage", "deferred"}``
+    where each removed entry has ``path``, ``kind``, ``repo``,
+    ``task_id``, ``bytes`` and ``reason``.  With *dry_run* nothing is
+    deleted.  With *defer_merge* orphaned merge worktrees are reported as
+    removed but left for the caller to pass to ``remove_deferred()``
+    under the merge lock.
+    """
+    from delegate.chat import log_event
+    from delegate.task import format_task_id, list_tasks
+
+    entries = scan(hc_home, team)
+    registered = _registered(hc_home, team)
+    repos = get_repos(hc_home, team)
+    tasks = {t["id"]: t for t in list_tasks(hc_home, team)}
+    now = time.time()
+    removed: list[dict] = []
+    deferred: list[tuple[Worktree, tuple | None]] = []
+
+    def drop(wt: Worktree, owner: tuple | None, reason: str) -> None:
+        removed.append({**asdict(wt), "path": str(wt.path), "reason": reason})
+        if dry_run:
+            return
+        if defer_merge and wt.kind == "merge":
+            deferred.append((wt, owner))
+        else:
+            _remove(wt, owner)
+
+    kept: list[Worktree] = []
+    for wt in entries:
+        owner = registered.get(str(wt.path.resolve()))
+        reason = None if wt.kind == "pool" else _orphan_reason(wt, tasks, repos, owner)
+        if reason and now - wt.touched >= GRACE_SECONDS:
+            drop(wt, owner, reason)
+        else:
+            kept.append(wt)
+
+    quota = get_disk_quota(hc_home, team)
+    total = sum(wt.bytes for wt in kept)
+    if quota is not None and total > quota:
+        idle = sorted(
+            (wt for wt in kept if wt.kind == "task"
+             and tasks.get(wt.task_id, {}).get("status") in EVICTABLE_STATUSES
+             and now - wt.touched >= GRACE_SECONDS),
+            key=lambda wt: wt.touched,
+        )
+        for wt in idle:
+            if total <= quota:
+                break
+            if not _is_clean(wt.path):
+                continue
+            drop(wt, registered.get(str(wt.path.resolve())), "disk quota")
+            kept.remove(wt)
+            total -= wt.bytes
+            if not dry_run:
+                log_event(
+                    hc_home, team,
+                    f"{format_task_id(wt.task_id)} worktree ({wt.repo}) evicted to stay under "
+                    f"the disk quota — restored from its branch when next needed",
+                    task_id=wt.task_id,
+                )
+
+    if not dry_run:
+        for _repo_name, real in set(registered.values()):
+            _git(["worktree", "prune"], real)
+
+    freed = sum(r["bytes"] for r in removed)
+    if removed and not dry_run:
+        logger.info(
+            "Disk GC %s: removed %d worktree(s), freed %.1f MiB (%s)",
+            team, len(removed), freed / 2**20,
+            ", ".join(sorted({r["reason"] for r in removed})),
+        )
+    return {
+        "removed": removed, "freed_bytes": freed, "usage": usage(hc_home, team, kept),
+        "deferred": deferred,
+    }
+
+
+def remove_deferred(deferred: list[tuple[Worktree, tuple | None]]) -> None:
+    """Remove the merge worktrees ``gc(defer_merge=True)`` left behind.
+
+    Call with the merge lock held, so no merge is adding or removing
+    worktrees in the same repos meanwhile.
+    """
+    for wt, owner in deferred:
+        _remove(wt, owner)
+        if owner is not None:
+            _git(["worktree", "prune"], owner[1])
+
+
+def gc_due(hc_home: Path, team: str, **kwargs) -> dict | None:
+    """Run ``gc()`` if *team*'s interval has elapsed (daemon loop hook).
+
+    Returns the ``gc()`` result, or None if it wasn't due (or failed).
+    """
+    key = (str(hc_home), team)
+    with _lock:
+        last = _last_run.get(key)
+        if key in _running or (last is not None and time.monotonic() - last < GC_INTERVAL):
+            return None
+        _running.add(key)
+    try:
+        return gc(hc_home, team, **kwargs)
+    except Exception:
+        logger.exception("Disk GC failed for team %s", team)
+        return None
+    finally:
+        with _lock:
+            _running.discard(key)
+            _last_run[key] = time.monotonic()
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def usage(hc_home: Path, team: str, entries: list[Worktree] | None = None) -> dict:
+    """Worktree disk usage of *team*.
+
+    Returns ``{"total_bytes", "quota_bytes", "repos": {repo: {"tasks",
+    "merge", "pool", "worktrees"}}}``; merge worktrees git doesn't know
+    about are counted under ``"_unknown"``.
+    """
+    if entries is None:
+        entries = scan(hc_home, team)
+    registered = _registered(hc_home, team) if any(wt.kind == "merge" for wt in entries) else {}
+    repos: dict[str, dict] = {}
+    for wt in entries:
+        repo = wt.repo
+        if repo is None:
+            repo = registered.get(str(wt.path.resolve()), ("_unknown",))[0]
+        bucket = repos.setdefault(repo, {"tasks": 0, "merge": 0, "pool": 0, "worktrees": 0})
+        bucket["tasks" if wt.kind == "task" else wt.kind] += wt.bytes
+        bucket["worktrees"] += 1
+    return {
+        "total_bytes": sum(wt.bytes for wt in entries),
+        "quota_bytes": get_disk_quota(hc_home, team),
+        "repos": repos,
+    }
@@ -102,15 +102,58 @@ def check_api_key() -> CheckResult:
     )
 
 
-def run_all_checks() -> list[CheckResult]:
-    """Run all dependency checks."""
-    return [
+def _mib(n: int) -> str:
+    return f"{n / 2**20:.1f} MiB"
+
+
+def check_disk_usage(hc_home: Path) -> list[CheckResult]:
+    """Report worktree disk usage per team; fail teams over their quota.
+
+    Orphaned worktrees are counted from a dry-run of ``diskgc.gc()``.
+    """
+    from delegate.diskgc import gc
+    from delegate.paths import teams_dir
+
+    td = teams_dir(hc_home)
+    teams = sorted(d.name for d in td.iterdir() if d.is_dir()) if td.is_dir() else []
+    results = []
+    for team in teams:
+        plan = gc(hc_home, team, dry_run=True)
+        usage = plan["usage"]
+        total = usage["total_bytes"] + plan["freed_bytes"]
+        parts = [f"{_mib(total)} in worktrees"]
+        per_repo = ", ".join(
+            f"{repo} {_mib(b['tasks'] + b['merge'] + b['pool'])}" for repo, b in sorted(usage["repos"].items())
+        )
+        if per_repo:
+            parts[0] += f" ({per_repo})"
+        quota = usage["quota_bytes"]
+        if quota is not None:
+            parts.append(f"quota {_mib(quota)}")
+        if plan["removed"]:
+            parts.append(
+                f"{len(plan['removed'])} reclaimable worktree(s), {_mib(plan['freed_bytes'])} "
+                f"— run 'delegate repo gc {team}'"
+            )
+        over = quota is not None and usage["total_bytes"] > quota
+        if over:
+            parts.append("over quota even after GC — finish or cancel idle tasks")
+        results.append(CheckResult(f"Disk ({team})", not over, "; ".join(parts) + "."))
+    return results
+
+
+def run_all_checks(hc_home: Path | None = None) -> list[CheckResult]:
+    """Run all dependency checks (plus disk usage per team if *hc_home* is given)."""
+    checks = [
         check_git(),
         check_python_version(),
         check_uv(),
         check_claude_cli(),
         check_api_key(),
     ]
+    if hc_home is not None:
+        checks += check_disk_usage(hc_home)
+    return checks
 
 
 # Aliases used by the CLI
@@ -0,0 +1,167 @@
+"""Bounded reads of large text files — tails, heads, line ranges, listings.
+
+Agent directories accumulate thousands of journals and worklogs, and
+shared files can be arbitrarily large, so UI endpoints must never read a
+whole file (or a whole directory of files) to render one page:
+
+- ``read_tail()`` / ``read_head()`` seek and read at most *max_bytes*.
+- ``read_lines()`` returns a line range, jumping through a sparse line
+  index (one offset every ``LINE_INDEX_STRIDE`` lines) built once per
+  file version with ``mmap`` and cached on ``(mtime_ns, size)``.
+- ``cached_listing()`` returns a directory's file names sorted, re-listing
+  only when the directory's mtime changes (i.e. a file was added or
+  removed).
+
+All text is decoded as UTF-8 with ``errors="replace"``; a multi-byte
+character cut by a byte boundary is dropped rather than mangled.
+"""
+
+import bisect
+import logging
+import mmap
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LINE_INDEX_STRIDE = 1024      # lines between sparse index offsets
+MAX_LINES_PER_READ = 10_000   # cap on read_lines(count=...)
+
+# path -> ((mtime_ns, size), offsets every STRIDE lines, total lines)
+_line_index_cache: dict[str, tuple[tuple[int, int], list[int], int]] = {}
+
+# (dir, suffix) -> (dir mtime_ns, sorted names)
+_listing_cache: dict[tuple[str, str], tuple[int, list[str]]] = {}
+
+
+def decode_utf8(raw: bytes, *, cut_start: bool = False, cut_end: bool = False) -> str:
+    """Decode UTF-8, dropping a partial character at a cut boundary."""
+    if cut_start:
+        i = 0
+        while i < min(3, len(raw)) and 0x80 <= raw[i] <= 0xBF:
+            i += 1
+        raw = raw[i:]
+    if cut_end:
+        for back in range(1, min(4, len(raw)) + 1):
+            b = raw[-back]
+            if b < 0x80:
+                break
+            if b >= 0xC0:  # lead byte — complete only if its sequence fits
+                need = 2 if b < 0xE0 else 3 if b < 0xF0 else 4
+                if back < need:
+                    raw = raw[:-back]
+                break
+    return raw.decode("utf-8", errors="replace")
+
+
+def read_tail(path: Path, max_bytes: int) -> tuple[str, bool]:
+    """Return ``(text, truncated)`` — the last *max_bytes* of *path*."""
+    with path.open("rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - max_bytes)
+        f.seek(start)
+        return decode_utf8(f.read(max_bytes), cut_start=start > 0), start > 0
+
+
+def read_head(path: Path, max_bytes: int) -> tuple[bytes, bool]:
+    """Return ``(raw bytes, truncated)`` — the first *max_bytes* of *path*."""
+    with path.open("rb") as f:
+        data = f.read(max_bytes + 1)
+    return data[:max_bytes], len(data) > max_bytes
+
+
+def read_head_text(path: Path, max_bytes: int) -> tuple[str, bool]:
+    """Text variant of ``read_head()``."""
+    data, truncated = read_head(path, max_bytes)
+    return decode_utf8(data, cut_end=truncated), truncated
+
+
+def _line_index(path: Path) -> tuple[list[int], int]:
+    """Return ``(sparse offsets, total lines)`` for *path*, cached per version."""
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(path)
+    cached = _line_index_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1], cached[2]
+
+    offsets = [0]
+    lines = 0
+    if st.st_size:
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while True:
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    if pos < st.st_size:
+                        lines += 1  # final line without a trailing newline
+                    break
+                lines += 1
+                pos = nl + 1
+                if lines % LINE_INDEX_STRIDE == 0 and pos < st.st_size:
+                    offsets.append(pos)
+    _line_index_cache[key] = (stamp, offsets, lines)
+    return offsets, lines
+
+
+def read_lines(path: Path, start: int, count: int) -> dict:
+    """Return lines ``[start, start + count)`` of *path* (0-based).
+
+    Response: ``{"content", "start_line", "end_line", "total_lines"}``
+    where ``end_line`` is exclusive.  Only the requested span (plus at
+    most ``LINE_INDEX_STRIDE`` skipped lines) is touched.
+    """
+    count = max(0, min(count, MAX_LINES_PER_READ))
+    offsets, total = _line_index(path)
+    start = max(0, min(start, total))
+    end = min(total, start + count)
+    if start == end:
+        return {"content": "", "start_line": start, "end_line": end, "total_lines": total}
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        block = start // LINE_INDEX_STRIDE
+        pos = offsets[block]
+        for _ in range(start - block * LINE_INDEX_STRIDE):
+            pos = mm.find(b"\n", pos) + 1
+        begin = pos
+        for _ in range(end - start):
+            nl = mm.find(b"\n", pos)
+            pos = len(mm) if nl < 0 else nl + 1
+        content = decode_utf8(mm[begin:pos])
+
+    return {"content": content, "start_line": start, "end_line": end, "total_lines": total}
+
+
+def cached_listing(directory: Path, suffix: str = "") -> list[str]:
+    """Sorted names of files in *directory* ending with *suffix*.
+
+    Cached until the directory's mtime changes, so polling a directory of
+    thousands of files costs one ``stat()``.  Missing directory → ``[]``.
+    """
+    try:
+        mtime = directory.stat().st_mtime_ns
+    except OSError:
+        return []
+    key = (str(directory), suffix)
+    cached = _listing_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    names = sorted(
+        entry.name
+        for entry in os.scandir(directory)
+        if entry.name.endswith(suffix) and entry.is_file()
+    )
+    _listing_cache[key] = (mtime, names)
+    return names
+
+
+def page_before(names: list[str], limit: int, before: str | None) -> tuple[list[str], str | None]:
+    """Newest-first page of sorted *names* strictly below the *before* cursor.
+
+    Returns ``(page, next_cursor)``; *next_cursor* is ``None`` when exhausted.
+    """
+    limit = max(1, limit)
+    end = len(names) if before is None else bisect.bisect_left(names, before)
+    begin = max(0, end - limit)
+    page = names[begin:end][::-1]
+    return page, (page[-1] if begin > 0 else None)
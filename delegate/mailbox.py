@@ -21,6 +21,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+from delegate.changes import publish, record, record_message
 from delegate.db import get_connection
 
 logger = logging.getLogger(__name__)
@@ -121,10 +122,12 @@ def send(
             VALUES (?, ?, ?, 'chat', ?, ?, ?)""",
             (sender, recipient, message, task_id, now, team),
         )
-        conn.commit()
         msg_id = cursor.lastrowid
+        change = record_message(conn, team, msg_id)
+        conn.commit()
     finally:
         conn.close()
+    publish(team, [change])
 
     return msg_id
 
@@ -181,62 +184,50 @@ def read_outbox(
     return [_row_to_message(r) for r in rows]
 
 
-def mark_seen(hc_home: Path, team: str, msg_id: int) -> None:
-    """Mark a message as seen (agent control loop picked it up at turn start)."""
+def _set_lifecycle(hc_home: Path, team: str, column: str, msg_ids: list[int]) -> None:
+    """Stamp *column* on each unstamped chat message in one transaction.
+
+    Records a ``message``/``update`` change for every row actually updated.
+    """
+    now = _now()
+    changes = []
     conn = get_connection(hc_home, team)
     try:
-        conn.execute(
-            "UPDATE messages SET seen_at = ? WHERE id = ? AND type = 'chat' AND seen_at IS NULL",
-            (_now(), msg_id),
-        )
+        for mid in msg_ids:
+            cursor = conn.execute(
+                f"UPDATE messages SET {column} = ? WHERE id = ? AND type = 'chat' AND {column} IS NULL",
+                (now, mid),
+            )
+            if cursor.rowcount:
+                changes.append(record(conn, team, "message", mid, "update", {column: now}))
         conn.commit()
     finally:
         conn.close()
+    publish(team, changes)
+
+
+def mark_seen(hc_home: Path, team: str, msg_id: int) -> None:
+    """Mark a message as seen (agent control loop picked it up at turn start)."""
+    _set_lifecycle(hc_home, team, "seen_at", [msg_id])
 
 
 def mark_seen_batch(hc_home: Path, team: str, msg_ids: list[int]) -> None:
     """Mark multiple messages as seen in a single transaction."""
     if not msg_ids:
         return
-    now = _now()
-    conn = get_connection(hc_home, team)
-    try:
-        conn.executemany(
-            "UPDATE messages SET seen_at = ? WHERE id = ? AND type = 'chat' AND seen_at IS NULL",
-            [(now, mid) for mid in msg_ids],
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _set_lifecycle(hc_home, team, "seen_at", msg_ids)
 
 
 def mark_processed(hc_home: Path, team: str, msg_id: int) -> None:
     """Mark a message as processed (agent finished the turn)."""
-    conn = get_connection(hc_home, team)
-    try:
-        conn.execute(
-            "UPDATE messages SET processed_at = ? WHERE id = ? AND type = 'chat' AND processed_at IS NULL",
-            (_now(), msg_id),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _set_lifecycle(hc_home, team, "processed_at", [msg_id])
 
 
 def mark_processed_batch(hc_home: Path, team: str, msg_ids: list[int]) -> None:
     """Mark multiple messages as processed in a single transaction."""
     if not msg_ids:
         return
-    now = _now()
-    conn = get_connection(hc_home, team)
-    try:
-        conn.executemany(
-            "UPDATE messages SET processed_at = ? WHERE id = ? AND type = 'chat' AND processed_at IS NULL",
-            [(now, mid) for mid in msg_ids],
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _set_lifecycle(hc_home, team, "processed_at", msg_ids)
 
 
 def mark_outbox_routed(
@@ -247,15 +238,7 @@ def mark_outbox_routed(
     With immediate delivery in ``send()``, this is typically a no-op.
     Kept for backward compatibility.
     """
-    conn = get_connection(hc_home, team)
-    try:
-        conn.execute(
-            "UPDATE messages SET delivered_at = ? WHERE id = ? AND type = 'chat' AND delivered_at IS NULL",
-            (_now(), msg_id),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _set_lifecycle(hc_home, team, "delivered_at", [msg_id])
 
 
 def deliver(hc_home: Path, team: str, message: Message) -> int:
@@ -276,10 +259,12 @@ def deliver(hc_home: Path, team: str, message: Message) -> int:
             VALUES (?, ?, ?, 'chat', ?, ?, ?)""",
             (message.sender, message.recipient, message.body, message.task_id, now, team),
         )
-        conn.commit()
         msg_id = cursor.lastrowid
+        change = record_message(conn, team, msg_id)
+        conn.commit()
     finally:
         conn.close()
+    publish(team, [change])
     return msg_id
 
 
@@ -391,6 +376,26 @@ def agents_with_unread(hc_home: Path, team: str) -> list[str]:
     return [row[0] for row in rows]
 
 
+def unread_arrival_window(hc_home: Path, team: str) -> dict[str, tuple[str, str]]:
+    """Return ``{recipient: (first_delivered_at, last_delivered_at)}`` for
+    every recipient with unread messages.
+
+    Single query — lets the daemon debounce bursty inboxes without reading
+    each agent's inbox.
+    """
+    conn = get_connection(hc_home, team)
+    try:
+        rows = conn.execute(
+            "SELECT recipient, MIN(delivered_at), MAX(delivered_at) FROM messages "
+            "WHERE type = 'chat' AND team = ? AND delivered_at IS NOT NULL AND processed_at IS NULL "
+            "GROUP BY recipient",
+            (team,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
 def count_unread(hc_home: Path, team: str, agent: str) -> int:
     """Count unread delivered messages for an agent."""
     conn = get_connection(hc_home, team)
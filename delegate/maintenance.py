@@ -0,0 +1,255 @@
+"""Scheduled git maintenance for registered repos.
+
+Every task creates and deletes a feature branch, one or two
+``.../_merge/<uid>/...`` temp branches and several worktrees.  After
+thousands of tasks the loose refs and objects (and the lack of a
+commit-graph) make ``git worktree prune``, ref lookups and rebases
+measurably slower.  Each repo is therefore maintained every
+``maintenance_interval_hours`` (``config.get_maintenance_interval``;
+default 24, ``0`` disables) while its team is idle, in two phases:
+
+1. ``prune_leftovers()`` — fast, and run by the daemon under the merge
+   lock so no merge is mid-flight: removes this team's merge worktrees
+   left behind by crashed merges, ``git worktree prune`` (admin dirs of
+   deleted worktrees), then deletes this team's ``_merge`` branches that
+   no worktree has checked out.
+2. ``optimize()`` — slow, and run without the lock: ``git pack-refs
+   --all``, ``git commit-graph write --reachable --split``, then the
+   ``loose-objects`` and ``incremental-repack`` tasks of ``git
+   maintenance run``.
+
+Each step is timed; loose refs and ``git count-objects`` sizes are taken
+before and after, and the totals are logged and stored in
+``repo_maintenance`` (which also keeps the schedule across restarts).
+
+Usage::
+
+    from delegate.maintenance import run
+    stats = run(hc_home, team, "myrepo")      # both phases, now
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from delegate.config import get_maintenance_interval, get_repos
+from delegate.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT = 1800
+OPTIMIZE_STEPS = (
+    ("pack_refs", ["pack-refs", "--all", "--prune"]),
+    ("commit_graph", ["commit-graph", "write", "--reachable", "--split"]),
+    # Separate runs: incremental-repack needs the pack loose-objects writes
+    ("loose_objects", ["maintenance", "run", "--task=loose-objects"]),
+    ("repack", ["maintenance", "run", "--task=incremental-repack"]),
+)
+
+
+def _git(args: list[str], cwd: Path, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git"] + args, cwd=str(cwd), capture_output=True, text=True, timeout=GIT_TIMEOUT, **kwargs,
+    )
+
+
+def _real_repo(hc_home: Path, team: str, repo_name: str) -> Path | None:
+    from delegate.repo import get_repo_path
+
+    real = get_repo_path(hc_home, team, repo_name).resolve()
+    return real if real.is_dir() else None
+
+
+def _git_dir(repo: Path) -> Path:
+    result = _git(["rev-parse", "--path-format=absolute", "--git-common-dir"], repo)
+    return Path(result.stdout.strip()) if result.returncode == 0 else repo / ".git"
+
+
+def _loose_refs(git_dir: Path) -> int:
+    return sum(len(files) for _, _, files in os.walk(git_dir / "refs"))
+
+
+def _object_bytes(repo: Path) -> int:
+    """Loose + packed + garbage object bytes (``git count-objects -v``)."""
+    result = _git(["count-objects", "-v"], repo)
+    fields = dict(line.split(": ", 1) for line in result.stdout.splitlines() if ": " in line)
+    return sum(int(fields.get(k, 0)) for k in ("size", "size-pack", "size-garbage")) * 1024
+
+
+def _timed(stats: dict, step: str, fn) -> None:
+    started = time.monotonic()
+    try:
+        ok = fn()
+    except subprocess.TimeoutExpired:
+        ok = False
+    stats["steps"][step] = {"ok": bool(ok), "seconds": round(time.monotonic() - started, 3)}
+
+
+# ---------------------------------------------------------------------------
+# Phase 1: merge leftovers (run under the merge lock)
+# ---------------------------------------------------------------------------
+
+def _worktrees(repo: Path) -> list[dict]:
+    """``[{"path", "branch"}]`` from ``git worktree list --porcelain``."""
+    result = _git(["worktree", "list", "--porcelain"], repo)
+    entries: list[dict] = []
+    for line in result.stdout.splitlines():
+        if line.startswith("worktree "):
+            entries.append({"path": line[len("worktree "):], "branch": None})
+        elif line.startswith("branch ") and entries:
+            entries[-1]["branch"] = line[len("branch "):]
+    return entries
+
+
+def prune_leftovers(hc_home: Path, team: str, repo_name: str) -> dict:
+    """Remove *team*'s orphaned merge worktrees and ``_merge`` branches.
+
+    Must not overlap a merge of this team (the daemon holds the merge
+    lock).  Returns stats to pass on to ``optimize()``.
+    """
+    stats = {"steps": {}, "merge_worktrees": 0, "admin_dirs": 0, "merge_branches": 0}
+    repo = _real_repo(hc_home, team, repo_name)
+    if repo is None:
+        return stats
+    git_dir = _git_dir(repo)
+    merge_root = str((hc_home / "teams" / team / "worktrees" / "_merge").resolve())
+
+    def remove_merge_worktrees() -> bool:
+        for wt in _worktrees(repo):
+            if wt["path"].startswith(merge_root + os.sep):
+                _git(["worktree", "remove", "--force", wt["path"]], repo)
+                shutil.rmtree(wt["path"], ignore_errors=True)
+                stats["merge_worktrees"] += 1
+        return True
+
+    def prune_admin_dirs() -> bool:
+        admin = git_dir / "worktrees"
+        before = len(list(admin.iterdir())) if admin.is_dir() else 0
+        ok = _git(["worktree", "prune"], repo).returncode == 0
+        after = len(list(admin.iterdir())) if admin.is_dir() else 0
+        stats["admin_dirs"] = before - after
+        return ok
+
+    def delete_merge_branches() -> bool:
+        checked_out = {wt["branch"] for wt in _worktrees(repo) if wt["branch"]}
+        listed = _git(["for-each-ref", "--format=%(refname) %(objectname)", "refs/heads/"], repo)
+        doomed = []
+        for line in listed.stdout.splitlines():
+            ref, _, sha = line.partition(" ")
+            name = ref[len("refs/heads/"):]
+            if f"/{team}/_merge/" in name and ref not in checked_out:
+                doomed.append(f"delete {ref} {sha}\n")  # only if it hasn't moved
+        if not doomed:
+            return True
+        result = _git(["update-ref", "--stdin"], repo, input="".join(doomed))
+        if result.returncode == 0:
+            stats["merge_branches"] = len(doomed)
+        return result.returncode == 0
+
+    _timed(stats, "merge_worktrees", remove_merge_worktrees)
+    _timed(stats, "worktree_prune", prune_admin_dirs)
+    _timed(stats, "merge_branches", delete_merge_branches)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Phase 2: packing (no lock needed)
+# ---------------------------------------------------------------------------
+
+def optimize(hc_home: Path, team: str, repo_name: str, stats: dict | None = None) -> dict:
+    """Pack refs, write the commit-graph and repack; record and log *stats*."""
+    stats = stats or {"steps": {}}
+    repo = _real_repo(hc_home, team, repo_name)
+    if repo is None:
+        return stats
+    git_dir = _git_dir(repo)
+    stats["loose_refs_before"] = _loose_refs(git_dir)
+    bytes_before = _object_bytes(repo)
+
+    for step, args in OPTIMIZE_STEPS:
+        _timed(stats, step, lambda args=args: _git(args, repo).returncode == 0)
+
+    stats["loose_refs_after"] = _loose_refs(git_dir)
+    stats["reclaimed_bytes"] = bytes_before - _object_bytes(repo)
+    duration = round(sum(s["seconds"] for s in stats["steps"].values()), 3)
+    stats["seconds"] = duration
+    _record(hc_home, team, repo_name, stats)
+
+    failed = [k for k, s in stats["steps"].items() if not s["ok"]]
+    logger.info(
+        "Maintenance %s/%s in %.1fs: reclaimed %.1f MiB, loose refs %d → %d, "
+        "removed %d merge worktree(s), %d admin dir(s), %d _merge branch(es)%s",
+        team, repo_name, duration, stats["reclaimed_bytes"] / 2**20,
+        stats["loose_refs_before"], stats["loose_refs_after"],
+        stats.get("merge_worktrees", 0), stats.get("admin_dirs", 0), stats.get("merge_branches", 0),
+        f"; failed: {', '.join(failed)}" if failed else "",
+    )
+    return stats
+
+
+def run(hc_home: Path, team: str, repo_name: str) -> dict:
+    """Run both phases for *repo_name* now (callers ensure no merge is running)."""
+    return optimize(hc_home, team, repo_name, prune_leftovers(hc_home, team, repo_name))
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+def _record(hc_home: Path, team: str, repo_name: str, stats: dict) -> None:
+    conn = get_connection(hc_home, team)
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO repo_maintenance "
+            "(team, repo, last_run_at, duration_s, reclaimed_bytes, stats) VALUES (?, ?, ?, ?, ?, ?)",
+            (team, repo_name, datetime.now(timezone.utc).isoformat(), stats["seconds"],
+             stats["reclaimed_bytes"], json.dumps(stats)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def last_runs(hc_home: Path, team: str) -> dict[str, dict]:
+    """``{repo: {"last_run_at", "duration_s", "reclaimed_bytes", "stats"}}``."""
+    conn = get_connection(hc_home, team)
+    try:
+        rows = conn.execute(
+            "SELECT repo, last_run_at, duration_s, reclaimed_bytes, stats "
+            "FROM repo_maintenance WHERE team = ?",
+            (team,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        repo: {"last_run_at": at, "duration_s": secs, "reclaimed_bytes": reclaimed, "stats": json.loads(stats)}
+        for repo, at, secs, reclaimed, stats in rows
+    }
+
+
+def due(hc_home: Path, team: str) -> list[str]:
+    """Repos of *team* whose maintenance interval has elapsed.
+
+    Empty while any task of the team is merging — maintenance waits for an
+    idle period.
+    """
+    from delegate.task import list_tasks
+
+    if list_tasks(hc_home, team, status="merging"):
+        return []
+    now = datetime.now(timezone.utc)
+    last = last_runs(hc_home, team)
+    repos = []
+    for repo_name in get_repos(hc_home, team):
+        interval = get_maintenance_interval(hc_home, team, repo_name)
+        if interval <= 0:
+            continue
+        prev = last.get(repo_name)
+        if prev is None or now - datetime.fromisoformat(prev["last_run_at"]) >= timedelta(seconds=interval):
+            repos.append(repo_name)
+    return repos
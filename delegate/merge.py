@@ -3,15 +3,21 @@
 The merge sequence for a task in ``in_approval`` with an approved review
 (or ``approval == 'auto'`` on the repo):
 
-1. Create a disposable worktree + temp branch from the feature branch.
-2. ``git rebase --onto main <base_sha> <temp>``  — rebase in the temp worktree.
-3. If rebase conflicts:
-   a. **Squash-reapply fallback**: create a fresh worktree from main,
-      ``git diff main...<feature>`` and ``git apply``.  This often succeeds
-      when commit-by-commit rebase fails (intermediate conflicts).
-   b. If squash-apply also fails (true content conflict): capture the
-      conflicting hunks, escalate to the manager with detailed context
-      and ``git reset --soft`` instructions for the DRI.
+1. Rebase the feature branch onto main **in the object database**
+   (``merge_tree.rebase``: ``git replay`` or ``merge-tree --write-tree``
+   + ``commit-tree``) — no checkout.  On a git too old to replay commits
+   that way, rebase a temp branch in a disposable worktree instead.
+2. If rebase conflicts:
+   a. **Squash-reapply fallback**: the net ``main...<feature>`` change as a
+      single commit on main (``merge_tree.squash``, also checkout-free).
+      This often succeeds when commit-by-commit rebase fails
+      (intermediate conflicts).
+   b. If squash also fails (true content conflict): describe the
+      conflicting hunks of the files ``merge-tree`` reported, escalate to
+      the manager with detailed context and ``git reset --soft``
+      instructions for the DRI.
+3. Point a temp branch at the result.  Only if pre-merge checks will run
+   is it checked out into a disposable worktree (from the worktree pool).
 4. Run pre-merge script / tests inside the temp worktree.
 5. If tests fail: remove temp worktree/branch, escalate to manager.
 6. Fast-forward main:
@@ -22,6 +28,12 @@ The merge sequence for a task in ``in_approval`` with an approved review
 7. Set task to ``done``.
 8. Clean up: remove temp worktree/branch, feature branch, agent worktree.
 
+For a multi-repo task, steps 1–5 run concurrently, one thread per repo
+(``_prepare_all``), so the merge waits for the slowest test suite rather
+than the sum.  Step 6 starts only once every repo has passed, checks
+all of them first, and rolls back the repos already fast-forwarded if a
+later one still fails — main moves in all repos or in none.
+
 Key invariants:
 - The **main repo working directory is never touched** during rebase/test.
   The only time the working tree may advance is when the user has ``main``
@@ -46,12 +58,16 @@ The merge worker is called from the daemon loop (via ``merge_once``).
 """
 
 import enum
+import functools
 import logging
 import subprocess
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
-from delegate.config import get_repo_approval, get_pre_merge_script
+from delegate import merge_tree, testcache, testselect, testshard
+from delegate.config import get_repo_approval, get_pre_merge_script, get_test_shards
 from delegate.notify import notify_conflict
 from delegate.review import get_current_review
 from delegate.task import (
@@ -59,6 +75,7 @@ from delegate.task import (
     format_task_id, transition_task, assign_task,
 )
 from delegate.chat import log_event
+from delegate.conflicts import order_for_merge
 from delegate.repo import get_repo_path, remove_task_worktree
 
 logger = logging.getLogger(__name__)
@@ -145,10 +162,45 @@ def _merge_worktree_dir(hc_home: Path, team: str, uid: str, task_id: int) -> Pat
     )
 
 
+def _temp_branch_name(source_branch: str, uid: str) -> str:
+    """Insert ``_merge/<uid>`` before the last segment of *source_branch*."""
+    parts = source_branch.rsplit("/", 1)
+    if len(parts) == 2:
+        return f"{parts[0]}/_merge/{uid}/{parts[1]}"
+    return f"_merge/{uid}/{source_branch}"
+
+
+def _add_worktree(
+    repo_dir: str,
+    wt_path: Path,
+    branch: str,
+    start: str,
+    pool: tuple[Path, str, str] | None = None,
+) -> subprocess.CompletedProcess | None:
+    """Create *wt_path* with new *branch* at *start*.
+
+    With *pool* (``(hc_home, team, repo_name)``) a pre-warmed worktree is
+    claimed from ``delegate.worktree_pool`` first.  Returns ``None`` on
+    success, else the failed ``git worktree add`` result.
+    """
+    if pool is not None:
+        from delegate.worktree_pool import claim
+        hc_home, team, repo_name = pool
+        if claim(hc_home, team, repo_name, wt_path, branch=branch, start=start):
+            return None
+
+    # ``git worktree add -b <branch> <path> <start>`` creates a new branch
+    # at <start> and checks it out in the new worktree.
+    wt_path.parent.mkdir(parents=True, exist_ok=True)
+    result = _run_git(["worktree", "add", "-b", branch, str(wt_path), start], cwd=repo_dir)
+    return result if result.returncode != 0 else None
+
+
 def _create_temp_worktree(
     repo_dir: str,
     source_branch: str,
     wt_path: Path,
+    pool: tuple[Path, str, str] | None = None,
 ) -> tuple[str, str]:
     """Create a disposable worktree + temp branch from *source_branch*.
 
@@ -157,28 +209,18 @@ def _create_temp_worktree(
 
         delegate/3f5776/myteam/T0001  →  delegate/3f5776/myteam/_merge/a1b2c3d4e5f6/T0001
 
+    *pool* (``(hc_home, team, repo_name)``) lets the worktree come from the
+    pre-warmed pool; see ``_add_worktree``.
+
     Returns ``(temp_branch_name, uid)``.
 
     Raises ``RuntimeError`` on failure.
     """
     uid = uuid.uuid4().hex[:12]
+    temp_branch = _temp_branch_name(source_branch, uid)
 
-    # Derive temp branch name (insert _merge/<uid> before last segment)
-    parts = source_branch.rsplit("/", 1)
-    if len(parts) == 2:
-        temp_branch = f"{parts[0]}/_merge/{uid}/{parts[1]}"
-    else:
-        temp_branch = f"_merge/{uid}/{source_branch}"
-
-    # Create worktree + branch in one atomic command.
-    # ``git worktree add -b <branch> <path> <start>`` creates a new branch
-    # at <start> and checks it out in the new worktree.
-    wt_path.parent.mkdir(parents=True, exist_ok=True)
-    result = _run_git(
-        ["worktree", "add", "-b", temp_branch, str(wt_path), source_branch],
-        cwd=repo_dir,
-    )
-    if result.returncode != 0:
+    result = _add_worktree(repo_dir, wt_path, temp_branch, source_branch, pool=pool)
+    if result is not None:
         raise RuntimeError(
             f"Could not create merge worktree: {result.stderr.strip()}"
         )
@@ -295,11 +337,14 @@ def _capture_conflict_hunks(
     repo_dir: str,
     branch: str,
     base_sha: str | None = None,
+    files: list[str] | None = None,
 ) -> str:
     """Capture human-readable conflict context when both rebase and squash fail.
 
     Identifies the specific files where the feature branch and main diverge
     on the same lines, and extracts both sides of the conflicting hunks.
+    *files* — the conflicted paths reported by ``git merge-tree`` — is used
+    instead of the files both sides touched when given.
 
     Returns a formatted string suitable for embedding in a notification
     message to the manager/delegate.
@@ -319,7 +364,7 @@ def _capture_conflict_hunks(
     branch_files = set(branch_diff.stdout.strip().splitlines()) if branch_diff.returncode == 0 else set()
 
     # Overlapping files are the conflict candidates
-    overlap = sorted(main_files & branch_files)
+    overlap = sorted(files) if files else sorted(main_files & branch_files)
     if not overlap:
         return "Could not identify specific conflicting files."
 
@@ -369,16 +414,89 @@ def _indent(text: str, spaces: int) -> str:
 # Pre-merge tests (runs inside temp worktree)
 # ---------------------------------------------------------------------------
 
+_TEST_MARKERS = ("pyproject.toml", "tests", "package.json", "Makefile")
+
+
+def _detect_test_cmd(top_level: dict[str, bool]) -> list[str] | None:
+    """Pick a test command from the repo's top-level entries (name → is_dir)."""
+    if "pyproject.toml" in top_level or top_level.get("tests"):
+        return ["python", "-m", "pytest", "-x", "-q"]
+    if "package.json" in top_level:
+        return ["npm", "test"]
+    if "Makefile" in top_level:
+        return ["make", "test"]
+    return None
+
+
+def _needs_checkout(hc_home: Path, team: str, repo_name: str, repo_dir: str, rev: str) -> bool:
+    """Whether ``_run_pre_merge`` would run anything for *rev*.
+
+    Decided from the commit's tree (``git ls-tree``), so merges of repos
+    without checks never materialize a worktree.
+    """
+    if get_pre_merge_script(hc_home, team, repo_name) is not None:
+        return True
+    listing = _run_git(["ls-tree", rev, "--", *_TEST_MARKERS], cwd=repo_dir)
+    if listing.returncode != 0:
+        return True  # can't tell — check out and let _run_pre_merge decide
+    top_level = {}
+    for line in listing.stdout.splitlines():
+        meta, _, name = line.partition("\t")
+        top_level[name] = meta.split()[1] == "tree"
+    return _detect_test_cmd(top_level) is not None
+
+
+def _run_script(script: str, wt_dir: str) -> tuple[bool, str]:
+    try:
+        script_result = subprocess.run(
+            script,
+            cwd=wt_dir,
+            capture_output=True,
+            text=True,
+            timeout=600,
+            shell=True,
+        )
+        output = script_result.stdout + script_result.stderr
+        ok = script_result.returncode == 0
+        return ok, output if not ok else f"Pre-merge script passed:\n{output}"
+    except subprocess.TimeoutExpired:
+        return False, "Pre-merge script timed out after 600 seconds."
+    except OSError as exc:
+        return False, f"Pre-merge script failed to start: {exc}"
+
+
+def _run_test_cmd(test_cmd: list[str], wt_dir: str) -> tuple[bool, str]:
+    try:
+        test_result = subprocess.run(
+            test_cmd,
+            cwd=wt_dir,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+        output = test_result.stdout + test_result.stderr
+        return test_result.returncode == 0, output
+    except subprocess.TimeoutExpired:
+        return False, "Tests timed out after 300 seconds."
+
+
 def _run_pre_merge(
     wt_dir: str,
     hc_home: Path | None = None,
     team: str | None = None,
     repo_name: str | None = None,
+    task_id: int | None = None,
 ) -> tuple[bool, str]:
     """Run pre-merge script or auto-detected tests inside the temp worktree.
 
     The temp worktree already has the rebased code checked out, so no
-    ``git checkout`` is needed.
+    ``git checkout`` is needed.  With *hc_home*/*team*/*repo_name* a pass
+    already recorded for the same tree and command is reused (see
+    ``delegate.testcache``); the output then starts with ``CACHED_PASS``.
+    Repos with ``test_selection`` enabled run the tests affected by the
+    change first (see ``delegate.testselect``); the decision is logged to
+    *task_id*'s activity.  Auto-detected pytest runs are split over
+    ``test_shards`` parallel processes (see ``delegate.testshard``).
 
     Returns ``(success, output)``.
     """
@@ -387,49 +505,42 @@ def _run_pre_merge(
     if hc_home is not None and team is not None and repo_name:
         script = get_pre_merge_script(hc_home, team, repo_name)
 
+    subset: Callable | None = None
     if script is not None:
-        try:
-            script_result = subprocess.run(
-                script,
-                cwd=wt_dir,
-                capture_output=True,
-                text=True,
-                timeout=600,
-                shell=True,
-            )
-            output = script_result.stdout + script_result.stderr
-            ok = script_result.returncode == 0
-            return ok, output if not ok else f"Pre-merge script passed:\n{output}"
-        except subprocess.TimeoutExpired:
-            return False, "Pre-merge script timed out after 600 seconds."
-        except OSError as exc:
-            return False, f"Pre-merge script failed to start: {exc}"
-
-    # Fall back to auto-detection (no script configured)
-    test_cmd: list[str] | None = None
-    wt_path = Path(wt_dir)
-    if (wt_path / "pyproject.toml").exists() or (wt_path / "tests").is_dir():
-        test_cmd = ["python", "-m", "pytest", "-x", "-q"]
-    elif (wt_path / "package.json").exists():
-        test_cmd = ["npm", "test"]
-    elif (wt_path / "Makefile").exists():
-        test_cmd = ["make", "test"]
-
-    if test_cmd is None:
-        return True, "No test runner detected, skipping tests."
+        command = script
+        run = functools.partial(_run_script, script, wt_dir)
+    else:
+        # Fall back to auto-detection (no script configured)
+        wt_path = Path(wt_dir)
+        test_cmd = _detect_test_cmd({
+            name: (wt_path / name).is_dir()
+            for name in _TEST_MARKERS if (wt_path / name).exists()
+        })
+        if test_cmd is None:
+            return True, "No test runner detected, skipping tests."
+        command = " ".join(test_cmd)
+        run = functools.partial(_run_test_cmd, test_cmd, wt_dir)
+        if test_cmd[:3] == ["python", "-m", "pytest"]:
+            shards = get_test_shards(hc_home, team, repo_name) if hc_home is not None and team and repo_name else 1
+            if shards > 1:
+                run = functools.partial(
+                    testshard.run_sharded, test_cmd, wt_dir, shards=shards,
+                    hc_home=hc_home, team=team, repo=repo_name,
+                )
 
-    try:
-        test_result = subprocess.run(
-            test_cmd,
-            cwd=wt_dir,
-            capture_output=True,
-            text=True,
-            timeout=300,
-        )
-        output = test_result.stdout + test_result.stderr
-        return test_result.returncode == 0, output
-    except subprocess.TimeoutExpired:
-        return False, "Tests timed out after 300 seconds."
+            def _subset(targets: list[str]):
+                cmd = test_cmd + targets
+                if shards > 1:
+                    return " ".join(cmd), functools.partial(run, targets=targets)
+                return " ".join(cmd), functools.partial(_run_test_cmd, cmd, wt_dir)
+            subset = _subset
+
+    if hc_home is None or team is None or not repo_name:
+        return run()
+    return testselect.run_selected(
+        hc_home, team, repo_name, wt_dir,
+        command=command, run=run, subset=subset, task_id=task_id,
+    )
 
 
 # Keep old names as aliases for backward compatibility
@@ -441,24 +552,17 @@ _run_pipeline = _run_pre_merge
 # Fast-forward merge (operates on refs only — no checkout needed)
 # ---------------------------------------------------------------------------
 
-def _ff_merge(repo_dir: str, branch: str) -> tuple[bool, str]:
-    """Fast-forward merge the branch into main.
+def _ff_check(repo_dir: str, branch: str) -> tuple[bool, str]:
+    """Check that main can be fast-forwarded to *branch* (changes nothing).
 
-    Behaviour depends on the user's checkout state in the main repo:
+    Fails if *branch* doesn't resolve, isn't a descendant of main, or the
+    user has ``main`` checked out with uncommitted changes.
 
-    - **main checked out + dirty** → fail (protect uncommitted work).
-    - **main checked out + clean** → ``git merge --ff-only`` (updates ref
-      AND working tree so the user doesn't see phantom dirty files).
-    - **other branch checked out** → ``git update-ref`` with CAS (ref-only,
-      user's working tree is untouched).
-
-    Returns ``(success, output)``.
+    Returns ``(ok, output)``.
     """
-    # Get branch tip
     branch_result = _run_git(["rev-parse", branch], cwd=repo_dir)
     if branch_result.returncode != 0:
         return False, f"Could not resolve {branch}: {branch_result.stderr}"
-    branch_tip = branch_result.stdout.strip()
 
     # Verify branch is a descendant of main (fast-forward check)
     ancestor_check = _run_git(
@@ -467,12 +571,8 @@ def _ff_merge(repo_dir: str, branch: str) -> tuple[bool, str]:
     if ancestor_check.returncode != 0:
         return False, f"Fast-forward not possible: {branch} is not a descendant of main"
 
-    # Check what the user has checked out in the main repo
     head_result = _run_git(["rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_dir)
-    user_branch = head_result.stdout.strip() if head_result.returncode == 0 else ""
-
-    if user_branch == "main":
-        # User is on main — check for uncommitted changes
+    if head_result.returncode == 0 and head_result.stdout.strip() == "main":
         status_result = _run_git(["status", "--porcelain"], cwd=repo_dir)
         dirty = status_result.stdout.strip()
         if dirty:
@@ -481,7 +581,32 @@ def _ff_merge(repo_dir: str, branch: str) -> tuple[bool, str]:
                 "commit or stash them before merging.\n"
                 f"Dirty files:\n{dirty[:500]}"
             )
+    return True, ""
+
+
+def _ff_merge(repo_dir: str, branch: str) -> tuple[bool, str]:
+    """Fast-forward merge the branch into main.
+
+    Behaviour depends on the user's checkout state in the main repo:
 
+    - **main checked out + dirty** → fail (protect uncommitted work).
+    - **main checked out + clean** → ``git merge --ff-only`` (updates ref
+      AND working tree so the user doesn't see phantom dirty files).
+    - **other branch checked out** → ``git update-ref`` with CAS (ref-only,
+      user's working tree is untouched).
+
+    Returns ``(success, output)``.
+    """
+    ok, output = _ff_check(repo_dir, branch)
+    if not ok:
+        return False, output
+    branch_tip = _run_git(["rev-parse", branch], cwd=repo_dir).stdout.strip()
+
+    # Check what the user has checked out in the main repo
+    head_result = _run_git(["rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_dir)
+    user_branch = head_result.stdout.strip() if head_result.returncode == 0 else ""
+
+    if user_branch == "main":
         # Clean main checkout: use merge --ff-only to update ref + working tree
         result = _run_git(["merge", "--ff-only", branch], cwd=repo_dir)
         if result.returncode != 0:
@@ -504,6 +629,28 @@ def _ff_merge(repo_dir: str, branch: str) -> tuple[bool, str]:
         return True, f"main fast-forwarded to {branch_tip[:12]} (ref-only, user on {user_branch})"
 
 
+def _ff_rollback(repo_dir: str, pre_sha: str, post_sha: str) -> bool:
+    """Move main back from *post_sha* to *pre_sha* (undo ``_ff_merge``).
+
+    Used when a later repo of a multi-repo task fails to fast-forward.  Only
+    acts while main is still at *post_sha*; a clean ``main`` checkout is
+    moved with ``reset --keep`` so its working tree follows.
+    """
+    if not pre_sha or not post_sha:
+        return False
+    main_result = _run_git(["rev-parse", "main"], cwd=repo_dir)
+    if main_result.returncode != 0 or main_result.stdout.strip() != post_sha:
+        return False
+    head_result = _run_git(["rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_dir)
+    if head_result.returncode == 0 and head_result.stdout.strip() == "main":
+        result = _run_git(["reset", "--keep", pre_sha], cwd=repo_dir)
+    else:
+        result = _run_git(["update-ref", "refs/heads/main", pre_sha, post_sha], cwd=repo_dir)
+    if result.returncode != 0:
+        logger.warning("Could not roll back main in %s: %s", repo_dir, result.stderr.strip())
+    return result.returncode == 0
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -581,6 +728,258 @@ def _cleanup_after_merge(
 # Main merge sequence
 # ---------------------------------------------------------------------------
 
+def _prepare_repo(
+    hc_home: Path,
+    team: str,
+    task_id: int,
+    branch: str,
+    repo_name: str,
+    repo_str: str,
+    base_sha: str,
+    skip_tests: bool,
+) -> tuple[Path, str] | MergeResult:
+    """Rebase *branch* onto main in one repo and run its pre-merge checks.
+
+    Touches nothing but a temp branch (and, if checks run, a disposable
+    worktree).  Returns ``(wt_path, temp_branch)`` ready to fast-forward
+    main to, or the failing ``MergeResult``.
+    """
+    pool = (hc_home, team, repo_name)
+    uid = uuid.uuid4().hex[:12]
+    wt_path = _merge_worktree_dir(hc_home, team, uid, task_id)
+    temp_branch = _temp_branch_name(branch, uid)
+    checked_out = False
+
+    # Step 1: Rebase onto main in the object database — no checkout.
+    #         The feature branch and agent worktree are NOT touched.
+    rebased = merge_tree.rebase(repo_str, branch, onto="main", base=base_sha or None)
+
+    if rebased.status == "unsupported":
+        # Step 1b: this git can't replay commits without a worktree —
+        #          rebase a temp branch inside a disposable worktree.
+        try:
+            temp_branch, uid = _create_temp_worktree(repo_str, branch, wt_path, pool=pool)
+        except RuntimeError as exc:
+            log_event(
+                hc_home, team,
+                f"{format_task_id(task_id)} could not create merge worktree ({repo_name})",
+                task_id=task_id,
+            )
+            return MergeResult(task_id, False, str(exc),
+                               reason=MergeFailureReason.WORKTREE_ERROR)
+        ok, output = _rebase_onto_main(str(wt_path), base_sha=base_sha)
+        if ok:
+            checked_out = True
+            head = _run_git(["rev-parse", "HEAD"], cwd=str(wt_path))
+            rebased = merge_tree.Rebased("ok", tip=head.stdout.strip())
+        else:
+            _remove_temp_worktree(repo_str, wt_path, temp_branch)
+            rebased = merge_tree.Rebased("conflict", output=output)
+
+    if rebased.status == "conflict":
+        # Step 2: Squash-reapply fallback — the branch's net diff as one
+        #         commit on main, again without a checkout.
+        log_event(
+            hc_home, team,
+            f"{format_task_id(task_id)} rebase conflict in {repo_name}, "
+            f"trying squash-reapply fallback",
+            task_id=task_id,
+        )
+        logger.info(
+            "%s: rebase failed for %s, attempting squash-reapply",
+            format_task_id(task_id), repo_name,
+        )
+
+        squash_uid = uuid.uuid4().hex[:12]
+        squash_wt_path = _merge_worktree_dir(hc_home, team, squash_uid, task_id)
+        squash_branch = _temp_branch_name(branch, squash_uid)
+
+        squashed = merge_tree.squash(repo_str, branch, onto="main")
+        if squashed.status == "unsupported":
+            # git < 2.38: apply the diff in a fresh worktree rooted at main
+            create_result = _add_worktree(repo_str, squash_wt_path, squash_branch, "main", pool=pool)
+            if create_result is not None:
+                log_event(
+                    hc_home, team,
+                    f"{format_task_id(task_id)} squash-reapply worktree creation failed ({repo_name})",
+                    task_id=task_id,
+                )
+                return MergeResult(
+                    task_id, False,
+                    f"Rebase conflict in {repo_name} and could not create squash worktree: "
+                    f"{create_result.stderr[:200]}",
+                    reason=MergeFailureReason.REBASE_CONFLICT,
+                )
+            squash_ok, squash_output = _squash_reapply(repo_str, branch, str(squash_wt_path))
+            if squash_ok:
+                checked_out = True
+                head = _run_git(["rev-parse", "HEAD"], cwd=str(squash_wt_path))
+                squashed = merge_tree.Rebased("ok", tip=head.stdout.strip())
+            else:
+                _remove_temp_worktree(repo_str, squash_wt_path, squash_branch)
+                squashed = merge_tree.Rebased("conflict", output=squash_output)
+
+        if not squashed.ok:
+            # True content conflict — capture detailed hunk context
+            conflict_ctx = _capture_conflict_hunks(
+                repo_str, branch, base_sha=base_sha, files=squashed.conflicts or None,
+            )
+            log_event(
+                hc_home, team,
+                f"{format_task_id(task_id)} true content conflict in {repo_name}, "
+                f"squash-reapply also failed",
+                task_id=task_id,
+            )
+            return MergeResult(
+                task_id, False,
+                f"True content conflict in {repo_name}: {squashed.output[:200]}",
+                reason=MergeFailureReason.SQUASH_CONFLICT,
+                conflict_context=conflict_ctx,
+            )
+
+        # Squash succeeded — use this worktree/branch going forward
+        log_event(
+            hc_home, team,
+            f"{format_task_id(task_id)} squash-reapply succeeded for {repo_name}",
+            task_id=task_id,
+        )
+        logger.info(
+            "%s: squash-reapply succeeded for %s",
+            format_task_id(task_id), repo_name,
+        )
+        rebased = squashed
+        wt_path = squash_wt_path
+        temp_branch = squash_branch
+
+    # Step 3: Point the temp branch at the result.  Check it out only if
+    #         pre-merge checks will actually run.
+    if not checked_out:
+        if not skip_tests and _needs_checkout(hc_home, team, repo_name, repo_str, rebased.tip):
+            create_result = _add_worktree(repo_str, wt_path, temp_branch, rebased.tip, pool=pool)
+        else:
+            create_result = _run_git(["branch", temp_branch, rebased.tip], cwd=repo_str)
+            create_result = create_result if create_result.returncode != 0 else None
+        if create_result is not None:
+            log_event(
+                hc_home, team,
+                f"{format_task_id(task_id)} could not create merge worktree ({repo_name})",
+                task_id=task_id,
+            )
+            return MergeResult(
+                task_id, False,
+                f"Could not create merge worktree: {create_result.stderr.strip()}",
+                reason=MergeFailureReason.WORKTREE_ERROR,
+            )
+
+    if not skip_tests and wt_path.exists():
+        ok, output = _run_pre_merge(
+            str(wt_path), hc_home=hc_home, team=team, repo_name=repo_name, task_id=task_id,
+        )
+        if not ok:
+            _remove_temp_worktree(repo_str, wt_path, temp_branch)
+            log_event(
+                hc_home, team,
+                f"{format_task_id(task_id)} merge blocked — pre-merge checks failed ({repo_name})",
+                task_id=task_id,
+            )
+            return MergeResult(
+                task_id, False,
+                f"Pre-merge checks failed in {repo_name}: {output[:200]}",
+                reason=MergeFailureReason.PRE_MERGE_FAILED,
+            )
+        if output.startswith(testcache.CACHED_PASS):
+            log_event(
+                hc_home, team,
+                f"{format_task_id(task_id)} pre-merge checks: cached pass ({repo_name})",
+                task_id=task_id,
+            )
+
+    return wt_path, temp_branch
+
+
+def _prepare_all(
+    hc_home: Path,
+    team: str,
+    task_id: int,
+    branch: str,
+    repos: list[str],
+    repo_dirs: dict[str, str],
+    base_sha_dict: dict,
+    skip_tests: bool,
+) -> dict[str, tuple[Path, str] | MergeResult]:
+    """Run ``_prepare_repo`` for every repo, one thread per repo.
+
+    An exception in one repo (a git timeout, a test runner that can't be
+    spawned) becomes a ``WORKTREE_ERROR`` result for that repo, so the
+    caller still gets — and cleans up — every other repo's temp branch.
+    """
+    def prepare(repo_name: str) -> tuple[Path, str] | MergeResult:
+        return _prepare_repo(
+            hc_home, team, task_id, branch, repo_name, repo_dirs[repo_name],
+            base_sha_dict.get(repo_name, ""), skip_tests,
+        )
+
+    def failed(repo_name: str, exc: Exception) -> MergeResult:
+        logger.exception("%s: preparing %s failed", format_task_id(task_id), repo_name)
+        return MergeResult(task_id, False, f"Could not prepare {repo_name}: {exc}",
+                           reason=MergeFailureReason.WORKTREE_ERROR)
+
+    if len(repos) == 1:
+        try:
+            return {repos[0]: prepare(repos[0])}
+        except Exception as exc:
+            return {repos[0]: failed(repos[0], exc)}
+    prepared: dict[str, tuple[Path, str] | MergeResult] = {}
+    with ThreadPoolExecutor(max_workers=len(repos), thread_name_prefix="merge-prepare") as executor:
+        futures = {repo_name: executor.submit(prepare, repo_name) for repo_name in repos}
+        for repo_name, future in futures.items():
+            try:
+                prepared[repo_name] = future.result()
+            except Exception as exc:
+                prepared[repo_name] = failed(repo_name, exc)
+    return prepared
+
+
+def _ff_failure(
+    hc_home: Path,
+    team: str,
+    task_id: int,
+    repo_name: str,
+    output: str,
+    repo_dirs: dict[str, str],
+    temp_worktrees: dict[str, tuple[Path, str]],
+    rolled_back: list[str] | None = None,
+    stuck: list[str] | None = None,
+) -> MergeResult:
+    """Clean up after a failed fast-forward and classify the failure."""
+    for rn, (wt_path, temp_branch) in temp_worktrees.items():
+        _remove_temp_worktree(repo_dirs[rn], wt_path, temp_branch)
+    note = ""
+    if rolled_back:
+        note += f"; rolled back main in {', '.join(rolled_back)}"
+    if stuck:
+        note += f"; could NOT roll back main in {', '.join(stuck)}"
+    log_event(
+        hc_home, team,
+        f"{format_task_id(task_id)} merge failed ({repo_name}){note}",
+        task_id=task_id,
+    )
+    # Classify the ff-merge failure
+    if "uncommitted" in output.lower():
+        reason = MergeFailureReason.DIRTY_MAIN
+    elif "not a descendant" in output.lower() or "not possible" in output.lower():
+        reason = MergeFailureReason.FF_NOT_POSSIBLE
+    elif "update-ref failed" in output.lower() or "concurrent" in output.lower():
+        reason = MergeFailureReason.UPDATE_REF_FAILED
+    else:
+        reason = MergeFailureReason.FF_NOT_POSSIBLE
+    return MergeResult(
+        task_id, False,
+        f"Merge failed in {repo_name}: {output[:200]}{note}",
+        reason=reason,
+    )
+
+
 def merge_task(
     hc_home: Path,
     team: str,
@@ -603,6 +1002,10 @@ def merge_task(
     On failure: only the temp worktree/branch is removed.  The feature
     branch and agent worktree remain intact for the agent to resume.
 
+    Multi-repo tasks are prepared concurrently and committed all-or-nothing:
+    main is fast-forwarded in every repo only if every repo rebased and
+    passed its checks.
+
     Args:
         hc_home: Delegate home directory.
         team: Team name.
@@ -640,155 +1043,50 @@ def merge_task(
     merge_base_dict: dict[str, str] = {}
     merge_tip_dict: dict[str, str] = {}
 
-    # Track temp worktrees so we can clean them up
-    temp_worktrees: dict[str, tuple[Path, str]] = {}  # repo_name -> (wt_path, temp_branch)
-
+    # Prepare phase: rebase + pre-merge checks for every repo, concurrently
+    # (a multi-repo task waits for its slowest suite, not the sum of them).
+    # Nothing but temp branches changes until every repo is ready.
+    prepared = _prepare_all(hc_home, team, task_id, branch, repos, repo_dirs, base_sha_dict, skip_tests)
+    # repo_name -> (wt_path, temp_branch), for cleanup
+    temp_worktrees: dict[str, tuple[Path, str]] = {
+        rn: out for rn, out in prepared.items() if not isinstance(out, MergeResult)
+    }
+    failures = [prepared[rn] for rn in repos if isinstance(prepared[rn], MergeResult)]
+    if failures:
+        for rn, (wt_path, temp_branch) in temp_worktrees.items():
+            _remove_temp_worktree(repo_dirs[rn], wt_path, temp_branch)
+        return failures[0]
+
+    # Commit phase: fast-forward main in every repo, all or nothing.  Check
+    # them all first; if a fast-forward still fails (main moved under us),
+    # roll back the repos already advanced.
     for repo_name in repos:
-        repo_str = repo_dirs[repo_name]
-
-        # Step 1: Create a disposable worktree + temp branch from the feature branch.
-        #         The feature branch and agent worktree are NOT touched.
-        uid = uuid.uuid4().hex[:12]
-        wt_path = _merge_worktree_dir(hc_home, team, uid, task_id)
-        try:
-            temp_branch, uid = _create_temp_worktree(repo_str, branch, wt_path)
-        except RuntimeError as exc:
-            log_event(
-                hc_home, team,
-                f"{format_task_id(task_id)} could not create merge worktree ({repo_name})",
-                task_id=task_id,
-            )
-            return MergeResult(task_id, False, str(exc),
-                               reason=MergeFailureReason.WORKTREE_ERROR)
-        temp_worktrees[repo_name] = (wt_path, temp_branch)
-
-        wt_str = str(wt_path)
-
-        # Step 2: Rebase the TEMP branch onto main (inside the temp worktree).
-        #         Feature branch is untouched.
-        base_sha = base_sha_dict.get(repo_name, "")
-        ok, output = _rebase_onto_main(wt_str, base_sha=base_sha)
+        ok, output = _ff_check(repo_dirs[repo_name], temp_worktrees[repo_name][1])
         if not ok:
-            # Rebase failed — try squash-reapply fallback.
-            # The temp worktree still has the aborted rebase state.
-            # Remove it and create a fresh one rooted at main.
-            _remove_temp_worktree(repo_str, wt_path, temp_branch)
-
-            log_event(
-                hc_home, team,
-                f"{format_task_id(task_id)} rebase conflict in {repo_name}, "
-                f"trying squash-reapply fallback",
-                task_id=task_id,
-            )
-            logger.info(
-                "%s: rebase failed for %s, attempting squash-reapply",
-                format_task_id(task_id), repo_name,
-            )
-
-            # Create a fresh temp worktree from main for the squash
-            squash_uid = uuid.uuid4().hex[:12]
-            squash_wt_path = _merge_worktree_dir(hc_home, team, squash_uid, task_id)
-            squash_wt_path.parent.mkdir(parents=True, exist_ok=True)
-            squash_branch = f"_merge/{squash_uid}/squash-{format_task_id(task_id)}"
-
-            create_result = _run_git(
-                ["worktree", "add", "-b", squash_branch, str(squash_wt_path), "main"],
-                cwd=repo_str,
-            )
-            if create_result.returncode != 0:
-                log_event(
-                    hc_home, team,
-                    f"{format_task_id(task_id)} squash-reapply worktree creation failed ({repo_name})",
-                    task_id=task_id,
-                )
-                return MergeResult(
-                    task_id, False,
-                    f"Rebase conflict in {repo_name} and could not create squash worktree: "
-                    f"{create_result.stderr[:200]}",
-                    reason=MergeFailureReason.REBASE_CONFLICT,
-                )
-
-            squash_ok, squash_output = _squash_reapply(
-                repo_str, branch, str(squash_wt_path),
-            )
+            return _ff_failure(hc_home, team, task_id, repo_name, output, repo_dirs, temp_worktrees)
 
-            if not squash_ok:
-                # True content conflict — capture detailed hunk context
-                _remove_temp_worktree(repo_str, squash_wt_path, squash_branch)
-
-                conflict_ctx = _capture_conflict_hunks(
-                    repo_str, branch, base_sha=base_sha,
-                )
-                log_event(
-                    hc_home, team,
-                    f"{format_task_id(task_id)} true content conflict in {repo_name}, "
-                    f"squash-reapply also failed",
-                    task_id=task_id,
-                )
-                return MergeResult(
-                    task_id, False,
-                    f"True content conflict in {repo_name}: {squash_output[:200]}",
-                    reason=MergeFailureReason.SQUASH_CONFLICT,
-                    conflict_context=conflict_ctx,
-                )
-
-            # Squash succeeded — use this worktree/branch going forward
-            log_event(
-                hc_home, team,
-                f"{format_task_id(task_id)} squash-reapply succeeded for {repo_name}",
-                task_id=task_id,
-            )
-            logger.info(
-                "%s: squash-reapply succeeded for %s",
-                format_task_id(task_id), repo_name,
-            )
-            # Replace the temp worktree tracking with the squash one
-            wt_path = squash_wt_path
-            temp_branch = squash_branch
-            temp_worktrees[repo_name] = (wt_path, temp_branch)
-            wt_str = str(wt_path)
-
-        # Step 3: Run pre-merge script / tests inside the temp worktree.
-        if not skip_tests:
-            ok, output = _run_pre_merge(wt_str, hc_home=hc_home, team=team, repo_name=repo_name)
-            if not ok:
-                _remove_temp_worktree(repo_str, wt_path, temp_branch)
-                log_event(
-                    hc_home, team,
-                    f"{format_task_id(task_id)} merge blocked — pre-merge checks failed ({repo_name})",
-                    task_id=task_id,
-                )
-                return MergeResult(
-                    task_id, False,
-                    f"Pre-merge checks failed in {repo_name}: {output[:200]}",
-                    reason=MergeFailureReason.PRE_MERGE_FAILED,
-                )
+    for repo_name in repos:
+        repo_str = repo_dirs[repo_name]
 
         # Step 4: Fast-forward merge main to the temp branch tip (atomic CAS).
         pre_merge = _run_git(["rev-parse", "main"], cwd=repo_str)
         merge_base_dict[repo_name] = pre_merge.stdout.strip() if pre_merge.returncode == 0 else ""
 
-        ok, output = _ff_merge(repo_str, temp_branch)
+        ok, output = _ff_merge(repo_str, temp_worktrees[repo_name][1])
         if not ok:
-            _remove_temp_worktree(repo_str, wt_path, temp_branch)
-            log_event(
-                hc_home, team,
-                f"{format_task_id(task_id)} merge failed ({repo_name})",
-                task_id=task_id,
-            )
-            # Classify the ff-merge failure
-            if "uncommitted" in output.lower():
-                reason = MergeFailureReason.DIRTY_MAIN
-            elif "not a descendant" in output.lower() or "not possible" in output.lower():
-                reason = MergeFailureReason.FF_NOT_POSSIBLE
-            elif "update-ref failed" in output.lower() or "concurrent" in output.lower():
-                reason = MergeFailureReason.UPDATE_REF_FAILED
-            else:
-                reason = MergeFailureReason.FF_NOT_POSSIBLE
-            return MergeResult(
-                task_id, False,
-                f"Merge failed in {repo_name}: {output[:200]}",
-                reason=reason,
+            rolled_back = [
+                rn for rn in merge_tip_dict
+                if _ff_rollback(repo_dirs[rn], merge_base_dict[rn], merge_tip_dict[rn])
+            ]
+            stuck = [rn for rn in merge_tip_dict if rn not in rolled_back]
+            if stuck:
+                logger.error(
+                    "%s: could not roll back main in %s after failing in %s",
+                    format_task_id(task_id), ", ".join(stuck), repo_name,
+                )
+            return _ff_failure(
+                hc_home, team, task_id, repo_name, output, repo_dirs, temp_worktrees,
+                rolled_back=rolled_back, stuck=stuck,
             )
 
         post_merge = _run_git(["rev-parse", "main"], cwd=repo_str)
@@ -885,8 +1183,8 @@ def merge_once(hc_home: Path, team: str) -> list[MergeResult]:
     results = []
     manager = _get_manager_name(hc_home, team)
 
-    # --- 1. Newly approved tasks ---
-    for task in list_tasks(hc_home, team, status="in_approval"):
+    # --- 1. Newly approved tasks (least predicted conflicts first) ---
+    for task in order_for_merge(hc_home, team, list_tasks(hc_home, team, status="in_approval")):
         task_id = task["id"]
         repos: list[str] = task.get("repo", [])
 
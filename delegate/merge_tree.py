@@ -0,0 +1,262 @@
+"""Checkout-free rebase, squash and conflict detection.
+
+The merge worker used to materialize a full worktree just to attempt
+``git rebase``, a second one for the squash-reapply fallback and then
+diff the two sides a third time to describe a conflict.  Everything here
+instead works on git's object database — no files are written outside
+``.git/objects`` — so a conflicting merge costs milliseconds:
+
+- ``merge_trees()`` — ``git merge-tree --write-tree`` (git >= 2.38): the
+  merged tree OID, or the conflicting paths and git's messages.
+- ``rebase()`` — replays ``<base>..<branch>`` onto *onto*, with
+  ``git replay`` when available (git >= 2.44), otherwise one
+  ``merge-tree --merge-base`` + ``commit-tree`` per commit (git >= 2.40).
+  Older gits (>= 2.38) manage single-commit branches the same way;
+  anything else is reported as ``unsupported`` and the caller rebases in
+  a worktree.
+- ``squash()`` — the branch's net change applied onto *onto* as a single
+  commit: ``merge_trees()`` of *onto* and the branch (merge base = their
+  fork point), then ``commit-tree`` of the result with *onto* as parent.
+
+A git call that times out is reported as ``unsupported`` too, so the
+caller falls back to its worktree path instead of crashing the merge.
+
+Nothing here moves a ref: callers point a temporary branch at
+``Rebased.tip`` and check it out only if tests need to run.
+"""
+
+import functools
+import logging
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+MERGE_TREE_VERSION = (2, 38)
+MERGE_BASE_OPTION_VERSION = (2, 40)
+REPLAY_VERSION = (2, 44)
+
+
+@dataclass
+class TreeMerge:
+    """Result of ``git merge-tree --write-tree``."""
+
+    clean: bool
+    tree: str | None
+    conflicts: list[str] = field(default_factory=list)
+    messages: str = ""
+
+
+@dataclass
+class Rebased:
+    """Result of an object-database rebase or squash.
+
+    *status* is ``"ok"`` (``tip`` is the new commit), ``"conflict"``
+    (``conflicts`` lists the paths, when known) or ``"unsupported"`` (this
+    git can't do it without a worktree; ``output`` says why).
+    """
+
+    status: str
+    tip: str | None = None
+    conflicts: list[str] = field(default_factory=list)
+    output: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def _git(args: list[str], cwd: str, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git"] + args, cwd=cwd, capture_output=True, text=True, timeout=120, **kwargs,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def git_version() -> tuple[int, int]:
+    """``(major, minor)`` of the installed git, ``(0, 0)`` if unknown."""
+    try:
+        out = subprocess.run(["git", "--version"], capture_output=True, text=True).stdout
+    except OSError:
+        return (0, 0)
+    m = re.search(r"(\d+)\.(\d+)", out)
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
+
+def has_merge_tree() -> bool:
+    return git_version() >= MERGE_TREE_VERSION
+
+
+def _rev(repo_dir: str, ref: str) -> str | None:
+    result = _git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], repo_dir)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _merge_base(repo_dir: str, a: str, b: str) -> str | None:
+    result = _git(["merge-base", a, b], repo_dir)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+# ---------------------------------------------------------------------------
+# Tree merges
+# ---------------------------------------------------------------------------
+
+def merge_trees(repo_dir: str, ours: str, theirs: str, merge_base: str | None = None) -> TreeMerge:
+    """Three-way merge *ours* and *theirs* in the object database.
+
+    *merge_base* (git >= 2.40) pins the base — e.g. a commit's parent to
+    cherry-pick it.  Raises ``RuntimeError`` if git can't merge at all
+    (no merge-tree support, unrelated histories, bad revision).
+    """
+    if not has_merge_tree():
+        raise RuntimeError(f"git merge-tree --write-tree needs git >= {'.'.join(map(str, MERGE_TREE_VERSION))}")
+    args = ["merge-tree", "--write-tree", "--name-only"]
+    if merge_base:
+        args.append(f"--merge-base={merge_base}")
+    result = _git(args + [ours, theirs], repo_dir)
+    if result.returncode not in (0, 1):
+        raise RuntimeError(f"git merge-tree failed: {result.stderr.strip()}")
+
+    head, _, messages = result.stdout.partition("\n\n")
+    lines = head.splitlines()
+    tree = lines[0].strip() if lines else None
+    conflicts = list(dict.fromkeys(line for line in lines[1:] if line))
+    return TreeMerge(result.returncode == 0, tree, conflicts, messages.strip())
+
+
+def _tree_of(repo_dir: str, commit: str) -> str:
+    return _git(["rev-parse", f"{commit}^{{tree}}"], repo_dir).stdout.strip()
+
+
+def _commit_tree(repo_dir: str, tree: str, parent: str, message: str, env: dict | None = None) -> str:
+    result = _git(
+        ["commit-tree", tree, "-p", parent, "-F", "-"], repo_dir,
+        input=message, env={**os.environ, **(env or {})},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git commit-tree failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+# ---------------------------------------------------------------------------
+# Rebase
+# ---------------------------------------------------------------------------
+
+def _replay(repo_dir: str, onto_sha: str, upstream: str, branch: str) -> Rebased:
+    result = _git(["replay", "--onto", onto_sha, f"{upstream}..{branch}"], repo_dir)
+    if result.returncode == 1:
+        return Rebased("conflict", output=result.stderr + result.stdout)
+    if result.returncode != 0:
+        return Rebased("unsupported", output=result.stderr.strip())
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 4 and parts[0] == "update":
+            return Rebased("ok", tip=parts[2])
+    return Rebased("unsupported", output="git replay reported no ref update")
+
+
+def _pick_commits(repo_dir: str, onto_sha: str, commits: list[str], *, pin_base: bool = True) -> Rebased:
+    """Cherry-pick *commits* onto *onto_sha* with merge-tree + commit-tree.
+
+    Without *pin_base* (git < 2.40) the merge base is git's own choice,
+    which is only a cherry-pick when it is the commit's parent.
+    """
+    tip = onto_sha
+    tip_tree = _tree_of(repo_dir, tip)
+    for commit in commits:
+        picked = merge_trees(repo_dir, tip, commit, merge_base=f"{commit}^" if pin_base else None)
+        if not picked.clean:
+            return Rebased(
+                "conflict", conflicts=picked.conflicts,
+                output=f"Could not apply {commit[:12]}:\n{picked.messages}",
+            )
+        if picked.tree == tip_tree:
+            continue  # became empty — rebase drops these too
+        meta = _git(["show", "-s", "--format=%an%x00%ae%x00%ad%x00%B", "--date=raw", commit], repo_dir)
+        name, email, date, message = meta.stdout.split("\0", 3)
+        tip = _commit_tree(repo_dir, picked.tree, tip, message, env={
+            "GIT_AUTHOR_NAME": name, "GIT_AUTHOR_EMAIL": email, "GIT_AUTHOR_DATE": date,
+        })
+        tip_tree = picked.tree
+    return Rebased("ok", tip=tip)
+
+
+def _unsupported_on_timeout(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> Rebased:
+        try:
+            return fn(*args, **kwargs)
+        except subprocess.TimeoutExpired as exc:
+            return Rebased("unsupported", output=f"git timed out after {exc.timeout:.0f}s")
+    return wrapper
+
+
+@_unsupported_on_timeout
+def rebase(repo_dir: str, branch: str, onto: str = "main", base: str | None = None) -> Rebased:
+    """Equivalent of ``git rebase --onto <onto> <base> <branch>``, checkout-free.
+
+    Without *base* the merge-base of *onto* and *branch* is used (plain
+    ``git rebase <onto>``).  Merge commits are linearized away, as rebase
+    does by default.  The branch ref itself is never moved.
+    """
+    onto_sha = _rev(repo_dir, onto)
+    branch_sha = _rev(repo_dir, branch)
+    if onto_sha is None or branch_sha is None:
+        return Rebased("unsupported", output=f"Could not resolve {onto} or {branch}")
+    fork = _merge_base(repo_dir, onto_sha, branch_sha)
+    upstream = base or fork
+    if upstream is None:
+        return Rebased("unsupported", output=f"{branch} shares no history with {onto}")
+    if upstream == onto_sha == fork:
+        return Rebased("ok", tip=branch_sha)  # already based on the current tip
+
+    listed = _git(["rev-list", "--reverse", "--no-merges", f"{upstream}..{branch_sha}"], repo_dir)
+    if listed.returncode != 0:
+        return Rebased("unsupported", output=listed.stderr.strip())
+    commits = listed.stdout.split()
+    if not commits:
+        return Rebased("ok", tip=onto_sha)
+
+    version = git_version()
+    try:
+        if version >= REPLAY_VERSION:
+            return _replay(repo_dir, onto_sha, upstream, branch)
+        if version >= MERGE_BASE_OPTION_VERSION:
+            return _pick_commits(repo_dir, onto_sha, commits)
+        if has_merge_tree() and commits == [branch_sha] and upstream == fork == _rev(repo_dir, f"{branch_sha}^"):
+            # One commit on top of the fork point: the default merge base
+            # *is* its parent, so a plain three-way merge is the cherry-pick.
+            return _pick_commits(repo_dir, onto_sha, commits, pin_base=False)
+    except RuntimeError as exc:
+        return Rebased("unsupported", output=str(exc))
+    return Rebased("unsupported", output=f"git {version[0]}.{version[1]} can't replay commits without a worktree")
+
+
+# ---------------------------------------------------------------------------
+# Squash
+# ---------------------------------------------------------------------------
+
+@_unsupported_on_timeout
+def squash(repo_dir: str, branch: str, onto: str = "main", message: str | None = None) -> Rebased:
+    """Commit the net change of *branch* (since its fork point) onto *onto*."""
+    onto_sha = _rev(repo_dir, onto)
+    if onto_sha is None:
+        return Rebased("unsupported", output=f"Could not resolve {onto}")
+    try:
+        merged = merge_trees(repo_dir, onto_sha, branch)
+    except RuntimeError as exc:
+        return Rebased("unsupported", output=str(exc))
+    if not merged.clean:
+        return Rebased("conflict", conflicts=merged.conflicts, output=merged.messages)
+    if merged.tree == _tree_of(repo_dir, onto_sha):
+        return Rebased("ok", tip=onto_sha, output="No changes to apply")
+    try:
+        tip = _commit_tree(
+            repo_dir, merged.tree, onto_sha,
+            message or f"squash-reapply: apply {branch} onto {onto}",
+        )
+    except RuntimeError as exc:
+        return Rebased("unsupported", output=str(exc))
+    return Rebased("ok", tip=tip)
@@ -5,13 +5,16 @@ these functions send a structured notification to the engineering manager's
 inbox so they can triage and take action.
 
 Notification types:
-    REJECTION  — human rejected a task via POST /tasks/{id}/reject
-    CONFLICT   — daemon merge worker detected a merge conflict
+    REJECTION           — human rejected a task via POST /tasks/{id}/reject
+    CONFLICT            — daemon merge worker detected a merge conflict
+    CONFLICT_PREDICTED  — conflict predictor found an overlap before merge
+                          (sent to the DRI as well as the manager)
 
 Usage:
     from delegate.notify import notify_rejection, notify_conflict
     notify_rejection(hc_home, team, task, reason="Code quality issues")
     notify_conflict(hc_home, team, task, conflict_details="...")
+    notify_predicted_conflict(hc_home, team, task, overlaps)
 """
 
 import logging
@@ -243,3 +246,65 @@ def notify_conflict(
             task_id, e
         )
         return None
+
+
+def notify_predicted_conflict(
+    hc_home: Path,
+    team: str,
+    task: dict,
+    overlaps: list[dict],
+) -> list[int]:
+    """Warn the task's DRI and the manager about predicted merge conflicts.
+
+    Called by the background conflict predictor (``delegate.conflicts``)
+    when new overlaps appear for an in-flight task — long before
+    ``merge_task`` would hit ``SQUASH_CONFLICT``.
+
+    Args:
+        hc_home: Delegate home directory.
+        team: Team name.
+        task: The task dict (must include id, title, branch).
+        overlaps: ``[{"other": task_id | 0 (main), "repo": str, "files": [...]}]``.
+
+    Returns:
+        The delivered message ids (one per recipient).
+    """
+    manager = _get_manager_name(hc_home, team)
+    sender = _get_sender_name(hc_home)
+    task_id = task["id"]
+    dri = task.get("dri") or task.get("assignee") or manager
+
+    lines = []
+    for o in overlaps:
+        against = "main" if not o["other"] else format_task_id(o["other"])
+        files = ", ".join(o["files"][:5]) + (f" (+{len(o['files']) - 5} more)" if len(o["files"]) > 5 else "")
+        lines.append(f"  - vs {against} in {o['repo']}: {files}")
+    touches_main = any(not o["other"] for o in overlaps)
+
+    body = (
+        f"CONFLICT_PREDICTED: {format_task_id(task_id)}\n"
+        "\n"
+        f"Task: {format_task_id(task_id)} — {task.get('title', '(untitled)')}\n"
+        f"Branch: {task.get('branch', '(no branch)')}\n"
+        f"DRI: {dri}\n"
+        "\n"
+        "A trial merge (no checkout) predicts content conflicts:\n"
+        + "\n".join(lines) + "\n"
+        "\n"
+        "Suggested actions:\n"
+        + ("  - Rebase onto main now (git reset --soft main) while the change is fresh\n" if touches_main else "")
+        + "  - Coordinate with the other task's DRI on who changes these files first\n"
+        "  - The merge queue merges the task that conflicts least first"
+    )
+
+    ids = []
+    for recipient in dict.fromkeys([dri, manager]):
+        try:
+            ids.append(deliver(hc_home, team, Message(
+                sender=sender, recipient=recipient, time=_now_iso(), body=body, task_id=task_id,
+            )))
+        except (ValueError, FileNotFoundError) as e:
+            logger.warning(
+                "Could not send conflict prediction for %s to %s: %s", task_id, recipient, e
+            )
+    return ids
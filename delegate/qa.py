@@ -14,11 +14,14 @@ Usage:
 """
 
 import argparse
+import functools
 import logging
 import re
+import shlex
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
 from delegate.paths import agent_dir as _resolve_agent_dir
 from delegate.mailbox import send, read_inbox, mark_processed, Message
@@ -143,8 +146,24 @@ def checkout_branch(hc_home: Path, team: str, repo_name: str, branch: str) -> Pa
 clone_and_checkout = checkout_branch
 
 
-def run_tests(repo_path: Path, test_command: str | None = None) -> ReviewResult:
-    """Run tests in the given repo directory."""
+def run_tests(
+    repo_path: Path,
+    test_command: str | None = None,
+    *,
+    hc_home: Path | None = None,
+    team: str | None = None,
+    repo_name: str | None = None,
+    task_id: int | None = None,
+) -> ReviewResult:
+    """Run tests in the given repo directory.
+
+    With *hc_home* and *team*, a pass already recorded for the same tree
+    and command is reused (see ``delegate.testcache``), and an
+    auto-detected pytest run goes through change-aware test selection
+    when the repo enables it (see ``delegate.testselect``) and is split
+    over the repo's ``test_shards`` (see ``delegate.testshard``).
+    """
+    auto_detected = test_command is None
     if test_command is None:
         if (repo_path / "pyproject.toml").exists() or (repo_path / "tests").is_dir():
             test_command = "python -m pytest -v"
@@ -160,31 +179,63 @@ def run_tests(repo_path: Path, test_command: str | None = None) -> ReviewResult:
                 branch="unknown",
             )
 
-    try:
-        result = subprocess.run(
-            test_command.split(),
-            cwd=str(repo_path),
-            capture_output=True,
-            text=True,
-            timeout=300,
-        )
-        return ReviewResult(
-            approved=result.returncode == 0,
-            output=result.stdout + result.stderr,
-            repo=repo_path.name,
-            branch="unknown",
-        )
-    except subprocess.TimeoutExpired as e:
-        logger.warning(
-            "Test command timed out after 300s in %s: %s",
-            repo_path.name, test_command
-        )
-        return ReviewResult(
-            approved=False,
-            output="Tests timed out after 300 seconds.",
-            repo=repo_path.name,
-            branch="unknown",
+    def _runner(argv: list[str]):
+        def _run() -> tuple[bool, str]:
+            try:
+                result = subprocess.run(
+                    argv,
+                    cwd=str(repo_path),
+                    capture_output=True,
+                    text=True,
+                    timeout=300,
+                )
+                return result.returncode == 0, result.stdout + result.stderr
+            except subprocess.TimeoutExpired:
+                logger.warning(
+                    "Test command timed out after 300s in %s: %s",
+                    repo_path.name, shlex.join(argv)
+                )
+                return False, "Tests timed out after 300 seconds."
+        return _run
+
+    _run = _runner(test_command.split())
+
+    if hc_home is not None and team is not None:
+        from delegate.config import get_test_shards
+        from delegate.testselect import run_selected
+        from delegate.testshard import run_sharded
+
+        subset: Callable | None = None
+        if auto_detected and test_command.startswith("python -m pytest"):
+            repo = repo_name or repo_path.name
+            shards = get_test_shards(hc_home, team, repo)
+            if shards > 1:
+                _run = functools.partial(
+                    run_sharded, test_command.split(), repo_path, shards=shards,
+                    hc_home=hc_home, team=team, repo=repo,
+                )
+
+            def _subset(targets: list[str]):
+                argv = test_command.split() + ["-x", *targets]
+                if shards > 1:
+                    return shlex.join(argv), functools.partial(
+                        run_sharded, test_command.split() + ["-x"], repo_path, shards=shards,
+                        targets=targets, hc_home=hc_home, team=team, repo=repo,
+                    )
+                return shlex.join(argv), _runner(argv)
+            subset = _subset
+        passed, output = run_selected(
+            hc_home, team, repo_name or repo_path.name, repo_path,
+            command=test_command, run=_run, subset=subset, task_id=task_id,
         )
+    else:
+        passed, output = _run()
+    return ReviewResult(
+        approved=passed,
+        output=output,
+        repo=repo_path.name,
+        branch="unknown",
+    )
 
 
 def run_pre_merge_script(repo_path: Path, script: str) -> ReviewResult:
@@ -197,8 +248,6 @@ def run_pre_merge_script(repo_path: Path, script: str) -> ReviewResult:
     Returns:
         ReviewResult with output from the script.
     """
-    import shlex
-
     cmd = shlex.split(script)
     try:
         result = subprocess.run(
@@ -372,12 +421,14 @@ def handle_review_request(
     script = get_pre_merge_script(hc_home, team, req.repo)
     if test_command is not None:
         # Explicit test_command overrides pre-merge script
-        result = run_tests(wt_path, test_command)
+        result = run_tests(
+            wt_path, test_command, hc_home=hc_home, team=team, repo_name=req.repo, task_id=task_id,
+        )
     elif script is not None:
         result = run_pre_merge_script(wt_path, script)
     else:
         # No script, no explicit command — auto-detect
-        result = run_tests(wt_path)
+        result = run_tests(wt_path, hc_home=hc_home, team=team, repo_name=req.repo, task_id=task_id)
     result.repo = req.repo
     result.branch = req.branch
 
@@ -0,0 +1,210 @@
+"""Per-repo ref snapshots — every task branch's state in one git call.
+
+The task board, the review gates and the commit views used to ask git
+about one task at a time (``rev-parse``, ``log base..HEAD``, ...).  A
+snapshot instead reads every ``delegate/*`` branch plus ``main`` with a
+single ``git for-each-ref`` and records, per branch:
+
+- ``sha`` — the tip commit,
+- ``ahead`` / ``behind`` — commit counts versus ``main``,
+- ``committed_at`` — the tip's committer date (ISO 8601).
+
+``ahead``/``behind`` come from ``%(ahead-behind:main)`` in the same call
+on git >= 2.41; older gits run one ``rev-list --left-right --count`` per
+branch, memoized per (main, tip) pair so only moved branches cost a
+subprocess.
+
+Snapshots are cached per repository until its refs change, detected from
+the mtimes of ``packed-refs`` and the directories under ``refs/heads``
+(git updates a loose ref by renaming a lock file into place, which bumps
+its directory's mtime) — a handful of ``stat`` calls, no subprocess.
+Refs touched within the last ``RACY_NS`` aren't cached, so filesystems
+with coarse timestamps can't hide a same-second update.
+
+``board()`` assembles the snapshots of a team's repos with the task each
+branch belongs to, for ``GET /teams/{team}/refs``.
+"""
+
+import functools
+import logging
+import os
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from delegate import merge_tree
+
+logger = logging.getLogger(__name__)
+
+BRANCH_PREFIX = "refs/heads/delegate/"
+AHEAD_BEHIND_VERSION = (2, 41)
+MAX_COUNTS = 4096
+RACY_NS = 2_000_000_000  # don't trust mtimes this fresh (coarse timestamps)
+
+_lock = threading.Lock()
+# (git common dir, with counts) -> (signature, snapshot)
+_snapshots: dict[tuple[str, bool], tuple[tuple, "RefSnapshot"]] = {}
+# (git common dir, main sha, tip sha) -> (ahead, behind)
+_counts: dict[tuple[str, str, str], tuple[int, int]] = {}
+
+
+@dataclass
+class BranchRef:
+    sha: str
+    ahead: int
+    behind: int
+    committed_at: str
+
+
+@dataclass
+class RefSnapshot:
+    main: str | None
+    branches: dict[str, BranchRef]
+
+    def to_dict(self) -> dict:
+        return {"main": self.main, "branches": {b: asdict(r) for b, r in self.branches.items()}}
+
+
+def _git(args: list[str], cwd: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, cwd=cwd, capture_output=True, text=True, timeout=60)
+
+
+@functools.lru_cache(maxsize=256)
+def _common_dir(repo_dir: str) -> str | None:
+    dot_git = os.path.join(repo_dir, ".git")
+    if os.path.isdir(dot_git):
+        return os.path.realpath(dot_git)
+    result = _git(["rev-parse", "--path-format=absolute", "--git-common-dir"], repo_dir)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _signature(common: str) -> tuple:
+    """mtimes that change whenever a branch is created, moved or deleted."""
+    sig = []
+    packed = os.path.join(common, "packed-refs")
+    try:
+        sig.append(("packed-refs", os.stat(packed).st_mtime_ns))
+    except OSError:
+        sig.append(("packed-refs", 0))
+    for dirpath, _dirnames, _files in os.walk(os.path.join(common, "refs", "heads")):
+        try:
+            sig.append((dirpath, os.stat(dirpath).st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(sorted(sig))
+
+
+def _ahead_behind(repo_dir: str, common: str, main: str, sha: str) -> tuple[int, int]:
+    key = (common, main, sha)
+    cached = _counts.get(key)
+    if cached is not None:
+        return cached
+    result = _git(["rev-list", "--left-right", "--count", f"{sha}...{main}"], repo_dir)
+    counts = (0, 0)
+    if result.returncode == 0:
+        left, _, right = result.stdout.strip().partition("\t")
+        counts = (int(left or 0), int(right or 0))
+    with _lock:
+        if len(_counts) >= MAX_COUNTS:
+            _counts.pop(next(iter(_counts)))
+        _counts[key] = counts
+    return counts
+
+
+def _read(repo_dir: str, common: str, counts: bool) -> RefSnapshot:
+    native = counts and merge_tree.git_version() >= AHEAD_BEHIND_VERSION
+    fmt = "%(refname)%00%(objectname)%00%(committerdate:iso-strict)"
+    if native:
+        fmt += "%00%(ahead-behind:refs/heads/main)"
+    result = _git(["for-each-ref", f"--format={fmt}", "refs/heads/main", BRANCH_PREFIX], repo_dir)
+    if result.returncode != 0:
+        logger.warning("for-each-ref failed in %s: %s", repo_dir, result.stderr.strip())
+        return RefSnapshot(None, {})
+
+    rows = [line.split("\0") for line in result.stdout.splitlines() if line]
+    main = next((r[1] for r in rows if r[0] == "refs/heads/main"), None)
+    branches: dict[str, BranchRef] = {}
+    for row in rows:
+        ref, sha, date = row[0], row[1], row[2]
+        if not ref.startswith(BRANCH_PREFIX):
+            continue
+        if native and len(row) > 3 and row[3]:
+            ahead, _, behind = row[3].partition(" ")
+            ab = (int(ahead), int(behind or 0))
+        elif counts and main is not None:
+            ab = _ahead_behind(repo_dir, common, main, sha)
+        else:
+            ab = (0, 0)
+        branches[ref[len("refs/heads/"):]] = BranchRef(sha, ab[0], ab[1], date)
+    return RefSnapshot(main, branches)
+
+
+def snapshot(repo_dir: Path | str, *, counts: bool = True) -> RefSnapshot:
+    """Return *repo_dir*'s ref snapshot, re-reading git only if refs changed.
+
+    With ``counts=False`` ``ahead``/``behind`` are left at 0 — enough for
+    callers that only need tips, and never more than one subprocess.
+    """
+    repo_dir = str(Path(repo_dir).resolve())
+    common = _common_dir(repo_dir)
+    if common is None:
+        return RefSnapshot(None, {})
+    sig = _signature(common)
+    with _lock:
+        cached = _snapshots.get((common, counts))
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    snap = _read(repo_dir, common, counts)
+    # A ref moved within the filesystem's timestamp granularity of this
+    # read would leave the signature unchanged — only cache settled refs.
+    now = time.time_ns()
+    if all(now - mtime > RACY_NS for _, mtime in sig):
+        with _lock:
+            _snapshots[(common, counts)] = (sig, snap)
+    return snap
+
+
+def branch_ref(repo_dir: Path | str, branch: str, *, counts: bool = True) -> BranchRef | None:
+    """The snapshot entry for *branch* (``None`` if it isn't a ``delegate/*`` branch)."""
+    return snapshot(repo_dir, counts=counts).branches.get(branch)
+
+
+def has_commits_since(repo_dir: Path | str, branch: str, base_sha: str) -> bool | None:
+    """Whether *branch* has moved past *base_sha*; ``None`` if it isn't in the snapshot."""
+    ref = branch_ref(repo_dir, branch, counts=False)
+    if ref is None:
+        return None
+    return ref.sha != base_sha
+
+
+def board(hc_home: Path, team: str) -> dict:
+    """Ref state for every repo of *team*, plus a per-task view.
+
+    Returns ``{"repos": {repo: {"main", "branches"}}, "tasks": {task_id:
+    {repo: {"branch", "sha", "ahead", "behind", "committed_at"}}}}``.
+    """
+    from delegate.config import get_repos
+    from delegate.repo import get_repo_path
+    from delegate.task import list_tasks
+
+    repos: dict[str, dict] = {}
+    snaps: dict[str, RefSnapshot] = {}
+    for repo_name in get_repos(hc_home, team):
+        real = get_repo_path(hc_home, team, repo_name).resolve()
+        if not real.is_dir():
+            continue
+        snaps[repo_name] = snapshot(real)
+        repos[repo_name] = snaps[repo_name].to_dict()
+
+    tasks: dict[int, dict] = {}
+    for task in list_tasks(hc_home, team):
+        branch = task.get("branch")
+        if not branch:
+            continue
+        for repo_name in task.get("repo", []):
+            ref = snaps.get(repo_name, RefSnapshot(None, {})).branches.get(branch)
+            if ref is not None:
+                tasks.setdefault(task["id"], {})[repo_name] = {"branch": branch, **asdict(ref)}
+    return {"repos": repos, "tasks": tasks}
@@ -214,8 +214,10 @@ def create_task_worktree(
     The worktree lives at ``teams/{team}/worktrees/{repo_name}/T{task_id}/``
     (one per task+repo, shared by all agents working on the task).
 
-    Before creating the branch, fetches the latest from origin (if available)
-    and records the base SHA (current main HEAD) on the task.
+    Records the base SHA (current main HEAD) on the task, then claims a
+    pre-warmed worktree from ``delegate.worktree_pool`` and creates the
+    branch there.  If the pool is empty, falls back to fetching from origin
+    (if available) and a full ``git worktree add``.
 
     Args:
         hc_home: Delegate home directory.
@@ -263,15 +265,14 @@ def create_task_worktree(
 
     wt_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Fetch latest before creating worktree (best effort)
-    subprocess.run(
-        ["git", "fetch", "--all"],
-        cwd=str(real_repo),
-        capture_output=True,
-        check=False,  # Don't fail if fetch fails (offline, no remote)
-    )
+    # Branch already exists (worktree evicted by delegate.diskgc): check it
+    # out again, keeping the recorded base SHA
+    restored = restore_task_worktree(hc_home, team, repo_name, task_id, branch)
+    if restored is not None:
+        return restored
 
     # Record base SHA (current main HEAD) on the task (per-repo dict)
+    sha = None
     try:
         sha = _get_main_head(real_repo)
         from delegate.task import get_task as _gt, update_task as _ut
@@ -283,6 +284,19 @@ def create_task_worktree(
     except Exception as exc:
         logger.warning("Could not record base_sha for %s: %s", task_id, exc)
 
+    # Fast path: take a pre-warmed worktree parked at main and branch there
+    from delegate.worktree_pool import claim
+    if sha and claim(hc_home, team, repo_name, wt_path, branch=branch, start=sha):
+        return wt_path
+
+    # Fetch latest before creating worktree (best effort)
+    subprocess.run(
+        ["git", "fetch", "--all"],
+        cwd=str(real_repo),
+        capture_output=True,
+        check=False,  # Don't fail if fetch fails (offline, no remote)
+    )
+
     # Defensive prune to clean up any stale worktree metadata before creating
     subprocess.run(
         ["git", "worktree", "prune"],
@@ -291,9 +305,9 @@ def create_task_worktree(
         check=False,
     )
 
-    # Create worktree with a new branch off main
+    # Create worktree with a new branch off main (at the recorded base SHA)
     subprocess.run(
-        ["git", "worktree", "add", str(wt_path), "-b", branch, "main"],
+        ["git", "worktree", "add", str(wt_path), "-b", branch, sha or "main"],
         cwd=str(real_repo),
         capture_output=True,
         check=True,
@@ -303,6 +317,46 @@ def create_task_worktree(
     return wt_path
 
 
+def restore_task_worktree(
+    hc_home: Path,
+    team: str,
+    repo_name: str,
+    task_id: int,
+    branch: str,
+) -> Path | None:
+    """Check out an existing task branch again at the task's worktree path.
+
+    Used when the worktree was removed (e.g. evicted by the disk GC) but the
+    task is still open.  Returns ``None`` if *branch* doesn't exist or the
+    repo isn't available; an existing worktree is returned as-is.
+    """
+    real_repo = get_repo_path(hc_home, team, repo_name).resolve()
+    wt_path = task_worktree_dir(hc_home, team, repo_name, task_id)
+    if wt_path.exists():
+        return wt_path
+    if not real_repo.is_dir():
+        return None
+    has_branch = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"],
+        cwd=str(real_repo),
+        capture_output=True,
+        check=False,
+    ).returncode == 0
+    if not has_branch:
+        return None
+
+    wt_path.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "worktree", "prune"], cwd=str(real_repo), capture_output=True, check=False)
+    subprocess.run(
+        ["git", "worktree", "add", str(wt_path), branch],
+        cwd=str(real_repo),
+        capture_output=True,
+        check=True,
+    )
+    logger.info("Restored worktree at %s (branch: %s)", wt_path, branch)
+    return wt_path
+
+
 def remove_task_worktree(
     hc_home: Path,
     team: str,
@@ -0,0 +1,346 @@
+"""HTTP response layer — fast JSON, negotiated compression, Server-Timing.
+
+Provides:
+
+- ``FastJSONResponse`` — JSON response rendered with ``orjson`` when it is
+  installed (``pip install delegate-ai[fast]``), otherwise with the stdlib
+  encoder using the same compact settings as Starlette.  Hot endpoints
+  return it directly, which also skips FastAPI's ``jsonable_encoder`` pass.
+- ``ResponseMiddleware`` — pure-ASGI middleware that compresses
+  single-chunk responses above ``COMPRESS_MIN_BYTES`` with brotli (when
+  installed) or gzip according to ``Accept-Encoding``, and adds a
+  ``Server-Timing`` header splitting handler, serialization and
+  compression time.  Event streams and multi-chunk (streamed) bodies
+  pass through untouched.
+- Conditional GET — ``conditional_json()`` / ``not_modified()`` answer
+  ``If-None-Match`` with ``304`` when a cheap validator (change-feed seq,
+  file mtimes, content hashes) is unchanged, so polled endpoints skip
+  the query and serialisation entirely.  Hit rates per endpoint are
+  kept in memory and exposed via ``etag_stats()``.
+- ``file_response()`` — streams a file from disk (``sendfile`` via the
+  ASGI ``pathsend`` extension where the server offers it, 64 KiB chunks
+  otherwise) with ``Range``/``206``, stat-based ``ETag`` and
+  ``Last-Modified``, so large downloads never sit in memory.
+
+Timings are collected per request in a context variable, so any code on
+the request path can contribute with ``record_timing(name, ms)``.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional: pip install delegate-ai[fast]
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: pip install delegate-ai[fast]
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # good ratio at gzip-like speed for JSON
+
+_COMPRESSIBLE_PREFIXES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+_timings: ContextVar[dict[str, float] | None] = ContextVar("delegate_timings", default=None)
+
+
+def record_timing(name: str, ms: float) -> None:
+    """Add *ms* to the current request's ``Server-Timing`` entry *name*."""
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + ms
+
+
+# ---------------------------------------------------------------------------
+# JSON
+# ---------------------------------------------------------------------------
+
+def dumps(content: Any) -> bytes:
+    """Serialise *content* to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits — let the stdlib handle it
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=jsonable_encoder,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` that renders via ``dumps()`` and records its cost."""
+
+    def render(self, content: Any) -> bytes:
+        t0 = time.perf_counter()
+        body = dumps(content)
+        record_timing("serialize", (time.perf_counter() - t0) * 1000)
+        return body
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET (ETag / If-None-Match)
+# ---------------------------------------------------------------------------
+
+# endpoint name -> {"hits": n, "misses": n}
+_etag_counts: dict[str, dict[str, int]] = {}
+_etag_lock = threading.Lock()
+
+# path -> ((mtime_ns, size), sha256 hex)
+_digest_cache: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def make_etag(*parts: Any, weak: bool = True) -> str:
+    """Build an ETag from validator *parts* (hashed, so any repr-able value works)."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 of *path*, re-hashing only when mtime or size change."""
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(path)
+    cached = _digest_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _digest_cache[key] = (stamp, digest)
+    return digest
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of *etag* against an ``If-None-Match`` header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _count(name: str, outcome: str) -> None:
+    with _etag_lock:
+        counts = _etag_counts.setdefault(name, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+
+def not_modified(request: Request, name: str, etag: str) -> Response | None:
+    """Return a ``304`` if the client already holds *etag*, else ``None``.
+
+    Every call counts as a hit or a miss for endpoint *name*.
+    """
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        _count(name, "hits")
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    _count(name, "misses")
+    return None
+
+
+def conditional_json(
+    request: Request,
+    name: str,
+    etag: str,
+    build: Callable[[], Any],
+) -> Response:
+    """Serve ``build()`` as JSON tagged with *etag*, or ``304`` if unchanged.
+
+    *build* is only called on a miss.  ``Cache-Control: no-cache`` makes
+    browsers revalidate on every poll, so ``fetch()`` callers get the
+    cached body back transparently on a ``304``.
+    """
+    cached = not_modified(request, name, etag)
+    if cached is not None:
+        return cached
+    return FastJSONResponse(build(), headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _unmodified_since(if_modified_since: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def file_response(
+    request: Request,
+    name: str,
+    path: Path,
+    *,
+    media_type: str,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Stream *path* with ``Range`` support, or ``304`` if the client is current.
+
+    Validators come from a single ``stat()``: Starlette's ``ETag`` (mtime
+    and size) and ``Last-Modified``.  ``If-None-Match`` wins over
+    ``If-Modified-Since``.  Hits and misses are counted under *name*.
+    """
+    st = path.stat()
+    response = FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+    etag = response.headers["etag"]
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None and _unmodified_since(request.headers.get("if-modified-since", ""), st.st_mtime):
+        _count(name, "hits")
+        return Response(status_code=304, headers={"ETag": etag, "Last-Modified": response.headers["last-modified"]})
+    cached = not_modified(request, name, etag)
+    return cached if cached is not None else response
+
+
+def etag_stats() -> dict[str, dict[str, float]]:
+    """Per-endpoint conditional-GET counters with a hit rate."""
+    with _etag_lock:
+        snapshot = {name: dict(c) for name, c in _etag_counts.items()}
+    for counts in snapshot.values():
+        total = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / total, 3) if total else 0.0
+    return snapshot
+
+
+def reset_etag_stats() -> None:
+    with _etag_lock:
+        _etag_counts.clear()
+
+
+# ---------------------------------------------------------------------------
+# Compression + Server-Timing middleware
+# ---------------------------------------------------------------------------
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header value."""
+    offered: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name.strip().lower()] = q
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(candidates, key=lambda enc: offered.get(enc, 0.0))
+    return best if offered.get(best, 0.0) > 0 else None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _format_timings(timings: dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+
+
+class ResponseMiddleware:
+    """Compress eligible responses and attach a ``Server-Timing`` header.
+
+    ``Server-Timing`` entries (milliseconds):
+
+    - ``app`` — request received → response headers ready
+    - ``handler`` — ``app`` minus JSON serialisation (query / compute time)
+    - ``serialize`` — ``FastJSONResponse`` rendering
+    - ``compress`` — gzip / brotli
+    """
+
+    def __init__(self, app, *, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        timings: dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        pending_start: dict | None = None
+
+        async def _send(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                timings["app"] = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(raw=message["headers"])
+                if headers.get("content-type", "").startswith("text/event-stream"):
+                    await send(message)  # never buffer or compress streams
+                    return
+                pending_start = message
+                return
+
+            if message["type"] != "http.response.body" and pending_start is not None:
+                # e.g. http.response.pathsend — nothing to compress, just flush
+                start, pending_start = pending_start, None
+                MutableHeaders(raw=start["headers"]).append("server-timing", _format_timings(timings))
+                await send(start)
+            elif message["type"] == "http.response.body" and pending_start is not None:
+                start, pending_start = pending_start, None
+                headers = MutableHeaders(raw=start["headers"])
+                body = message.get("body", b"")
+                if (
+                    encoding
+                    and not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "content-encoding" not in headers
+                    and headers.get("content-type", "").startswith(_COMPRESSIBLE_PREFIXES)
+                    and start["status"] not in (204, 206, 304)
+                ):
+                    t0 = time.perf_counter()
+                    body = _compress(body, encoding)
+                    timings["compress"] = (time.perf_counter() - t0) * 1000
+                    headers["content-encoding"] = encoding
+                    headers["content-length"] = str(len(body))
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["etag"] = "W/" + etag  # bytes differ from the identity body
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": body}
+                if "serialize" in timings:
+                    timings["handler"] = max(0.0, timings["app"] - timings["serialize"])
+                headers.append("server-timing", _format_timings(timings))
+                await send(start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _timings.reset(token)
@@ -24,6 +24,7 @@ import logging
 from datetime import datetime, timezone
 from pathlib import Path
 
+from delegate.changes import publish, record
 from delegate.db import get_connection
 
 logger = logging.getLogger(__name__)
@@ -49,14 +50,16 @@ def create_review(hc_home: Path, team: str, task_id: int, attempt: int, reviewer
             "INSERT INTO reviews (task_id, attempt, reviewer, team) VALUES (?, ?, ?, ?)",
             (task_id, attempt, reviewer, team),
         )
-        conn.commit()
-        row = conn.execute(
+        review = dict(conn.execute(
             "SELECT * FROM reviews WHERE task_id = ? AND attempt = ? AND team = ?",
             (task_id, attempt, team),
-        ).fetchone()
-        return dict(row)
+        ).fetchone())
+        change = record(conn, team, "review", review["id"], "create", review)
+        conn.commit()
     finally:
         conn.close()
+    publish(team, [change])
+    return review
 
 
 def get_reviews(hc_home: Path, team: str, task_id: int) -> list[dict]:
@@ -121,16 +124,20 @@ def set_verdict(
              WHERE task_id = ? AND attempt = ? AND team = ?""",
             (verdict, summary, reviewer, now, task_id, attempt, team),
         )
-        conn.commit()
         row = conn.execute(
             "SELECT * FROM reviews WHERE task_id = ? AND attempt = ? AND team = ?",
             (task_id, attempt, team),
         ).fetchone()
         if row is None:
             raise ValueError(f"No review found for task {task_id} attempt {attempt}")
-        return dict(row)
+        change = record(conn, team, "review", row["id"], "update", {
+            "verdict": verdict, "summary": summary, "reviewer": reviewer, "decided_at": now,
+        })
+        conn.commit()
     finally:
         conn.close()
+    publish(team, [change])
+    return dict(row)
 
 
 # ---------------------------------------------------------------------------
@@ -165,14 +172,16 @@ def add_comment(
             VALUES (?, ?, ?, ?, ?, ?, ?)""",
             (task_id, attempt, file, line, body, author, team),
         )
-        conn.commit()
-        row = conn.execute(
+        comment = dict(conn.execute(
             "SELECT * FROM review_comments WHERE id = ?",
             (cursor.lastrowid,),
-        ).fetchone()
-        return dict(row)
+        ).fetchone())
+        change = record(conn, team, "review_comment", comment["id"], "create", comment)
+        conn.commit()
     finally:
         conn.close()
+    publish(team, [change])
+    return comment
 
 
 def get_comments(
@@ -219,14 +228,17 @@ def update_comment(
             "UPDATE review_comments SET body = ? WHERE id = ? AND team = ?",
             (body, comment_id, team),
         )
-        conn.commit()
         row = conn.execute(
             "SELECT * FROM review_comments WHERE id = ? AND team = ?",
             (comment_id, team),
         ).fetchone()
-        return dict(row) if row else None
+        change = record(conn, team, "review_comment", comment_id, "update", {"body": body}) if row else None
+        conn.commit()
     finally:
         conn.close()
+    if change:
+        publish(team, [change])
+    return dict(row) if row else None
 
 
 def delete_comment(
@@ -244,7 +256,11 @@ def delete_comment(
             "DELETE FROM review_comments WHERE id = ? AND team = ?",
             (comment_id, team),
         )
+        deleted = cursor.rowcount > 0
+        change = record(conn, team, "review_comment", comment_id, "delete") if deleted else None
         conn.commit()
-        return cursor.rowcount > 0
     finally:
         conn.close()
+    if change:
+        publish(team, [change])
+    return deleted
@@ -3,8 +3,9 @@
 The daemon dispatches ``run_turn()`` for each agent that has unread
 messages.  Each call:
 
-1. Reads unread inbox messages and selects a batch of ≤5 messages that
-   share the same ``task_id`` as the first message.
+1. Reads unread inbox messages and selects a batch of messages that
+   share the same ``task_id`` as the first message, sized by an
+   approximate token budget (see ``_select_batch``).
 2. Marks the selected messages as *seen*.
 3. Resolves the task (if any) and all repo worktree paths.
 4. Builds the user message with bidirectional conversation history,
@@ -12,9 +13,15 @@ messages.  Each call:
 5. Calls ``claude_code_sdk.query()`` — streaming tool summaries to the
    in-memory ring buffer, SSE subscribers, and the worklog.
 6. Marks ALL selected messages as *processed*.
-7. Optionally runs a reflection follow-up (1-in-10 coin flip).
+7. Optionally queues a reflection turn (per-agent coin flip) — see below.
 8. Finalises the session: writes worklog, saves context, ends session.
 
+Reflection turns are deferred, low-priority work: ``run_turn()`` only
+*queues* them, and the daemon runs them via ``run_reflection()`` when
+there is spare concurrency and the agent's inbox is empty.  They get
+their own session row (``kind = 'reflection'``) so their cost is
+tracked separately.
+
 All agents are "always online" — there is no PID tracking or subprocess
 management.  The daemon owns the event loop and dispatches turns as
 asyncio tasks with a semaphore for concurrency control.
@@ -36,12 +43,14 @@ from delegate.agent import (
     build_reflection_message,
     _agent_dir,
     _read_state,
-    _next_worklog_number,
     _process_turn_messages,
     TurnTokens,
     SENIORITY_MODELS,
     DEFAULT_SENIORITY,
     MAX_BATCH_SIZE,
+    BATCH_TOKEN_BUDGET,
+    BATCH_DEBOUNCE_SECONDS,
+    BATCH_MAX_WAIT_SECONDS,
 )
 from delegate.mailbox import (
     read_inbox,
@@ -74,12 +83,17 @@ DISALLOWED_TOOLS = [
     "Bash(git worktree:*)",
 ]
 
-# Reflection: 1-in-10 coin flip per turn
+# Reflection: 1-in-10 coin flip per turn (override per agent with
+# ``reflection_probability`` in state.yaml)
 REFLECTION_PROBABILITY = 0.1
 
 # In-memory turn counter per (team, agent) (module-level; single-process safe)
 _turn_counts: dict[tuple[str, str], int] = {}
 
+# Deferred reflection queue: (team, agent) -> queued_at ISO timestamp.
+# In-memory only — a pending reflection lost on restart is harmless.
+_pending_reflections: dict[tuple[str, str], str] = {}
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -119,28 +133,118 @@ def list_ai_agents(hc_home: Path, team: str) -> list[str]:
     return agents
 
 
-def _write_worklog(ad: Path, lines: list[str]) -> None:
-    """Write worklog lines to the agent's logs directory."""
-    log_num = _next_worklog_number(ad)
-    logs_dir = ad / "logs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    log_path = logs_dir / f"{log_num}.worklog.md"
-    log_path.write_text("\n".join(lines))
+def _write_worklog(
+    ad: Path,
+    lines: list[str],
+    *,
+    task_id: int | None = None,
+    retention: dict | None = None,
+) -> None:
+    """Append worklog lines to the agent's segmented worklog store.
+
+    *retention* is the optional ``worklog_retention`` mapping from the
+    agent's state.yaml (``max_segments`` / ``max_age_days``).
+    """
+    from delegate import worklog
+
+    retention = retention or {}
+    worklog.append(
+        ad, "\n".join(lines),
+        task_id=task_id,
+        max_segments=retention.get("max_segments", worklog.RETENTION_MAX_SEGMENTS),
+        max_age_days=retention.get("max_age_days", worklog.RETENTION_MAX_AGE_DAYS),
+    )
 
 
 # ---------------------------------------------------------------------------
-# Message selection — pick ≤K messages with the same task_id
+# Deferred reflection queue
 # ---------------------------------------------------------------------------
 
+def _reflection_probability(state: dict) -> float:
+    """Return the agent's reflection probability from its state.yaml."""
+    value = state.get("reflection_probability", REFLECTION_PROBABILITY)
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return REFLECTION_PROBABILITY
+
+
+def queue_reflection(team: str, agent: str) -> None:
+    """Queue a reflection turn for *agent* (idempotent)."""
+    _pending_reflections.setdefault(
+        (team, agent), datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def pending_reflections(team: str) -> list[str]:
+    """Return agents in *team* with a queued reflection, oldest first."""
+    queued = [(ts, a) for (t, a), ts in _pending_reflections.items() if t == team]
+    return [a for _, a in sorted(queued)]
+
+
+def discard_reflection(team: str, agent: str) -> bool:
+    """Remove a queued reflection.  Returns True if one was queued."""
+    return _pending_reflections.pop((team, agent), None) is not None
+
+
+# ---------------------------------------------------------------------------
+# Message selection — pick a token-bounded batch with the same task_id
+# ---------------------------------------------------------------------------
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token, plus framing)."""
+    return len(text) // 4 + 16
+
+
+def _parse_ts(ts: str) -> datetime:
+    """Parse a stored ISO timestamp; naive values are treated as UTC."""
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _inbox_settled(
+    first_at: str | None,
+    last_at: str | None,
+    *,
+    now: datetime | None = None,
+    debounce: float = BATCH_DEBOUNCE_SECONDS,
+    max_wait: float = BATCH_MAX_WAIT_SECONDS,
+) -> bool:
+    """Return True when an agent's unread messages are ready to dispatch.
+
+    The inbox is *settled* once no new message has arrived for *debounce*
+    seconds, or once the oldest unread message has waited *max_wait*
+    seconds (so a steady trickle cannot starve the agent).  Unparseable
+    timestamps never delay dispatch.
+    """
+    if not first_at or not last_at or debounce <= 0:
+        return True
+    now = now or datetime.now(timezone.utc)
+    try:
+        quiet_for = (now - _parse_ts(last_at)).total_seconds()
+        waited = (now - _parse_ts(first_at)).total_seconds()
+    except ValueError:
+        return True
+    return quiet_for >= debounce or waited >= max_wait
+
+
 def _select_batch(
     inbox: list[Message],
     max_size: int = MAX_BATCH_SIZE,
     *,
     human_name: str | None = None,
+    token_budget: int | None = BATCH_TOKEN_BUDGET,
 ) -> list[Message]:
     """Select up to *max_size* messages from *inbox* that share the
     same ``task_id`` as the first message.
 
+    The batch is also bounded by *token_budget* (estimated from message
+    bodies): messages are taken in order until the next one would exceed
+    the budget.  The first message is always included, however large.
+    Pass ``token_budget=None`` to batch by count alone.
+
     If *human_name* is provided, the first human message (if any)
     determines the grouping anchor instead of the oldest message.
 
@@ -189,7 +293,10 @@ def _select_batch(
         eligible.add(sender)
 
     # --- Collect matching messages from eligible senders ---
+    # Stopping at the first over-budget message (rather than skipping it)
+    # keeps every included sender's messages a contiguous prefix.
     batch: list[Message] = []
+    used_tokens = 0
     for msg in inbox:
         if msg.sender not in eligible:
             continue
@@ -197,7 +304,11 @@ def _select_batch(
             continue
         if target_task_id is None and msg.sender != target_sender:
             continue
+        cost = _estimate_tokens(msg.body)
+        if token_budget is not None and batch and used_tokens + cost > token_budget:
+            break
         batch.append(msg)
+        used_tokens += cost
         if len(batch) >= max_size:
             break
     return batch
@@ -222,7 +333,7 @@ def _resolve_workspace(
     Falls back to the agent's own workspace directory when there is no
     task or no repos.
     """
-    from delegate.repo import get_task_worktree_path
+    from delegate.repo import get_task_worktree_path, restore_task_worktree
 
     ad = _agent_dir(hc_home, team, agent)
     fallback = ad / "workspace"
@@ -240,6 +351,12 @@ def _resolve_workspace(
 
     for i, repo_name in enumerate(repos):
         wt = get_task_worktree_path(hc_home, team, repo_name, task["id"])
+        if not wt.is_dir() and task.get("branch") and task.get("status") not in ("done", "cancelled"):
+            # Evicted by the disk GC while the task sat idle — bring it back
+            try:
+                restore_task_worktree(hc_home, team, repo_name, task["id"], task["branch"])
+            except Exception as exc:
+                logger.warning("Could not restore worktree for %s (%s): %s", task["id"], repo_name, exc)
         if wt.is_dir():
             workspace_paths[repo_name] = wt
             if i == 0:
@@ -266,6 +383,7 @@ class TurnResult:
     cost_usd: float = 0.0
     turns: int = 0
     error: str | None = None
+    reflection_queued: bool = False
 
 
 # ---------------------------------------------------------------------------
@@ -298,6 +416,54 @@ def _extract_tool_summary(block: Any) -> tuple[str, str]:
 # Core: run a single turn for one agent
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# SDK helpers
+# ---------------------------------------------------------------------------
+
+def _resolve_sdk(sdk_query: Any, sdk_options_class: Any) -> tuple[Any, Any]:
+    """Fill in the default ``claude_code_sdk`` query/options if not injected."""
+    if sdk_query is None or sdk_options_class is None:
+        try:
+            from claude_code_sdk import (
+                query as default_query,
+                ClaudeCodeOptions as DefaultOptions,
+            )
+            sdk_query = sdk_query or default_query
+            sdk_options_class = sdk_options_class or DefaultOptions
+        except ImportError:
+            raise RuntimeError(
+                "claude_code_sdk is required for agent turns "
+                "(install with: pip install claude-code-sdk)"
+            )
+    return sdk_query, sdk_options_class
+
+
+def _build_sdk_options(
+    sdk_options_class: Any,
+    hc_home: Path,
+    team: str,
+    agent: str,
+    workspace: Path,
+    *,
+    model: str | None,
+    max_turns: int | None,
+) -> Any:
+    """Build SDK options with a freshly rendered (stable) system prompt."""
+    sys_prompt = build_system_prompt(hc_home, team, agent)
+    kw: dict[str, Any] = dict(
+        system_prompt=sys_prompt,
+        cwd=str(workspace),
+        permission_mode="bypassPermissions",
+        add_dirs=[str(hc_home)],
+        disallowed_tools=DISALLOWED_TOOLS,
+    )
+    if model:
+        kw["model"] = model
+    if max_turns:
+        kw["max_turns"] = max_turns
+    return sdk_options_class(**kw)
+
+
 async def run_turn(
     hc_home: Path,
     team: str,
@@ -308,13 +474,14 @@ async def run_turn(
 ) -> TurnResult:
     """Run a single turn for an agent.
 
-    Selects ≤5 unread messages that share the same ``task_id``, resolves
-    the task and worktree paths, builds a prompt with bidirectional
-    history, executes the turn (streaming tool summaries to the activity
-    ring buffer / SSE), then marks every selected message as processed.
+    Selects a token-bounded batch of unread messages that share the same
+    ``task_id``, resolves the task and worktree paths, builds a prompt
+    with bidirectional history, executes the turn (streaming tool
+    summaries to the activity ring buffer / SSE), then marks every
+    selected message as processed.
 
-    If the 1-in-10 reflection coin-flip lands, a second (reflection)
-    turn is appended within the same session.
+    If the reflection coin-flip lands, a reflection turn is queued for
+    the daemon to run later (see ``run_reflection()``).
 
     Returns a ``TurnResult`` with token usage and cost.
     """
@@ -326,19 +493,7 @@ async def run_turn(
     )
 
     # --- SDK setup ---
-    if sdk_query is None or sdk_options_class is None:
-        try:
-            from claude_code_sdk import (
-                query as default_query,
-                ClaudeCodeOptions as DefaultOptions,
-            )
-            sdk_query = sdk_query or default_query
-            sdk_options_class = sdk_options_class or DefaultOptions
-        except ImportError:
-            raise RuntimeError(
-                "claude_code_sdk is required for agent turns "
-                "(install with: pip install claude-code-sdk)"
-            )
+    sdk_query, sdk_options_class = _resolve_sdk(sdk_query, sdk_options_class)
 
     alog = AgentLogger(agent)
     result = TurnResult(agent=agent, team=team)
@@ -355,7 +510,7 @@ async def run_turn(
     token_budget = state.get("token_budget")
     max_turns = max(1, token_budget // 4000) if token_budget else None
 
-    # --- Message selection: pick ≤5 with same task_id (human first) ---
+    # --- Message selection: token-bounded batch, same task_id (human first) ---
     from delegate.config import get_default_human
     inbox = read_inbox(hc_home, team, agent, unread_only=True)
     batch = _select_batch(inbox, human_name=get_default_human(hc_home))
@@ -418,22 +573,10 @@ async def run_turn(
     )
 
     # --- Build SDK options (stable system prompt) ---
-    def _build_options() -> Any:
-        sys_prompt = build_system_prompt(hc_home, team, agent)
-        kw: dict[str, Any] = dict(
-            system_prompt=sys_prompt,
-            cwd=str(workspace),
-            permission_mode="bypassPermissions",
-            add_dirs=[str(hc_home)],
-            disallowed_tools=DISALLOWED_TOOLS,
-        )
-        if model:
-            kw["model"] = model
-        if max_turns:
-            kw["max_turns"] = max_turns
-        return sdk_options_class(**kw)
-
-    options = _build_options()
+    options = _build_sdk_options(
+        sdk_options_class, hc_home, team, agent, workspace,
+        model=model, max_turns=max_turns,
+    )
 
     # --- Build user message (task context + history + messages) ---
     user_msg = build_user_message(
@@ -498,7 +641,11 @@ async def run_turn(
 
     # Early return if there was an error
     if error_occurred:
-        _write_worklog(ad, worklog_lines)
+        _write_worklog(
+            ad, worklog_lines,
+            task_id=current_task_id,
+            retention=state.get("worklog_retention"),
+        )
         # Broadcast turn_ended even on error
         broadcast_turn_event('turn_ended', agent, team=team, task_id=current_task_id, sender=primary_sender)
         log_caller.reset(_prev_caller)
@@ -543,12 +690,7 @@ async def run_turn(
         except Exception:
             pass
 
-    # --- Optional reflection turn (1-in-10 coin flip) ---
-    total = TurnTokens(
-        input=turn.input, output=turn.output,
-        cache_read=turn.cache_read, cache_write=turn.cache_write,
-        cost_usd=turn.cost_usd,
-    )
+    total = turn
     turn_num = 1
 
     # Increment in-memory turn counter (keyed by team+agent)
@@ -556,44 +698,11 @@ async def run_turn(
     _turn_counts[_tc_key] = _turn_counts.get(_tc_key, 0) + 1
 
     try:
-        if random.random() < REFLECTION_PROBABILITY:
-            turn_num = 2
-            ref_msg = build_reflection_message(hc_home, team, agent)
-            worklog_lines.append(f"\n## Turn 2 (reflection)\n{ref_msg}")
-            alog.turn_start(2, ref_msg)
-
-            ref = TurnTokens()
-            ref_tools: list[str] = []
-
-            try:
-                ref_options = _build_options()  # rebuild for fresh system prompt
-                async for msg in sdk_query(prompt=ref_msg, options=ref_options):
-                    _process_turn_messages(
-                        msg, alog, ref, ref_tools, worklog_lines,
-                        agent=agent, task_label=task_label,
-                    )
-
-                total.input += ref.input
-                total.output += ref.output
-                total.cache_read += ref.cache_read
-                total.cache_write += ref.cache_write
-                total.cost_usd += ref.cost_usd
-
-                alog.turn_end(
-                    2,
-                    tokens_in=ref.input,
-                    tokens_out=ref.output,
-                    cost_usd=ref.cost_usd,
-                    cumulative_tokens_in=total.input,
-                    cumulative_tokens_out=total.output,
-                    cumulative_cost=total.cost_usd,
-                    tool_calls=ref_tools or None,
-                )
-
-                # DO NOT mark mail during reflection — no inbox message was acted on
-                alog.info("Reflection turn completed")
-            except Exception as exc:
-                alog.error("Reflection turn failed: %s", exc)
+        # --- Reflection: queue for idle time instead of running inline ---
+        if random.random() < _reflection_probability(state):
+            queue_reflection(team, agent)
+            result.reflection_queued = True
+            alog.info("Reflection turn queued")
     finally:
         # --- Finalize session (always runs) ---
         result.tokens_in = total.input
@@ -603,20 +712,6 @@ async def run_turn(
         result.cost_usd = total.cost_usd
         result.turns = turn_num
 
-        # Update session with final totals (already called end_session in the first finally block)
-        # This updates the session that was already ended with the final token counts
-        try:
-            update_session_tokens(
-                hc_home, team, session_id,
-                tokens_in=total.input,
-                tokens_out=total.output,
-                cost_usd=total.cost_usd,
-                cache_read_tokens=total.cache_read,
-                cache_write_tokens=total.cache_write,
-            )
-        except Exception:
-            logger.exception("Failed to update session tokens")
-
         # Log session summary
         alog.session_end_log(
             turns=turn_num,
@@ -626,7 +721,11 @@ async def run_turn(
         )
 
         # Write worklog
-        _write_worklog(ad, worklog_lines)
+        _write_worklog(
+            ad, worklog_lines,
+            task_id=current_task_id,
+            retention=state.get("worklog_retention"),
+        )
 
         # Save context.md for next session
         total_tokens = total.input + total.output
@@ -645,6 +744,119 @@ async def run_turn(
     return result
 
 
+async def run_reflection(
+    hc_home: Path,
+    team: str,
+    agent: str,
+    *,
+    sdk_query: Any = None,
+    sdk_options_class: Any = None,
+) -> TurnResult:
+    """Run a queued reflection turn for an agent.
+
+    Dispatched by the daemon only when there is spare concurrency and the
+    agent's inbox is empty.  No inbox messages are read or marked.  The
+    turn gets its own session row with ``kind = 'reflection'`` so its
+    cost is reported separately from regular turns.
+    """
+    from delegate.chat import start_session, end_session
+
+    sdk_query, sdk_options_class = _resolve_sdk(sdk_query, sdk_options_class)
+    discard_reflection(team, agent)
+
+    alog = AgentLogger(agent)
+    result = TurnResult(agent=agent, team=team)
+
+    ad = _agent_dir(hc_home, team, agent)
+    state = _read_state(ad)
+    seniority = state.get("seniority", DEFAULT_SENIORITY)
+    role = state.get("role", "engineer")
+    model = SENIORITY_MODELS.get(seniority, SENIORITY_MODELS[DEFAULT_SENIORITY])
+    token_budget = state.get("token_budget")
+    max_turns = max(1, token_budget // 4000) if token_budget else None
+
+    _prev_caller = log_caller.set(f"{agent}:{role}")
+    session_id: int | None = None
+    worklog_lines: list[str] = []
+    ref = TurnTokens()
+    ref_tools: list[str] = []
+    try:
+        # Setup runs inside the try so a failure still resets log_caller
+        # and closes the session row.
+        workspace, _ = _resolve_workspace(hc_home, team, agent, None)
+
+        session_id = start_session(hc_home, team, agent, kind="reflection")
+        result.session_id = session_id
+        alog.session_start_log(
+            task_id=None, model=model, token_budget=token_budget,
+            workspace=workspace, session_id=session_id,
+        )
+
+        ref_msg = build_reflection_message(hc_home, team, agent)
+        worklog_lines = [
+            f"# Worklog — {agent}",
+            "Task: (none)",
+            f"Session: {datetime.now(timezone.utc).isoformat()}",
+            f"\n## Turn 1 (reflection)\n{ref_msg}",
+        ]
+        alog.turn_start(1, ref_msg)
+
+        options = _build_sdk_options(
+            sdk_options_class, hc_home, team, agent, workspace,
+            model=model, max_turns=max_turns,
+        )
+        async for msg in sdk_query(prompt=ref_msg, options=options):
+            _process_turn_messages(
+                msg, alog, ref, ref_tools, worklog_lines,
+                agent=agent, task_label="",
+            )
+        alog.turn_end(
+            1,
+            tokens_in=ref.input,
+            tokens_out=ref.output,
+            cost_usd=ref.cost_usd,
+            cumulative_tokens_in=ref.input,
+            cumulative_tokens_out=ref.output,
+            cumulative_cost=ref.cost_usd,
+            tool_calls=ref_tools or None,
+        )
+        alog.info("Reflection turn completed")
+    except Exception as exc:
+        alog.error("Reflection turn failed: %s", exc)
+        result.error = str(exc)
+    finally:
+        try:
+            if session_id is not None:
+                end_session(
+                    hc_home, team, session_id,
+                    tokens_in=ref.input, tokens_out=ref.output,
+                    cost_usd=ref.cost_usd,
+                    cache_read_tokens=ref.cache_read,
+                    cache_write_tokens=ref.cache_write,
+                )
+        except Exception:
+            logger.exception("Failed to end reflection session")
+
+        result.tokens_in = ref.input
+        result.tokens_out = ref.output
+        result.cache_read = ref.cache_read
+        result.cache_write = ref.cache_write
+        result.cost_usd = ref.cost_usd
+        result.turns = 1
+
+        alog.session_end_log(
+            turns=1,
+            tokens_in=ref.input,
+            tokens_out=ref.output,
+            cost_usd=ref.cost_usd,
+        )
+        if worklog_lines:
+            _write_worklog(ad, worklog_lines, retention=state.get("worklog_retention"))
+        log_caller.reset(_prev_caller)
+
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Helpers (post-turn)
 # ---------------------------------------------------------------------------
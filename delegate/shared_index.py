@@ -0,0 +1,262 @@
+"""In-memory index of each team's ``shared/`` directory.
+
+``GET /teams/{team}/files`` used to ``iterdir()`` + ``stat()`` a folder per
+request, one request per folder expansion.  Instead, each team's tree is
+scanned once into a ``SharedIndex`` and kept current by a background
+``watchfiles`` thread, so listings — including recursive listings, name
+search, size/mtime sorting and pagination — are answered from memory.
+
+Every batch of filesystem changes is also pushed to SSE clients as a
+``shared_files`` event (see ``activity.broadcast_shared_files``).
+
+If no watcher is running (``watchfiles`` missing, inotify limits, or the
+directory didn't exist yet) every query rescans the tree first — the old
+cost, but never stale.
+
+Usage::
+
+    from delegate.shared_index import get_index
+    page = get_index(hc_home, team).query("specs", recursive=True, q="api")
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from delegate.paths import shared_dir
+
+try:
+    import watchfiles
+except ImportError:  # declared dependency, but keep the browser working without it
+    watchfiles = None
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("name", "size", "mtime")
+WATCH_DEBOUNCE_MS = 200
+WATCH_STEP_MS = 50
+
+_indexes: dict[tuple[str, str], "SharedIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def _entry(rel: str, st: os.stat_result, is_dir: bool) -> dict:
+    return {
+        "name": rel.rsplit("/", 1)[-1],
+        "path": rel,
+        "size": st.st_size,
+        "modified": datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).isoformat(),
+        "mtime": st.st_mtime,
+        "is_dir": is_dir,
+    }
+
+
+def _parent(rel: str) -> str:
+    return rel.rsplit("/", 1)[0] if "/" in rel else ""
+
+
+class SharedIndex:
+    """Path → entry map for one ``shared/`` tree, plus per-directory children."""
+
+    def __init__(self, root: Path, team: str):
+        self.root = root
+        self.team = team
+        self.entries: dict[str, dict] = {}
+        self.children: dict[str, set[str]] = {"": set()}
+        self.watching = False
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # -- building ----------------------------------------------------------
+
+    def _rel(self, path: Path | str) -> str:
+        return Path(path).relative_to(self.root).as_posix()
+
+    def _add(self, rel: str, st: os.stat_result, is_dir: bool) -> None:
+        self.entries[rel] = _entry(rel, st, is_dir)
+        self.children.setdefault(_parent(rel), set()).add(rel)
+        if is_dir:
+            self.children.setdefault(rel, set())
+
+    def _remove(self, rel: str) -> None:
+        if self.entries.pop(rel, None) is None:
+            return
+        self.children.get(_parent(rel), set()).discard(rel)
+        for child in list(self.children.pop(rel, ())):
+            self._remove(child)
+
+    def _scan(self, top: Path) -> None:
+        for dirpath, dirnames, filenames in os.walk(top):
+            for name in dirnames + filenames:
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                self._add(self._rel(full), st, name in dirnames)
+
+    def rebuild(self) -> None:
+        """Rescan the whole tree."""
+        with self._lock:
+            self.entries.clear()
+            self.children = {"": set()}
+            if self.root.is_dir():
+                self._scan(self.root)
+
+    def apply(self, paths: list[Path | str]) -> list[dict]:
+        """Re-stat changed *paths* and update the index.
+
+        Returns ``[{"op": "added"|"modified"|"deleted", "path": rel}]`` for
+        the entries that actually changed.
+        """
+        changes: list[dict] = []
+        with self._lock:
+            for path in paths:
+                try:
+                    rel = self._rel(path)
+                except ValueError:
+                    continue
+                if rel in ("", "."):
+                    continue
+                known = rel in self.entries
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    if known:
+                        self._remove(rel)
+                        changes.append({"op": "deleted", "path": rel})
+                    continue
+                is_dir = Path(path).is_dir()
+                self._add(rel, st, is_dir)
+                if is_dir and not known:
+                    self._scan(Path(path))  # e.g. a directory moved in
+                changes.append({"op": "modified" if known else "added", "path": rel})
+        return changes
+
+    # -- watching ----------------------------------------------------------
+
+    def start_watching(self) -> None:
+        if watchfiles is None or self._thread is not None or self._stop.is_set():
+            return
+        self._thread = threading.Thread(
+            target=self._watch_loop, name=f"shared-index-{self.team}", daemon=True,
+        )
+        self.watching = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.watching = False
+
+    def _watch_loop(self) -> None:
+        from delegate.activity import broadcast_shared_files
+
+        try:
+            for batch in watchfiles.watch(
+                self.root,
+                stop_event=self._stop,
+                debounce=WATCH_DEBOUNCE_MS,
+                step=WATCH_STEP_MS,
+                yield_on_timeout=True,
+                rust_timeout=5_000,
+                raise_interrupt=False,
+            ):
+                if not self.root.is_dir():
+                    break  # tree removed (team deleted)
+                if not batch:
+                    continue
+                changes = self.apply(sorted({p for _, p in batch}))
+                if changes:
+                    broadcast_shared_files(self.team, changes)
+        except Exception:
+            logger.warning("Shared-files watcher for team %s stopped", self.team, exc_info=True)
+        finally:
+            self.watching = False
+            self._thread = None  # let _ensure_fresh start a new watcher
+
+    def _ensure_fresh(self) -> None:
+        # Without a live watcher, rescan so answers are never stale.
+        if self.watching:
+            return
+        if self.root.is_dir():
+            self.start_watching()  # e.g. root appeared after the index was created
+        self.rebuild()
+
+    # -- querying ----------------------------------------------------------
+
+    def has_dir(self, rel: str) -> bool:
+        self._ensure_fresh()
+        return rel == "" or (rel in self.entries and self.entries[rel]["is_dir"])
+
+    def query(
+        self,
+        path: str = "",
+        *,
+        recursive: bool = False,
+        q: str | None = None,
+        sort: str = "name",
+        order: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> dict:
+        """Return ``{"files", "total", "next_offset"}`` for entries under *path*.
+
+        *q* is a case-insensitive substring match on the entry name.
+        ``sort="name"`` lists directories first (ascending by default);
+        ``size``/``mtime`` default to descending.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort '{sort}' (expected one of {', '.join(SORT_KEYS)})")
+        self._ensure_fresh()
+        path = path.strip("/")
+        needle = q.lower() if q else None
+
+        with self._lock:
+            if recursive:
+                prefix = f"{path}/" if path else ""
+                rows = [e for rel, e in self.entries.items() if rel.startswith(prefix)]
+            else:
+                rows = [self.entries[rel] for rel in self.children.get(path, ())]
+        if needle:
+            rows = [e for e in rows if needle in e["name"].lower()]
+
+        if sort == "name":
+            rows.sort(key=lambda e: (not e["is_dir"], e["name"].lower(), e["path"]))
+            reverse = order == "desc"
+        else:
+            rows.sort(key=lambda e: (e[sort], e["path"]))
+            reverse = order != "asc"
+        if reverse:
+            rows.reverse()
+
+        total = len(rows)
+        offset = max(0, offset)
+        end = total if limit is None else offset + max(1, limit)
+        page = [{k: v for k, v in e.items() if k != "mtime"} for e in rows[offset:end]]
+        return {"files": page, "total": total, "next_offset": end if end < total else None}
+
+
+def get_index(hc_home: Path, team: str) -> SharedIndex:
+    """Return the (lazily built and watched) index for *team*'s ``shared/``."""
+    key = (str(hc_home), team)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SharedIndex(shared_dir(hc_home, team), team)
+            _indexes[key] = index
+            if index.root.is_dir():
+                # Watch first so changes made during the scan aren't missed.
+                index.start_watching()
+            index.rebuild()
+    return index
+
+
+def stop_all() -> None:
+    """Stop every watcher thread (server shutdown)."""
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.stop()
+        _indexes.clear()
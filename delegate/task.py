@@ -24,6 +24,7 @@ import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 
+from delegate.changes import publish as _publish_changes, record as _record_change
 from delegate.db import get_connection, task_row_to_dict, _JSON_COLUMNS
 
 _log = logging.getLogger(__name__)
@@ -166,14 +167,16 @@ def create_task(
                 json.dumps(metadata or {}),
             ),
         )
-        conn.commit()
         task_id = cursor.lastrowid
 
         # Read back the full row to return
         row = conn.execute("SELECT * FROM tasks WHERE team = ? AND id = ?", (team, task_id)).fetchone()
         task = task_row_to_dict(row)
+        change = _record_change(conn, team, "task", task_id, "create", task)
+        conn.commit()
     finally:
         conn.close()
+    _publish_changes(team, [change])
 
     from delegate.chat import log_event
     log_event(hc_home, team, f"{format_task_id(task_id)} created \u2014 {title}", task_id=task_id)
@@ -260,11 +263,13 @@ def update_task(hc_home: Path, team: str, task_id: int, **updates) -> dict:
             f"UPDATE tasks SET {', '.join(set_parts)} WHERE team = ? AND id = ?",
             params,
         )
-        conn.commit()
         row = conn.execute("SELECT * FROM tasks WHERE team = ? AND id = ?", (team, task_id)).fetchone()
         task = task_row_to_dict(row)
+        change = _record_change(conn, team, "task", task_id, "update", {k: task[k] for k in updates})
+        conn.commit()
     finally:
         conn.close()
+    _publish_changes(team, [change])
 
     return task
 
@@ -399,18 +404,24 @@ def _validate_review_gate(hc_home: Path, team: str, task: dict) -> None:
         except subprocess.TimeoutExpired:
             pass  # Skip validation if git is slow
 
-        # Check 2: at least one commit after base_sha
+        # Check 2: at least one commit after base_sha (branch tip from the
+        # cached ref snapshot; git log only for branches it doesn't cover)
         base_sha = base_sha_dict.get(repo_name, "")
         if base_sha:
+            from delegate.refs import has_commits_since
+
             try:
-                result = subprocess.run(
-                    ["git", "log", f"{base_sha}..HEAD", "--oneline"],
-                    cwd=wt_str,
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                if result.returncode == 0 and not result.stdout.strip():
+                moved = has_commits_since(wt_str, branch, base_sha) if branch else None
+                if moved is None:
+                    result = subprocess.run(
+                        ["git", "log", f"{base_sha}..HEAD", "--oneline"],
+                        cwd=wt_str,
+                        capture_output=True,
+                        text=True,
+                        timeout=10,
+                    )
+                    moved = result.returncode != 0 or bool(result.stdout.strip())
+                if not moved:
                     raise ValueError(
                         f"Cannot move {format_task_id(task_id)} to in_review: "
                         f"branch for {repo_name} has no commits beyond base. "
@@ -755,10 +766,16 @@ def add_comment(hc_home: Path, team: str, task_id: int, author: str, body: str)
             "INSERT INTO task_comments (task_id, author, body, team) VALUES (?, ?, ?, ?)",
             (task_id, author, body, team),
         )
-        conn.commit()
         comment_id = cursor.lastrowid
+        row = conn.execute(
+            "SELECT id, task_id, author, body, created_at FROM task_comments WHERE id = ?",
+            (comment_id,),
+        ).fetchone()
+        change = _record_change(conn, team, "task_comment", comment_id, "create", dict(row))
+        conn.commit()
     finally:
         conn.close()
+    _publish_changes(team, [change])
 
     from delegate.chat import log_event
     log_event(
@@ -932,7 +949,8 @@ def get_task_commit_diffs(
     """Return per-commit diffs for a task, keyed by repo name.
 
     Returns ``{repo_name: [{"sha": str, "message": str, "diff": str}, ...]}``.
-    Commits are always discovered dynamically via ``git log base_sha..branch``.
+    Commits and their patches are read with a single ``git log -p
+    base_sha..branch`` per repo.
     """
     task = get_task(hc_home, team, task_id)
     repos: list[str] = task.get("repo", [])
@@ -953,13 +971,20 @@ def get_task_commit_diffs(
             results[repo_name] = [{"sha": "", "message": "", "diff": f"(repo '{repo_name}' not found)"}]
             continue
 
-        # Discover commits from git log
+        # One ``git log -p`` for all commits (instead of a diff per commit);
+        # a branch still at its base has none — known from the ref snapshot.
         base_sha = base_sha_dict.get(repo_name, "")
+        if base_sha:
+            from delegate.refs import has_commits_since
+
+            if has_commits_since(git_cwd, branch, base_sha) is False:
+                continue
         range_spec = f"{base_sha}..{branch}" if base_sha else f"main..{branch}"
         try:
             log_result = subprocess.run(
-                ["git", "log", "--reverse", "--pretty=format:%H%n%s", range_spec],
-                capture_output=True, text=True, timeout=30, cwd=git_cwd,
+                ["git", "log", "--reverse", "-p", "--diff-merges=first-parent",
+                 "--format=%x00%H%x00%s%x00", range_spec],
+                capture_output=True, text=True, timeout=60, cwd=git_cwd,
             )
         except (subprocess.TimeoutExpired, FileNotFoundError):
             results[repo_name] = [{"sha": "", "message": "", "diff": f"(failed to discover commits for '{repo_name}')"}]
@@ -968,29 +993,12 @@ def get_task_commit_diffs(
         if log_result.returncode != 0 or not log_result.stdout.strip():
             continue  # No commits found
 
-        lines = log_result.stdout.strip().split("\n")
+        # Output is "\0<sha>\0<subject>\0<patch>" per commit
+        fields = log_result.stdout.split("\0")[1:]
         repo_results: list[dict] = []
-        for i in range(0, len(lines), 2):
-            sha = lines[i]
-            msg = lines[i + 1] if i + 1 < len(lines) else ""
-            diff = ""
-            try:
-                diff_result = subprocess.run(
-                    ["git", "diff", f"{sha}~1..{sha}"],
-                    capture_output=True, text=True, timeout=30, cwd=git_cwd,
-                )
-                if diff_result.returncode == 0:
-                    diff = diff_result.stdout
-                else:
-                    show_result = subprocess.run(
-                        ["git", "show", sha, "--format=", "--diff-merges=first-parent"],
-                        capture_output=True, text=True, timeout=30, cwd=git_cwd,
-                    )
-                    if show_result.returncode == 0:
-                        diff = show_result.stdout
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                diff = "(failed to compute diff)"
-            repo_results.append({"sha": sha, "message": msg, "diff": diff or "(empty diff)"})
+        for i in range(0, len(fields) - 2, 3):
+            sha, msg, patch = fields[i], fields[i + 1], fields[i + 2].lstrip("\n")
+            repo_results.append({"sha": sha, "message": msg, "diff": patch or "(empty diff)"})
         if repo_results:
             results[repo_name] = repo_results
 
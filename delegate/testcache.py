@@ -0,0 +1,182 @@
+"""Test result cache — don't re-run checks on a tree that already passed.
+
+Pre-merge checks can take minutes, and the merge worker re-runs them on
+every attempt — including retries after ``DIRTY_MAIN`` or
+``UPDATE_REF_FAILED``, where the rebased tree is byte-identical to the
+one just tested.  Passing runs are therefore recorded in the
+``test_results`` table keyed by:
+
+- repo name,
+- the tree SHA of the checked-out commit (``HEAD^{tree}``),
+- the exact command (plus a content hash of the script it runs when that
+  lives outside the worktree — ``command_key``),
+- a hash of the environment variables that select the toolchain
+  (``ENV_KEYS``).
+
+A worktree with uncommitted or untracked changes has no tree SHA, so it is
+never cached.  Only passes are stored — a failure may be a flake and is
+always re-run.  Entries expire after the repo's ``test_cache_ttl_hours``
+(``config.get_test_cache_ttl``, ``0`` disables the cache) and can be
+dropped with ``invalidate()`` / ``delegate repo clear-test-cache``.
+
+Used by ``merge._run_pre_merge``, ``qa.run_tests`` and
+``GitMixin.run_tests``; a hit returns output starting with
+``CACHED_PASS``.
+"""
+
+import hashlib
+import logging
+import os
+import shlex
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+from delegate.config import get_test_cache_ttl
+from delegate.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+CACHED_PASS = "Cached pass"
+ENV_KEYS = ("PATH", "VIRTUAL_ENV", "PYTHONPATH", "NODE_ENV", "CI")
+MAX_STORED_OUTPUT = 20_000  # chars of the original run's output kept
+
+
+def env_hash(env: dict[str, str] | None = None) -> str:
+    """Short digest of the toolchain-selecting environment variables."""
+    env = os.environ if env is None else env
+    raw = "\0".join(f"{k}={env.get(k, '')}" for k in ENV_KEYS)
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def tree_sha(wt_dir: Path | str) -> str | None:
+    """Tree SHA of *wt_dir*'s HEAD, or ``None`` if it's dirty or not a repo."""
+    status = subprocess.run(
+        ["git", "status", "--porcelain"], cwd=str(wt_dir), capture_output=True, text=True,
+    )
+    if status.returncode != 0 or status.stdout.strip():
+        return None
+    tree = subprocess.run(
+        ["git", "rev-parse", "HEAD^{tree}"], cwd=str(wt_dir), capture_output=True, text=True,
+    )
+    return tree.stdout.strip() if tree.returncode == 0 else None
+
+
+def command_key(command: str, wt_dir: Path | str) -> str:
+    """*command*, plus a digest of the script it runs if that's outside *wt_dir*.
+
+    An in-repo script is covered by the tree SHA, but a configured
+    ``pre_merge_script`` such as ``/opt/ci/check.sh`` or
+    ``../tools/lint.sh --all`` can be edited without the tree changing.
+    Only a program given as a path counts; commands found on ``PATH``
+    (``pytest``, ``make``) are keyed by name alone.
+    """
+    try:
+        program = shlex.split(command)[0]
+    except (ValueError, IndexError):
+        return command
+    if "/" not in program:
+        return command
+    root = Path(wt_dir).resolve()
+    path = (root / os.path.expanduser(program)).resolve()
+    if path.is_relative_to(root) or not path.is_file():
+        return command
+    try:
+        digest = hashlib.blake2b(path.read_bytes(), digest_size=8).hexdigest()
+    except OSError:
+        return command
+    return f"{command} #{digest}"
+
+
+def lookup(hc_home: Path, team: str, repo: str, tree: str, command: str) -> dict | None:
+    """Return the unexpired cached pass for this key, if any."""
+    ttl = get_test_cache_ttl(hc_home, team, repo)
+    if ttl <= 0:
+        return None
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=ttl)).isoformat()
+    conn = get_connection(hc_home, team)
+    try:
+        row = conn.execute(
+            "SELECT output, duration_s, created_at FROM test_results "
+            "WHERE team = ? AND repo = ? AND tree_sha = ? AND command = ? AND env_hash = ? "
+            "AND passed = 1 AND created_at >= ?",
+            (team, repo, tree, command, env_hash(), cutoff),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {"output": row[0], "duration_s": row[1], "created_at": row[2]}
+
+
+def record(
+    hc_home: Path, team: str, repo: str, tree: str, command: str,
+    *, passed: bool, output: str, duration_s: float,
+) -> None:
+    """Store a run's result (only passes are kept)."""
+    if not passed or get_test_cache_ttl(hc_home, team, repo) <= 0:
+        return
+    conn = get_connection(hc_home, team)
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO test_results "
+            "(team, repo, tree_sha, command, env_hash, passed, output, duration_s, created_at) "
+            "VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)",
+            (team, repo, tree, command, env_hash(), output[-MAX_STORED_OUTPUT:], duration_s,
+             datetime.now(timezone.utc).isoformat()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_cached(
+    hc_home: Path,
+    team: str,
+    repo: str,
+    wt_dir: Path | str,
+    command: str,
+    run: Callable[[], tuple[bool, str]],
+) -> tuple[bool, str, bool]:
+    """Return ``(passed, output, cached)``, calling *run* only on a miss."""
+    tree = tree_sha(wt_dir)
+    if tree is None:
+        ok, output = run()
+        return ok, output, False
+
+    key = command_key(command, wt_dir)
+    hit = lookup(hc_home, team, repo, tree, key)
+    if hit is not None:
+        logger.info("Test cache hit for %s @ %s: %s", repo, tree[:12], command)
+        return True, (
+            f"{CACHED_PASS}: tree {tree[:12]} passed `{command}` at {hit['created_at']} "
+            f"({hit['duration_s']:.0f}s skipped).\n{hit['output']}"
+        ), True
+
+    started = time.monotonic()
+    ok, output = run()
+    record(
+        hc_home, team, repo, tree, key,
+        passed=ok, output=output, duration_s=time.monotonic() - started,
+    )
+    return ok, output, False
+
+
+def invalidate(hc_home: Path, team: str, repo: str | None = None, tree: str | None = None) -> int:
+    """Drop cached results for *team* (optionally one repo / tree); returns the count."""
+    clauses, params = ["team = ?"], [team]
+    if repo is not None:
+        clauses.append("repo = ?")
+        params.append(repo)
+    if tree is not None:
+        clauses.append("tree_sha = ?")
+        params.append(tree)
+    conn = get_connection(hc_home, team)
+    try:
+        cur = conn.execute(f"DELETE FROM test_results WHERE {' AND '.join(clauses)}", params)
+        conn.commit()
+        return cur.rowcount
+    finally:
+        conn.close()
@@ -0,0 +1,408 @@
+"""Change-aware test selection — run the tests a change can affect first.
+
+Pre-merge and QA checks used to run a repo's whole suite for every task,
+even a one-line change to a leaf module.  For repos that opt in (the
+``test_selection`` key in ``repos.yaml``; see
+``config.get_test_selection``) the checks instead:
+
+1. list the files changed since the merge base (``git diff --name-only
+   main...HEAD``);
+2. map them to test files with the repo's Python import graph (built with
+   ``ast`` from the tracked ``*.py`` files: a test is affected if it
+   imports a changed module, directly or transitively) plus the repo's
+   ``map`` globs for files the graph can't see;
+3. run that subset first, failing fast;
+4. run the full suite only every ``full_every`` selective runs, or when the
+   mapping is *uncertain* — a changed file that is neither ignored, mapped
+   nor reached by any test, a deleted module, a ``conftest.py`` or a
+   packaging / test-runner config file.
+
+Every decision is written to the task's activity (``log_event``) with the
+estimated time saved, so the trade-off can be audited.  The cadence
+counter and the last full-suite duration live in the
+``test_selection_state`` table.
+
+Each run still goes through ``testcache.run_cached``, so a subset or full
+run already passed on the same tree is not repeated.
+"""
+
+import ast
+import fnmatch
+import logging
+import posixpath
+import shlex
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from delegate import testcache
+from delegate.config import get_test_selection
+
+logger = logging.getLogger(__name__)
+
+# Changing any of these can affect every test.
+GLOBAL_FILES = (
+    "conftest.py", "pyproject.toml", "setup.py", "setup.cfg", "pytest.ini",
+    "tox.ini", "requirements*.txt", "package.json", "Makefile",
+)
+SOURCE_ROOTS = ("", "src/", "lib/")
+SUBSET_TIMEOUT = 600
+MAX_GRAPHS = 16
+
+Runner = Callable[[], tuple[bool, str]]
+
+# tree sha -> (module file paths, reverse import edges, test files)
+_graphs: dict[str, tuple[dict[str, str], dict[str, set[str]], list[str]]] = {}
+
+
+@dataclass
+class Selection:
+    """Which tests a change needs.
+
+    *targets* are repo-relative test paths to run first; *uncertain* lists
+    the changed files the mapping couldn't account for (any → full suite).
+    """
+
+    changed: list[str]
+    targets: list[str] = field(default_factory=list)
+    uncertain: list[str] = field(default_factory=list)
+    total_tests: int = 0
+
+    @property
+    def full(self) -> bool:
+        return bool(self.uncertain)
+
+
+def _git(args: list[str], cwd: Path | str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, cwd=str(cwd), capture_output=True, text=True, timeout=120)
+
+
+def is_test_file(path: str) -> bool:
+    name = posixpath.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _matches(path: str, patterns) -> bool:
+    name = posixpath.basename(path)
+    return any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def changed_files(wt_dir: Path | str, base: str = "main") -> list[tuple[str, str]] | None:
+    """``[(status, path)]`` changed between the merge base with *base* and the worktree.
+
+    Committed and uncommitted changes both count.  Returns ``None`` if git
+    can't tell (no common history, *base* missing).
+    """
+    fork = _git(["merge-base", base, "HEAD"], wt_dir)
+    if fork.returncode != 0:
+        return None
+    diff = _git(["diff", "--name-status", "--no-renames", fork.stdout.strip()], wt_dir)
+    if diff.returncode != 0:
+        return None
+    changes = []
+    for line in diff.stdout.splitlines():
+        status, _, path = line.partition("\t")
+        if path:
+            changes.append((status[:1], path))
+    untracked = _git(["ls-files", "--others", "--exclude-standard"], wt_dir)
+    changes += [("A", p) for p in untracked.stdout.splitlines() if p]
+    return changes
+
+
+# ---------------------------------------------------------------------------
+# Import graph
+# ---------------------------------------------------------------------------
+
+def _module_names(path: str) -> list[str]:
+    """Dotted names *path* can be imported as (with and without a source root)."""
+    stem = path[:-3]
+    if stem.endswith("/__init__"):
+        stem = stem[: -len("/__init__")]
+    names = []
+    for root in SOURCE_ROOTS:
+        if stem.startswith(root) and stem != root.rstrip("/"):
+            names.append(stem[len(root):].replace("/", "."))
+    return names
+
+
+def _imports(path: str, source: str) -> set[str]:
+    """Dotted names imported by *source* (relative imports resolved)."""
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError):
+        return set()
+    package = posixpath.dirname(path).replace("/", ".")
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split(".") if package else []
+                if node.level - 1 > len(parts):
+                    continue
+                parts = parts[: len(parts) - (node.level - 1)]
+                base = ".".join(parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                names.add(base)
+            # ``from pkg import mod`` may import a submodule
+            names.update(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+    return names
+
+
+def _build_graph(wt_dir: Path) -> tuple[dict[str, str], dict[str, set[str]], list[str]]:
+    listed = _git(["ls-files", "-z", "--", "*.py"], wt_dir)
+    files = [p for p in listed.stdout.split("\0") if p]
+    modules: dict[str, str] = {}
+    for path in files:
+        for name in _module_names(path):
+            modules.setdefault(name, path)
+
+    importers: dict[str, set[str]] = {}
+    for path in files:
+        try:
+            source = (wt_dir / path).read_text(errors="replace")
+        except OSError:
+            continue
+        for name in _imports(path, source):
+            # ``import a.b.c`` also runs a/__init__ and a/b/__init__
+            parts = name.split(".")
+            for i in range(len(parts), 0, -1):
+                target = modules.get(".".join(parts[:i]))
+                if target is not None and target != path:
+                    importers.setdefault(target, set()).add(path)
+    tests = sorted(p for p in files if is_test_file(p))
+    return modules, importers, tests
+
+
+def import_graph(wt_dir: Path | str) -> tuple[dict[str, str], dict[str, set[str]], list[str]]:
+    """``(module name → file, file → importing files, test files)`` for *wt_dir*.
+
+    Cached per tree SHA, so repeated runs on the same commit parse nothing.
+    """
+    wt_dir = Path(wt_dir)
+    tree = testcache.tree_sha(wt_dir)
+    if tree is not None and tree in _graphs:
+        return _graphs[tree]
+    graph = _build_graph(wt_dir)
+    if tree is not None:
+        if len(_graphs) >= MAX_GRAPHS:
+            _graphs.pop(next(iter(_graphs)))
+        _graphs[tree] = graph
+    return graph
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+def select(wt_dir: Path | str, cfg: dict, base: str = "main") -> Selection:
+    """Map the worktree's changes since *base* to test targets."""
+    changes = changed_files(wt_dir, base)
+    if changes is None:
+        return Selection(changed=[], uncertain=[f"<no merge base with {base}>"])
+
+    _modules, importers, tests = import_graph(wt_dir)
+    selection = Selection(changed=[p for _, p in changes], total_tests=len(tests))
+    targets: set[str] = set()
+    for status, path in changes:
+        if _matches(path, GLOBAL_FILES):
+            selection.uncertain.append(path)
+            continue
+        mapped = [t for pattern, ts in cfg["map"].items() if fnmatch.fnmatch(path, pattern) for t in ts]
+        if mapped:
+            targets.update(mapped)
+            continue
+        if _matches(path, cfg["ignore"]):
+            continue
+        if not path.endswith(".py"):
+            selection.uncertain.append(path)
+            continue
+        if status == "D":
+            if not is_test_file(path):
+                selection.uncertain.append(path)  # its importers now fail to import
+            continue
+        if is_test_file(path):
+            targets.add(path)
+            continue
+
+        # Every test that reaches *path* through the import graph
+        reached, seen, stack = set(), {path}, [path]
+        while stack:
+            for importer in importers.get(stack.pop(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    stack.append(importer)
+                    if is_test_file(importer):
+                        reached.add(importer)
+        if reached:
+            targets.update(reached)
+        else:
+            selection.uncertain.append(path)  # no test imports it (or only dynamically)
+
+    selection.targets = sorted(targets)
+    return selection
+
+
+# ---------------------------------------------------------------------------
+# Cadence state
+# ---------------------------------------------------------------------------
+
+def _state(hc_home: Path, team: str, repo: str) -> tuple[int, float | None]:
+    from delegate.db import get_connection
+
+    conn = get_connection(hc_home, team)
+    try:
+        row = conn.execute(
+            "SELECT runs_since_full, full_duration_s FROM test_selection_state "
+            "WHERE team = ? AND repo = ?",
+            (team, repo),
+        ).fetchone()
+    finally:
+        conn.close()
+    return (row[0], row[1]) if row else (0, None)
+
+
+def _note_run(hc_home: Path, team: str, repo: str, *, full_duration_s: float | None) -> None:
+    """Count a selective run, or reset the counter after a full one."""
+    from delegate.db import get_connection
+
+    now = datetime.now(timezone.utc).isoformat()
+    conn = get_connection(hc_home, team)
+    try:
+        if full_duration_s is None:
+            conn.execute(
+                "INSERT INTO test_selection_state (team, repo, runs_since_full, updated_at) "
+                "VALUES (?, ?, 1, ?) ON CONFLICT(team, repo) DO UPDATE SET "
+                "runs_since_full = runs_since_full + 1, updated_at = excluded.updated_at",
+                (team, repo, now),
+            )
+        else:
+            conn.execute(
+                "INSERT INTO test_selection_state (team, repo, runs_since_full, full_duration_s, updated_at) "
+                "VALUES (?, ?, 0, ?, ?) ON CONFLICT(team, repo) DO UPDATE SET "
+                "runs_since_full = 0, full_duration_s = excluded.full_duration_s, "
+                "updated_at = excluded.updated_at",
+                (team, repo, full_duration_s, now),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def _shell_runner(command: str, wt_dir: str) -> Runner:
+    def run() -> tuple[bool, str]:
+        try:
+            result = subprocess.run(
+                command, cwd=wt_dir, capture_output=True, text=True,
+                timeout=SUBSET_TIMEOUT, shell=True,
+            )
+        except subprocess.TimeoutExpired:
+            return False, f"Selected tests timed out after {SUBSET_TIMEOUT} seconds."
+        return result.returncode == 0, result.stdout + result.stderr
+    return run
+
+
+def _timed(hc_home, team, repo, wt_dir, command, run) -> tuple[bool, str, bool, float]:
+    started = time.monotonic()
+    ok, output, cached = testcache.run_cached(hc_home, team, repo, wt_dir, command, run)
+    return ok, output, cached, time.monotonic() - started
+
+
+def run_selected(
+    hc_home: Path,
+    team: str,
+    repo_name: str,
+    wt_dir: Path | str,
+    *,
+    command: str,
+    run: Runner,
+    subset: Callable[[list[str]], tuple[str, Runner]] | None = None,
+    base: str = "main",
+    task_id: int | None = None,
+) -> tuple[bool, str]:
+    """Run the affected tests, then the full suite (*command*/*run*) if due.
+
+    *subset* builds ``(command, runner)`` for a list of test targets; the
+    repo's ``test_selection.command`` template takes precedence.  Without
+    either, or with selection disabled, the full suite runs as before.
+    Returns ``(success, output)``.
+    """
+    cfg = get_test_selection(hc_home, team, repo_name)
+    if cfg is not None and cfg["command"]:
+        template = cfg["command"]
+
+        def subset(targets: list[str]) -> tuple[str, Runner]:
+            filled = template.replace("{targets}", " ".join(shlex.quote(t) for t in targets))
+            return filled, _shell_runner(filled, str(wt_dir))
+
+    if cfg is None or subset is None:
+        ok, output, _cached = testcache.run_cached(hc_home, team, repo_name, wt_dir, command, run)
+        return ok, output
+
+    selection = select(wt_dir, cfg, base)
+    runs_since_full, full_duration = _state(hc_home, team, repo_name)
+    cadence_due = cfg["full_every"] > 0 and runs_since_full + 1 >= cfg["full_every"]
+    summary = (
+        f"{len(selection.changed)} changed file(s) → "
+        f"{len(selection.targets)}/{selection.total_tests} test file(s)"
+    )
+
+    outputs: list[str] = []
+    subset_s = 0.0
+    if selection.targets:
+        subset_cmd, subset_run = subset(selection.targets)
+        ok, output, _cached, subset_s = _timed(hc_home, team, repo_name, wt_dir, subset_cmd, subset_run)
+        if not ok:
+            _log(hc_home, team, task_id, repo_name, f"{summary}; selected tests failed in {subset_s:.0f}s")
+            return False, output
+        outputs.append(f"Selected tests passed ({len(selection.targets)} file(s)):\n{output}")
+
+    if selection.full or cadence_due:
+        why = (
+            f"uncertain mapping for {', '.join(selection.uncertain[:3])}"
+            + (f" and {len(selection.uncertain) - 3} more" if len(selection.uncertain) > 3 else "")
+            if selection.full else f"every {cfg['full_every']} runs"
+        )
+        ok, output, cached, full_s = _timed(hc_home, team, repo_name, wt_dir, command, run)
+        if ok and not cached:
+            _note_run(hc_home, team, repo_name, full_duration_s=full_s)
+        _log(
+            hc_home, team, task_id, repo_name,
+            f"{summary}; full suite {'passed' if ok else 'failed'} ({why})",
+        )
+        return ok, "\n".join(outputs + [output])
+
+    _note_run(hc_home, team, repo_name, full_duration_s=None)
+    saved = f", ~{full_duration - subset_s:.0f}s saved" if full_duration is not None else ""
+    skipped_until = cfg["full_every"] - runs_since_full - 1
+    _log(
+        hc_home, team, task_id, repo_name,
+        f"{summary}; full suite skipped{saved}"
+        + (f" (next full run in {skipped_until})" if cfg["full_every"] > 0 else ""),
+    )
+    if not outputs:
+        outputs.append(f"No tests affected by {len(selection.changed)} changed file(s), skipping tests.")
+    return True, "\n".join(outputs)
+
+
+def _log(hc_home: Path, team: str, task_id: int | None, repo_name: str, detail: str) -> None:
+    logger.info("Test selection (%s): %s", repo_name, detail)
+    if task_id is None:
+        return
+    from delegate.chat import log_event
+    from delegate.task import format_task_id
+
+    log_event(
+        hc_home, team, f"{format_task_id(task_id)} test selection ({repo_name}): {detail}",
+        task_id=task_id,
+    )
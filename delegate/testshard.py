@@ -0,0 +1,234 @@
+"""Sharded pytest runs — spread a test suite over parallel processes.
+
+A single ``pytest`` process keeps one core busy for the whole pre-merge
+check, however many the machine has.  For repos with ``test_shards`` set
+(``config.get_test_shards``) the auto-detected pytest run is instead:
+
+1. collected once (``--collect-only``) to get the list of test files;
+2. split into N shards by file, balanced on the per-file durations
+   recorded from earlier runs (longest-first onto the least-loaded shard;
+   files never timed count as the average);
+3. run as N ``pytest`` subprocesses in the same worktree, their output
+   streamed line by line (tagged ``[shard i/N]``) to a callback — the
+   debug log by default — and combined into the result;
+4. cut short as soon as any shard fails — the others are killed.
+
+Each shard runs with ``--durations=0`` so its per-file timings can be
+parsed back into the ``test_durations`` table for the next balance.
+Sharding is by file, so module- and class-scoped fixtures behave as in an
+unsharded run; session fixtures run once per shard.
+
+If collection fails or finds fewer than two files, the plain command runs
+unsharded.
+"""
+
+import logging
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+COLLECT_TIMEOUT = 120
+DEFAULT_TIMEOUT = 300
+NO_TESTS_COLLECTED = 5  # pytest exit code
+# ``-p no:cacheprovider``: parallel shards must not race on .pytest_cache
+SHARD_FLAGS = ["--durations=0", "--durations-min=0", "-p", "no:cacheprovider"]
+VERBOSITY_FLAGS = {"-q", "-qq", "-v", "-vv", "--quiet", "--verbose"}
+
+_DURATION_LINE = re.compile(r"^\s*([\d.]+)s\s+(?:setup|call|teardown)\s+([^:\s]+)::")
+_COLLECTED_FILE = re.compile(r"^(\S+\.py): \d+$")
+
+
+# ---------------------------------------------------------------------------
+# Collection and balancing
+# ---------------------------------------------------------------------------
+
+def collect(cmd: list[str], wt_dir: Path | str, targets: list[str] | None = None) -> list[str] | None:
+    """Test files *cmd* would run, in collection order (``None`` on error)."""
+    args = [a for a in cmd if a not in VERBOSITY_FLAGS] + ["--collect-only", "-q", *(targets or [])]
+    try:
+        result = subprocess.run(
+            args, cwd=str(wt_dir), capture_output=True, text=True, timeout=COLLECT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode not in (0, NO_TESTS_COLLECTED):
+        return None
+    files: dict[str, None] = {}
+    for line in result.stdout.splitlines():
+        if "::" in line:
+            files[line.split("::", 1)[0]] = None
+        elif m := _COLLECTED_FILE.match(line):  # pytest -qq
+            files[m.group(1)] = None
+    return list(files)
+
+
+def balance(files: list[str], durations: dict[str, float], shards: int) -> list[list[str]]:
+    """Split *files* into at most *shards* groups of similar expected duration."""
+    known = [durations[f] for f in files if f in durations]
+    default = sum(known) / len(known) if known else 1.0
+    groups: list[list[str]] = [[] for _ in range(max(1, min(shards, len(files))))]
+    loads = [0.0] * len(groups)
+    for f in sorted(files, key=lambda f: (-durations.get(f, default), f)):
+        i = loads.index(min(loads))
+        groups[i].append(f)
+        loads[i] += durations.get(f, default)
+    return groups
+
+
+def parse_durations(lines: list[str]) -> dict[str, float]:
+    """Per-file seconds from pytest's ``--durations=0`` report."""
+    totals: dict[str, float] = {}
+    for line in lines:
+        m = _DURATION_LINE.match(line)
+        if m:
+            totals[m.group(2)] = totals.get(m.group(2), 0.0) + float(m.group(1))
+    return totals
+
+
+# ---------------------------------------------------------------------------
+# Stored durations
+# ---------------------------------------------------------------------------
+
+def load_durations(hc_home: Path, team: str, repo: str) -> dict[str, float]:
+    from delegate.db import get_connection
+
+    conn = get_connection(hc_home, team)
+    try:
+        rows = conn.execute(
+            "SELECT path, duration_s FROM test_durations WHERE team = ? AND repo = ?", (team, repo),
+        ).fetchall()
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def record_durations(hc_home: Path, team: str, repo: str, durations: dict[str, float]) -> None:
+    if not durations:
+        return
+    from delegate.db import get_connection
+
+    now = datetime.now(timezone.utc).isoformat()
+    conn = get_connection(hc_home, team)
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO test_durations (team, repo, path, duration_s, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(team, repo, path, secs, now) for path, secs in durations.items()],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def _kill(proc: subprocess.Popen) -> None:
+    if proc.poll() is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)  # pytest plugins may have children
+    except (OSError, AttributeError):
+        proc.kill()
+
+
+def _run_single(cmd: list[str], wt_dir: Path | str, timeout: int) -> tuple[bool, str]:
+    try:
+        result = subprocess.run(cmd, cwd=str(wt_dir), capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return False, f"Tests timed out after {timeout} seconds."
+    return result.returncode == 0, result.stdout + result.stderr
+
+
+def run_sharded(
+    cmd: list[str],
+    wt_dir: Path | str,
+    *,
+    shards: int,
+    targets: list[str] | None = None,
+    hc_home: Path | None = None,
+    team: str | None = None,
+    repo: str | None = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    stream: Callable[[str], None] | None = None,
+) -> tuple[bool, str]:
+    """Run pytest *cmd* (optionally limited to *targets*) in up to *shards* processes.
+
+    With *hc_home*/*team*/*repo* the shards are balanced on, and update,
+    the stored per-file durations.  Returns ``(success, output)``.
+    """
+    files = collect(cmd, wt_dir, targets) if shards > 1 else None
+    if not files or len(files) < 2:
+        return _run_single(cmd + (targets or []), wt_dir, timeout)
+
+    track = hc_home is not None and team is not None and repo is not None
+    groups = balance(files, load_durations(hc_home, team, repo) if track else {}, shards)
+    n = len(groups)
+    logger.info("Running %d test files in %d shards in %s", len(files), n, wt_dir)
+
+    emit = stream or (lambda line: logger.debug("%s", line.rstrip()))
+    lock = threading.Lock()
+    shard_lines: list[list[str]] = [[] for _ in groups]
+
+    def pump(i: int, proc: subprocess.Popen) -> None:
+        for line in proc.stdout:
+            with lock:
+                shard_lines[i].append(line)
+            emit(f"[shard {i + 1}/{n}] {line}")
+
+    procs: list[subprocess.Popen] = []
+    readers: list[threading.Thread] = []
+    try:
+        for i, group in enumerate(groups):
+            proc = subprocess.Popen(
+                cmd + SHARD_FLAGS + group, cwd=str(wt_dir), text=True,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, start_new_session=True,
+            )
+            procs.append(proc)
+            reader = threading.Thread(target=pump, args=(i, proc), daemon=True)
+            reader.start()
+            readers.append(reader)
+
+        failed: int | None = None
+        timed_out = False
+        deadline = time.monotonic() + timeout
+        while failed is None:
+            codes = [p.poll() for p in procs]
+            failed = next(
+                (i for i, c in enumerate(codes) if c not in (None, 0, NO_TESTS_COLLECTED)), None,
+            )
+            if failed is not None or all(c is not None for c in codes):
+                break
+            if time.monotonic() > deadline:
+                timed_out = True
+                break
+            time.sleep(0.05)
+    finally:
+        for proc in procs:
+            _kill(proc)
+        for reader in readers:
+            reader.join(timeout=5)
+        for proc in procs:
+            proc.wait()
+
+    if track:
+        record_durations(hc_home, team, repo, parse_durations([l for ls in shard_lines for l in ls]))
+
+    order = list(range(n)) if failed is None else [failed] + [i for i in range(n) if i != failed]
+    body = "".join(
+        f"--- shard {i + 1}/{n} ({len(groups[i])} files) ---\n" + "".join(shard_lines[i]) for i in order
+    )
+    if timed_out:
+        return False, f"Tests timed out after {timeout} seconds.\n{body}"
+    if failed is not None:
+        return False, f"Shard {failed + 1}/{n} failed; other shards stopped.\n{body}"
+    return True, f"{len(files)} test files passed in {n} shards.\n{body}"
@@ -4,12 +4,22 @@ Provides:
     - File validation (extension + magic bytes)
     - Sanitized filename generation with collision handling
     - Temp-file-then-move pattern for safe writes
+    - Streaming writes (``UploadWriter``) with content-hash deduplication
+
+Stored bytes live once in a content-addressed store under
+``uploads/.objects/<sha[:2]>/<sha>``; each upload's
+``uploads/YYYY/MM/<name>`` is a hardlink to its object (a copy where the
+filesystem can't hardlink), so identical uploads share disk space while
+keeping their own names and URLs.
 """
 
 import hashlib
+import os
 import re
+import shutil
 import time
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
 
 import filetype
@@ -36,6 +46,10 @@ TEXT_EXTENSIONS = {
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
 MAX_TOTAL_SIZE = 200 * 1024 * 1024  # 200 MB
 
+CHUNK_SIZE = 64 * 1024  # bytes read per iteration when streaming
+HEADER_BYTES = 8192     # buffered for magic-byte detection (filetype needs 261)
+OBJECTS_DIR = ".objects"
+
 
 # ---------------------------------------------------------------------------
 # Validation
@@ -221,6 +235,139 @@ def resolve_collision(base_path: Path, filename: str) -> str:
 # Upload Storage
 # ---------------------------------------------------------------------------
 
+class UploadRejected(Exception):
+    """Raised by ``UploadWriter`` when an upload fails validation."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredUpload:
+    filename: str       # final name under YEAR/MONTH/
+    path: Path
+    size: int
+    sha256: str
+    mime_type: str | None
+    deduplicated: bool  # True if the bytes were already in the object store
+
+
+def _object_path(uploads_dir: Path, digest: str) -> Path:
+    return uploads_dir / OBJECTS_DIR / digest[:2] / digest
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class UploadWriter:
+    """Stream one upload to disk chunk by chunk with constant memory.
+
+    Usage::
+
+        writer = UploadWriter(uploads_dir, filename)
+        try:
+            while chunk := await file.read(CHUNK_SIZE):
+                writer.write(chunk)
+            stored = writer.finish(year, month)
+        except UploadRejected:
+            writer.discard()
+            raise
+
+    Type validation (``validate_file``) runs as soon as ``HEADER_BYTES``
+    have arrived, the size limit is checked on every chunk, and the
+    SHA-256 is computed on the fly — a rejected upload stops early
+    without the rest of it being written.
+    """
+
+    def __init__(
+        self,
+        uploads_dir: Path,
+        filename: str,
+        *,
+        max_size: int = MAX_FILE_SIZE,
+        validate: bool = True,
+    ):
+        self.uploads_dir = uploads_dir
+        self.filename = filename
+        self.max_size = max_size
+        self.size = 0
+        self.mime_type: str | None = None
+        self._validated = not validate
+        self._header = b""
+        self._hash = hashlib.sha256()
+        tmp_dir = uploads_dir / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = tmp_dir / f"{uuid.uuid4()}.tmp"
+        self._file = self._tmp_path.open("wb")
+
+    def _validate(self) -> None:
+        is_valid, mime_type, error_msg = validate_file(self._header, self.filename)
+        if not is_valid:
+            raise UploadRejected(error_msg)
+        self.mime_type = mime_type
+        self._validated = True
+        self._header = b""
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadRejected(f"File too large: {self.size} bytes received so far (max {self.max_size})")
+        if not self._validated:
+            self._header += chunk
+            if len(self._header) >= HEADER_BYTES:
+                self._validate()
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self, year: str, month: str) -> StoredUpload:
+        """Validate (if still pending), dedupe and link under ``YEAR/MONTH``."""
+        if not self._validated:
+            self._validate()
+        self._file.close()
+        digest = self._hash.hexdigest()
+
+        try:
+            obj = _object_path(self.uploads_dir, digest)
+            deduplicated = obj.exists()
+            if deduplicated:
+                self._tmp_path.unlink(missing_ok=True)
+            else:
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                self._tmp_path.replace(obj)
+
+            final_dir = self.uploads_dir / year / month
+            final_dir.mkdir(parents=True, exist_ok=True)
+            final_filename = resolve_collision(final_dir, generate_filename(self.filename))
+            final_path = final_dir / final_filename
+            _link_or_copy(obj, final_path)
+        except Exception as e:
+            self._tmp_path.unlink(missing_ok=True)
+            raise IOError(f"Failed to store file: {e}") from e
+
+        return StoredUpload(final_filename, final_path, self.size, digest, self.mime_type, deduplicated)
+
+    def discard(self) -> None:
+        """Drop the partial temp file (safe to call more than once)."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def remove_upload(uploads_dir: Path, stored: StoredUpload) -> None:
+    """Unlink a stored upload, and its object once no other name uses it."""
+    stored.path.unlink(missing_ok=True)
+    obj = _object_path(uploads_dir, stored.sha256)
+    try:
+        if obj.stat().st_nlink == 1:
+            obj.unlink()
+    except OSError:
+        pass
+
+
 def store_upload(
     content: bytes,
     filename: str,
@@ -228,7 +375,9 @@ def store_upload(
     year: str,
     month: str,
 ) -> tuple[str, Path]:
-    """Store uploaded file using temp-file-then-move pattern.
+    """Store an in-memory upload (see ``UploadWriter`` for the streaming path).
+
+    Does not validate — callers check type and size first.
 
     Args:
         content: File content as bytes
@@ -243,38 +392,14 @@ def store_upload(
     Raises:
         IOError: If file write fails
     """
-    # Ensure .tmp directory exists
-    tmp_dir = uploads_dir / ".tmp"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-
-    # Write to temp file
-    tmp_filename = f"{uuid.uuid4()}.tmp"
-    tmp_path = tmp_dir / tmp_filename
-
+    writer = UploadWriter(uploads_dir, filename, max_size=len(content), validate=False)
     try:
-        with tmp_path.open("wb") as f:
-            f.write(content)
-
-        # Generate final filename
-        final_filename = generate_filename(filename)
-
-        # Ensure year/month directory exists
-        final_dir = uploads_dir / year / month
-        final_dir.mkdir(parents=True, exist_ok=True)
-
-        # Resolve collision
-        final_filename = resolve_collision(final_dir, final_filename)
-        final_path = final_dir / final_filename
-
-        # Move from tmp to final location
-        tmp_path.rename(final_path)
-
-        return final_filename, final_path
-
-    except Exception as e:
-        # Clean up temp file on error
-        tmp_path.unlink(missing_ok=True)
+        writer.write(content)
+    except OSError as e:
+        writer.discard()
         raise IOError(f"Failed to store file: {e}") from e
+    stored = writer.finish(year, month)
+    return stored.filename, stored.path
 
 
 # ---------------------------------------------------------------------------
@@ -14,7 +14,7 @@ Provides:
     GET  /teams/{team}/agents/{name}/stats  — agent stats
     GET  /teams/{team}/agents/{name}/inbox  — agent inbox messages
     GET  /teams/{team}/agents/{name}/outbox — agent outbox messages
-    GET  /teams/{team}/agents/{name}/logs   — agent worklog sessions
+    GET  /teams/{team}/agents/{name}/logs   — agent worklog sessions (paginated)
 
     Legacy convenience (aggregate across all teams, /api prefix):
     GET  /api/tasks       — list tasks across all teams
@@ -41,16 +41,18 @@ import subprocess
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
 import yaml
-from fastapi import FastAPI, HTTPException, UploadFile
-from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from fastapi import FastAPI, Header, HTTPException, Request, UploadFile
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from delegate.paths import (
     home as _default_home,
     agents_dir as _agents_dir,
+    members_dir as _members_dir,
     agent_dir as _agent_dir,
     shared_dir as _shared_dir,
     team_dir as _team_dir,
@@ -84,11 +86,14 @@ def _first_team(hc_home: Path) -> str:
 def _agent_last_active_at(agent_dir: Path) -> str | None:
     """Return ISO timestamp of the agent's most recent activity.
 
-    Checks worklog files in the agent's logs/ directory and uses the
-    most recent mtime.  Falls back to the state.yaml mtime if no
-    worklogs exist.  Returns None if nothing is found.
+    Checks the worklog store index and any legacy worklog files in the
+    agent's logs/ directory and uses the most recent mtime.  Falls back
+    to the state.yaml mtime if no worklogs exist.  Returns None if
+    nothing is found.
     """
-    latest_mtime: float | None = None
+    from delegate.worklog import last_modified
+
+    latest_mtime: float | None = last_modified(agent_dir)
 
     logs_dir = agent_dir / "logs"
     if logs_dir.is_dir():
@@ -130,7 +135,13 @@ def _agent_current_task(hc_home: Path, team: str, agent_name: str, ip_tasks: lis
 
 
 def _list_team_agents(hc_home: Path, team: str) -> list[dict]:
-    """List AI agents for a team (excludes human members)."""
+    """List AI agents for a team (excludes human members).
+
+    ``last_active_at`` comes from the agent status registry; only agents
+    that have never run a turn fall back to stat-ing their logs.
+    """
+    from delegate.agent_status import get_statuses
+
     ad = _agents_dir(hc_home, team)
     agents = []
     if not ad.is_dir():
@@ -146,6 +157,8 @@ def _list_team_agents(hc_home: Path, team: str) -> list[dict]:
     except FileNotFoundError:
         ip_tasks = []
 
+    statuses = get_statuses(hc_home, team)
+
     for d in sorted(ad.iterdir()):
         state_file = d / "state.yaml"
         if not d.is_dir() or not state_file.exists():
@@ -158,18 +171,72 @@ def _list_team_agents(hc_home: Path, team: str) -> list[dict]:
         if state.get("role") == "boss":
             continue
         unread = _count_unread(hc_home, team, d.name)
+        status = statuses.get(d.name)
+        last_active = status["last_active_at"] if status else None
         agents.append({
             "name": d.name,
             "role": state.get("role", "engineer"),
             "pid": True,  # All agents are always online — daemon dispatches turns
             "unread_inbox": unread,
             "team": team,
-            "last_active_at": _agent_last_active_at(d),
+            "last_active_at": last_active or _agent_last_active_at(d),
+            "turn_state": status["turn_state"] if status else "idle",
             "current_task": _agent_current_task(hc_home, team, d.name, ip_tasks),
         })
     return agents
 
 
+# ---------------------------------------------------------------------------
+# Cache validators — cheap inputs for ETags on polled endpoints
+# ---------------------------------------------------------------------------
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _roster_fingerprint(hc_home: Path, team: str) -> tuple:
+    """Stat-only fingerprint of everything ``_list_team_agents`` reads from disk.
+
+    Covers the roster directory, each agent's ``state.yaml``, the status
+    registry version and, for agents that never ran a turn, the worklog
+    index and legacy logs dir (``last_active_at``), and the human members
+    directory.  DB-derived fields are covered by the caller's seq.
+    """
+    from delegate.agent_status import version
+    from delegate.worklog import last_modified
+
+    ad = _agents_dir(hc_home, team)
+    parts: list = [_mtime_ns(ad), _mtime_ns(_members_dir(hc_home)), version(hc_home, team)]
+    if ad.is_dir():
+        for d in sorted(ad.iterdir()):
+            parts.append((
+                d.name,
+                _mtime_ns(d / "state.yaml"),
+                last_modified(d),
+                _mtime_ns(d / "logs"),
+            ))
+    return tuple(parts)
+
+
+def _workflow_digests(hc_home: Path, team: str, name: str | None = None) -> list[tuple[str, str]]:
+    """Content hashes of a team's workflow sources (all, or just *name*)."""
+    from delegate.responses import file_digest
+
+    base = _team_dir(hc_home, team) / "workflows"
+    if name is not None:
+        base = base / name
+    if not base.is_dir():
+        return []
+    return sorted(
+        (str(p.relative_to(base)), file_digest(p))
+        for p in base.rglob("*.py")
+        if p.is_file()
+    )
+
+
 # ---------------------------------------------------------------------------
 # Startup greeting — dynamic, time-aware message from manager
 # ---------------------------------------------------------------------------
@@ -340,8 +407,10 @@ def _process_auto_stages(hc_home: Path, team: str) -> None:
     from delegate.workflows.core import Context
     from delegate.chat import log_event
 
+    from delegate.conflicts import order_for_merge
+
     try:
-        all_tasks = list_tasks(hc_home, team)
+        all_tasks = order_for_merge(hc_home, team, list_tasks(hc_home, team))
     except Exception:
         return
 
@@ -418,6 +487,9 @@ async def _daemon_loop(
     interval: float,
     max_concurrent: int,
     default_token_budget: int | None,
+    *,
+    sdk_query: Any = None,
+    sdk_options_class: Any = None,
 ) -> None:
     """Route messages, dispatch agent turns, and process merges (all teams).
 
@@ -425,23 +497,81 @@ async def _daemon_loop(
     the daemon dispatches ``run_turn()`` as asyncio tasks when an agent
     has unread mail.  A semaphore enforces *max_concurrent* across all
     teams.
+
+    Queued reflection turns are low-priority: they are dispatched only
+    when there is spare concurrency and the agent's inbox is empty, and
+    at most ``max(1, max_concurrent // 4)`` run at once.
+
+    *sdk_query* / *sdk_options_class* are passed through to every turn
+    (used by the load-test harness to run against a scripted fake SDK).
     """
-    from delegate.runtime import run_turn, list_ai_agents
+    from delegate.runtime import (
+        run_turn, run_reflection, list_ai_agents, _inbox_settled,
+        pending_reflections, discard_reflection,
+    )
     from delegate.merge import merge_once
+    from delegate.worktree_pool import replenish_due
+    from delegate.conflicts import predict_due
+    from delegate.maintenance import due as maintenance_due, prune_leftovers, optimize
+    from delegate.diskgc import gc_due, remove_deferred
     from delegate.bootstrap import get_member_by_role
-    from delegate.mailbox import send as send_message, agents_with_unread
+    from delegate.mailbox import send as send_message, unread_arrival_window
 
     logger.info("Daemon loop started — polling every %.1fs", interval)
 
     sem = asyncio.Semaphore(max_concurrent)
     merge_sem = asyncio.Semaphore(1)
     in_flight: set[tuple[str, str]] = set()  # (team, agent) pairs currently running
+    reflecting: set[tuple[str, str]] = set()  # subset of in_flight running reflections
+    refilling: set[str] = set()  # teams whose worktree pools are being replenished
+    predicting: set[str] = set()  # teams with a conflict prediction scan running
+    maintaining: set[str] = set()  # teams whose repos are having git maintenance run
+    max_reflecting = max(1, max_concurrent // 4)
+
+    def _spawn_background(team: str, guard: set[str], fn) -> None:
+        """Run ``await fn(team)`` as a tracked task, at most one per team in *guard*."""
+        if team in guard:
+            return
+
+        async def _run() -> None:
+            try:
+                await fn(team)
+            finally:
+                guard.discard(team)
+
+        guard.add(team)
+        task = asyncio.create_task(_run())
+        _active_merge_tasks.add(task)
+        task.add_done_callback(_active_merge_tasks.discard)
+
+    async def _maintain_repos(team: str) -> None:
+        """Git maintenance for due repos, then worktree GC.
 
-    async def _dispatch_turn(team: str, agent: str) -> None:
+        Leftover pruning shares the merge lock; the slow packing steps run
+        outside it.  GC scans unlocked too (rate-limited inside gc_due) and
+        only removing the merge worktrees it found waits for the lock.
+        """
+        for repo_name in await asyncio.to_thread(maintenance_due, hc_home, team):
+            if _shutdown_flag:
+                return
+            async with merge_sem:
+                pruned = await asyncio.to_thread(prune_leftovers, hc_home, team, repo_name)
+            await asyncio.to_thread(optimize, hc_home, team, repo_name, pruned)
+        if _shutdown_flag:
+            return
+        swept = await asyncio.to_thread(gc_due, hc_home, team, defer_merge=True)
+        if swept and swept["deferred"]:
+            async with merge_sem:
+                await asyncio.to_thread(remove_deferred, swept["deferred"])
+
+    async def _dispatch_turn(team: str, agent: str, runner=run_turn) -> None:
         """Dispatch and run one turn, then remove from in_flight."""
         async with sem:
             try:
-                result = await run_turn(hc_home, team, agent)
+                result = await runner(
+                    hc_home, team, agent,
+                    sdk_query=sdk_query, sdk_options_class=sdk_options_class,
+                )
                 if result.error:
                     logger.warning(
                         "Turn error | agent=%s | team=%s | error=%s",
@@ -460,6 +590,7 @@ async def _daemon_loop(
                 logger.exception("Uncaught error in turn | agent=%s | team=%s", agent, team)
             finally:
                 in_flight.discard((team, agent))
+                reflecting.discard((team, agent))
 
     # --- Greeting logic ---
     # Greeting is now handled by the frontend on page load / return-from-away.
@@ -484,11 +615,14 @@ async def _daemon_loop(
                 if _shutdown_flag:
                     break
 
-                # Find agents with unread messages and dispatch turns
+                # Find agents with unread messages and dispatch turns.
+                # Inboxes still receiving a burst are left to settle so
+                # the whole burst is coalesced into one turn.
                 ai_agents = set(list_ai_agents(hc_home, team))
+                unread = unread_arrival_window(hc_home, team)
                 needing_turn = [
-                    a for a in agents_with_unread(hc_home, team)
-                    if a in ai_agents
+                    a for a, (first_at, last_at) in unread.items()
+                    if a in ai_agents and _inbox_settled(first_at, last_at)
                 ]
                 for agent in needing_turn:
                     # Check shutdown flag before dispatching
@@ -502,6 +636,27 @@ async def _daemon_loop(
                         _active_agent_tasks.add(agent_task)
                         agent_task.add_done_callback(_active_agent_tasks.discard)
 
+                # Deferred reflections — only with spare capacity and an
+                # empty inbox, so they never delay real work.
+                for agent in pending_reflections(team):
+                    if _shutdown_flag:
+                        break
+                    if len(in_flight) >= max_concurrent or len(reflecting) >= max_reflecting:
+                        break
+                    if agent not in ai_agents:
+                        discard_reflection(team, agent)
+                        continue
+                    key = (team, agent)
+                    if key in in_flight or agent in unread:
+                        continue
+                    in_flight.add(key)
+                    reflecting.add(key)
+                    agent_task = asyncio.create_task(
+                        _dispatch_turn(team, agent, runner=run_reflection)
+                    )
+                    _active_agent_tasks.add(agent_task)
+                    agent_task.add_done_callback(_active_agent_tasks.discard)
+
                 # Process auto stages (merge, etc.) — serialized, one at a time
                 if not _shutdown_flag:
                     async def _run_auto_stages(t: str) -> None:
@@ -520,6 +675,22 @@ async def _daemon_loop(
                     merge_task = asyncio.create_task(_run_auto_stages(team))
                     _active_merge_tasks.add(merge_task)
                     merge_task.add_done_callback(_active_merge_tasks.discard)
+
+                # Keep pre-warmed worktrees at main's tip (slow git work, off
+                # the turn path; one refill per team at a time)
+                if not _shutdown_flag:
+                    _spawn_background(team, refilling, lambda t: asyncio.to_thread(replenish_due, hc_home, t))
+
+                # Trial-merge in-flight branches to warn about conflicts
+                # early (rate-limited inside predict_due)
+                if not _shutdown_flag:
+                    _spawn_background(team, predicting, lambda t: asyncio.to_thread(predict_due, hc_home, t))
+
+                # Scheduled git maintenance and worktree GC, only while no
+                # agent of the team is mid-turn
+                idle = not any(t == team for t, _ in in_flight)
+                if not _shutdown_flag and idle:
+                    _spawn_background(team, maintaining, _maintain_repos)
         except asyncio.CancelledError:
             logger.info("Daemon loop cancelled")
             raise
@@ -605,6 +776,10 @@ async def _lifespan(app: FastAPI):
 
     yield
 
+    # Stop shared/ index watchers
+    from delegate.shared_index import stop_all as _stop_shared_watchers
+    _stop_shared_watchers()
+
     # Shut down esbuild watcher
     if esbuild_proc is not None:
         logger.info("Stopping esbuild watcher (PID %d)", esbuild_proc.pid)
@@ -698,8 +873,14 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
     for team_name in _list_teams(hc_home):
         ensure_schema(hc_home, team_name)
 
-    app = FastAPI(title="Delegate UI", lifespan=_lifespan)
+    from delegate.changes import cached_head_seq
+    from delegate.db import db_generation
+    from delegate.responses import FastJSONResponse, ResponseMiddleware, conditional_json, make_etag
+
+    app = FastAPI(title="Delegate UI", lifespan=_lifespan, default_response_class=FastJSONResponse)
     app.state.hc_home = hc_home
+    # Compression + Server-Timing (SSE streams pass through untouched)
+    app.add_middleware(ResponseMiddleware)
 
     # --- Config endpoint ---
 
@@ -793,6 +974,10 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         }
 
         if initial_team:
+            from delegate.changes import head_seq
+            # Read the cursor first so deltas racing with the snapshot are
+            # replayed (idempotently) rather than missed.
+            seq = head_seq(hc_home, initial_team)
             agents_data = _list_team_agents(hc_home, initial_team)
 
             # Batch agent stats: single GROUP BY query + single list_tasks
@@ -808,9 +993,10 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
                 "agents": agents_data,
                 "agent_stats": agent_stats,
                 "messages": messages_data,
+                "seq": seq,
             }
 
-        return result
+        return FastJSONResponse(result)
 
     # --- Team endpoints ---
 
@@ -825,14 +1011,21 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
     # --- Workflow endpoints (team-scoped) ---
 
     @app.get("/teams/{team}/workflows")
-    def get_team_workflows(team: str):
+    def get_team_workflows(team: str, request: Request):
         """List all registered workflows for a team."""
         from delegate.workflow import list_workflows as _list_wf
-        return _list_wf(hc_home, team)
+        etag = make_etag("workflows", team, _workflow_digests(hc_home, team))
+        return conditional_json(request, "workflows", etag, lambda: _list_wf(hc_home, team))
 
     @app.get("/teams/{team}/workflows/{name}")
-    def get_team_workflow(team: str, name: str, version: int | None = None):
+    def get_team_workflow(team: str, name: str, request: Request, version: int | None = None):
         """Get a specific workflow definition."""
+        etag = make_etag("workflow", team, name, version, _workflow_digests(hc_home, team, name))
+        return conditional_json(
+            request, "workflow", etag, lambda: _workflow_definition(team, name, version),
+        )
+
+    def _workflow_definition(team: str, name: str, version: int | None) -> dict:
         from delegate.workflow import load_workflow, get_latest_version
 
         if version is None:
@@ -865,8 +1058,23 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
     # --- Task endpoints (team-scoped) ---
 
     @app.get("/teams/{team}/tasks")
-    def get_team_tasks(team: str, status: str | None = None, assignee: str | None = None):
-        return _list_tasks(hc_home, team, status=status, assignee=assignee)
+    def get_team_tasks(team: str, request: Request, status: str | None = None, assignee: str | None = None):
+        etag = make_etag("tasks", team, cached_head_seq(hc_home, team), status, assignee)
+        return conditional_json(
+            request, "tasks", etag,
+            lambda: _list_tasks(hc_home, team, status=status, assignee=assignee),
+        )
+
+    @app.get("/teams/{team}/changes")
+    def get_team_changes(team: str, since: int = 0, limit: int = 500):
+        """Return change-feed deltas after *since* (see delegate/changes.py).
+
+        Clients keep the returned ``seq`` and pass it back as ``since``.
+        ``reset: true`` means the cursor is stale — refetch the board and
+        continue from ``seq``.
+        """
+        from delegate.changes import changes_since
+        return changes_since(hc_home, team, since, limit=max(1, min(limit, 2000)))
 
     @app.get("/teams/{team}/tasks/{task_id}/stats")
     def get_team_task_stats(team: str, task_id: int):
@@ -899,14 +1107,14 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         except FileNotFoundError:
             raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
         diff_dict = _get_task_diff(hc_home, team, task_id)
-        return {
+        return FastJSONResponse({
             "task_id": task_id,
             "branch": task.get("branch", ""),
             "repo": task.get("repo", []),
             "diff": diff_dict,
             "merge_base": task.get("merge_base", {}),
             "merge_tip": task.get("merge_tip", {}),
-        }
+        })
 
     @app.get("/teams/{team}/tasks/{task_id}/merge-preview")
     def get_team_task_merge_preview(team: str, task_id: int):
@@ -922,6 +1130,31 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             "diff": diff_dict,
         }
 
+    @app.get("/teams/{team}/conflicts")
+    def get_team_conflict_predictions(team: str, task_id: int | None = None):
+        """Predicted merge conflicts between in-flight tasks and main.
+
+        ``other_task_id`` 0 means the conflict is against ``main``.
+        """
+        from delegate.conflicts import predictions
+        return {"predictions": predictions(hc_home, team, task_id)}
+
+    @app.get("/teams/{team}/refs")
+    def get_team_refs(team: str):
+        """Tip SHA, ahead/behind ``main`` and last commit time of every task branch.
+
+        Served from per-repo ref snapshots (one ``git for-each-ref`` per
+        repo, cached until refs change) — see ``delegate.refs``.
+        """
+        from delegate.refs import board
+        return board(hc_home, team)
+
+    @app.get("/teams/{team}/disk")
+    def get_team_disk_usage(team: str):
+        """Worktree disk usage per repo, and the team's quota (bytes)."""
+        from delegate.diskgc import usage
+        return usage(hc_home, team)
+
     @app.get("/teams/{team}/tasks/{task_id}/commits")
     def get_team_task_commits(team: str, task_id: int):
         """Return per-commit diffs for a task, keyed by repo."""
@@ -1171,7 +1404,9 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             parts = [p.strip() for p in between.split(",")]
             if len(parts) == 2:
                 between_tuple = (parts[0], parts[1])
-        return _get_messages(hc_home, team, since=since, between=between_tuple, msg_type=type, limit=limit, before_id=before_id)
+        return FastJSONResponse(
+            _get_messages(hc_home, team, since=since, between=between_tuple, msg_type=type, limit=limit, before_id=before_id)
+        )
 
     class SendMessage(BaseModel):
         team: str | None = None
@@ -1308,74 +1543,67 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             400: Invalid file type or file too large
             413: Payload too large
         """
-        from fastapi import UploadFile
         from datetime import datetime, timezone
         from delegate.uploads import (
-            validate_file,
-            validate_file_size,
-            store_upload,
+            CHUNK_SIZE,
             MAX_TOTAL_SIZE,
+            UploadRejected,
+            UploadWriter,
+            remove_upload,
         )
 
-        # Check total size
-        total_size = 0
-        file_data = []
-
-        for file in files:
-            content = await file.read()
-            size = len(content)
-            total_size += size
-
-            if total_size > MAX_TOTAL_SIZE:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"Total upload size exceeds limit: {MAX_TOTAL_SIZE} bytes",
-                )
-
-            file_data.append((file.filename or "unnamed", content, size))
+        # Starlette has already spooled each part (to disk past 1 MB), so
+        # sizes are known up front — reject oversized requests before
+        # copying anything.
+        total_size = sum(file.size or 0 for file in files)
+        if total_size > MAX_TOTAL_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Total upload size exceeds limit: {MAX_TOTAL_SIZE} bytes",
+            )
 
-        # Validate and store each file
+        # Stream, validate and store each file
         uploaded = []
+        stored_files = []
         uploads_dir = _team_dir(hc_home, team) / "uploads"
         now = datetime.now(timezone.utc)
         year = now.strftime("%Y")
         month = now.strftime("%m")
 
-        for filename, content, size in file_data:
-            # Validate size
-            size_valid, size_error = validate_file_size(size)
-            if not size_valid:
-                raise HTTPException(status_code=400, detail=size_error)
-
-            # Validate file type
-            is_valid, mime_type, error_msg = validate_file(content, filename)
-            if not is_valid:
-                raise HTTPException(status_code=400, detail=error_msg)
-
-            # Store file
-            try:
-                final_filename, final_path = store_upload(
-                    content, filename, uploads_dir, year, month
-                )
-            except IOError as e:
-                raise HTTPException(status_code=500, detail=str(e))
-
-            # Build response
-            stored_path = f"uploads/{year}/{month}/{final_filename}"
-            url = f"/teams/{team}/uploads/{year}/{month}/{final_filename}"
-
-            uploaded.append({
-                "original_name": filename,
-                "stored_path": stored_path,
-                "url": url,
-                "size_bytes": size,
-                "mime_type": mime_type,
-            })
+        try:
+            for file in files:
+                filename = file.filename or "unnamed"
+                writer = UploadWriter(uploads_dir, filename)
+                try:
+                    while chunk := await file.read(CHUNK_SIZE):
+                        writer.write(chunk)
+                    stored = writer.finish(year, month)
+                except BaseException:
+                    writer.discard()
+                    raise
+                stored_files.append(stored)
+
+                # Build response
+                uploaded.append({
+                    "original_name": filename,
+                    "stored_path": f"uploads/{year}/{month}/{stored.filename}",
+                    "url": f"/teams/{team}/uploads/{year}/{month}/{stored.filename}",
+                    "size_bytes": stored.size,
+                    "mime_type": stored.mime_type,
+                    "sha256": stored.sha256,
+                })
+        except (UploadRejected, OSError) as e:
+            # All-or-nothing: drop files already stored by this request.
+            for stored in stored_files:
+                remove_upload(uploads_dir, stored)
+            if isinstance(e, UploadRejected):
+                raise HTTPException(status_code=e.status_code, detail=str(e))
+            raise HTTPException(status_code=500, detail=str(e))
 
         return {"uploaded": uploaded}
 
     @app.get("/teams/{team}/uploads/{year}/{month}/{filename}")
-    def serve_file(team: str, year: str, month: str, filename: str):
+    def serve_file(team: str, year: str, month: str, filename: str, request: Request):
         """Serve an uploaded file with appropriate headers.
 
         Args:
@@ -1391,6 +1619,7 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             403: Path traversal attempt
             404: File not found
         """
+        from delegate.responses import file_response
         from delegate.uploads import safe_path
 
         uploads_dir = _team_dir(hc_home, team) / "uploads"
@@ -1420,13 +1649,8 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         else:
             content_disposition = f'attachment; filename="{filename}"'
 
-        # Read file content
-        with file_path.open("rb") as f:
-            content = f.read()
-
-        # Build response with security headers
+        # Security headers (Content-Type, length and validators come from the file response)
         headers = {
-            "Content-Type": mime_type,
             "Content-Disposition": content_disposition,
             "X-Content-Type-Options": "nosniff",
             "Cache-Control": "public, max-age=86400",
@@ -1436,7 +1660,7 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         if filename.lower().endswith(".svg"):
             headers["Content-Security-Policy"] = "default-src 'none'"
 
-        return Response(content=content, headers=headers, media_type=mime_type)
+        return file_response(request, "uploads", file_path, media_type=mime_type, headers=headers)
 
     @app.get("/teams/{team}/cost-summary")
     def get_cost_summary(team: str):
@@ -1637,7 +1861,12 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
     # Prefixed with /api/ to avoid colliding with SPA routes (/tasks, /agents).
 
     @app.get("/api/tasks")
-    def get_tasks(status: str | None = None, assignee: str | None = None, team: str | None = None):
+    def get_tasks(
+        request: Request,
+        status: str | None = None,
+        assignee: str | None = None,
+        team: str | None = None,
+    ):
         """List tasks across all teams or specific team.
 
         Query params:
@@ -1645,13 +1874,21 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             assignee: Filter by assignee
             team: Filter by team name, or "all" for all teams (default: all)
         """
-        all_tasks = []
         # Determine which teams to query
         if team and team != "all":
             teams = [team]
         else:
             teams = _list_teams(hc_home)
 
+        etag = make_etag(
+            "all-tasks", [(t, cached_head_seq(hc_home, t)) for t in teams], status, assignee,
+        )
+        return conditional_json(
+            request, "tasks", etag, lambda: _all_tasks(teams, status, assignee),
+        )
+
+    def _all_tasks(teams: list[str], status: str | None, assignee: str | None) -> list[dict]:
+        all_tasks = []
         for t in teams:
             try:
                 tasks = _list_tasks(hc_home, t, status=status, assignee=assignee)
@@ -1973,7 +2210,7 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
     # --- Agent endpoints (team-scoped) ---
 
     @app.get("/api/agents")
-    def get_all_agents(team: str | None = None):
+    def get_all_agents(request: Request, team: str | None = None):
         """List all agents across all teams or specific team.
 
         Query params:
@@ -1985,27 +2222,60 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         else:
             teams = _list_teams(hc_home)
 
-        all_agents = []
-        for t in teams:
-            all_agents.extend(_list_team_agents(hc_home, t))
-        return all_agents
+        def _build():
+            all_agents = []
+            for t in teams:
+                all_agents.extend(_list_team_agents(hc_home, t))
+            return all_agents
+
+        etag = make_etag("all-agents", [_agents_validator(t) for t in teams])
+        return conditional_json(request, "agents", etag, _build)
+
+    def _agents_validator(team: str) -> tuple:
+        # Unread counts and current tasks come from messages/tasks, both of
+        # which advance the change-feed seq; the rest lives on disk.
+        return (team, cached_head_seq(hc_home, team), _roster_fingerprint(hc_home, team))
 
     @app.get("/teams/{team}/agents")
-    def get_agents(team: str):
+    def get_agents(team: str, request: Request):
         """List AI agents for a team (excludes human members)."""
-        return _list_team_agents(hc_home, team)
+        etag = make_etag("agents", _agents_validator(team))
+        return conditional_json(request, "agents", etag, lambda: _list_team_agents(hc_home, team))
+
+    @app.get("/teams/{team}/agents/status")
+    def get_agents_status(team: str, request: Request):
+        """Turn state, turn task and last activity for every agent, in one call.
+
+        Served from the in-memory status registry (see delegate/agent_status.py).
+        """
+        from delegate.agent_status import get_statuses, version
+
+        def _build():
+            statuses = get_statuses(hc_home, team)
+            return {"agents": [statuses[name] for name in sorted(statuses)]}
+
+        etag = make_etag("agent-status", team, version(hc_home, team))
+        return conditional_json(request, "agent_status", etag, _build)
 
     @app.get("/teams/{team}/agents/stats")
-    def get_all_agent_stats(team: str):
+    def get_all_agent_stats(team: str, request: Request):
         """Get aggregated stats for all agents in a team (single DB query)."""
-        agents_data = _list_team_agents(hc_home, team)
-        agent_names = [a["name"] for a in agents_data]
-        return _get_team_agent_stats(hc_home, team, agent_names)
+        def _build():
+            agents_data = _list_team_agents(hc_home, team)
+            agent_names = [a["name"] for a in agents_data]
+            return _get_team_agent_stats(hc_home, team, agent_names)
+
+        # Session rows aren't in the change feed, so key on any DB write.
+        etag = make_etag("agent-stats", team, db_generation(hc_home), _roster_fingerprint(hc_home, team))
+        return conditional_json(request, "agent_stats", etag, _build)
 
     @app.get("/teams/{team}/agents/{name}/stats")
-    def get_agent_stats(team: str, name: str):
+    def get_agent_stats(team: str, name: str, request: Request):
         """Get aggregated stats for a specific agent."""
-        return _get_agent_stats(hc_home, team, name)
+        etag = make_etag("agent-stats", team, name, db_generation(hc_home))
+        return conditional_json(
+            request, "agent_stats", etag, lambda: _get_agent_stats(hc_home, team, name),
+        )
 
     @app.get("/teams/{team}/agents/{name}/inbox")
     def get_agent_inbox(team: str, name: str):
@@ -2046,29 +2316,20 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         return result[:100]
 
     @app.get("/teams/{team}/agents/{name}/logs")
-    def get_agent_logs(team: str, name: str):
-        """Return the agent's worklog entries."""
+    def get_agent_logs(team: str, name: str, limit: int = 20, before: int | None = None):
+        """Return a page of the agent's worklog entries, newest first.
+
+        Pass the returned ``next_before`` as ``before`` to fetch the next
+        page; it is null once all entries have been returned.
+        """
+        from delegate.worklog import list_entries
+
         ad = _agent_dir(hc_home, team, name)
         if not ad.is_dir():
             raise HTTPException(status_code=404, detail=f"Agent '{name}' not found in team '{team}'")
 
-        logs_dir = ad / "logs"
-        sessions = []
-        if logs_dir.is_dir():
-            worklog_files = [f for f in logs_dir.iterdir() if f.name.endswith(".worklog.md")]
-            worklog_files.sort(key=lambda f: int(f.name.split(".")[0]) if f.name.split(".")[0].isdigit() else 0)
-
-            for f in worklog_files:
-                content = f.read_text()
-                if len(content) > 50 * 1024:
-                    content = content[-(50 * 1024):]
-                sessions.append({
-                    "filename": f.name,
-                    "content": content,
-                })
-
-        sessions.reverse()
-        return {"sessions": sessions}
+        sessions, next_before = list_entries(ad, limit=min(max(limit, 1), 200), before=before)
+        return FastJSONResponse({"sessions": sessions, "next_before": next_before})
 
     @app.get("/teams/{team}/agents/{name}/reflections")
     def get_agent_reflections(team: str, name: str):
@@ -2081,21 +2342,30 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         return {"content": content}
 
     @app.get("/teams/{team}/agents/{name}/journal")
-    def get_agent_journal(team: str, name: str):
-        """Return the agent's task journals (one file per task)."""
+    def get_agent_journal(team: str, name: str, limit: int = 20, before: str | None = None):
+        """Return a page of the agent's task journals (one file per task), newest first.
+
+        Each journal is trimmed to its last 50 KB, read by seeking from the
+        end.  Pass the returned ``next_before`` (a filename) as ``before``
+        to fetch the next page; it is null once all journals are returned.
+        """
+        from delegate.fileread import cached_listing, page_before, read_tail
+
         ad = _agent_dir(hc_home, team, name)
         if not ad.is_dir():
             raise HTTPException(status_code=404, detail=f"Agent '{name}' not found")
         journals_dir = ad / "journals"
+        names, next_before = page_before(
+            cached_listing(journals_dir, ".md"), min(max(limit, 1), 200), before,
+        )
         entries: list[dict] = []
-        if journals_dir.is_dir():
-            for f in sorted(journals_dir.iterdir(), reverse=True):
-                if f.suffix == ".md":
-                    content = f.read_text()
-                    if len(content) > 50 * 1024:
-                        content = content[-(50 * 1024):]
-                    entries.append({"filename": f.name, "content": content})
-        return {"entries": entries}
+        for filename in names:
+            try:
+                content, truncated = read_tail(journals_dir / filename, 50 * 1024)
+            except OSError:
+                continue
+            entries.append({"filename": filename, "content": content, "truncated": truncated})
+        return {"entries": entries, "next_before": next_before}
 
     # --- Agent activity (ring buffer history + SSE stream) ---
 
@@ -2105,30 +2375,67 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         from delegate.activity import get_recent
         return get_recent(team, name, n=n)
 
-    @app.get("/teams/{team}/activity/stream")
-    async def activity_stream(team: str):
-        """SSE endpoint streaming real-time agent activity events.
-
-        The client opens an ``EventSource`` to this URL and receives
-        ``data: {...}`` events for every tool invocation across all
-        agents on this team.  Events from other teams are filtered out.
+    def _sse_response(
+        team: str | None,
+        last_event_id: str | None = None,
+        *,
+        agent: str | None = None,
+        task_id: int | None = None,
+        policy: str = "drop_oldest",
+    ) -> StreamingResponse:
+        """Stream activity events for *team* (``None`` = all teams).
+
+        Events are coalesced per subscriber: everything that arrives
+        within ``activity.COALESCE_WINDOW`` of the first event is sent as
+        one frame (a JSON array when there is more than one event).  Each
+        frame carries the id of its last event; a reconnecting client that
+        sends ``Last-Event-ID`` gets the missed events replayed from the
+        in-memory buffers, or a single ``{"type": "resync"}`` event when
+        the gap is larger than the buffers.
+
+        *agent* / *task_id* narrow the subscription to one agent's or one
+        task's events; *policy* is the backpressure policy applied when
+        the client falls behind (``disconnect`` ends the stream and relies
+        on the client resuming with ``Last-Event-ID``).
         """
-        from delegate.activity import subscribe, unsubscribe
+        from delegate.activity import (
+            BACKPRESSURE_POLICIES, RETRY_MS, SubscriberDisconnected,
+            subscribe, unsubscribe, next_frame, encode_frame, replay_since, topic_for,
+        )
+
+        if policy not in BACKPRESSURE_POLICIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown policy '{policy}'. Must be one of: {', '.join(BACKPRESSURE_POLICIES)}",
+            )
 
-        queue = subscribe(team=team)
+        # Subscribe before reading the buffers so nothing falls between them.
+        queue = subscribe(team=team, agent=agent, task_id=task_id, policy=policy)
+        replay = replay_since(last_event_id, team, topic=topic_for(team, agent, task_id))
 
         async def _generate():
             try:
                 # Send a ping immediately so the client knows the stream is alive
-                yield f"data: {json.dumps({'type': 'connected'})}\n\n"
+                yield f"retry: {RETRY_MS}\n" + encode_frame([{"type": "connected"}])
+                if replay is None:
+                    yield encode_frame([{"type": "resync"}])
+                    replayed = 0
+                else:
+                    for i in range(0, len(replay), 128):
+                        yield encode_frame(replay[i:i + 128])
+                    replayed = replay[-1]["eid"] if replay else 0
                 while True:
                     try:
-                        entry = await asyncio.wait_for(queue.get(), timeout=30.0)
-                        yield f"data: {json.dumps(entry)}\n\n"
+                        events = await next_frame(queue, timeout=30.0)
+                        if replayed:
+                            events = [e for e in events if e.get("eid", replayed + 1) > replayed]
+                            if not events:
+                                continue
+                        yield encode_frame(events)
                     except asyncio.TimeoutError:
                         # Send keepalive comment to prevent proxy/browser timeout
                         yield ": keepalive\n\n"
-            except asyncio.CancelledError:
+            except (asyncio.CancelledError, SubscriberDisconnected):
                 pass
             finally:
                 unsubscribe(queue)
@@ -2143,90 +2450,120 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             },
         )
 
+    @app.get("/teams/{team}/activity/stream")
+    async def activity_stream(
+        team: str,
+        agent: str | None = None,
+        task_id: int | None = None,
+        policy: str = "drop_oldest",
+        last_event_id: str | None = None,
+        last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    ):
+        """SSE endpoint streaming real-time agent activity events.
+
+        The client opens an ``EventSource`` to this URL and receives
+        ``data: ...`` frames for tool invocations across all agents on
+        this team.  Each frame holds one event object or an array of
+        events.  Events from other teams are filtered out.
+
+        ``?agent=`` or ``?task_id=`` follows a single agent or task instead
+        of the whole team; ``?policy=`` picks the backpressure policy.
+
+        Resumes from the ``Last-Event-ID`` header (sent automatically by
+        ``EventSource`` on reconnect) or the ``last_event_id`` query param.
+        """
+        return _sse_response(
+            team, last_event_id_header or last_event_id,
+            agent=agent, task_id=task_id, policy=policy,
+        )
+
     # --- Global SSE stream (all teams) ---
 
     @app.get("/stream")
-    async def global_activity_stream():
+    async def global_activity_stream(
+        policy: str = "drop_oldest",
+        last_event_id: str | None = None,
+        last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    ):
         """SSE endpoint streaming real-time agent activity events across all teams.
 
         The client opens an ``EventSource`` to this URL and receives
-        ``data: {...}`` events for every tool invocation across all teams.
-        Each event includes a ``team`` field for client-side filtering.
+        ``data: ...`` frames (one event object or an array of events) for
+        every tool invocation across all teams.  Each event includes a
+        ``team`` field for client-side filtering.  Supports the same
+        ``Last-Event-ID`` resume and ``?policy=`` as the per-team stream.
         """
-        from delegate.activity import subscribe, unsubscribe
+        return _sse_response(None, last_event_id_header or last_event_id, policy=policy)
 
-        queue = subscribe(team=None)  # No team filter — receive all events
+    @app.get("/stream/stats")
+    def stream_stats():
+        """Per-subscriber SSE delivery counters (delivered, dropped, lag)."""
+        from delegate.activity import subscriber_stats
+        return {"subscribers": subscriber_stats()}
 
-        async def _generate():
-            try:
-                # Send a ping immediately so the client knows the stream is alive
-                yield f"data: {json.dumps({'type': 'connected'})}\n\n"
-                while True:
-                    try:
-                        entry = await asyncio.wait_for(queue.get(), timeout=30.0)
-                        yield f"data: {json.dumps(entry)}\n\n"
-                    except asyncio.TimeoutError:
-                        # Send keepalive comment to prevent proxy/browser timeout
-                        yield ": keepalive\n\n"
-            except asyncio.CancelledError:
-                pass
-            finally:
-                unsubscribe(queue)
-
-        return StreamingResponse(
-            _generate(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-            },
-        )
+    @app.get("/stats/etag")
+    def etag_hit_rates():
+        """Conditional-GET hit/miss counters per endpoint (304s are hits)."""
+        from delegate.responses import etag_stats
+        return {"endpoints": etag_stats()}
 
     # --- Shared files endpoints ---
 
     MAX_FILE_SIZE = 1_000_000  # 1 MB truncation limit
 
     @app.get("/teams/{team}/files")
-    def list_shared_files(team: str, path: str | None = None):
-        """List files in the team's shared/ directory or a subdirectory."""
+    def list_shared_files(
+        team: str,
+        path: str | None = None,
+        recursive: bool = False,
+        q: str | None = None,
+        sort: str = "name",
+        order: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ):
+        """List files in the team's shared/ directory or a subdirectory.
+
+        Answered from the watched in-memory index (delegate/shared_index.py).
+
+        Query params:
+            path: Subdirectory (relative to shared/)
+            recursive: Include everything below *path*, not just children
+            q: Case-insensitive substring filter on names
+            sort: ``name`` (directories first), ``size`` or ``mtime``
+            order: ``asc`` or ``desc`` (default: asc for name, desc otherwise)
+            limit / offset: Pagination; ``next_offset`` is null on the last page
+        """
+        from delegate.shared_index import SORT_KEYS, get_index
+
         base = _shared_dir(hc_home, team)
         if not base.is_dir():
-            return {"files": []}
+            return {"files": [], "total": 0, "next_offset": None}
 
+        rel = ""
         if path:
             target = (base / path).resolve()
             try:
-                target.relative_to(base.resolve())
+                rel = target.relative_to(base.resolve()).as_posix()
             except ValueError:
                 raise HTTPException(
                     status_code=403, detail="Path traversal not allowed"
                 )
-        else:
-            target = base
+            if rel == ".":
+                rel = ""
 
-        if not target.is_dir():
+        if sort not in SORT_KEYS:
+            raise HTTPException(status_code=400, detail=f"Unknown sort '{sort}'")
+
+        index = get_index(hc_home, team)
+        if not index.has_dir(rel):
             raise HTTPException(
                 status_code=404, detail=f"Directory not found: {path}"
             )
-
-        entries = []
-        for item in target.iterdir():
-            stat = item.stat()
-            entries.append(
-                {
-                    "name": item.name,
-                    "path": str(item.relative_to(base)),
-                    "size": stat.st_size,
-                    "modified": datetime.fromtimestamp(
-                        stat.st_mtime, tz=timezone.utc
-                    ).isoformat(),
-                    "is_dir": item.is_dir(),
-                }
-            )
-
-        entries.sort(key=lambda e: (not e["is_dir"], e["name"].lower()))
-        return {"files": entries}
+        return index.query(
+            rel, recursive=recursive, q=q, sort=sort, order=order,
+            limit=min(max(limit, 1), 5000) if limit is not None else None, offset=offset,
+        )
 
     def _resolve_file_path(team: str, path: str) -> Path:
         """Resolve a file path from an API ``path`` parameter.
@@ -2252,15 +2589,26 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         return target
 
     @app.get("/teams/{team}/files/content")
-    def read_file_content(team: str, path: str):
+    def read_file_content(
+        team: str,
+        path: str,
+        start_line: int | None = None,
+        line_count: int = 1000,
+        tail_bytes: int | None = None,
+    ):
         """Read any file and return its content as JSON.
 
         Supports absolute paths and delegate-relative paths (resolved
         from ``hc_home``, e.g. ``teams/self/shared/spec.md``).
 
-        For text files, returns content as string.
+        For text files, returns content as string — the first 1 MB by
+        default (``truncated`` is set when there is more), ``line_count``
+        lines from ``start_line`` (0-based; adds ``start_line``,
+        ``end_line`` and ``total_lines``), or the last ``tail_bytes``.
         For images and binary files, returns base64-encoded data with content_type.
         """
+        from delegate.fileread import read_head, read_head_text, read_lines, read_tail
+
         target = _resolve_file_path(team, path)
 
         stat = target.stat()
@@ -2282,10 +2630,8 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
         display_path = str(target)
 
         if ext in image_types:
-            # Read as binary and encode as base64
-            data = target.read_bytes()
-            if len(data) > MAX_FILE_SIZE:
-                data = data[:MAX_FILE_SIZE]
+            # Read as binary (bounded) and encode as base64
+            data, _ = read_head(target, MAX_FILE_SIZE)
             return {
                 "path": display_path,
                 "name": target.name,
@@ -2311,10 +2657,18 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
                 ).isoformat(),
             }
         else:
-            # Text file - read as text
-            content = target.read_text(errors="replace")
-            if len(content) > MAX_FILE_SIZE:
-                content = content[:MAX_FILE_SIZE]
+            # Text file - bounded read: line range, tail or head
+            extra: dict = {}
+            if start_line is not None:
+                extra = read_lines(target, start_line, line_count)
+                content = extra.pop("content")
+                extra["truncated"] = extra["start_line"] > 0 or extra["end_line"] < extra["total_lines"]
+            elif tail_bytes is not None:
+                content, truncated = read_tail(target, min(max(tail_bytes, 0), MAX_FILE_SIZE))
+                extra["truncated"] = truncated
+            else:
+                content, truncated = read_head_text(target, MAX_FILE_SIZE)
+                extra["truncated"] = truncated
             return {
                 "path": display_path,
                 "name": target.name,
@@ -2325,19 +2679,20 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
                 "modified": datetime.fromtimestamp(
                     stat.st_mtime, tz=timezone.utc
                 ).isoformat(),
+                **extra,
             }
 
     @app.get("/teams/{team}/files/raw")
-    def serve_raw_file(team: str, path: str):
+    def serve_raw_file(team: str, path: str, request: Request):
         """Serve a raw file (absolute or delegate-relative path).
 
         Returns the file with its native content type so browsers can render it directly.
-        Used for opening HTML attachments in new tabs.
+        Used for opening HTML attachments in new tabs.  Streamed from disk
+        with ``Range`` support, so large files don't load into memory.
         """
-        target = _resolve_file_path(team, path)
+        from delegate.responses import file_response
 
-        # Read file content
-        file_bytes = target.read_bytes()
+        target = _resolve_file_path(team, path)
 
         # Determine content type
         ext = target.suffix.lower()
@@ -2348,7 +2703,10 @@ def create_app(hc_home: Path | None = None) -> FastAPI:
             guessed_type, _ = mimetypes.guess_type(target.name)
             media_type = guessed_type or "application/octet-stream"
 
-        return Response(content=file_bytes, media_type=media_type)
+        return file_response(
+            request, "raw_files", target,
+            media_type=media_type, headers={"X-Content-Type-Options": "nosniff"},
+        )
 
     # --- Static files ---
     _static_dir = Path(__file__).parent / "static"
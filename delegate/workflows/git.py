@@ -184,18 +184,24 @@ class GitMixin:
             except subprocess.TimeoutExpired:
                 pass
 
-            # Check commits beyond base_sha
+            # Check commits beyond base_sha (branch tip from the cached ref
+            # snapshot; git log only for branches it doesn't cover)
             base_sha = base_sha_dict.get(r, "")
             if base_sha:
+                from delegate.refs import has_commits_since
+
                 try:
-                    result = subprocess.run(
-                        ["git", "log", "--oneline", f"{base_sha}..HEAD"],
-                        cwd=str(wt_path),
-                        capture_output=True,
-                        text=True,
-                        timeout=10,
-                    )
-                    if result.returncode == 0 and not result.stdout.strip():
+                    moved = has_commits_since(wt_path, branch, base_sha) if branch else None
+                    if moved is None:
+                        result = subprocess.run(
+                            ["git", "log", "--oneline", f"{base_sha}..HEAD"],
+                            cwd=str(wt_path),
+                            capture_output=True,
+                            text=True,
+                            timeout=10,
+                        )
+                        moved = result.returncode != 0 or bool(result.stdout.strip())
+                    if not moved:
                         raise GateError(
                             f"No new commits on branch for {r} since base "
                             f"({base_sha[:8]}). Nothing to review."
@@ -232,15 +238,18 @@ class GitMixin:
         """Run the test suite in the task's worktree.
 
         If *command* is None, uses the configured pre-merge script or
-        auto-detects the test framework.
+        auto-detects the test framework.  A pass already recorded for the
+        same tree and command is reused (see ``delegate.testcache``).
         """
         from delegate.paths import task_worktree_dir
         from delegate.config import get_pre_merge_script
+        from delegate.testcache import CACHED_PASS, run_cached
 
         repos = [repo] if repo else self.task.get("repo", [])
         if not repos:
             return TestResult(passed=True, output="No repos configured", command="")
 
+        cached: list[str] = []
         for r in repos:
             wt_path = task_worktree_dir(self._hc_home, self._team, r, self.task.id)
             if not wt_path.is_dir():
@@ -251,32 +260,33 @@ class GitMixin:
                 cmd = get_pre_merge_script(self._hc_home, self._team, r)
 
             if cmd:
-                try:
-                    result = subprocess.run(
-                        cmd,
-                        shell=True,
-                        cwd=str(wt_path),
-                        capture_output=True,
-                        text=True,
-                        timeout=600,
-                    )
-                    if result.returncode != 0:
-                        return TestResult(
-                            passed=False,
-                            output=result.stdout + "\n" + result.stderr,
-                            command=cmd,
+                def _run() -> tuple[bool, str]:
+                    try:
+                        result = subprocess.run(
+                            cmd,
+                            shell=True,
+                            cwd=str(wt_path),
+                            capture_output=True,
+                            text=True,
+                            timeout=600,
                         )
-                except subprocess.TimeoutExpired:
-                    return TestResult(
-                        passed=False,
-                        output="Test execution timed out (10 min limit)",
-                        command=cmd,
-                    )
+                        return result.returncode == 0, result.stdout + "\n" + result.stderr
+                    except subprocess.TimeoutExpired:
+                        return False, "Test execution timed out (10 min limit)"
+
+                passed, output, hit = run_cached(self._hc_home, self._team, r, wt_path, cmd, _run)
+                if not passed:
+                    return TestResult(passed=False, output=output, command=cmd)
+                if hit:
+                    cached.append(r)
             else:
                 # No test command configured — pass by default
                 return TestResult(passed=True, output="No test command configured", command="")
 
-        return TestResult(passed=True, output="All tests passed", command=command or "")
+        output = "All tests passed"
+        if cached:
+            output += f" ({CACHED_PASS}: {', '.join(cached)})"
+        return TestResult(passed=True, output=output, command=command or "")
 
     def run_script(self, path: str, cwd: str | None = None) -> TestResult:
         """Run an arbitrary script.
@@ -0,0 +1,408 @@
+"""Segmented, append-only worklog store.
+
+Each agent turn produces one worklog entry.  Entries are appended to
+segment files under the agent's ``logs/worklog/`` directory::
+
+    logs/worklog/
+        index.jsonl        one line per entry (see below)
+        000001.seg.gz      sealed (cold) segment, gzip-compressed
+        000002.seg         hot segment — the one being appended to
+
+Every index line is a small JSON object::
+
+    {"turn": 42, "seg": 2, "offset": 18231, "length": 912,
+     "task_id": 7, "ts": "2026-02-11T10:00:00+00:00"}
+
+``offset``/``length`` are byte positions within the *uncompressed*
+segment, so an entry can be read without scanning its neighbours.
+
+- **Appends are O(1)** — the next turn number comes from the last index
+  line (read by seeking from the end), not from globbing the directory.
+- **Segments are sealed** once they exceed ``SEGMENT_MAX_BYTES``; sealed
+  segments are gzip-compressed and subject to retention
+  (``RETENTION_MAX_SEGMENTS`` / ``RETENTION_MAX_AGE_DAYS``).
+- **Reads are paginated** newest-first via ``list_entries()`` using a
+  cursor (the turn number to read *before*).
+
+Legacy ``logs/<N>.worklog.md`` files written by earlier versions are
+left in place and served after the store's own entries.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Seal the hot segment once it grows past this many bytes.
+SEGMENT_MAX_BYTES = 1024 * 1024
+
+# Default retention for sealed segments (applied whenever a segment is sealed).
+RETENTION_MAX_SEGMENTS = 64
+RETENTION_MAX_AGE_DAYS: int | None = None
+
+# Per-entry content cap returned by list_entries() (tail is kept).
+ENTRY_MAX_BYTES = 50 * 1024
+
+_INDEX = "index.jsonl"
+_HOT_SUFFIX = ".seg"
+_COLD_SUFFIX = ".seg.gz"
+_LEGACY_SUFFIX = ".worklog.md"
+
+# Parsed index cache: path -> ((size, mtime_ns), entries)
+_index_cache: dict[Path, tuple[tuple[int, int], list[dict]]] = {}
+
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+
+def worklog_dir(ad: Path) -> Path:
+    """Directory holding the worklog store for agent directory *ad*."""
+    return ad / "logs" / "worklog"
+
+
+def _segment_path(wd: Path, seg: int, *, cold: bool = False) -> Path:
+    return wd / f"{seg:06d}{_COLD_SUFFIX if cold else _HOT_SUFFIX}"
+
+
+def _segment_numbers(wd: Path) -> list[int]:
+    """Return all segment numbers present (hot or cold), ascending."""
+    nums: set[int] = set()
+    if wd.is_dir():
+        for f in wd.iterdir():
+            stem = f.name.split(".", 1)[0]
+            if stem.isdigit() and (f.name.endswith(_HOT_SUFFIX) or f.name.endswith(_COLD_SUFFIX)):
+                nums.add(int(stem))
+    return sorted(nums)
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def _last_index_entry(wd: Path) -> dict | None:
+    """Return the last valid index line without reading the whole index.
+
+    A torn or corrupt tail (e.g. a crash mid-append) is skipped, so turn
+    numbering carries on from the last entry that was fully written.
+    """
+    path = wd / _INDEX
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            block = 4096
+            tail = b""  # partial first line of the blocks read so far
+            while pos > 0:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + tail).split(b"\n")
+                tail = lines.pop(0) if pos > 0 else b""
+                for line in reversed(lines):
+                    entry = _parse_index_line(line)
+                    if entry is not None:
+                        return entry
+    except FileNotFoundError:
+        return None
+    except OSError:
+        logger.warning("Unreadable worklog index in %s", wd)
+    return None
+
+
+def _parse_index_line(line: bytes) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) and "turn" in entry else None
+
+
+def _load_index(wd: Path) -> list[dict]:
+    """Return all index entries (ascending by turn), cached by file stat."""
+    path = wd / _INDEX
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        _index_cache.pop(path, None)
+        return []
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _index_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    entries: list[dict] = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # torn write — skip
+    _index_cache[path] = (key, entries)
+    return entries
+
+
+def _legacy_numbers(ad: Path) -> list[int]:
+    """Turn numbers of legacy ``logs/<N>.worklog.md`` files, ascending."""
+    from delegate.fileread import cached_listing
+
+    nums = []
+    for name in cached_listing(ad / "logs", _LEGACY_SUFFIX):
+        stem = name[: -len(_LEGACY_SUFFIX)]
+        if stem.isdigit():
+            nums.append(int(stem))
+    return sorted(nums)
+
+
+def next_turn_number(ad: Path) -> int:
+    """Return the number the next appended worklog entry will get.
+
+    Reads the last index line; only falls back to scanning legacy
+    ``*.worklog.md`` files when the store is still empty.
+    """
+    last = _last_index_entry(worklog_dir(ad))
+    if last is not None:
+        return int(last["turn"]) + 1
+    return max(_legacy_numbers(ad), default=0) + 1
+
+
+# ---------------------------------------------------------------------------
+# Append / seal / retention
+# ---------------------------------------------------------------------------
+
+def append(
+    ad: Path,
+    content: str,
+    *,
+    task_id: int | None = None,
+    max_segments: int | None = RETENTION_MAX_SEGMENTS,
+    max_age_days: int | None = RETENTION_MAX_AGE_DAYS,
+) -> int:
+    """Append one worklog entry for agent directory *ad*.
+
+    Returns the entry's turn number.  Only one writer per agent is
+    expected (the daemon never runs two turns for the same agent).
+    """
+    wd = worklog_dir(ad)
+    wd.mkdir(parents=True, exist_ok=True)
+
+    turn = next_turn_number(ad)
+    data = content.encode("utf-8")
+
+    segs = _segment_numbers(wd)
+    seg = segs[-1] if segs else 1
+    hot = _segment_path(wd, seg)
+    if not hot.exists() and _segment_path(wd, seg, cold=True).exists():
+        seg += 1
+        hot = _segment_path(wd, seg)
+
+    offset = hot.stat().st_size if hot.exists() else 0
+    if offset and offset + len(data) > SEGMENT_MAX_BYTES:
+        _seal_segment(wd, seg)
+        prune(ad, max_segments=max_segments, max_age_days=max_age_days)
+        seg += 1
+        hot = _segment_path(wd, seg)
+        offset = 0
+
+    with open(hot, "ab") as f:
+        f.write(data)
+
+    entry = {
+        "turn": turn,
+        "seg": seg,
+        "offset": offset,
+        "length": len(data),
+        "task_id": task_id,
+        "ts": datetime.now(timezone.utc).isoformat(),
+    }
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    with open(wd / _INDEX, "ab+") as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":  # torn last line — don't glue onto it
+                line = "\n" + line
+        f.write(line.encode())
+    return turn
+
+
+def _seal_segment(wd: Path, seg: int) -> None:
+    """Compress hot segment *seg* into its cold ``.seg.gz`` form."""
+    hot = _segment_path(wd, seg)
+    cold = _segment_path(wd, seg, cold=True)
+    tmp = cold.with_name(cold.name + ".tmp")
+    try:
+        with open(hot, "rb") as src, gzip.open(tmp, "wb") as dst:
+            while chunk := src.read(64 * 1024):
+                dst.write(chunk)
+        tmp.replace(cold)
+        hot.unlink()
+    except OSError:
+        logger.exception("Failed to seal worklog segment %s", hot)
+        tmp.unlink(missing_ok=True)
+
+
+def prune(
+    ad: Path,
+    *,
+    max_segments: int | None = RETENTION_MAX_SEGMENTS,
+    max_age_days: int | None = RETENTION_MAX_AGE_DAYS,
+) -> int:
+    """Delete sealed segments beyond the retention policy.
+
+    Keeps at most *max_segments* sealed segments and drops sealed
+    segments whose mtime is older than *max_age_days*.  The hot segment
+    and the newest sealed segment are never pruned, so the index always
+    retains the latest turn number.  Index lines for removed segments
+    are dropped.
+
+    Returns the number of segments removed.
+    """
+    wd = worklog_dir(ad)
+    cold = [n for n in _segment_numbers(wd) if _segment_path(wd, n, cold=True).exists()]
+    doomed: set[int] = set()
+    if max_segments is not None and len(cold) > max(1, max_segments):
+        doomed.update(cold[: len(cold) - max(1, max_segments)])
+    if max_age_days is not None:
+        cutoff = time.time() - max_age_days * 86400
+        for n in cold[:-1]:
+            try:
+                if _segment_path(wd, n, cold=True).stat().st_mtime < cutoff:
+                    doomed.add(n)
+            except OSError:
+                continue
+    if not doomed:
+        return 0
+
+    kept = [e for e in _load_index(wd) if e.get("seg") not in doomed]
+    index = wd / _INDEX
+    tmp = index.with_name(index.name + ".tmp")
+    tmp.write_text("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in kept))
+    tmp.replace(index)
+    for n in doomed:
+        _segment_path(wd, n, cold=True).unlink(missing_ok=True)
+    logger.info("Pruned %d worklog segment(s) in %s", len(doomed), wd)
+    return len(doomed)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def _read_span(wd: Path, seg: int, offset: int, length: int) -> bytes:
+    hot = _segment_path(wd, seg)
+    try:
+        with open(hot, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+    except FileNotFoundError:
+        pass
+    with gzip.open(_segment_path(wd, seg, cold=True), "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def read_entry(ad: Path, turn: int) -> str | None:
+    """Return the full content of worklog entry *turn*, or None."""
+    wd = worklog_dir(ad)
+    for e in reversed(_load_index(wd)):
+        if e["turn"] == turn:
+            try:
+                return _read_span(wd, e["seg"], e["offset"], e["length"]).decode("utf-8", errors="replace")
+            except OSError:
+                return None
+    legacy = ad / "logs" / f"{turn}{_LEGACY_SUFFIX}"
+    return legacy.read_text() if legacy.is_file() else None
+
+
+def list_entries(
+    ad: Path,
+    *,
+    limit: int = 20,
+    before: int | None = None,
+    max_bytes: int | None = ENTRY_MAX_BYTES,
+) -> tuple[list[dict], int | None]:
+    """Return a page of worklog entries, newest first.
+
+    *before* is an exclusive turn-number cursor (``None`` = newest).
+    Each entry is ``{"turn", "filename", "task_id", "timestamp",
+    "content"}``; content is trimmed to its last *max_bytes* bytes, and
+    only that tail is read from disk.
+
+    Returns ``(entries, next_cursor)`` — pass *next_cursor* back as
+    *before* to fetch the following page; it is ``None`` when exhausted.
+    Only the entries on the returned page are read from disk.
+    """
+    limit = max(1, limit)
+    wd = worklog_dir(ad)
+    index = _load_index(wd)
+
+    # Collect up to limit+1 candidates (the extra one signals "more").
+    candidates: list[tuple[int, dict | None]] = []
+    for e in reversed(index):
+        if before is not None and e["turn"] >= before:
+            continue
+        candidates.append((e["turn"], e))
+        if len(candidates) > limit:
+            break
+
+    # Legacy files sit below the store's first turn.
+    if len(candidates) <= limit:
+        floor = index[0]["turn"] if index else None
+        for n in reversed(_legacy_numbers(ad)):
+            if (floor is not None and n >= floor) or (before is not None and n >= before):
+                continue
+            candidates.append((n, None))
+            if len(candidates) > limit:
+                break
+
+    next_cursor = candidates[limit - 1][0] if len(candidates) > limit else None
+
+    from delegate.fileread import decode_utf8, read_tail
+
+    page: list[dict] = []
+    for turn, e in candidates[:limit]:
+        try:
+            if e is not None:
+                offset, length = e["offset"], e["length"]
+                cut = max_bytes is not None and length > max_bytes
+                if cut:
+                    offset, length = offset + length - max_bytes, max_bytes
+                content = decode_utf8(_read_span(wd, e["seg"], offset, length), cut_start=cut)
+                ts, task_id = e.get("ts"), e.get("task_id")
+            else:
+                path = ad / "logs" / f"{turn}{_LEGACY_SUFFIX}"
+                if max_bytes is None:
+                    content = path.read_text()
+                else:
+                    content, _ = read_tail(path, max_bytes)
+                ts = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc).isoformat()
+                task_id = None
+        except OSError:
+            continue
+        page.append({
+            "turn": turn,
+            "filename": f"{turn}{_LEGACY_SUFFIX}",
+            "task_id": task_id,
+            "timestamp": ts,
+            "content": content,
+        })
+    return page, next_cursor
+
+
+def last_modified(ad: Path) -> float | None:
+    """Return the mtime of the most recent worklog write, or None."""
+    try:
+        return (worklog_dir(ad) / _INDEX).stat().st_mtime
+    except OSError:
+        return None
@@ -0,0 +1,276 @@
+"""Pre-warmed worktree pool — instant task and merge workspaces.
+
+Creating a task worktree used to run ``git fetch --all``, ``git worktree
+prune`` and a full ``git worktree add … main`` checkout on the first turn
+of every task; on a large repo that is tens of seconds before the agent
+can do anything.  Instead each registered repo keeps a few detached
+worktrees parked at the current ``main`` tip under::
+
+    teams/<team>/worktrees/_pool/<repo>/<uid>/
+
+- ``claim()`` moves a parked worktree to its final path (``git worktree
+  move`` — a rename, no checkout) and creates the branch there.  Starting
+  the branch at the parked commit touches no files; starting it elsewhere
+  (the merge worker's feature branch) only rewrites the files that differ.
+- ``replenish()`` does the slow work in the background: fetch, prune,
+  advance parked worktrees to the new ``main`` tip (an incremental
+  checkout) and top the pool back up.  It is run from the daemon loop at
+  most every ``REPLENISH_INTERVAL`` seconds per repo, or on the next cycle
+  after a claim.
+
+The pool is bounded by the repo's ``worktree_pool`` config (``size`` and
+``max_mb``; see ``config.get_worktree_pool``).  The per-worktree cost is
+estimated from the blob sizes of ``main``'s tree.
+
+Callers always keep their old code path as a fallback: ``claim()``
+returns ``False`` whenever the pool is empty, disabled or a git step
+fails.
+"""
+
+import logging
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from delegate.config import get_repos, get_worktree_pool
+from delegate.paths import team_dir
+
+logger = logging.getLogger(__name__)
+
+REPLENISH_INTERVAL = 60.0  # seconds between background checks per repo
+GIT_TIMEOUT = 600
+
+_lock = threading.Lock()
+_busy: set[str] = set()  # entry paths being created / advanced / claimed
+_replenishing: set[tuple[str, str, str]] = set()
+_last_check: dict[tuple[str, str, str], float] = {}
+# (repo dir, main sha) -> estimated bytes per worktree
+_tree_bytes: dict[tuple[str, str], int] = {}
+
+
+def pool_dir(hc_home: Path, team: str, repo_name: str) -> Path:
+    """Parking directory for *repo_name*'s pre-warmed worktrees."""
+    return team_dir(hc_home, team) / "worktrees" / "_pool" / repo_name
+
+
+def _key(hc_home: Path, team: str, repo_name: str) -> tuple[str, str, str]:
+    return (str(hc_home), team, repo_name)
+
+
+def _git(args: list[str], cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git"] + args, cwd=str(cwd), capture_output=True, text=True, timeout=GIT_TIMEOUT,
+    )
+
+
+def _real_repo(hc_home: Path, team: str, repo_name: str) -> Path | None:
+    from delegate.repo import get_repo_path
+
+    real = get_repo_path(hc_home, team, repo_name).resolve()
+    return real if real.is_dir() else None
+
+
+def _rev(cwd: Path, ref: str) -> str | None:
+    result = _git(["rev-parse", "--verify", "--quiet", ref], cwd)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _entries(pdir: Path) -> list[Path]:
+    if not pdir.is_dir():
+        return []
+    return sorted(p for p in pdir.iterdir() if p.is_dir())
+
+
+def _tree_size(repo: Path, sha: str) -> int:
+    """Bytes of the blobs in *sha*'s tree — what a checkout writes to disk."""
+    key = (str(repo), sha)
+    cached = _tree_bytes.get(key)
+    if cached is not None:
+        return cached
+    result = _git(["ls-tree", "-r", "-l", sha], repo)
+    total = 0
+    for line in result.stdout.splitlines():
+        fields = line.split("\t", 1)[0].split()
+        if len(fields) == 4 and fields[3].isdigit():
+            total += int(fields[3])
+    _tree_bytes[key] = total
+    return total
+
+
+def _target(hc_home: Path, team: str, repo_name: str, repo: Path, sha: str) -> int:
+    """How many worktrees to keep parked, within the size and disk budget."""
+    cfg = get_worktree_pool(hc_home, team, repo_name)
+    if cfg["size"] <= 0:
+        return 0
+    per_worktree = _tree_size(repo, sha)
+    if per_worktree <= 0:
+        return cfg["size"]
+    return max(0, min(cfg["size"], cfg["max_mb"] * 1024 * 1024 // per_worktree))
+
+
+def _discard(repo: Path, path: Path) -> None:
+    _git(["worktree", "remove", "--force", str(path)], repo)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Claiming
+# ---------------------------------------------------------------------------
+
+def claim(
+    hc_home: Path,
+    team: str,
+    repo_name: str,
+    dest: Path,
+    *,
+    branch: str,
+    start: str,
+) -> bool:
+    """Move a parked worktree to *dest* and check out new *branch* at *start*.
+
+    Returns ``False`` (leaving *dest* absent) if no worktree could be used;
+    the caller should then create the worktree the slow way.
+    """
+    pdir = pool_dir(hc_home, team, repo_name)
+    repo = _real_repo(hc_home, team, repo_name)
+    if repo is None or dest.exists():
+        return False
+
+    with _lock:
+        entry = next((e for e in _entries(pdir) if str(e) not in _busy), None)
+        if entry is None:
+            return False
+        _busy.add(str(entry))
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        moved = _git(["worktree", "move", str(entry), str(dest)], repo)
+        if moved.returncode != 0:
+            # e.g. repos with submodules can't be moved — don't keep trying
+            logger.warning("Could not move pooled worktree %s: %s", entry, moved.stderr.strip())
+            _discard(repo, entry)
+            return False
+    finally:
+        with _lock:
+            _busy.discard(str(entry))
+            _last_check.pop(_key(hc_home, team, repo_name), None)  # refill next cycle
+
+    checkout = _git(["checkout", "-q", "-b", branch, start], dest)
+    if checkout.returncode != 0:
+        logger.warning("Pooled worktree checkout of %s failed: %s", branch, checkout.stderr.strip())
+        _discard(repo, dest)
+        return False
+
+    logger.info("Claimed pooled worktree for %s at %s", branch, dest)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Background replenishment
+# ---------------------------------------------------------------------------
+
+def replenish(hc_home: Path, team: str, repo_name: str, *, fetch: bool = True) -> dict:
+    """Bring *repo_name*'s pool to its target size at the current ``main`` tip.
+
+    Returns counts: ``{"ready", "created", "advanced", "removed"}``.
+    """
+    stats = {"ready": 0, "created": 0, "advanced": 0, "removed": 0}
+    key = _key(hc_home, team, repo_name)
+    repo = _real_repo(hc_home, team, repo_name)
+    if repo is None:
+        return stats
+    with _lock:
+        if key in _replenishing:
+            return stats
+        _replenishing.add(key)
+    try:
+        if fetch:
+            _git(["fetch", "--all", "--quiet"], repo)  # best effort (offline, no remote)
+        _git(["worktree", "prune"], repo)
+        sha = _rev(repo, "main")
+        if sha is None:
+            return stats
+        target = _target(hc_home, team, repo_name, repo, sha)
+        pdir = pool_dir(hc_home, team, repo_name)
+
+        with _lock:
+            parked = [e for e in _entries(pdir) if str(e) not in _busy]
+            _busy.update(str(e) for e in parked)
+        try:
+            for entry in parked:
+                head = _rev(entry, "HEAD") if stats["ready"] < target else None
+                if head is None:
+                    _discard(repo, entry)  # over budget, or left half-made by a crash
+                    stats["removed"] += 1
+                    continue
+                if head != sha:
+                    advanced = _git(["checkout", "-q", "--detach", "--force", sha], entry)
+                    if advanced.returncode != 0:
+                        _discard(repo, entry)
+                        stats["removed"] += 1
+                        continue
+                    stats["advanced"] += 1
+                stats["ready"] += 1
+        finally:
+            with _lock:
+                _busy.difference_update(str(e) for e in parked)
+
+        while stats["ready"] < target:
+            entry = pdir / uuid.uuid4().hex[:12]
+            pdir.mkdir(parents=True, exist_ok=True)
+            with _lock:
+                _busy.add(str(entry))
+            try:
+                added = _git(["worktree", "add", "--detach", str(entry), sha], repo)
+            finally:
+                with _lock:
+                    _busy.discard(str(entry))
+            if added.returncode != 0:
+                logger.warning("Could not pre-warm worktree for %s: %s", repo_name, added.stderr.strip())
+                shutil.rmtree(entry, ignore_errors=True)
+                break
+            stats["created"] += 1
+            stats["ready"] += 1
+    finally:
+        with _lock:
+            _replenishing.discard(key)
+            _last_check[key] = time.monotonic()
+
+    if stats["created"] or stats["advanced"] or stats["removed"]:
+        logger.info("Worktree pool %s/%s at %s: %s", team, repo_name, sha[:8], stats)
+    return stats
+
+
+def replenish_due(hc_home: Path, team: str) -> None:
+    """Replenish every repo pool of *team* whose check interval has elapsed."""
+    now = time.monotonic()
+    for repo_name in get_repos(hc_home, team):
+        last = _last_check.get(_key(hc_home, team, repo_name))
+        if last is not None and now - last < REPLENISH_INTERVAL:
+            continue
+        try:
+            replenish(hc_home, team, repo_name)
+        except Exception:
+            logger.exception("Worktree pool replenish failed for %s/%s", team, repo_name)
+
+
+def drain(hc_home: Path, team: str, repo_name: str) -> int:
+    """Remove every parked worktree for *repo_name*; returns how many."""
+    repo = _real_repo(hc_home, team, repo_name)
+    removed = 0
+    with _lock:
+        parked = [e for e in _entries(pool_dir(hc_home, team, repo_name)) if str(e) not in _busy]
+        _busy.update(str(e) for e in parked)
+    try:
+        for entry in parked:
+            if repo is not None:
+                _discard(repo, entry)
+            else:
+                shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+    finally:
+        with _lock:
+            _busy.difference_update(str(e) for e in parked)
+    return removed
@@ -7,6 +7,10 @@
  *   Worker → Tab:  { type: "sse", data: ... }  — SSE event payload
  *   Worker → Tab:  { type: "status", connected: bool } — connection status
  *
+ * Resume: the server numbers events; EventSource resends the last id on
+ * its own reconnects, and manual reconnects pass it as ?last_event_id=
+ * so missed events are replayed (or a { type: "resync" } event is sent).
+ *
  * Cleanup: dead ports are pruned on every broadcast (postMessage throws
  * on closed ports). When the last tab closes, the browser GCs the worker
  * and all its resources (including the EventSource).
@@ -15,6 +19,7 @@
 const ports = new Set();
 let es = null;
 let reconnectTimer = null;
+let lastEventId = "";
 
 function broadcast(msg) {
   for (const port of ports) {
@@ -29,16 +34,21 @@ function broadcast(msg) {
 
 function connect() {
   if (es) { try { es.close(); } catch (_) {} }
-  es = new EventSource("/stream");
+  const qs = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : "";
+  es = new EventSource(`/stream${qs}`);
 
   es.onopen = () => {
     broadcast({ type: "status", connected: true });
   };
 
   es.onmessage = (evt) => {
+    if (evt.lastEventId) lastEventId = evt.lastEventId;
     try {
+      // A frame is either one event or an array of coalesced events
       const data = JSON.parse(evt.data);
-      broadcast({ type: "sse", data });
+      for (const entry of Array.isArray(data) ? data : [data]) {
+        broadcast({ type: "sse", data: entry });
+      }
     } catch (_) {}
   };
 
@@ -31,6 +31,14 @@ export async function fetchTasks(team) {
   return r.ok ? r.json() : [];
 }
 
+export async function fetchChanges(team, since = 0, limit = null) {
+  const params = new URLSearchParams({ since: String(since) });
+  if (limit) params.set("limit", String(limit));
+  const r = await fetch(`/teams/${team}/changes?${params}`);
+  if (!r.ok) throw new Error(`changes: ${r.status}`);
+  return r.json();
+}
+
 export async function fetchAllTasks() {
   const r = await fetch(`/api/tasks?team=all`);
   return r.ok ? r.json() : [];
@@ -229,8 +237,10 @@ export async function rejectTask(team, taskId, reason, summary = "") {
   return r.json();
 }
 
-export async function fetchAgentTab(team, agentName, tab) {
-  const r = await fetch(`/teams/${team}/agents/${agentName}/${tab}`);
+export async function fetchAgentTab(team, agentName, tab, before = null) {
+  // Paginated tabs (logs, journal) return next_before; pass it back as before.
+  const qs = before != null ? `?before=${encodeURIComponent(before)}` : "";
+  const r = await fetch(`/teams/${team}/agents/${agentName}/${tab}${qs}`);
   return r.ok ? r.json() : null;
 }
 
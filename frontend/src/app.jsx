@@ -39,9 +39,66 @@ const _pt = {
   managerCtx:  {},   // team → ctx | null
   managerName: {},   // team → managerAgentName | null
   turnState:   {},   // team → { agentName: { inTurn: bool, taskId: num|null } }
+  changeSeq:   {},   // team → last applied change-feed seq
+  taskLists:   {},   // team → task replica kept in sync via the change feed
 };
 const MAX_LOG_ENTRIES = 500;
 
+/** Apply change-feed task deltas to *team*'s replica (ordered by id). */
+function applyTaskChanges(team, list, changes) {
+  let next = list;
+  for (const c of changes) {
+    if (c.kind !== "task") continue;
+    if (next === list) next = [...list];
+    const idx = next.findIndex(t => t.id === c.id);
+    if (idx === -1) {
+      if (c.op === "create") next.push({ ...c.data, team });
+    } else if (c.op === "delete") {
+      next.splice(idx, 1);
+    } else {
+      next[idx] = { ...next[idx], ...c.data };
+    }
+  }
+  return next;
+}
+
+/** Bring *team*'s task replica up to date and return it.
+ *  With a known cursor this costs O(changes); otherwise (first load or a
+ *  stale cursor) it refetches the board once and records the head seq. */
+async function syncTeamTasks(team) {
+  let cursor = _pt.changeSeq[team];
+  if (cursor == null || !_pt.taskLists[team]) {
+    const { head } = await api.fetchChanges(team, 0, 1);
+    const full = await api.fetchTasks(team);
+    _pt.taskLists[team] = full.map(t => ({ ...t, team }));
+    _pt.changeSeq[team] = head;
+    return _pt.taskLists[team];
+  }
+  let list = _pt.taskLists[team];
+  for (;;) {
+    const res = await api.fetchChanges(team, cursor);
+    if (res.reset) {
+      delete _pt.changeSeq[team];
+      return syncTeamTasks(team);
+    }
+    list = applyTaskChanges(team, list, res.changes);
+    cursor = res.seq;
+    if (!res.more) break;
+  }
+  _pt.taskLists[team] = list;
+  _pt.changeSeq[team] = cursor;
+  return list;
+}
+
+/** Tasks for the board filter: one team's replica, or all of them
+ *  merged newest-first (matching ``/api/tasks?team=all``). */
+async function syncFilteredTasks(filter, current) {
+  if (filter !== "all") return syncTeamTasks(filter === "current" ? current : filter);
+  const names = teams.value.map(t => typeof t === "object" ? t.name : t);
+  const lists = await Promise.all(names.map(n => syncTeamTasks(n).catch(() => [])));
+  return lists.flat().sort((a, b) => (b.updated_at || "").localeCompare(a.updated_at || ""));
+}
+
 // Greeting threshold: only greet after meaningful absence (30 minutes)
 const GREETING_THRESHOLD = 30 * 60 * 1000; // 30 minutes in milliseconds
 
@@ -213,6 +270,10 @@ function App() {
       if (initial && boot.initial_data) {
         const d = boot.initial_data;
         bootstrapTeamRef.current = initial;  // mark so team-switch effect skips fetch
+        if (d.seq != null) {
+          _pt.taskLists[initial] = (d.tasks || []).map(t => ({ ...t, team: initial }));
+          _pt.changeSeq[initial] = d.seq;
+        }
         batch(() => {
           tasks.value = d.tasks || [];
           agents.value = d.agents || [];
@@ -245,11 +306,7 @@ function App() {
       if (!t) return; // No team yet — bootstrap will set one
 
       try {
-        const taskDataPromise = filter === "all"
-          ? api.fetchAllTasks()
-          : filter === "current"
-            ? api.fetchTasks(t)
-            : api.fetchTasks(filter);
+        const taskDataPromise = syncFilteredTasks(filter, t);
 
         const [taskData, agentData, allAgentData] = await Promise.all([
           taskDataPromise,
@@ -340,7 +397,7 @@ function App() {
         fetchWorkflows(t);
 
         const [taskData, agentData] = await Promise.all([
-          api.fetchTasks(t),
+          syncTeamTasks(t),
           api.fetchAgents(t),
         ]);
         // Guard: only apply if the team hasn't changed while we were fetching
@@ -503,11 +560,30 @@ function App() {
     const handleSSE = (entry) => {
       if (entry.type === "connected") return;
 
+      // ── resync: reconnect gap exceeded the server's replay buffer ──
+      // Drop the task replicas so the next poll refetches every board.
+      if (entry.type === "resync") {
+        _pt.changeSeq = {};
+        _pt.taskLists = {};
+        return;
+      }
+
       const team = entry.team;
       if (!team) return;  // skip events without team field
 
       const isCurrent = (team === currentTeam.value);
 
+      // ── change (change-feed delta) ──
+      // Apply in-order deltas to the replica; on a gap, leave the cursor
+      // alone and let the next poll fetch the missing range.
+      if (entry.type === "change") {
+        if (_pt.taskLists[team] && entry.seq === _pt.changeSeq[team] + 1) {
+          _pt.taskLists[team] = applyTaskChanges(team, _pt.taskLists[team], [entry]);
+          _pt.changeSeq[team] = entry.seq;
+        }
+        return;
+      }
+
       // ── turn_started ──
       if (entry.type === "turn_started") {
         if (!_pt.turnState[team]) _pt.turnState[team] = {};
@@ -645,7 +721,11 @@ function App() {
     if (!cleanup) {
       const es = new EventSource("/stream");
       es.onmessage = (evt) => {
-        try { handleSSE(JSON.parse(evt.data)); } catch (_) {}
+        try {
+          // A frame is either one event or an array of coalesced events
+          const data = JSON.parse(evt.data);
+          for (const entry of Array.isArray(data) ? data : [data]) handleSSE(entry);
+        } catch (_) {}
       };
       es.onerror = () => {};
       cleanup = () => es.close();
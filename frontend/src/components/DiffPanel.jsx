@@ -73,6 +73,7 @@ function AgentView({ agentName }) {
   const team = currentTeam.value;
   const [tab, setTab] = useState("activity");
   const [tabData, setTabData] = useState({});
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const activityEndRef = useRef(null);
 
   // Get role directly from agents signal (no async fetch needed)
@@ -88,6 +89,36 @@ function AgentView({ agentName }) {
     }
   }, [team, agentName, tabData]);
 
+  // Logs and journal are paginated newest-first; append the next page.
+  const loadOlder = useCallback((t, key) => {
+    const current = tabData[t];
+    if (loadingOlder || !current || current.next_before == null) return;
+    setLoadingOlder(true);
+    api.fetchAgentTab(team, agentName, t, current.next_before).then(older => {
+      if (!older) return;
+      setTabData(prev => ({
+        ...prev,
+        [t]: { ...older, [key]: [...(prev[t][key] || []), ...(older[key] || [])] },
+      }));
+    }).catch(() => {}).finally(() => setLoadingOlder(false));
+  }, [team, agentName, tabData, loadingOlder]);
+
+  const renderLoadOlder = (data, t, key) => {
+    if (!data || data.next_before == null) return null;
+    return (
+      <div style={{ textAlign: "center", padding: "12px" }}>
+        <button
+          class="btn-approve"
+          onClick={() => loadOlder(t, key)}
+          disabled={loadingOlder}
+          style={{ fontSize: "12px", padding: "6px 12px" }}
+        >
+          {loadingOlder ? "Loading..." : "Load older"}
+        </button>
+      </div>
+    );
+  };
+
   const renderInbox = (msgs) => {
     if (!msgs || !msgs.length) return <div class="diff-empty">No messages</div>;
     return msgs.map((m, i) => (
@@ -127,7 +158,7 @@ function AgentView({ agentName }) {
   const renderLogs = (data) => {
     const sessions = data && data.sessions ? data.sessions : [];
     if (!sessions.length) return <div class="diff-empty">No worklogs</div>;
-    return sessions.map((s, i) => (
+    return <>{sessions.map((s, i) => (
       <div key={i} class="agent-log-session">
         <div class="agent-log-header" onClick={(e) => {
           e.target.closest(".agent-log-session").querySelector(".agent-log-arrow").classList.toggle("expanded");
@@ -140,7 +171,7 @@ function AgentView({ agentName }) {
           {s.content}
         </div>
       </div>
-    ));
+    ))}{renderLoadOlder(data, "logs", "sessions")}</>;
   };
 
   const renderStats = (s) => {
@@ -168,7 +199,7 @@ function AgentView({ agentName }) {
   const renderJournal = (data) => {
     const entries = data && data.entries ? data.entries : [];
     if (!entries.length) return <div class="diff-empty">No journal entries</div>;
-    return entries.map((e, i) => (
+    return <>{entries.map((e, i) => (
       <div key={i} class="agent-log-session">
         <div class="agent-log-header" onClick={(e) => {
           e.target.closest(".agent-log-session").querySelector(".agent-log-arrow").classList.toggle("expanded");
@@ -181,7 +212,7 @@ function AgentView({ agentName }) {
           <div class="agent-markdown-content" dangerouslySetInnerHTML={{ __html: renderMarkdown(e.content) }} />
         </div>
       </div>
-    ));
+    ))}{renderLoadOlder(data, "journal", "entries")}</>;
   };
 
   // --- Activity tab (live SSE stream, tail -f style) ---
@@ -37,6 +37,22 @@ def all_members():
     return [SAMPLE_MANAGER, SAMPLE_HUMAN] + list(SAMPLE_WORKERS)
 
 
+@pytest.fixture
+def hc_home(tmp_path):
+    """A bootstrapped delegate home with team ``gitutil.SAMPLE_TEAM``.
+
+    Used with the git repo helpers in tests/gitutil.py.
+    """
+    from delegate.config import set_boss
+    from tests.gitutil import SAMPLE_TEAM
+
+    hc = tmp_path / "hc_home"
+    hc.mkdir()
+    set_boss(hc, "nikhil")
+    bootstrap(hc, SAMPLE_TEAM, manager="edison", agents=["alice", "bob", ("sarah", "qa")])
+    return hc
+
+
 @pytest.fixture
 def tmp_team(tmp_path):
     """Create a fully bootstrapped team directory tree in a temp folder.
@@ -61,3 +77,7 @@ def tmp_team(tmp_path):
     # Clear the schema cache so subsequent tests re-check the DB
     from delegate.db import _schema_verified
     _schema_verified.clear()
+
+    # Stop shared/ watcher threads started by the files API
+    from delegate.shared_index import stop_all
+    stop_all()
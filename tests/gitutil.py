@@ -0,0 +1,84 @@
+"""Git repo helpers shared by the merge, worktree and maintenance tests.
+
+The ``hc_home`` fixture these go with (team ``SAMPLE_TEAM``) lives in
+conftest.py.
+"""
+
+import subprocess
+from pathlib import Path
+
+from delegate.config import add_repo
+from delegate.task import change_status, create_task, get_task, update_task
+
+SAMPLE_TEAM = "myteam"
+
+
+def git(cwd: Path, *args: str) -> str:
+    """Run git in *cwd*, raising on failure; returns stripped stdout."""
+    return subprocess.run(
+        ["git", *args], cwd=str(cwd), capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+
+def setup_git_repo(tmp_path: Path) -> Path:
+    """Create ``tmp_path/source_repo`` with a main branch and initial commit."""
+    repo = tmp_path / "source_repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "test@test.com")
+    git(repo, "config", "user.name", "Test")
+    (repo / "README.md").write_text("# Test repo\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "Initial commit")
+    return repo
+
+
+def commit(repo: Path, files: dict[str, str], message: str = "change", branch: str | None = None) -> str:
+    """Write *files* and commit them (on *branch*, if given); returns the new SHA.
+
+    With *branch* the repo is switched back to main afterwards.
+    """
+    if branch is not None:
+        git(repo, "checkout", "-q", branch)
+    for path, content in files.items():
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text(content)
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", message)
+    sha = git(repo, "rev-parse", "HEAD")
+    if branch is not None:
+        git(repo, "checkout", "-q", "main")
+    return sha
+
+
+def make_feature_branch(repo: Path, branch: str, filename: str = "feature.py", content: str = "# New\n"):
+    """Create *branch* at HEAD with a single commit, then check out main."""
+    git(repo, "branch", branch)
+    commit(repo, {filename: content}, f"Add {filename}", branch=branch)
+
+
+def branch_names(repo: Path) -> list[str]:
+    return git(repo, "branch", "--format=%(refname:short)").split()
+
+
+def register_repo_with_symlink(hc_home: Path, name: str, source_repo: Path):
+    """Register a repo by creating a symlink in hc_home/teams/<team>/repos/."""
+    from delegate.paths import repos_dir
+
+    rd = repos_dir(hc_home, SAMPLE_TEAM)
+    rd.mkdir(parents=True, exist_ok=True)
+    link = rd / name
+    if not link.exists():
+        link.symlink_to(source_repo)
+    add_repo(hc_home, SAMPLE_TEAM, name, str(source_repo), approval="auto")
+
+
+def make_in_approval_task(
+    hc_home: Path, title="Task", repo="myrepo", branch="feature/test", merging=False, assignee="manager",
+):
+    """Create a task and advance it to in_approval (or, with *merging*, merging)."""
+    task = create_task(hc_home, SAMPLE_TEAM, title=title, assignee=assignee)
+    update_task(hc_home, SAMPLE_TEAM, task["id"], repo=repo, branch=branch)
+    for status in ("in_progress", "in_review", "in_approval") + (("merging",) if merging else ()):
+        change_status(hc_home, SAMPLE_TEAM, task["id"], status)
+    return get_task(hc_home, SAMPLE_TEAM, task["id"])
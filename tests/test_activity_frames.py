@@ -0,0 +1,258 @@
+"""Tests for SSE frame coalescing and subscriber counters in delegate/activity.py."""
+
+import asyncio
+import json
+
+import pytest
+
+from delegate import activity
+from delegate.activity import (
+    SubscriberDisconnected,
+    broadcast,
+    broadcast_change,
+    broadcast_task_update,
+    encode_frame,
+    next_frame,
+    replay_since,
+    subscribe,
+    subscriber_stats,
+    unsubscribe,
+)
+
+
+def _decode(frame: str):
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    return json.loads(frame[len("data: "):])
+
+
+class TestEncodeFrame:
+    def test_single_event_is_an_object(self):
+        data = _decode(encode_frame([{"type": "connected"}]))
+        assert data == {"type": "connected"}
+
+    def test_multiple_events_are_an_array(self):
+        data = _decode(encode_frame([{"a": 1}, {"b": 2}]))
+        assert data == [{"a": 1}, {"b": 2}]
+
+    def test_frame_id_is_last_event_id(self):
+        frame = encode_frame([{"type": "x", "eid": 3}, {"type": "y", "eid": 7}])
+        first, rest = frame.split("\n", 1)
+        assert first == f"id: {activity.EPOCH}:7"
+        assert all("eid" not in e for e in _decode(rest))
+
+    def test_compact_encoding_drops_nulls_and_clips_detail(self):
+        frame = encode_frame([{"type": "agent_activity", "task_id": None, "detail": "x" * 1000}])
+        assert ", " not in frame and '": ' not in frame
+        data = _decode(frame)
+        assert "task_id" not in data
+        assert len(data["detail"]) == activity.MAX_DETAIL_CHARS + 1
+
+
+class TestNextFrame:
+    async def test_burst_is_coalesced_into_one_frame(self):
+        q = subscribe(team="t1")
+        try:
+            for i in range(10):
+                broadcast("alice", "t1", "Bash", f"cmd {i}")
+            events = await next_frame(q, timeout=1.0, window=0.01)
+            assert [e["detail"] for e in events] == [f"cmd {i}" for i in range(10)]
+        finally:
+            unsubscribe(q)
+
+    async def test_late_events_within_window_are_included(self):
+        q = subscribe(team="t1")
+        try:
+            broadcast("alice", "t1", "Read", "first")
+
+            async def _later():
+                await asyncio.sleep(0.01)
+                broadcast("alice", "t1", "Read", "second")
+
+            task = asyncio.create_task(_later())
+            events = await next_frame(q, timeout=1.0, window=0.2)
+            await task
+            assert [e["detail"] for e in events] == ["first", "second"]
+        finally:
+            unsubscribe(q)
+
+    async def test_max_events_caps_frame(self):
+        q = subscribe(team="t1")
+        try:
+            for i in range(5):
+                broadcast("alice", "t1", "Bash", str(i))
+            events = await next_frame(q, timeout=1.0, window=0.01, max_events=3)
+            assert len(events) == 3
+            assert q.qsize() == 2
+        finally:
+            unsubscribe(q)
+
+    async def test_timeout_without_events(self):
+        q = subscribe(team="t1")
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await next_frame(q, timeout=0.01)
+        finally:
+            unsubscribe(q)
+
+
+class TestSubscriberStats:
+    async def test_delivered_and_frames_counted(self):
+        q = subscribe(team="stats-team")
+        try:
+            broadcast("alice", "stats-team", "Bash", "ls")
+            broadcast("alice", "stats-team", "Bash", "pwd")
+            await next_frame(q, timeout=1.0, window=0.01)
+            st = next(s for s in subscriber_stats() if s["team"] == "stats-team")
+            assert st["delivered"] == 2
+            assert st["frames"] == 1
+            assert st["dropped"] == 0
+            assert st["max_backlog"] == 2
+            assert st["last_lag_ms"] >= 0
+        finally:
+            unsubscribe(q)
+
+    def test_drops_counted_for_slow_consumer(self):
+        q = subscribe(team="slow-team")
+        try:
+            for i in range(q.maxsize + 5):
+                broadcast("alice", "slow-team", "Bash", str(i))
+            st = next(s for s in subscriber_stats() if s["team"] == "slow-team")
+            assert st["dropped"] == 5
+            assert st["max_backlog"] == q.maxsize
+        finally:
+            unsubscribe(q)
+
+    def test_unsubscribe_removes_stats(self):
+        q = subscribe(team="gone-team")
+        unsubscribe(q)
+        assert not any(s["team"] == "gone-team" for s in subscriber_stats())
+
+
+class TestReplay:
+    def _last_id(self, q):
+        events = []
+        while not q.empty():
+            events.append(q.get_nowait())
+        return activity.format_event_id(events[-1]["eid"])
+
+    def test_replays_activity_and_task_events_after_id(self):
+        q = subscribe(team="replay-team")
+        try:
+            broadcast("alice", "replay-team", "Bash", "before")
+            last = self._last_id(q)
+            broadcast("alice", "replay-team", "Bash", "after")
+            broadcast_task_update(1, "replay-team", {"status": "done"})
+            broadcast("bob", "other-team", "Bash", "elsewhere")
+            events = replay_since(last, "replay-team")
+            assert [e.get("detail") or e["type"] for e in events] == ["after", "task_update"]
+            assert events[0]["eid"] < events[1]["eid"]
+            # The global stream sees every team.
+            assert len(replay_since(last, None)) == 3
+        finally:
+            unsubscribe(q)
+
+    def test_no_id_means_nothing_to_replay(self):
+        assert replay_since(None, "replay-team") == []
+
+    def test_foreign_epoch_requires_resync(self):
+        assert replay_since("deadbeef:1", "replay-team") is None
+        assert replay_since(f"{activity.EPOCH}:{activity._last_eid + 100}", "replay-team") is None
+
+    def test_gap_beyond_buffer_requires_resync(self, monkeypatch):
+        monkeypatch.setattr(activity, "REPLAY_SIZE", 3)
+        monkeypatch.setattr(activity, "_replay", {})
+        monkeypatch.setattr(activity, "_evicted", {})
+        broadcast_task_update(1, "gap-team", {"status": "todo"})
+        first = activity.format_event_id(activity._last_eid)
+        for i in range(4):  # evicts "first" and the event right after it
+            broadcast_task_update(1, "gap-team", {"status": "in_progress"})
+        recent = activity.format_event_id(activity._last_eid - 1)
+        assert replay_since(first, "gap-team") is None
+        assert len(replay_since(recent, "gap-team")) == 1
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+class TestTopics:
+    def test_task_subscriber_sees_only_its_task(self):
+        q = subscribe(team="topic-team", task_id=7)
+        try:
+            broadcast("alice", "topic-team", "Bash", "on 7", task_id=7)
+            broadcast("alice", "topic-team", "Bash", "on 8", task_id=8)
+            broadcast_task_update(7, "topic-team", {"status": "done"})
+            broadcast_change("topic-team", {"seq": 1, "kind": "message", "id": 3, "op": "create",
+                                            "data": {"task_id": 7}})
+            broadcast_change("topic-team", {"seq": 2, "kind": "task", "id": 8, "op": "update", "data": {}})
+            got = _drain(q)
+            assert [e["type"] for e in got] == ["agent_activity", "task_update", "change"]
+            assert got[0]["detail"] == "on 7"
+        finally:
+            unsubscribe(q)
+
+    def test_agent_and_team_subscribers(self):
+        qa = subscribe(team="topic-team", agent="bob")
+        qt = subscribe(team="topic-team")
+        qo = subscribe(team="other-topic-team")
+        try:
+            broadcast("alice", "topic-team", "Read", "a")
+            broadcast("bob", "topic-team", "Read", "b")
+            assert [e["detail"] for e in _drain(qa)] == ["b"]
+            assert [e["detail"] for e in _drain(qt)] == ["a", "b"]
+            assert _drain(qo) == []
+        finally:
+            for q in (qa, qt, qo):
+                unsubscribe(q)
+        assert ("team", "topic-team") not in activity._topics
+
+    def test_payload_serialized_once_and_shared(self):
+        q1 = subscribe(team="shared-team")
+        q2 = subscribe(team=None)
+        try:
+            broadcast("alice", "shared-team", "Bash", "ls")
+            e1, e2 = q1.get_nowait(), [e for e in _drain(q2) if e.get("team") == "shared-team"][0]
+            assert e1 is e2
+            assert encode_frame([e1]).endswith(f"data: {e1.wire}\n\n")
+        finally:
+            unsubscribe(q1)
+            unsubscribe(q2)
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            subscribe(team="t1", policy="yolo")
+
+
+class TestBackpressure:
+    def test_coalesce_keeps_latest_activity_per_agent(self):
+        q = subscribe(team="bp-team", policy="coalesce")
+        try:
+            for i in range(q.maxsize + 10):
+                broadcast("alice" if i % 2 else "bob", "bp-team", "Bash", str(i))
+            got = _drain(q)
+            # The overflow collapsed the full queue to the newest entry per
+            # agent; the remaining events then queued normally.
+            assert [(e["agent"], e["detail"]) for e in got[:2]] == [
+                ("alice", str(q.maxsize - 1)), ("bob", str(q.maxsize)),
+            ]
+            assert len(got) == 11
+            st = next(s for s in subscriber_stats() if s["team"] == "bp-team")
+            assert st["coalesced"] > 0 and st["dropped"] == 0
+        finally:
+            unsubscribe(q)
+
+    async def test_disconnect_policy_ends_stream(self):
+        q = subscribe(team="bp-team2", policy="disconnect")
+        try:
+            for i in range(q.maxsize + 1):
+                broadcast("alice", "bp-team2", "Bash", str(i))
+            assert q not in activity._subscribers
+            st = next(s for s in subscriber_stats() if s["team"] == "bp-team2")
+            assert st["disconnected"] is True
+            with pytest.raises(SubscriberDisconnected):
+                await next_frame(q, timeout=1.0)
+        finally:
+            unsubscribe(q)
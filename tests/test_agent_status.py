@@ -0,0 +1,96 @@
+"""Tests for delegate/agent_status.py — the agent status registry."""
+
+from fastapi.testclient import TestClient
+
+import delegate.web
+from delegate import agent_status
+from delegate.agent_status import get_status, get_statuses
+from delegate.chat import end_session, start_session, update_session_task
+from delegate.web import create_app
+
+TEAM = "testteam"
+
+
+def _forget(hc_home):
+    """Drop the in-memory copy, as a process restart would."""
+    for key in [k for k in agent_status._registry if k[0] == str(hc_home)]:
+        del agent_status._registry[key]
+
+
+class TestLifecycle:
+    def test_session_start_update_end(self, tmp_team):
+        assert get_status(tmp_team, TEAM, "alice")["turn_state"] == "idle"
+
+        sid = start_session(tmp_team, TEAM, "alice")
+        status = get_status(tmp_team, TEAM, "alice")
+        assert status["turn_state"] == "running"
+        assert status["session_id"] == sid
+        assert status["turn_started_at"] is not None
+        assert status["last_active_at"] is None
+
+        update_session_task(tmp_team, TEAM, sid, 7)
+        assert get_status(tmp_team, TEAM, "alice")["task_id"] == 7
+
+        end_session(tmp_team, TEAM, sid)
+        status = get_status(tmp_team, TEAM, "alice")
+        assert status["turn_state"] == "idle"
+        assert status["last_active_at"] is not None
+        assert status["task_id"] == 7
+
+    def test_ending_an_older_session_keeps_newer_turn_running(self, tmp_team):
+        first = start_session(tmp_team, TEAM, "bob")
+        second = start_session(tmp_team, TEAM, "bob", kind="reflection")
+        end_session(tmp_team, TEAM, first)
+        status = get_status(tmp_team, TEAM, "bob")
+        assert status["turn_state"] == "running"
+        assert status["session_id"] == second
+
+    def test_version_bumps(self, tmp_team):
+        before = agent_status.version(tmp_team, TEAM)
+        start_session(tmp_team, TEAM, "alice")
+        assert agent_status.version(tmp_team, TEAM) > before
+
+
+class TestPersistence:
+    def test_survives_restart_and_clears_stale_running(self, tmp_team):
+        done = start_session(tmp_team, TEAM, "alice", task_id=3)
+        end_session(tmp_team, TEAM, done)
+        start_session(tmp_team, TEAM, "bob")  # still running when we "crash"
+        finished_at = get_status(tmp_team, TEAM, "alice")["last_active_at"]
+
+        _forget(tmp_team)
+        statuses = get_statuses(tmp_team, TEAM)
+        assert statuses["alice"]["last_active_at"] == finished_at
+        assert statuses["alice"]["task_id"] == 3
+        assert statuses["bob"]["turn_state"] == "idle"
+
+
+class TestEndpoints:
+    def test_agents_list_uses_registry(self, tmp_team, monkeypatch):
+        sid = start_session(tmp_team, TEAM, "alice")
+        end_session(tmp_team, TEAM, sid)
+        expected = get_status(tmp_team, TEAM, "alice")["last_active_at"]
+
+        seen = []
+        real = delegate.web._agent_last_active_at
+        monkeypatch.setattr(delegate.web, "_agent_last_active_at", lambda d: seen.append(d.name) or real(d))
+
+        client = TestClient(create_app(hc_home=tmp_team))
+        agents = {a["name"]: a for a in client.get(f"/teams/{TEAM}/agents").json()}
+        assert agents["alice"]["last_active_at"] == expected
+        assert agents["alice"]["turn_state"] == "idle"
+        assert "alice" not in seen  # no log scan for agents with a status row
+
+    def test_batched_status_endpoint(self, tmp_team):
+        start_session(tmp_team, TEAM, "alice", task_id=5)
+        client = TestClient(create_app(hc_home=tmp_team))
+        resp = client.get(f"/teams/{TEAM}/agents/status")
+        assert resp.status_code == 200
+        agents = {a["agent"]: a for a in resp.json()["agents"]}
+        assert agents["alice"]["turn_state"] == "running"
+        assert agents["alice"]["task_id"] == 5
+
+        etag = resp.headers["etag"]
+        assert client.get(f"/teams/{TEAM}/agents/status", headers={"If-None-Match": etag}).status_code == 304
+        start_session(tmp_team, TEAM, "bob")
+        assert client.get(f"/teams/{TEAM}/agents/status", headers={"If-None-Match": etag}).status_code == 200
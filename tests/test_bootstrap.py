@@ -131,11 +131,11 @@ def test_db_schema_created(tmp_team):
 
     cursor = conn.execute("PRAGMA table_info(sessions)")
     sess_columns = {row[1] for row in cursor.fetchall()}
-    # V11 added team for multi-team support
+    # V11 added team for multi-team support; V15 added kind (turn/reflection)
     assert sess_columns == {
         "id", "agent", "task_id", "started_at", "ended_at",
         "duration_seconds", "tokens_in", "tokens_out", "cost_usd",
-        "cache_read_tokens", "cache_write_tokens", "team",
+        "cache_read_tokens", "cache_write_tokens", "team", "kind",
     }
 
     conn.close()
@@ -0,0 +1,122 @@
+"""Tests for delegate/changes.py — per-team change feed."""
+
+from fastapi.testclient import TestClient
+
+from delegate import changes
+from delegate.activity import subscribe, unsubscribe
+from delegate.changes import changes_since, head_seq
+from delegate.chat import log_event
+from delegate.mailbox import mark_seen_batch, send
+from delegate.review import add_comment as add_review_comment, create_review, delete_comment, set_verdict
+from delegate.task import add_comment, change_status, create_task
+from delegate.web import create_app
+
+TEAM = "testteam"
+
+
+class TestRecord:
+    def test_seq_is_monotonic_per_team(self, tmp_team):
+        assert head_seq(tmp_team, TEAM) == 0
+        create_task(tmp_team, TEAM, title="A", assignee="alice")
+        first = head_seq(tmp_team, TEAM)
+        assert first > 0
+        create_task(tmp_team, TEAM, title="B", assignee="bob")
+        assert head_seq(tmp_team, TEAM) > first
+        assert head_seq(tmp_team, "otherteam") == 0
+
+    def test_task_create_and_update_deltas(self, tmp_team):
+        task = create_task(tmp_team, TEAM, title="Build", assignee="alice")
+        cursor = head_seq(tmp_team, TEAM)
+        change_status(tmp_team, TEAM, task["id"], "in_progress")
+
+        feed = changes_since(tmp_team, TEAM, cursor)
+        task_changes = [c for c in feed["changes"] if c["kind"] == "task"]
+        assert task_changes[0]["op"] == "update"
+        assert task_changes[0]["id"] == task["id"]
+        assert task_changes[0]["data"]["status"] == "in_progress"
+        # Only the touched fields travel, not the whole row.
+        assert "title" not in task_changes[0]["data"]
+        assert feed["seq"] == feed["head"]
+
+        full = changes_since(tmp_team, TEAM, 0)
+        create = next(c for c in full["changes"] if c["kind"] == "task" and c["op"] == "create")
+        assert create["data"]["title"] == "Build"
+
+    def test_messages_comments_and_reviews_are_recorded(self, tmp_team):
+        task = create_task(tmp_team, TEAM, title="T", assignee="alice")
+        cursor = head_seq(tmp_team, TEAM)
+
+        msg_id = send(tmp_team, TEAM, "manager", "alice", "hi", task_id=task["id"])
+        mark_seen_batch(tmp_team, TEAM, [msg_id])
+        mark_seen_batch(tmp_team, TEAM, [msg_id])  # already seen — no delta
+        log_event(tmp_team, TEAM, "something happened")
+        add_comment(tmp_team, TEAM, task["id"], "alice", "looks good")
+        review = create_review(tmp_team, TEAM, task["id"], 1)
+        rc = add_review_comment(tmp_team, TEAM, task["id"], 1, "a.py", "nit", "nikhil")
+        delete_comment(tmp_team, TEAM, rc["id"])
+        set_verdict(tmp_team, TEAM, task["id"], 1, "approved")
+
+        feed = changes_since(tmp_team, TEAM, cursor)
+        kinds = [(c["kind"], c["op"]) for c in feed["changes"]]
+        assert kinds[:2] == [("message", "create"), ("message", "update")]
+        assert kinds.count(("message", "update")) == 1
+        assert ("task_comment", "create") in kinds
+        assert ("review", "create") in kinds
+        assert ("review_comment", "delete") in kinds
+        verdict = [c for c in feed["changes"] if c["kind"] == "review" and c["op"] == "update"]
+        assert verdict[0]["id"] == review["id"]
+        assert verdict[0]["data"]["verdict"] == "approved"
+
+
+class TestChangesSince:
+    def test_pagination(self, tmp_team):
+        for i in range(5):
+            log_event(tmp_team, TEAM, f"event {i}")
+        page = changes_since(tmp_team, TEAM, 0, limit=3)
+        assert len(page["changes"]) == 3 and page["more"]
+        page = changes_since(tmp_team, TEAM, page["seq"], limit=3)
+        assert len(page["changes"]) == 2 and not page["more"]
+        assert page["seq"] == page["head"] == 5
+
+    def test_stale_cursor_requests_reset(self, tmp_team, monkeypatch):
+        monkeypatch.setattr(changes, "RETENTION", 4)
+        monkeypatch.setattr(changes, "PRUNE_EVERY", 2)
+        for i in range(10):
+            log_event(tmp_team, TEAM, f"event {i}")
+        feed = changes_since(tmp_team, TEAM, 1)
+        assert feed["reset"] and feed["changes"] == []
+        assert feed["seq"] == 10
+        assert not changes_since(tmp_team, TEAM, 8)["reset"]
+
+    def test_cursor_ahead_of_head_requests_reset(self, tmp_team):
+        log_event(tmp_team, TEAM, "one")
+        assert changes_since(tmp_team, TEAM, 99)["reset"]
+
+
+class TestEndpoints:
+    def test_changes_endpoint_and_bootstrap_seq(self, tmp_team):
+        client = TestClient(create_app(hc_home=tmp_team))
+        boot = client.get("/bootstrap", params={"team": TEAM}).json()
+        since = boot["initial_data"]["seq"]
+
+        task = create_task(tmp_team, TEAM, title="New", assignee="bob")
+        resp = client.get(f"/teams/{TEAM}/changes", params={"since": since})
+        assert resp.status_code == 200
+        data = resp.json()
+        created = [c for c in data["changes"] if c["kind"] == "task"]
+        assert created[0]["id"] == task["id"]
+        assert created[0]["op"] == "create"
+        assert data["seq"] > since
+
+    async def test_sse_change_event_carries_seq(self, tmp_team):
+        q = subscribe(team=TEAM)
+        try:
+            create_task(tmp_team, TEAM, title="Live", assignee="alice")
+            events = []
+            while not q.empty():
+                events.append(q.get_nowait())
+            task_events = [e for e in events if e.get("type") == "change" and e["kind"] == "task"]
+            assert task_events[0]["seq"] > 0
+            assert task_events[0]["data"]["title"] == "Live"
+        finally:
+            unsubscribe(q)
@@ -0,0 +1,142 @@
+"""Tests for delegate/conflicts.py — background conflict prediction."""
+
+import pytest
+
+from delegate import conflicts
+from delegate.chat import get_task_activity
+from delegate.mailbox import read_inbox
+from delegate.merge import merge_once
+from delegate.task import create_task, update_task, change_status, get_task
+
+from tests.gitutil import (
+    SAMPLE_TEAM, commit, git, make_in_approval_task, register_repo_with_symlink, setup_git_repo,
+)
+
+
+def _branch(repo, branch, files: dict[str, str], base="main"):
+    git(repo, "branch", branch, base)
+    commit(repo, files, f"work on {branch}", branch=branch)
+
+
+def _in_progress_task(hc_home, branch, assignee="alice"):
+    task = create_task(hc_home, SAMPLE_TEAM, title=f"Work {branch}", assignee=assignee)
+    update_task(hc_home, SAMPLE_TEAM, task["id"], repo="myrepo", branch=branch)
+    change_status(hc_home, SAMPLE_TEAM, task["id"], "in_progress")
+    return get_task(hc_home, SAMPLE_TEAM, task["id"])
+
+
+@pytest.fixture
+def repo(hc_home, tmp_path):
+    repo = setup_git_repo(tmp_path)
+    commit(repo, {"app.py": "a = 1\nb = 2\nc = 3\n", "other.py": "x = 1\n"})
+    register_repo_with_symlink(hc_home, "myrepo", repo)
+    return repo
+
+
+class TestScan:
+    def test_branch_vs_branch(self, hc_home, repo):
+        t1 = _in_progress_task(hc_home, "alice/one")
+        t2 = _in_progress_task(hc_home, "bob/two", assignee="bob")
+        t3 = _in_progress_task(hc_home, "bob/three", assignee="bob")
+        _branch(repo, "alice/one", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        _branch(repo, "bob/two", {"app.py": "a = 20\nb = 2\nc = 3\n"})
+        _branch(repo, "bob/three", {"app.py": "a = 1\nb = 2\nc = 30\n"})  # same file, no conflict
+
+        found = conflicts.scan(hc_home, SAMPLE_TEAM)
+        assert found == {
+            (t1["id"], t2["id"], "myrepo"): ["app.py"],
+            (t2["id"], t1["id"], "myrepo"): ["app.py"],
+        }
+        assert not any(t3["id"] in key[:2] for key in found)
+
+    def test_branch_vs_main(self, hc_home, repo):
+        t1 = _in_progress_task(hc_home, "alice/one")
+        _branch(repo, "alice/one", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        commit(repo, {"app.py": "a = 99\nb = 2\nc = 3\n"})
+        assert conflicts.scan(hc_home, SAMPLE_TEAM) == {(t1["id"], conflicts.MAIN, "myrepo"): ["app.py"]}
+
+    def test_inactive_tasks_are_ignored(self, hc_home, repo):
+        t1 = _in_progress_task(hc_home, "alice/one")
+        _in_progress_task(hc_home, "bob/two", assignee="bob")
+        _branch(repo, "alice/one", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        _branch(repo, "bob/two", {"app.py": "a = 20\nb = 2\nc = 3\n"})
+        change_status(hc_home, SAMPLE_TEAM, t1["id"], "cancelled")
+        assert conflicts.scan(hc_home, SAMPLE_TEAM) == {}
+
+
+class TestPredict:
+    def test_new_predictions_warn_dri_and_manager_once(self, hc_home, repo):
+        t1 = _in_progress_task(hc_home, "alice/one")
+        t2 = _in_progress_task(hc_home, "bob/two", assignee="bob")
+        _branch(repo, "alice/one", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        _branch(repo, "bob/two", {"app.py": "a = 20\nb = 2\nc = 3\n"})
+
+        assert conflicts.predict(hc_home, SAMPLE_TEAM) == {"predicted": 2, "new": 2}
+        alice = [m for m in read_inbox(hc_home, SAMPLE_TEAM, "alice") if "CONFLICT_PREDICTED" in m.body]
+        edison = [m for m in read_inbox(hc_home, SAMPLE_TEAM, "edison") if "CONFLICT_PREDICTED" in m.body]
+        assert len(alice) == 1 and "app.py" in alice[0].body
+        assert len(edison) == 2
+        events = [e["content"] for e in get_task_activity(hc_home, SAMPLE_TEAM, t1["id"])]
+        assert any("conflict predicted" in e for e in events)
+
+        # Unchanged on the next scan → no repeat warnings
+        assert conflicts.predict(hc_home, SAMPLE_TEAM) == {"predicted": 2, "new": 0}
+        assert len([m for m in read_inbox(hc_home, SAMPLE_TEAM, "edison") if "CONFLICT_PREDICTED" in m.body]) == 2
+
+        stored = conflicts.predictions(hc_home, SAMPLE_TEAM, t2["id"])
+        assert [(p["other_task_id"], p["files"]) for p in stored] == [(t1["id"], ["app.py"])]
+
+    def test_resolved_predictions_are_dropped(self, hc_home, repo):
+        t1 = _in_progress_task(hc_home, "alice/one")
+        _branch(repo, "alice/one", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        commit(repo, {"app.py": "a = 99\nb = 2\nc = 3\n"})
+        conflicts.predict(hc_home, SAMPLE_TEAM, notify=False)
+        assert conflicts.predictions(hc_home, SAMPLE_TEAM)
+
+        change_status(hc_home, SAMPLE_TEAM, t1["id"], "cancelled")
+        conflicts.predict(hc_home, SAMPLE_TEAM, notify=False)
+        assert conflicts.predictions(hc_home, SAMPLE_TEAM) == []
+
+    def test_predict_due_is_rate_limited(self, hc_home, repo, monkeypatch):
+        calls = []
+        monkeypatch.setattr(conflicts, "predict", lambda h, t: calls.append(t))
+        conflicts._last_run.clear()
+        conflicts.predict_due(hc_home, SAMPLE_TEAM)
+        conflicts.predict_due(hc_home, SAMPLE_TEAM)
+        assert calls == [SAMPLE_TEAM]
+
+
+class TestMergeOrder:
+    def test_least_conflicting_task_merges_first(self, hc_home, repo):
+        # T1 conflicts with two in-flight tasks, T2 with none
+        busy = make_in_approval_task(hc_home, title="Busy", branch="alice/busy")
+        calm = make_in_approval_task(hc_home, title="Calm", branch="alice/calm")
+        _in_progress_task(hc_home, "bob/x", assignee="bob")
+        _in_progress_task(hc_home, "bob/y", assignee="bob")
+        _branch(repo, "alice/busy", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        _branch(repo, "alice/calm", {"other.py": "x = 2\n"})
+        _branch(repo, "bob/x", {"app.py": "a = 20\nb = 2\nc = 3\n"})
+        _branch(repo, "bob/y", {"app.py": "a = 30\nb = 2\nc = 3\n"})
+        conflicts.predict(hc_home, SAMPLE_TEAM, notify=False)
+
+        ordered = conflicts.order_for_merge(hc_home, SAMPLE_TEAM, [busy, calm])
+        assert [t["id"] for t in ordered] == [calm["id"], busy["id"]]
+
+        results = merge_once(hc_home, SAMPLE_TEAM)
+        assert [r.task_id for r in results][:2] == [calm["id"], busy["id"]]
+
+
+class TestApi:
+    def test_conflicts_endpoint(self, hc_home, repo):
+        from fastapi.testclient import TestClient
+        from delegate.web import create_app
+
+        t1 = _in_progress_task(hc_home, "alice/one")
+        _branch(repo, "alice/one", {"app.py": "a = 10\nb = 2\nc = 3\n"})
+        commit(repo, {"app.py": "a = 99\nb = 2\nc = 3\n"})
+        conflicts.predict(hc_home, SAMPLE_TEAM, notify=False)
+
+        client = TestClient(create_app(hc_home=hc_home))
+        data = client.get(f"/teams/{SAMPLE_TEAM}/conflicts", params={"task_id": t1["id"]}).json()
+        assert data["predictions"][0]["other_task_id"] == 0
+        assert data["predictions"][0]["files"] == ["app.py"]
@@ -0,0 +1,193 @@
+"""Tests for delegate/diskgc.py — worktree GC and disk quotas."""
+
+import os
+import time
+
+import pytest
+import yaml
+
+from delegate import diskgc
+from delegate.chat import get_task_activity
+from delegate.config import get_disk_quota
+from delegate.paths import task_worktree_dir
+from delegate.runtime import _resolve_workspace
+from delegate.task import create_task, change_status, get_task
+
+from tests.gitutil import SAMPLE_TEAM, commit, git, register_repo_with_symlink, setup_git_repo
+
+
+def _task(hc_home, *statuses):
+    task = create_task(hc_home, SAMPLE_TEAM, title="Work", assignee="alice", repo="myrepo")
+    for status in statuses:
+        if status == "in_review":  # the review gate wants a commit
+            commit(_wt(hc_home, task), {f"work{task['id']}.py": "pass\n"}, "work")
+        change_status(hc_home, SAMPLE_TEAM, task["id"], status)
+    return get_task(hc_home, SAMPLE_TEAM, task["id"])
+
+
+def _wt(hc_home, task):
+    return task_worktree_dir(hc_home, SAMPLE_TEAM, "myrepo", task["id"])
+
+
+def _age(path, seconds):
+    """Backdate every mtime under *path* by *seconds*."""
+    past = time.time() - seconds
+    for dirpath, dirs, files in os.walk(path):
+        for name in dirs + files:
+            os.utime(os.path.join(dirpath, name), (past, past), follow_symlinks=False)
+    os.utime(path, (past, past))
+
+
+def _set_quota(hc_home, mb):
+    path = hc_home / "config.yaml"
+    data = yaml.safe_load(path.read_text()) if path.exists() else {}
+    data = data or {}
+    data["disk_quota_mb"] = mb
+    path.write_text(yaml.dump(data))
+
+
+IN_APPROVAL = ("in_progress", "in_review", "in_approval")
+
+
+@pytest.fixture
+def repo(hc_home, tmp_path, monkeypatch):
+    monkeypatch.setattr(diskgc, "GRACE_SECONDS", 0)
+    repo = setup_git_repo(tmp_path)
+    register_repo_with_symlink(hc_home, "myrepo", repo)
+    return repo
+
+
+class TestOrphans:
+    def test_reconciles_dirs_git_and_task_status(self, hc_home, repo):
+        active = _task(hc_home, "in_progress")
+        done = _task(hc_home, *IN_APPROVAL, "merging", "done")
+        merging = _task(hc_home, *IN_APPROVAL, "merging")
+        stray = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "myrepo" / "T0099"
+        stray.mkdir(parents=True)
+        (stray / "junk.txt").write_text("x" * 1000)
+        old_merge = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "_merge" / "abc" / f"T{active['id']:04d}"
+        live_merge = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "_merge" / "def" / f"T{merging['id']:04d}"
+        for path in (old_merge, live_merge):
+            path.parent.mkdir(parents=True)
+            git(repo, "worktree", "add", "-q", "--detach", str(path))
+
+        result = diskgc.gc(hc_home, SAMPLE_TEAM)
+        reasons = {r["path"]: r["reason"] for r in result["removed"]}
+        assert reasons == {
+            str(_wt(hc_home, done)): "task done",
+            str(stray): "unknown task",
+            str(old_merge): "merge attempt finished",
+        }
+        assert result["freed_bytes"] > 0
+        assert not stray.exists() and not old_merge.exists() and not _wt(hc_home, done).exists()
+        assert _wt(hc_home, active).is_dir() and live_merge.is_dir()
+        listed = git(repo, "worktree", "list", "--porcelain")
+        assert str(old_merge) not in listed and str(_wt(hc_home, done)) not in listed
+
+    def test_recently_touched_orphans_are_kept(self, hc_home, repo, monkeypatch):
+        monkeypatch.setattr(diskgc, "GRACE_SECONDS", 600)
+        stray = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "myrepo" / "T0099"
+        stray.mkdir(parents=True)
+        assert diskgc.gc(hc_home, SAMPLE_TEAM)["removed"] == []
+        _age(stray, 3600)
+        assert len(diskgc.gc(hc_home, SAMPLE_TEAM)["removed"]) == 1
+
+    def test_merge_worktrees_can_be_deferred(self, hc_home, repo):
+        active = _task(hc_home, "in_progress")
+        old_merge = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "_merge" / "abc" / f"T{active['id']:04d}"
+        old_merge.parent.mkdir(parents=True)
+        git(repo, "worktree", "add", "-q", "--detach", str(old_merge))
+
+        result = diskgc.gc(hc_home, SAMPLE_TEAM, defer_merge=True)
+        assert [r["path"] for r in result["removed"]] == [str(old_merge)]
+        assert old_merge.is_dir()
+        diskgc.remove_deferred(result["deferred"])
+        assert not old_merge.exists()
+        assert str(old_merge) not in git(repo, "worktree", "list", "--porcelain")
+
+    def test_entries_vanishing_mid_scan_are_skipped(self, hc_home, repo, monkeypatch):
+        gone = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "_pool" / "myrepo" / "claimed"
+        gone.mkdir(parents=True)
+        listed = diskgc._subdirs
+
+        def subdirs(path):
+            found = listed(path)
+            if gone in found:
+                gone.rmdir()  # a pool claim() racing the scan
+            return found
+
+        monkeypatch.setattr(diskgc, "_subdirs", subdirs)
+        assert diskgc.scan(hc_home, SAMPLE_TEAM) == []
+        assert diskgc.gc(hc_home, SAMPLE_TEAM)["removed"] == []
+
+    def test_dry_run_removes_nothing(self, hc_home, repo):
+        done = _task(hc_home, *IN_APPROVAL, "merging", "done")
+        result = diskgc.gc(hc_home, SAMPLE_TEAM, dry_run=True)
+        assert [r["task_id"] for r in result["removed"]] == [done["id"]]
+        assert _wt(hc_home, done).is_dir()
+
+
+class TestQuota:
+    def test_evicts_oldest_clean_idle_worktree_first(self, hc_home, repo):
+        oldest = _task(hc_home, *IN_APPROVAL)
+        dirty = _task(hc_home, *IN_APPROVAL)
+        newer = _task(hc_home, *IN_APPROVAL)
+        busy = _task(hc_home, "in_progress")
+        (_wt(hc_home, dirty) / "scratch.py").write_text("wip\n")
+        _age(_wt(hc_home, dirty), 4000)
+        _age(_wt(hc_home, oldest), 3000)
+        _age(_wt(hc_home, newer), 2000)
+        _age(_wt(hc_home, busy), 5000)
+
+        usage = diskgc.usage(hc_home, SAMPLE_TEAM)
+        per_tree = usage["total_bytes"] // 4
+        _set_quota(hc_home, (usage["total_bytes"] - per_tree // 2) / 2**20)
+
+        result = diskgc.gc(hc_home, SAMPLE_TEAM)
+        assert [(r["task_id"], r["reason"]) for r in result["removed"]] == [(oldest["id"], "disk quota")]
+        assert _wt(hc_home, dirty).is_dir() and _wt(hc_home, busy).is_dir()
+        events = [e["content"] for e in get_task_activity(hc_home, SAMPLE_TEAM, oldest["id"])]
+        assert any("evicted" in e for e in events)
+
+    def test_evicted_worktree_is_restored_from_branch(self, hc_home, repo):
+        task = _task(hc_home, *IN_APPROVAL)
+        wt = _wt(hc_home, task)
+        commit(wt, {"feature.py": "print('hi')\n"}, "feature")
+        _age(wt, 3000)
+        _set_quota(hc_home, 0.001)
+        assert len(diskgc.gc(hc_home, SAMPLE_TEAM)["removed"]) == 1
+        assert not wt.exists()
+
+        change_status(hc_home, SAMPLE_TEAM, task["id"], "rejected")
+        cwd, paths = _resolve_workspace(hc_home, SAMPLE_TEAM, "alice", get_task(hc_home, SAMPLE_TEAM, task["id"]))
+        assert cwd == wt and paths == {"myrepo": wt}
+        assert (wt / "feature.py").read_text() == "print('hi')\n"
+
+
+class TestReporting:
+    def test_quota_config(self, hc_home):
+        assert get_disk_quota(hc_home, SAMPLE_TEAM) is None
+        _set_quota(hc_home, 10)
+        assert get_disk_quota(hc_home, SAMPLE_TEAM) == 10 * 2**20
+        _set_quota(hc_home, {"other": 5})
+        assert get_disk_quota(hc_home, SAMPLE_TEAM) is None
+
+    def test_disk_endpoint(self, hc_home, repo):
+        from fastapi.testclient import TestClient
+        from delegate.web import create_app
+
+        _task(hc_home, "in_progress")
+        data = TestClient(create_app(hc_home=hc_home)).get(f"/teams/{SAMPLE_TEAM}/disk").json()
+        assert data["repos"]["myrepo"]["worktrees"] == 1
+        assert data["repos"]["myrepo"]["tasks"] == data["total_bytes"] > 0
+        assert data["quota_bytes"] is None
+
+    def test_doctor_flags_team_over_quota(self, hc_home, repo):
+        from delegate.doctor import check_disk_usage
+
+        _task(hc_home, "in_progress")
+        [check] = check_disk_usage(hc_home)
+        assert check.passed and "myrepo" in check.message
+        _set_quota(hc_home, 0.001)
+        [check] = check_disk_usage(hc_home)
+        assert not check.passed and "over quota" in check.message
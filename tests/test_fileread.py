@@ -0,0 +1,99 @@
+"""Tests for delegate/fileread.py — bounded tails, heads, line ranges, listings."""
+
+from fastapi.testclient import TestClient
+
+from delegate import fileread
+from delegate.fileread import cached_listing, page_before, read_head_text, read_lines, read_tail
+from delegate.paths import agent_dir
+from delegate.web import create_app
+
+TEAM = "testteam"
+
+
+class TestTailAndHead:
+    def test_tail_drops_partial_utf8(self, tmp_path):
+        p = tmp_path / "f.txt"
+        p.write_text("aé" * 10)  # é is two bytes
+        text, truncated = read_tail(p, 3)
+        assert truncated
+        assert "�" not in text
+        assert text.endswith("é")
+
+    def test_tail_whole_small_file(self, tmp_path):
+        p = tmp_path / "f.txt"
+        p.write_text("short")
+        assert read_tail(p, 100) == ("short", False)
+
+    def test_head_drops_partial_utf8(self, tmp_path):
+        p = tmp_path / "f.txt"
+        p.write_text("é" * 10)
+        text, truncated = read_head_text(p, 5)
+        assert truncated and text == "éé"
+
+
+class TestReadLines:
+    def test_ranges_across_index_blocks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fileread, "LINE_INDEX_STRIDE", 7)
+        p = tmp_path / "f.txt"
+        p.write_text("".join(f"{i}\n" for i in range(100)) + "tail")
+
+        out = read_lines(p, 50, 3)
+        assert out == {"content": "50\n51\n52\n", "start_line": 50, "end_line": 53, "total_lines": 101}
+        assert read_lines(p, 99, 10)["content"] == "99\ntail"
+        assert read_lines(p, 500, 10)["content"] == ""
+
+    def test_index_refreshes_when_file_changes(self, tmp_path):
+        p = tmp_path / "f.txt"
+        p.write_text("a\nb\n")
+        assert read_lines(p, 0, 10)["total_lines"] == 2
+        p.write_text("a\nb\nc\n")
+        assert read_lines(p, 0, 10)["total_lines"] == 3
+
+    def test_empty_file(self, tmp_path):
+        p = tmp_path / "f.txt"
+        p.write_text("")
+        assert read_lines(p, 0, 10)["total_lines"] == 0
+
+
+class TestListing:
+    def test_cached_listing_and_paging(self, tmp_path):
+        for i in range(1, 6):
+            (tmp_path / f"T{i:04d}.md").write_text(str(i))
+        (tmp_path / "notes.txt").write_text("skip")
+
+        names = cached_listing(tmp_path, ".md")
+        assert names == [f"T{i:04d}.md" for i in range(1, 6)]
+
+        page, cursor = page_before(names, 2, None)
+        assert page == ["T0005.md", "T0004.md"] and cursor == "T0004.md"
+        page, cursor = page_before(names, 2, cursor)
+        assert page == ["T0003.md", "T0002.md"]
+        page, cursor = page_before(names, 2, cursor)
+        assert page == ["T0001.md"] and cursor is None
+
+        (tmp_path / "T0006.md").write_text("6")
+        assert cached_listing(tmp_path, ".md")[-1] == "T0006.md"
+
+    def test_missing_dir(self, tmp_path):
+        assert cached_listing(tmp_path / "nope") == []
+
+
+class TestJournalEndpoint:
+    def test_paginated_journal_tails(self, tmp_team):
+        journals = agent_dir(tmp_team, TEAM, "alice") / "journals"
+        journals.mkdir(parents=True, exist_ok=True)
+        for i in range(1, 4):
+            (journals / f"T{i:04d}.md").write_text(f"journal {i}")
+        (journals / "T0004.md").write_text("x" * 60 * 1024 + "END")
+
+        client = TestClient(create_app(hc_home=tmp_team))
+        data = client.get(f"/teams/{TEAM}/agents/alice/journal", params={"limit": 2}).json()
+        assert [e["filename"] for e in data["entries"]] == ["T0004.md", "T0003.md"]
+        assert data["entries"][0]["truncated"] and data["entries"][0]["content"].endswith("END")
+        assert len(data["entries"][0]["content"]) == 50 * 1024
+
+        rest = client.get(
+            f"/teams/{TEAM}/agents/alice/journal", params={"before": data["next_before"]},
+        ).json()
+        assert [e["filename"] for e in rest["entries"]] == ["T0002.md", "T0001.md"]
+        assert rest["next_before"] is None
@@ -115,7 +115,7 @@ class TestListSharedFiles:
         c = TestClient(app)
         resp = c.get(f"/teams/{TEAM}/files")
         assert resp.status_code == 200
-        assert resp.json() == {"files": []}
+        assert resp.json() == {"files": [], "total": 0, "next_offset": None}
 
 
 # ---------------------------------------------------------------------------
@@ -251,3 +251,32 @@ class TestReadSharedFile:
         )
         assert resp.status_code == 200
         assert "Shared Knowledge Base" in resp.json()["content"]
+
+    def test_read_line_range(self, shared_tree):
+        """start_line/line_count return just that slice plus the line total."""
+        from delegate.paths import shared_dir
+
+        big = shared_dir(shared_tree, TEAM) / "big.log"
+        big.write_text("".join(f"line {i}\n" for i in range(5000)))
+
+        c = TestClient(create_app(hc_home=shared_tree))
+        data = c.get(
+            f"/teams/{TEAM}/files/content",
+            params={"path": str(big), "start_line": 2500, "line_count": 3},
+        ).json()
+        assert data["content"] == "line 2500\nline 2501\nline 2502\n"
+        assert (data["start_line"], data["end_line"], data["total_lines"]) == (2500, 2503, 5000)
+        assert data["truncated"] is True
+
+    def test_read_tail_bytes(self, shared_tree):
+        from delegate.paths import shared_dir
+
+        log = shared_dir(shared_tree, TEAM) / "run.log"
+        log.write_text("x" * 1000 + "LAST")
+
+        c = TestClient(create_app(hc_home=shared_tree))
+        data = c.get(
+            f"/teams/{TEAM}/files/content", params={"path": str(log), "tail_bytes": 4},
+        ).json()
+        assert data["content"] == "LAST"
+        assert data["truncated"] is True
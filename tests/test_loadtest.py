@@ -0,0 +1,28 @@
+"""Smoke test for benchmarks/loadtest.py — synthetic daemon load harness."""
+
+import sqlite3
+
+from benchmarks import loadtest
+from delegate.task import list_tasks
+
+
+async def test_run_load_drives_daemon(tmp_path):
+    report = await loadtest.run_load(tmp_path, teams=1, agents=2, duration=4.0, interval=0.2)
+
+    assert report["turns"] > 0
+    assert report["transitions"] > 0
+    assert report["dispatch_latency_s"]["count"] > 0
+    assert report["db_write_ms"]["count"] > 0
+    assert report["loop_lag_ms"]["count"] > 0
+    # Tasks actually moved through the workflow.
+    assert any(t["status"] != "todo" for t in list_tasks(tmp_path, "lt00"))
+    # DB timing hook is removed afterwards.
+    assert sqlite3.connect is loadtest._real_connect()
+
+
+def test_summarize_counts_lock_waits():
+    m = loadtest.LoadMetrics(turns=10, db_write_ms=[1.0, 2.0, loadtest.LOCK_WAIT_THRESHOLD_MS + 5])
+    r = loadtest.summarize(m, 5.0, teams=1, agents=1, max_concurrent=1)
+    assert r["turns_per_s"] == 2.0
+    assert r["db_lock_waits"] == 1
+    assert r["db_write_ms"]["max"] == loadtest.LOCK_WAIT_THRESHOLD_MS + 5
@@ -15,6 +15,7 @@ from delegate.mailbox import (
     has_unread,
     count_unread,
     agents_with_unread,
+    unread_arrival_window,
     recent_processed,
     recent_conversation,
 )
@@ -235,6 +236,26 @@ class TestCountUnread:
         assert count_unread(tmp_team, TEAM, "bob") == 2
 
 
+class TestUnreadArrivalWindow:
+    def test_empty(self, tmp_team):
+        assert unread_arrival_window(tmp_team, TEAM) == {}
+
+    def test_first_and_last_delivery(self, tmp_team):
+        first = send(tmp_team, TEAM, "alice", "bob", "First")
+        send(tmp_team, TEAM, "alice", "bob", "Second")
+        last = send(tmp_team, TEAM, "manager", "bob", "Third")
+        window = unread_arrival_window(tmp_team, TEAM)
+        assert set(window) == {"bob"}
+        inbox = read_inbox(tmp_team, TEAM, "bob")
+        by_id = {m.id: m.delivered_at for m in inbox}
+        assert window["bob"] == (by_id[first], by_id[last])
+
+    def test_processed_messages_excluded(self, tmp_team):
+        msg_id = send(tmp_team, TEAM, "alice", "bob", "Hey")
+        mark_processed(tmp_team, TEAM, msg_id)
+        assert unread_arrival_window(tmp_team, TEAM) == {}
+
+
 class TestMessageEscaping:
     def test_commas_in_body(self, tmp_team):
         send(tmp_team, TEAM, "alice", "bob", "one, two, three")
@@ -0,0 +1,125 @@
+"""Tests for delegate/maintenance.py — scheduled git maintenance."""
+
+import shutil
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from delegate import maintenance
+from delegate.task import change_status
+
+from tests.gitutil import (
+    SAMPLE_TEAM, branch_names, git, make_feature_branch, make_in_approval_task,
+    register_repo_with_symlink, setup_git_repo,
+)
+
+
+@pytest.fixture
+def repo(hc_home, tmp_path):
+    repo = setup_git_repo(tmp_path)
+    register_repo_with_symlink(hc_home, "myrepo", repo)
+    return repo
+
+
+def _set_interval(hc_home, hours):
+    path = hc_home / "teams" / SAMPLE_TEAM / "repos.yaml"
+    data = yaml.safe_load(path.read_text())
+    data["myrepo"]["maintenance_interval_hours"] = hours
+    path.write_text(yaml.dump(data))
+
+
+class TestPruneLeftovers:
+    def test_removes_orphaned_merge_worktrees_and_branches(self, hc_home, repo, tmp_path):
+        merge_wt = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "_merge" / "abc123" / "T0001"
+        merge_wt.parent.mkdir(parents=True)
+        git(repo, "worktree", "add", "-q", "-b", "delegate/x/myteam/_merge/abc123/T0001", str(merge_wt))
+        git(repo, "branch", "delegate/x/myteam/_merge/def456/T0002")
+        git(repo, "branch", "delegate/x/otherteam/_merge/def456/T0003")  # not ours
+        git(repo, "branch", "delegate/x/myteam/T0004")  # a real task branch
+        gone = tmp_path / "gone"
+        git(repo, "worktree", "add", "-q", "--detach", str(gone))
+        shutil.rmtree(gone)  # leaves a dead admin dir
+
+        stats = maintenance.prune_leftovers(hc_home, SAMPLE_TEAM, "myrepo")
+        assert (stats["merge_worktrees"], stats["merge_branches"]) == (1, 2)
+        assert stats["admin_dirs"] == 1
+        assert not merge_wt.exists()
+        assert sorted(branch_names(repo)) == [
+            "delegate/x/myteam/T0004", "delegate/x/otherteam/_merge/def456/T0003", "main",
+        ]
+        assert all(s["ok"] for s in stats["steps"].values())
+
+    def test_removes_branch_left_by_crashed_squash_reapply(self, hc_home, repo):
+        from delegate import merge, merge_tree
+
+        branch = f"delegate/x/{SAMPLE_TEAM}/T0001"
+        make_feature_branch(repo, branch)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        with patch.object(merge.merge_tree, "rebase", return_value=merge_tree.Rebased("conflict")), \
+                patch.object(merge, "_needs_checkout", return_value=True), \
+                patch.object(merge, "_run_pre_merge", return_value=(False, "boom")), \
+                patch.object(merge, "_remove_temp_worktree"):  # the crash: no cleanup
+            assert merge.merge_task(hc_home, SAMPLE_TEAM, task["id"]).success is False
+        assert any("_merge" in b for b in branch_names(repo))
+
+        stats = maintenance.prune_leftovers(hc_home, SAMPLE_TEAM, "myrepo")
+        assert stats["merge_branches"] == 1
+        assert sorted(branch_names(repo)) == [branch, "main"]
+
+    def test_keeps_merge_branch_checked_out_elsewhere(self, hc_home, repo, tmp_path):
+        elsewhere = tmp_path / "elsewhere"
+        git(repo, "worktree", "add", "-q", "-b", "delegate/x/myteam/_merge/abc/T0001", str(elsewhere))
+        stats = maintenance.prune_leftovers(hc_home, SAMPLE_TEAM, "myrepo")
+        assert stats["merge_branches"] == 0
+        assert "delegate/x/myteam/_merge/abc/T0001" in branch_names(repo)
+
+
+class TestOptimize:
+    def test_packs_refs_and_records_run(self, hc_home, repo):
+        for n in range(5):
+            git(repo, "branch", f"delegate/x/myteam/T000{n}")
+
+        stats = maintenance.run(hc_home, SAMPLE_TEAM, "myrepo")
+        assert stats["loose_refs_before"] >= 6
+        assert stats["loose_refs_after"] == 0
+        assert set(stats["steps"]) >= {"pack_refs", "commit_graph", "repack"}
+        assert all(s["ok"] for s in stats["steps"].values())
+        assert (repo / ".git" / "objects" / "info" / "commit-graphs").is_dir()
+
+        last = maintenance.last_runs(hc_home, SAMPLE_TEAM)["myrepo"]
+        assert last["duration_s"] == stats["seconds"]
+        assert last["stats"]["loose_refs_after"] == 0
+
+    def test_missing_repo_is_skipped(self, hc_home):
+        assert "seconds" not in maintenance.run(hc_home, SAMPLE_TEAM, "nope")
+
+
+class TestSchedule:
+    def test_due_until_run_then_after_interval(self, hc_home, repo):
+        assert maintenance.due(hc_home, SAMPLE_TEAM) == ["myrepo"]
+        maintenance.run(hc_home, SAMPLE_TEAM, "myrepo")
+        assert maintenance.due(hc_home, SAMPLE_TEAM) == []
+
+        _set_interval(hc_home, 1e-9)
+        assert maintenance.due(hc_home, SAMPLE_TEAM) == ["myrepo"]
+
+    def test_zero_interval_disables(self, hc_home, repo):
+        _set_interval(hc_home, 0)
+        assert maintenance.due(hc_home, SAMPLE_TEAM) == []
+
+    def test_waits_while_a_task_is_merging(self, hc_home, repo):
+        task = make_in_approval_task(hc_home, branch="alice/x")
+        change_status(hc_home, SAMPLE_TEAM, task["id"], "merging")
+        assert maintenance.due(hc_home, SAMPLE_TEAM) == []
+
+
+class TestCli:
+    def test_repo_maintenance_command(self, hc_home, repo):
+        from click.testing import CliRunner
+        from delegate.cli import main
+
+        git(repo, "branch", "delegate/x/myteam/_merge/abc/T0001")
+        result = CliRunner().invoke(main, ["--home", str(hc_home), "repo", "maintenance", SAMPLE_TEAM])
+        assert result.exit_code == 0, result.output
+        assert "myrepo:" in result.output and "1 _merge branch(es)" in result.output
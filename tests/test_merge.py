@@ -27,78 +27,14 @@ from delegate.task import (
     get_task,
 )
 from delegate.config import (
-    add_repo, get_repo_approval, get_repo_test_cmd, update_repo_test_cmd, set_boss,
+    add_repo, get_repo_approval, get_repo_test_cmd, update_repo_test_cmd,
     get_pre_merge_script, set_pre_merge_script,
 )
 from delegate.merge import merge_task, merge_once, _run_pre_merge, _other_unmerged_tasks_on_branch, MergeResult, MergeFailureReason
-from delegate.bootstrap import bootstrap
 
-
-SAMPLE_TEAM = "myteam"
-
-
-@pytest.fixture
-def hc_home(tmp_path):
-    """Create a fully bootstrapped delegate home directory."""
-    hc = tmp_path / "hc_home"
-    hc.mkdir()
-    set_boss(hc, "nikhil")
-    bootstrap(hc, SAMPLE_TEAM, manager="edison", agents=["alice", "bob", ("sarah", "qa")])
-    return hc
-
-
-def _make_in_approval_task(hc_home, title="Task", repo="myrepo", branch="feature/test", merging=False, assignee="manager"):
-    """Helper: create a task and advance it to in_approval (or optionally merging) status.
-
-    Args:
-        merging: If True, advance to merging state (for direct merge_task calls).
-                 If False, stop at in_approval (for merge_once tests).
-        assignee: The assignee/DRI for the task (default: "manager").
-    """
-    task = create_task(hc_home, SAMPLE_TEAM, title=title, assignee=assignee)
-    update_task(hc_home, SAMPLE_TEAM, task["id"], repo=repo, branch=branch)
-    change_status(hc_home, SAMPLE_TEAM, task["id"], "in_progress")
-    change_status(hc_home, SAMPLE_TEAM, task["id"], "in_review")
-    change_status(hc_home, SAMPLE_TEAM, task["id"], "in_approval")
-    if merging:
-        change_status(hc_home, SAMPLE_TEAM, task["id"], "merging")
-    return get_task(hc_home, SAMPLE_TEAM, task["id"])
-
-
-def _setup_git_repo(tmp_path: Path) -> Path:
-    """Set up a local git repo with a main branch and initial commit.
-
-    Returns the repo path.
-    """
-    repo = tmp_path / "source_repo"
-    repo.mkdir()
-    subprocess.run(["git", "init", "-b", "main"], cwd=str(repo), capture_output=True, check=True)
-    subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=str(repo), capture_output=True)
-    subprocess.run(["git", "config", "user.name", "Test"], cwd=str(repo), capture_output=True)
-    (repo / "README.md").write_text("# Test repo\n")
-    subprocess.run(["git", "add", "."], cwd=str(repo), capture_output=True)
-    subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=str(repo), capture_output=True)
-    return repo
-
-
-def _make_feature_branch(repo: Path, branch: str, filename: str = "feature.py", content: str = "# New\n"):
-    """Create a feature branch with a single commit."""
-    subprocess.run(["git", "checkout", "-b", branch], cwd=str(repo), capture_output=True, check=True)
-    (repo / filename).write_text(content)
-    subprocess.run(["git", "add", "."], cwd=str(repo), capture_output=True)
-    subprocess.run(["git", "commit", "-m", f"Add {filename}"], cwd=str(repo), capture_output=True, check=True)
-    subprocess.run(["git", "checkout", "main"], cwd=str(repo), capture_output=True, check=True)
-
-
-def _register_repo_with_symlink(hc_home: Path, name: str, source_repo: Path):
-    """Register a repo by creating a symlink in hc_home/teams/<team>/repos/."""
-    from delegate.paths import repos_dir
-    rd = repos_dir(hc_home, SAMPLE_TEAM)
-    rd.mkdir(parents=True, exist_ok=True)
-    link = rd / name
-    if not link.exists():
-        link.symlink_to(source_repo)
-    add_repo(hc_home, SAMPLE_TEAM, name, str(source_repo), approval="auto")
+from tests.gitutil import (
+    SAMPLE_TEAM, make_feature_branch, make_in_approval_task, register_repo_with_symlink, setup_git_repo,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -108,11 +44,11 @@ def _register_repo_with_symlink(hc_home: Path, name: str, source_repo: Path):
 class TestMergeTask:
     def test_successful_merge(self, hc_home, tmp_path):
         """Full merge: rebase, skip-tests, ff-merge."""
-        repo = _setup_git_repo(tmp_path)
-        _make_feature_branch(repo, "alice/T0001")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        repo = setup_git_repo(tmp_path)
+        make_feature_branch(repo, "alice/T0001")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved")
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
@@ -131,19 +67,19 @@ class TestMergeTask:
 
     def test_rebase_conflict(self, hc_home, tmp_path):
         """True content conflict → rebase fails, squash-reapply also fails → SQUASH_CONFLICT."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
 
         # Create feature branch that modifies file.txt
-        _make_feature_branch(repo, "alice/T0001", filename="file.txt", content="feature version\n")
+        make_feature_branch(repo, "alice/T0001", filename="file.txt", content="feature version\n")
 
         # Now modify same file on main
         (repo / "file.txt").write_text("main version\n")
         subprocess.run(["git", "add", "."], cwd=str(repo), capture_output=True)
         subprocess.run(["git", "commit", "-m", "Diverge main"], cwd=str(repo), capture_output=True, check=True)
 
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
 
@@ -180,10 +116,10 @@ class TestMergeTask:
 
     def test_main_repo_untouched_when_user_on_other_branch(self, hc_home, tmp_path):
         """When the user is on a non-main branch, the working directory is untouched."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Switch user to a different branch so update-ref path is used
         subprocess.run(
@@ -194,7 +130,7 @@ class TestMergeTask:
         # Add a dirty file to the main repo
         (repo / "dirty_file.txt").write_text("user's uncommitted work\n")
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
         assert result.success is True, f"Merge failed: {result.message}"
 
@@ -211,15 +147,15 @@ class TestMergeTask:
 
     def test_dirty_main_checkout_blocks_merge(self, hc_home, tmp_path):
         """When user has main checked out with uncommitted changes, merge fails."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # User is on main (default after setup) — add dirty file
         (repo / "dirty_file.txt").write_text("user's uncommitted work\n")
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
 
@@ -233,13 +169,13 @@ class TestMergeTask:
 
     def test_clean_main_checkout_updates_working_tree(self, hc_home, tmp_path):
         """When user has main checked out cleanly, merge --ff-only updates the working tree."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch, filename="new_feature.py", content="# feature\n")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch, filename="new_feature.py", content="# feature\n")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # User is on main (default after setup) and repo is clean
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
         assert result.success is True, f"Merge failed: {result.message}"
 
@@ -257,10 +193,10 @@ class TestMergeTask:
     def test_other_branch_checkout_uses_ref_only(self, hc_home, tmp_path):
         """When user is on a different branch, update-ref advances main
         without checking out main or running merge --ff-only."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch, filename="new_feature.py", content="# feature\n")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch, filename="new_feature.py", content="# feature\n")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Switch user to a different branch
         subprocess.run(
@@ -268,7 +204,7 @@ class TestMergeTask:
             cwd=str(repo), capture_output=True, check=True,
         )
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
         assert result.success is True, f"Merge failed: {result.message}"
 
@@ -288,10 +224,10 @@ class TestMergeTask:
 
     def test_feature_branch_untouched_on_failure(self, hc_home, tmp_path):
         """On merge failure, the feature branch should remain at its original tip."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Advance main to create a rebase scenario
         (repo / "extra.txt").write_text("extra\n")
@@ -305,7 +241,7 @@ class TestMergeTask:
 
         set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", "false")  # Tests will fail
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
 
         assert result.success is False
@@ -319,10 +255,10 @@ class TestMergeTask:
 
     def test_agent_worktree_survives_failure(self, hc_home, tmp_path):
         """On failure, the agent's worktree should remain intact."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Create an agent worktree (simulating normal task work)
         wt_dir = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "myrepo"
@@ -336,7 +272,7 @@ class TestMergeTask:
 
         set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", "false")  # Force failure
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
 
         assert result.success is False
@@ -344,10 +280,10 @@ class TestMergeTask:
 
     def test_agent_worktree_removed_on_success(self, hc_home, tmp_path):
         """On success, the agent's worktree should be cleaned up."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Create an agent worktree
         wt_dir = hc_home / "teams" / SAMPLE_TEAM / "worktrees" / "myrepo"
@@ -359,7 +295,7 @@ class TestMergeTask:
         )
         assert wt_path.exists()
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
         assert result.success is True
 
@@ -368,14 +304,14 @@ class TestMergeTask:
 
     def test_temp_worktree_cleaned_up_on_failure(self, hc_home, tmp_path):
         """Temp merge worktree should be removed even on failure."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", "false")  # Force failure
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
 
         assert result.success is False
@@ -389,7 +325,7 @@ class TestMergeTask:
     def test_rebase_onto_with_base_sha(self, hc_home, tmp_path):
         """When base_sha is set on the task, rebase uses --onto to replay
         only the agent's commits (after base_sha) onto current main."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
 
         # Record the initial commit SHA — this will be our base_sha
         base_sha_result = subprocess.run(
@@ -400,7 +336,7 @@ class TestMergeTask:
 
         # Create a feature branch with one commit
         branch = "alice/T0001-onto"
-        _make_feature_branch(repo, branch, filename="onto_feature.py", content="# onto\n")
+        make_feature_branch(repo, branch, filename="onto_feature.py", content="# onto\n")
 
         # Advance main with a non-conflicting commit (simulates main moving forward)
         (repo / "mainfile.txt").write_text("main extra\n")
@@ -410,9 +346,9 @@ class TestMergeTask:
             cwd=str(repo), capture_output=True, check=True,
         )
 
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved", base_sha=base_sha)
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
@@ -430,12 +366,12 @@ class TestMergeTask:
 
     def test_rebase_fallback_without_base_sha(self, hc_home, tmp_path):
         """When base_sha is empty/None the merge falls back to plain rebase."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001-nobase"
-        _make_feature_branch(repo, branch, filename="nobase.py", content="# no base\n")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch, filename="nobase.py", content="# no base\n")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         # Explicitly set base_sha to empty string (simulating a task without it)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved", base_sha="")
 
@@ -454,7 +390,7 @@ class TestMergeTask:
         - main is then reset to M0 (M1, M2 are reverted)
         - rebase --onto main M2 branch replays only A1 onto M0
         """
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
 
         # M0 is the initial commit. Add M1 and M2.
         (repo / "m1.txt").write_text("m1\n")
@@ -495,9 +431,9 @@ class TestMergeTask:
         assert not (repo / "m1.txt").exists()
         assert not (repo / "m2.txt").exists()
 
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved", base_sha=base_sha)
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
@@ -541,10 +477,10 @@ class TestMergeBaseAndTip:
 
     def test_set_after_successful_merge(self, hc_home, tmp_path):
         """merge_base and merge_tip should be set after a successful merge."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Record main HEAD before merge (expected merge_base)
         pre_merge = subprocess.run(
@@ -553,7 +489,7 @@ class TestMergeBaseAndTip:
         )
         expected_base = pre_merge.stdout.strip()
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved")
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
@@ -571,12 +507,12 @@ class TestMergeBaseAndTip:
 
     def test_merge_base_tip_give_correct_diff(self, hc_home, tmp_path):
         """git diff merge_base..merge_tip should show exactly the merged changes."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch, filename="new_feature.py", content="# feature code\n")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch, filename="new_feature.py", content="# feature code\n")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved")
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
@@ -594,17 +530,17 @@ class TestMergeBaseAndTip:
 
     def test_not_set_on_failed_merge(self, hc_home, tmp_path):
         """merge_base and merge_tip should remain empty on failed merges."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
 
         # Create a conflicting scenario
-        _make_feature_branch(repo, "alice/T0001", filename="file.txt", content="feature\n")
+        make_feature_branch(repo, "alice/T0001", filename="file.txt", content="feature\n")
         (repo / "file.txt").write_text("main conflict\n")
         subprocess.run(["git", "add", "."], cwd=str(repo), capture_output=True)
         subprocess.run(["git", "commit", "-m", "Conflict on main"], cwd=str(repo), capture_output=True, check=True)
 
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
 
@@ -641,17 +577,17 @@ class TestMergeOnce:
     def test_skips_manual_unapproved(self, hc_home):
         """Manual approval tasks without approval_status='approved' are skipped."""
         add_repo(hc_home, SAMPLE_TEAM, "myrepo", "/fake", approval="manual")
-        _make_in_approval_task(hc_home, title="Unapproved")
+        make_in_approval_task(hc_home, title="Unapproved")
         results = merge_once(hc_home, SAMPLE_TEAM)
         assert results == []
 
     def test_auto_merge_processes(self, hc_home, tmp_path):
         """Auto approval tasks should be processed without boss approval."""
-        repo = _setup_git_repo(tmp_path)
-        _make_feature_branch(repo, "alice/T0001")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        repo = setup_git_repo(tmp_path)
+        make_feature_branch(repo, "alice/T0001")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        _make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001")
+        make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001")
 
         results = merge_once(hc_home, SAMPLE_TEAM)
         assert len(results) == 1
@@ -659,8 +595,8 @@ class TestMergeOnce:
 
     def test_manual_approved_processes(self, hc_home, tmp_path):
         """Manual tasks with an approved review should be processed."""
-        repo = _setup_git_repo(tmp_path)
-        _make_feature_branch(repo, "alice/T0001")
+        repo = setup_git_repo(tmp_path)
+        make_feature_branch(repo, "alice/T0001")
 
         from delegate.paths import repos_dir
         from delegate.review import get_current_review, set_verdict
@@ -669,7 +605,7 @@ class TestMergeOnce:
         (rd / "myrepo").symlink_to(repo)
         add_repo(hc_home, SAMPLE_TEAM, "myrepo", str(repo), approval="manual")
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001")
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001")
         # Approve via the reviews table (not the deprecated approval_status field)
         # change_status to in_approval already creates a review (attempt=1)
         review = get_current_review(hc_home, SAMPLE_TEAM, task["id"])
@@ -783,9 +719,9 @@ class TestRunPreMerge:
     def _setup_worktree(self, hc_home, tmp_path, branch="alice/T0001"):
         """Create a repo, feature branch, and a worktree at that branch.
         Returns (repo, wt_path)."""
-        repo = _setup_git_repo(tmp_path)
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        repo = setup_git_repo(tmp_path)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Create a worktree to simulate the merge worktree
         wt_path = tmp_path / "merge_wt"
@@ -832,14 +768,14 @@ class TestRunPreMerge:
 
     def test_merge_with_script_failure(self, hc_home, tmp_path):
         """merge_task should fail when pre-merge script fails."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", "false")
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
 
@@ -849,14 +785,14 @@ class TestRunPreMerge:
 
     def test_merge_with_script_success(self, hc_home, tmp_path):
         """merge_task should succeed when pre-merge script passes."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", "echo all-checks-pass")
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved")
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
@@ -891,9 +827,9 @@ class TestSharedBranchCleanup:
     def test_no_other_unmerged_when_all_merged(self, hc_home, tmp_path):
         """_other_unmerged_tasks_on_branch returns False when the only other
         task on the branch is already merged."""
-        repo = _setup_git_repo(tmp_path)
-        _make_feature_branch(repo, "shared/branch")
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        repo = setup_git_repo(tmp_path)
+        make_feature_branch(repo, "shared/branch")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         t1 = create_task(hc_home, SAMPLE_TEAM, title="Task 1", assignee="manager")
         t2 = create_task(hc_home, SAMPLE_TEAM, title="Task 2", assignee="manager")
@@ -926,14 +862,14 @@ class TestSharedBranchCleanup:
     def test_branch_kept_when_sibling_task_unmerged(self, hc_home, tmp_path):
         """Merging one task should NOT delete the branch when a sibling task
         on the same branch is still unmerged."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "shared/T0001-T0002"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
         # Create two tasks sharing the same branch
-        t1 = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
-        t2 = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        t1 = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        t2 = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, t1["id"], approval_status="approved")
         update_task(hc_home, SAMPLE_TEAM, t2["id"], approval_status="approved")
 
@@ -953,13 +889,13 @@ class TestSharedBranchCleanup:
 
     def test_branch_deleted_when_last_task_merged(self, hc_home, tmp_path):
         """Branch should be deleted after the last task on it is merged."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "shared/T0001-T0002"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        t1 = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
-        t2 = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        t1 = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        t2 = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, t1["id"], approval_status="approved")
         update_task(hc_home, SAMPLE_TEAM, t2["id"], approval_status="approved")
 
@@ -982,12 +918,12 @@ class TestSharedBranchCleanup:
 
     def test_single_task_branch_deleted_normally(self, hc_home, tmp_path):
         """When only one task uses a branch, cleanup proceeds normally."""
-        repo = _setup_git_repo(tmp_path)
+        repo = setup_git_repo(tmp_path)
         branch = "alice/T0001"
-        _make_feature_branch(repo, branch)
-        _register_repo_with_symlink(hc_home, "myrepo", repo)
+        make_feature_branch(repo, branch)
+        register_repo_with_symlink(hc_home, "myrepo", repo)
 
-        task = _make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch=branch, merging=True)
         update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved")
 
         result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
@@ -999,3 +935,123 @@ class TestSharedBranchCleanup:
             cwd=str(repo), capture_output=True, text=True,
         )
         assert branch not in branch_check.stdout
+
+
+# ---------------------------------------------------------------------------
+# Multi-repo merges: concurrent prepare, all-or-nothing commit
+# ---------------------------------------------------------------------------
+
+class TestMultiRepoMerge:
+    BRANCH = "alice/T0001"
+
+    def _setup(self, hc_home, tmp_path):
+        repos = {}
+        for name in ("repo1", "repo2"):
+            (tmp_path / name).mkdir()
+            repos[name] = setup_git_repo(tmp_path / name)
+            make_feature_branch(repos[name], self.BRANCH, filename=f"{name}.py")
+            register_repo_with_symlink(hc_home, name, repos[name])
+        task = make_in_approval_task(hc_home, repo=list(repos), branch=self.BRANCH, merging=True)
+        return task, repos
+
+    @staticmethod
+    def _main(repo):
+        return subprocess.run(
+            ["git", "rev-parse", "main"], cwd=str(repo), capture_output=True, text=True,
+        ).stdout.strip()
+
+    @staticmethod
+    def _branches(repo):
+        return subprocess.run(
+            ["git", "branch", "--format=%(refname:short)"], cwd=str(repo), capture_output=True, text=True,
+        ).stdout.split()
+
+    def test_repos_are_prepared_concurrently(self, hc_home, tmp_path):
+        import threading
+
+        task, repos = self._setup(hc_home, tmp_path)
+        both_running = threading.Barrier(2, timeout=10)
+
+        def pre_merge(wt_dir, **kwargs):
+            both_running.wait()  # raises BrokenBarrierError if run one after the other
+            return True, "ok"
+
+        with patch("delegate.merge._run_pre_merge", side_effect=pre_merge), \
+                patch("delegate.merge._needs_checkout", return_value=True):
+            result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert result.success is True, result.message
+        merged = get_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert set(merged["merge_tip"]) == {"repo1", "repo2"}
+
+    def test_failed_checks_in_one_repo_merge_nothing(self, hc_home, tmp_path):
+        task, repos = self._setup(hc_home, tmp_path)
+        before = {name: self._main(repo) for name, repo in repos.items()}
+
+        def pre_merge(wt_dir, *, repo_name, **kwargs):
+            return (False, "boom") if repo_name == "repo2" else (True, "ok")
+
+        with patch("delegate.merge._run_pre_merge", side_effect=pre_merge), \
+                patch("delegate.merge._needs_checkout", return_value=True):
+            result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert result.success is False
+        assert result.reason == MergeFailureReason.PRE_MERGE_FAILED
+        assert {name: self._main(repo) for name, repo in repos.items()} == before
+        for repo in repos.values():
+            assert not any("_merge" in b for b in self._branches(repo))
+            assert self.BRANCH in self._branches(repo)
+
+    def test_exception_in_one_repo_cleans_up_the_others(self, hc_home, tmp_path):
+        task, repos = self._setup(hc_home, tmp_path)
+        before = {name: self._main(repo) for name, repo in repos.items()}
+
+        def pre_merge(wt_dir, *, repo_name, **kwargs):
+            if repo_name == "repo2":
+                raise subprocess.TimeoutExpired("pytest", 10)
+            return True, "ok"
+
+        with patch("delegate.merge._run_pre_merge", side_effect=pre_merge), \
+                patch("delegate.merge._needs_checkout", return_value=True):
+            result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert result.success is False
+        assert result.reason == MergeFailureReason.WORKTREE_ERROR
+        assert "repo2" in result.message
+        assert {name: self._main(repo) for name, repo in repos.items()} == before
+        assert not any("_merge" in b for b in self._branches(repos["repo1"]))
+        worktrees = subprocess.run(
+            ["git", "worktree", "list"], cwd=str(repos["repo1"]), capture_output=True, text=True,
+        ).stdout
+        assert "_merge" not in worktrees
+
+    def test_dirty_main_in_one_repo_blocks_all(self, hc_home, tmp_path):
+        task, repos = self._setup(hc_home, tmp_path)
+        before = self._main(repos["repo1"])
+        (repos["repo2"] / "README.md").write_text("local edit\n")
+
+        result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
+        assert result.success is False
+        assert result.reason == MergeFailureReason.DIRTY_MAIN
+        assert self._main(repos["repo1"]) == before
+
+    def test_late_ff_failure_rolls_back_earlier_repos(self, hc_home, tmp_path):
+        from delegate import merge as merge_mod
+        from delegate.chat import get_task_activity
+
+        task, repos = self._setup(hc_home, tmp_path)
+        before = self._main(repos["repo1"])
+        real_ff = merge_mod._ff_merge
+
+        def ff(repo_dir, branch):
+            if repo_dir == str(repos["repo2"].resolve()):
+                return False, "Atomic update-ref failed (concurrent push?): lock"
+            return real_ff(repo_dir, branch)
+
+        with patch("delegate.merge._ff_merge", side_effect=ff):
+            result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
+        assert result.success is False
+        assert result.reason == MergeFailureReason.UPDATE_REF_FAILED
+        assert "rolled back main in repo1" in result.message
+        assert self._main(repos["repo1"]) == before
+        # repo1 has main checked out: its working tree followed the rollback
+        assert not (repos["repo1"] / "repo1.py").exists()
+        events = [e["content"] for e in get_task_activity(hc_home, SAMPLE_TEAM, task["id"])]
+        assert any("rolled back" in e for e in events)
@@ -0,0 +1,161 @@
+"""Tests for delegate/merge_tree.py — checkout-free rebase and squash."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from delegate import merge_tree
+from delegate.task import update_task
+from delegate.merge import merge_task, MergeFailureReason
+
+from tests.gitutil import (
+    SAMPLE_TEAM, commit, git, make_in_approval_task, register_repo_with_symlink, setup_git_repo,
+)
+
+pytestmark = pytest.mark.skipif(not merge_tree.has_merge_tree(), reason="needs git >= 2.38")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = setup_git_repo(tmp_path)
+    git(repo, "branch", "feature")
+    return repo
+
+
+class TestMergeTrees:
+    def test_clean(self, repo):
+        commit(repo, {"a.txt": "a\n"}, branch="feature")
+        commit(repo, {"b.txt": "b\n"})
+        merged = merge_tree.merge_trees(str(repo), "main", "feature")
+        assert merged.clean
+        assert "a.txt" in git(repo, "ls-tree", "--name-only", merged.tree)
+
+    def test_conflict_lists_paths(self, repo):
+        commit(repo, {"x.txt": "feature\n"}, branch="feature")
+        commit(repo, {"x.txt": "main\n"})
+        merged = merge_tree.merge_trees(str(repo), "main", "feature")
+        assert not merged.clean
+        assert merged.conflicts == ["x.txt"]
+        assert "CONFLICT" in merged.messages
+
+
+class TestRebase:
+    def test_already_on_main(self, repo):
+        tip = commit(repo, {"a.txt": "a\n"}, branch="feature")
+        assert merge_tree.rebase(str(repo), "feature").tip == tip
+
+    def test_conflict_detected_without_worktree(self, repo):
+        commit(repo, {"x.txt": "feature\n"}, branch="feature")
+        commit(repo, {"x.txt": "main\n"})
+        before = git(repo, "worktree", "list")
+        rebased = merge_tree.rebase(str(repo), "feature")
+        assert rebased.status == "conflict"
+        assert git(repo, "worktree", "list") == before
+
+    def test_single_commit(self, repo):
+        commit(repo, {"a.txt": "a\n"}, "Edit a.txt", branch="feature")
+        commit(repo, {"b.txt": "b\n"})
+        rebased = merge_tree.rebase(str(repo), "feature")
+        assert rebased.ok
+        assert git(repo, "rev-parse", f"{rebased.tip}^") == git(repo, "rev-parse", "main")
+        assert git(repo, "log", "-1", "--format=%s %an", rebased.tip) == "Edit a.txt Test"
+        assert git(repo, "show", f"{rebased.tip}:b.txt") == "b"
+
+    def test_several_commits(self, repo):
+        commit(repo, {"a.txt": "a\n"}, branch="feature")
+        commit(repo, {"a.txt": "aa\n"}, branch="feature")
+        commit(repo, {"b.txt": "b\n"})
+        rebased = merge_tree.rebase(str(repo), "feature")
+        if merge_tree.git_version() < merge_tree.MERGE_BASE_OPTION_VERSION:
+            assert rebased.status == "unsupported"
+            return
+        assert rebased.ok
+        assert git(repo, "rev-list", "--count", f"main..{rebased.tip}") == "2"
+        assert git(repo, "show", f"{rebased.tip}:a.txt") == "aa"
+
+    def test_base_not_on_main_is_replayed(self, repo):
+        base = commit(repo, {"m.txt": "m\n"})
+        git(repo, "branch", "-f", "feature", "main")
+        tip = commit(repo, {"a.txt": "a\n"}, branch="feature")
+        git(repo, "reset", "-q", "--hard", "HEAD~1")  # main drops m.txt
+        rebased = merge_tree.rebase(str(repo), "feature", base=base)
+        if rebased.status == "unsupported":
+            return
+        assert rebased.tip != tip
+        files = git(repo, "ls-tree", "--name-only", rebased.tip).split()
+        assert "a.txt" in files and "m.txt" not in files
+
+
+class TestTimeouts:
+    def test_timeout_is_unsupported(self, repo):
+        commit(repo, {"a.txt": "a\n"}, branch="feature")
+        commit(repo, {"b.txt": "b\n"})
+        with patch.object(merge_tree, "_git", side_effect=subprocess.TimeoutExpired("git", 120)):
+            for result in (merge_tree.rebase(str(repo), "feature"), merge_tree.squash(str(repo), "feature")):
+                assert result.status == "unsupported"
+                assert "timed out" in result.output
+
+
+class TestSquash:
+    def test_single_commit_on_main(self, repo):
+        commit(repo, {"a.txt": "a\n"}, branch="feature")
+        commit(repo, {"c.txt": "c\n"}, branch="feature")
+        main = commit(repo, {"b.txt": "b\n"})
+        squashed = merge_tree.squash(str(repo), "feature")
+        assert squashed.ok
+        assert git(repo, "rev-parse", f"{squashed.tip}^") == main
+        files = git(repo, "ls-tree", "--name-only", squashed.tip).split()
+        assert {"a.txt", "b.txt", "c.txt"} <= set(files)
+        assert git(repo, "rev-parse", "main") == main  # no ref moved
+
+    def test_no_changes(self, repo):
+        squashed = merge_tree.squash(str(repo), "feature")
+        assert squashed.tip == git(repo, "rev-parse", "main")
+
+
+class TestMergeTaskCheckoutFree:
+    def test_conflict_never_creates_a_worktree(self, hc_home, tmp_path):
+        repo = setup_git_repo(tmp_path)
+        fork = git(repo, "rev-parse", "main")
+        git(repo, "branch", "alice/T0001")
+        commit(repo, {"file.txt": "feature\n"}, branch="alice/T0001")
+        commit(repo, {"file.txt": "main\n"})
+        register_repo_with_symlink(hc_home, "myrepo", repo)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+        update_task(hc_home, SAMPLE_TEAM, task["id"], base_sha={"myrepo": fork})
+
+        with patch("delegate.merge._add_worktree") as add_worktree, \
+                patch("delegate.merge._create_temp_worktree") as create_temp:
+            result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert result.reason == MergeFailureReason.SQUASH_CONFLICT
+        assert "file.txt" in result.conflict_context
+        add_worktree.assert_not_called()
+        create_temp.assert_not_called()
+
+    def test_commits_already_on_main_are_dropped(self, hc_home, tmp_path):
+        repo = setup_git_repo(tmp_path)
+        git(repo, "branch", "alice/T0001")
+        commit(repo, {"file.txt": "one\n"}, branch="alice/T0001")
+        commit(repo, {"file.txt": "two\n"}, branch="alice/T0001")
+        commit(repo, {"file.txt": "one\n"})  # conflicts with the first commit only
+        register_repo_with_symlink(hc_home, "myrepo", repo)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+
+        result = merge_task(hc_home, SAMPLE_TEAM, task["id"], skip_tests=True)
+        assert result.success, result.message
+        assert git(repo, "show", "main:file.txt") == "two"
+
+    def test_no_checks_means_no_checkout(self, hc_home, tmp_path):
+        repo = setup_git_repo(tmp_path)
+        git(repo, "branch", "alice/T0001")
+        commit(repo, {"a.txt": "a\n"}, branch="alice/T0001")
+        register_repo_with_symlink(hc_home, "myrepo", repo)
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+        update_task(hc_home, SAMPLE_TEAM, task["id"], approval_status="approved")
+
+        with patch("delegate.merge._run_pre_merge") as run_pre_merge:
+            result = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert result.success, result.message
+        run_pre_merge.assert_not_called()
+        assert git(repo, "show", "main:a.txt") == "a"
@@ -12,7 +12,10 @@ from unittest.mock import patch
 import pytest
 
 from delegate.mailbox import deliver, Message, agents_with_unread, mark_processed, read_inbox
-from delegate.runtime import list_ai_agents, run_turn
+from delegate.runtime import (
+    list_ai_agents, run_turn, run_reflection,
+    queue_reflection, pending_reflections, discard_reflection,
+)
 
 TEAM = "testteam"
 
@@ -189,9 +192,9 @@ class TestRunTurn:
         )
 
         from delegate.paths import agent_dir
-        logs_dir = agent_dir(tmp_team, TEAM, "alice") / "logs"
-        worklogs = list(logs_dir.glob("*.worklog.md"))
-        assert len(worklogs) >= 1
+        from delegate.worklog import list_entries
+        entries, _ = list_entries(agent_dir(tmp_team, TEAM, "alice"))
+        assert len(entries) >= 1
 
     @patch("delegate.runtime.random.random", return_value=1.0)
     def test_session_created_in_db(self, _mock_rng, tmp_team):
@@ -244,8 +247,8 @@ class TestRunTurn:
         assert result.cache_write == 10
 
     @patch("delegate.runtime.random.random", return_value=0.0)  # always reflect
-    def test_reflection_turn_runs_when_due(self, _mock_rng, tmp_team):
-        """When reflection coin-flip lands, a second turn runs without marking mail."""
+    def test_reflection_queued_not_run_inline(self, _mock_rng, tmp_team):
+        """When the reflection coin-flip lands, the reflection is queued, not run inline."""
         _deliver_msg(tmp_team, "alice", body="Work on this")
 
         result = asyncio.run(
@@ -256,13 +259,96 @@ class TestRunTurn:
             )
         )
 
-        assert result.turns == 2
-        # Tokens should be doubled (100 in + 100 in for reflection)
-        assert result.tokens_in == 200
-        assert result.tokens_out == 100
-        # Cache tokens should also be doubled
-        assert result.cache_read == 40
-        assert result.cache_write == 20
+        assert result.turns == 1
+        assert result.reflection_queued
+        assert result.tokens_in == 100
+        assert "alice" in pending_reflections(TEAM)
+        discard_reflection(TEAM, "alice")
+
+    @patch("delegate.runtime.random.random", return_value=0.0)
+    def test_reflection_probability_from_state(self, _mock_rng, tmp_team):
+        """reflection_probability in state.yaml overrides the default."""
+        import yaml
+        from delegate.paths import agent_dir
+        state_path = agent_dir(tmp_team, TEAM, "alice") / "state.yaml"
+        state = yaml.safe_load(state_path.read_text()) or {}
+        state["reflection_probability"] = 0
+        state_path.write_text(yaml.dump(state))
+        _deliver_msg(tmp_team, "alice", body="Work on this")
+
+        result = asyncio.run(
+            run_turn(
+                tmp_team, TEAM, "alice",
+                sdk_query=_mock_query,
+                sdk_options_class=_FakeOptions,
+            )
+        )
+
+        assert not result.reflection_queued
+        assert "alice" not in pending_reflections(TEAM)
+
+    def test_run_reflection_records_separate_session(self, tmp_team):
+        """run_reflection uses its own 'reflection' session and dequeues the agent."""
+        from delegate.chat import get_agent_stats
+        from delegate.db import get_connection
+
+        queue_reflection(TEAM, "alice")
+        result = asyncio.run(
+            run_reflection(
+                tmp_team, TEAM, "alice",
+                sdk_query=_mock_query,
+                sdk_options_class=_FakeOptions,
+            )
+        )
+
+        assert result.error is None
+        assert result.tokens_in == 100
+        assert "alice" not in pending_reflections(TEAM)
+
+        conn = get_connection(tmp_team, TEAM)
+        row = conn.execute(
+            "SELECT kind, cost_usd FROM sessions WHERE id = ?", (result.session_id,),
+        ).fetchone()
+        conn.close()
+        assert row["kind"] == "reflection"
+        assert row["cost_usd"] == pytest.approx(0.01)
+
+        stats = get_agent_stats(tmp_team, TEAM, "alice")
+        assert stats["reflection_cost_usd"] == pytest.approx(0.01)
+
+    def test_run_reflection_setup_failure_closes_session(self, tmp_team):
+        """A failure before the SDK call still ends the session and resets log_caller."""
+        from delegate.db import get_connection
+        from delegate.logging_setup import log_caller
+
+        before = log_caller.get()
+        with patch("delegate.runtime.build_reflection_message", side_effect=OSError("disk gone")):
+            result = asyncio.run(
+                run_reflection(
+                    tmp_team, TEAM, "alice",
+                    sdk_query=_mock_query,
+                    sdk_options_class=_FakeOptions,
+                )
+            )
+
+        assert result.error == "disk gone"
+        assert log_caller.get() == before
+        conn = get_connection(tmp_team, TEAM)
+        row = conn.execute("SELECT ended_at FROM sessions WHERE id = ?", (result.session_id,)).fetchone()
+        conn.close()
+        assert row["ended_at"] is not None
+
+    def test_run_reflection_leaves_inbox_untouched(self, tmp_team):
+        """A reflection never reads or marks inbox messages."""
+        _deliver_msg(tmp_team, "alice", body="Pending")
+        asyncio.run(
+            run_reflection(
+                tmp_team, TEAM, "alice",
+                sdk_query=_mock_query,
+                sdk_options_class=_FakeOptions,
+            )
+        )
+        assert "alice" in agents_with_unread(tmp_team, TEAM)
 
     @patch("delegate.runtime.random.random", return_value=1.0)
     def test_batch_same_task_id(self, _mock_rng, tmp_team):
@@ -0,0 +1,132 @@
+"""Tests for delegate/refs.py — cached per-repo ref snapshots."""
+
+import os
+import time
+
+import pytest
+
+from delegate import merge_tree, refs
+from delegate.task import create_task, update_task, get_task_commit_diffs
+
+from tests.gitutil import SAMPLE_TEAM, commit, git, register_repo_with_symlink, setup_git_repo
+
+
+def _age_refs(repo):
+    """Backdate ref mtimes so the snapshot is allowed to cache them."""
+    past = time.time() - 60
+    git_dir = repo / ".git"
+    for dirpath, _dirs, _files in os.walk(git_dir / "refs" / "heads"):
+        os.utime(dirpath, (past, past))
+    if (git_dir / "packed-refs").exists():
+        os.utime(git_dir / "packed-refs", (past, past))
+
+
+@pytest.fixture
+def repo(hc_home, tmp_path):
+    repo = setup_git_repo(tmp_path)
+    register_repo_with_symlink(hc_home, "myrepo", repo)
+    refs._snapshots.clear()
+    return repo
+
+
+class TestSnapshot:
+    def test_tips_and_ahead_behind(self, repo):
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+        git(repo, "branch", "feature/other")  # not a delegate branch
+        commit(repo, {"a.py": "x\n"}, branch="delegate/abc/myteam/T0001")
+        commit(repo, {"b.py": "x\n"}, branch="delegate/abc/myteam/T0001")
+        commit(repo, {"c.py": "x\n"})
+
+        snap = refs.snapshot(repo)
+        tip = git(repo, "rev-parse", "delegate/abc/myteam/T0001")
+        assert snap.main == git(repo, "rev-parse", "main")
+        assert list(snap.branches) == ["delegate/abc/myteam/T0001"]
+        ref = snap.branches["delegate/abc/myteam/T0001"]
+        assert (ref.sha, ref.ahead, ref.behind) == (tip, 2, 1)
+        assert ref.committed_at[:4].isdigit()
+
+    def test_cached_until_refs_change(self, repo, monkeypatch):
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+        _age_refs(repo)
+        first = refs.snapshot(repo)
+
+        calls = []
+        real_git = refs._git
+        monkeypatch.setattr(refs, "_git", lambda args, cwd: (calls.append(args), real_git(args, cwd))[1])
+        assert refs.snapshot(repo) is first
+        assert calls == []
+
+        commit(repo, {"a.py": "x\n"}, branch="delegate/abc/myteam/T0001")
+        second = refs.snapshot(repo)
+        assert second is not first
+        assert second.branches["delegate/abc/myteam/T0001"].ahead == 1
+
+    def test_fresh_refs_are_not_cached(self, repo):
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+        first = refs.snapshot(repo)
+        assert refs.snapshot(repo) is not first
+
+    def test_old_git_counts_are_memoized(self, repo, monkeypatch):
+        monkeypatch.setattr(merge_tree, "git_version", lambda: (2, 39))
+        refs._counts.clear()
+        for n in (1, 2):
+            git(repo, "branch", f"delegate/abc/myteam/T000{n}")
+            commit(repo, {f"f{n}.py": "x\n"}, branch=f"delegate/abc/myteam/T000{n}")
+        refs.snapshot(repo)
+        assert len(refs._counts) == 2
+
+        commit(repo, {"g.py": "x\n"}, branch="delegate/abc/myteam/T0001")
+        refs.snapshot(repo)
+        assert len(refs._counts) == 3  # only the moved branch was recounted
+
+    def test_has_commits_since(self, repo):
+        base = git(repo, "rev-parse", "main")
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+        assert refs.has_commits_since(repo, "delegate/abc/myteam/T0001", base) is False
+        commit(repo, {"a.py": "x\n"}, branch="delegate/abc/myteam/T0001")
+        assert refs.has_commits_since(repo, "delegate/abc/myteam/T0001", base) is True
+        assert refs.has_commits_since(repo, "delegate/abc/myteam/T0099", base) is None
+
+
+class TestBoard:
+    def test_board_maps_tasks(self, hc_home, repo):
+        task = create_task(hc_home, SAMPLE_TEAM, title="Board", assignee="alice")
+        update_task(hc_home, SAMPLE_TEAM, task["id"], repo="myrepo", branch="delegate/abc/myteam/T0001")
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+        commit(repo, {"a.py": "x\n"}, branch="delegate/abc/myteam/T0001")
+
+        board = refs.board(hc_home, SAMPLE_TEAM)
+        assert "delegate/abc/myteam/T0001" in board["repos"]["myrepo"]["branches"]
+        entry = board["tasks"][task["id"]]["myrepo"]
+        assert entry["branch"] == "delegate/abc/myteam/T0001"
+        assert entry["ahead"] == 1 and entry["behind"] == 0
+
+    def test_refs_endpoint(self, hc_home, repo):
+        from fastapi.testclient import TestClient
+        from delegate.web import create_app
+
+        task = create_task(hc_home, SAMPLE_TEAM, title="Board", assignee="alice")
+        update_task(hc_home, SAMPLE_TEAM, task["id"], repo="myrepo", branch="delegate/abc/myteam/T0001")
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+
+        data = TestClient(create_app(hc_home=hc_home)).get(f"/teams/{SAMPLE_TEAM}/refs").json()
+        assert data["tasks"][str(task["id"])]["myrepo"]["ahead"] == 0
+
+
+class TestCommitDiffs:
+    def test_one_log_for_all_commits(self, hc_home, repo):
+        base = git(repo, "rev-parse", "main")
+        task = create_task(hc_home, SAMPLE_TEAM, title="Diffs", assignee="alice")
+        update_task(
+            hc_home, SAMPLE_TEAM, task["id"], repo="myrepo",
+            branch="delegate/abc/myteam/T0001", base_sha={"myrepo": base},
+        )
+        git(repo, "branch", "delegate/abc/myteam/T0001")
+        assert get_task_commit_diffs(hc_home, SAMPLE_TEAM, task["id"]) == {}
+
+        commit(repo, {"a.py": "print('a')\n"}, "first change", branch="delegate/abc/myteam/T0001")
+        commit(repo, {"b.py": "print('b')\n"}, "second change", branch="delegate/abc/myteam/T0001")
+        commits = get_task_commit_diffs(hc_home, SAMPLE_TEAM, task["id"])["myrepo"]
+        assert [c["message"] for c in commits] == ["first change", "second change"]
+        assert commits[0]["diff"].startswith("diff --git a/a.py b/a.py")
+        assert "+print('b')" in commits[1]["diff"] and "a.py" not in commits[1]["diff"]
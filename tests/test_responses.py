@@ -0,0 +1,172 @@
+"""Tests for delegate/responses.py — JSON rendering, compression, Server-Timing."""
+
+import gzip
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+import delegate.changes
+import delegate.web
+from delegate import responses
+from delegate.responses import dumps, negotiate_encoding
+from delegate.task import create_task
+from delegate.web import create_app
+
+TEAM = "testteam"
+
+
+class TestDumps:
+    def test_compact_utf8(self):
+        assert dumps({"a": [1, "é"]}) == '{"a":[1,"é"]}'.encode()
+
+    def test_falls_back_to_jsonable_encoder(self, tmp_path):
+        assert json.loads(dumps({"p": tmp_path})) == {"p": str(tmp_path)}
+
+
+class TestNegotiate:
+    def test_gzip(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+
+    def test_none(self):
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding("gzip;q=0") is None
+
+    def test_brotli_preferred_only_when_installed(self, monkeypatch):
+        monkeypatch.setattr(responses, "brotli", object())
+        assert negotiate_encoding("gzip, br") == "br"
+        monkeypatch.setattr(responses, "brotli", None)
+        assert negotiate_encoding("gzip, br") == "gzip"
+
+
+class TestMiddleware:
+    def _client(self, tmp_team):
+        for i in range(30):
+            create_task(tmp_team, TEAM, title=f"Task number {i} " + "x" * 40, assignee="alice")
+        return TestClient(create_app(hc_home=tmp_team))
+
+    def test_large_json_is_gzipped(self, tmp_team):
+        client = self._client(tmp_team)
+        resp = client.get(f"/teams/{TEAM}/tasks", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["vary"]
+        assert len(resp.json()) == 30  # httpx decodes transparently
+        raw_len = int(resp.headers["content-length"])
+        assert raw_len < len(json.dumps(resp.json()))
+
+    def test_identity_when_not_accepted(self, tmp_team):
+        client = self._client(tmp_team)
+        resp = client.get(f"/teams/{TEAM}/tasks", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers
+
+    def test_small_responses_not_compressed(self, tmp_team):
+        client = TestClient(create_app(hc_home=tmp_team))
+        resp = client.get("/config", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in resp.headers
+
+    def test_server_timing_header(self, tmp_team):
+        client = self._client(tmp_team)
+        resp = client.get(f"/teams/{TEAM}/tasks", headers={"Accept-Encoding": "gzip"})
+        timing = resp.headers["server-timing"]
+        names = {part.split(";")[0].strip() for part in timing.split(",")}
+        assert {"app", "serialize", "handler", "compress"} <= names
+
+    def test_gzip_body_roundtrip(self):
+        body = b'{"k":"' + b"v" * 5000 + b'"}'
+        assert gzip.decompress(responses._compress(body, "gzip")) == body
+
+
+class TestConditionalGet:
+    def _client(self, tmp_team):
+        responses.reset_etag_stats()
+        return TestClient(create_app(hc_home=tmp_team))
+
+    def test_tasks_304_until_a_change(self, tmp_team):
+        client = self._client(tmp_team)
+        create_task(tmp_team, TEAM, title="A", assignee="alice")
+        first = client.get(f"/teams/{TEAM}/tasks")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        again = client.get(f"/teams/{TEAM}/tasks", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+
+        create_task(tmp_team, TEAM, title="B", assignee="bob")
+        changed = client.get(f"/teams/{TEAM}/tasks", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert len(changed.json()) == 2
+        assert changed.headers["etag"] != etag
+
+    def test_filters_get_distinct_tags(self, tmp_team):
+        client = self._client(tmp_team)
+        create_task(tmp_team, TEAM, title="A", assignee="alice")
+        everything = client.get(f"/teams/{TEAM}/tasks").headers["etag"]
+        filtered = client.get(f"/teams/{TEAM}/tasks", params={"assignee": "bob"}).headers["etag"]
+        assert everything != filtered
+
+    def test_unchanged_tasks_skip_the_query(self, tmp_team, monkeypatch):
+        client = self._client(tmp_team)
+        etag = client.get(f"/teams/{TEAM}/tasks").headers["etag"]
+
+        def boom(*args, **kwargs):
+            raise AssertionError("should not hit SQLite")
+
+        monkeypatch.setattr(delegate.web, "_list_tasks", boom)
+        monkeypatch.setattr(delegate.changes, "head_seq", boom)
+        resp = client.get(f"/teams/{TEAM}/tasks", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+    def test_agents_tag_follows_roster(self, tmp_team):
+        client = self._client(tmp_team)
+        etag = client.get(f"/teams/{TEAM}/agents").headers["etag"]
+        assert client.get(f"/teams/{TEAM}/agents", headers={"If-None-Match": etag}).status_code == 304
+
+        state = tmp_team / "teams" / TEAM / "agents" / "alice" / "state.yaml"
+        state.write_text(state.read_text() + "\n# touched\n")
+        st = state.stat()
+        os.utime(state, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert client.get(f"/teams/{TEAM}/agents", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_uploads_are_conditional(self, tmp_team):
+        client = self._client(tmp_team)
+        upload_dir = tmp_team / "teams" / TEAM / "uploads" / "2026" / "02"
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "notes.txt").write_text("hello")
+        url = f"/teams/{TEAM}/uploads/2026/02/notes.txt"
+
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert responses.etag_stats()["uploads"]["hits"] == 1
+
+    def test_hit_rates_are_reported(self, tmp_team):
+        client = self._client(tmp_team)
+        etag = client.get(f"/teams/{TEAM}/tasks").headers["etag"]
+        client.get(f"/teams/{TEAM}/tasks", headers={"If-None-Match": etag})
+        client.get(f"/teams/{TEAM}/tasks", headers={"If-None-Match": etag})
+        stats = client.get("/stats/etag").json()["endpoints"]["tasks"]
+        assert stats == {"hits": 2, "misses": 1, "hit_rate": 0.667}
+
+    def test_etag_matching(self):
+        assert responses.etag_matches('"abc"', 'W/"abc"')
+        assert responses.etag_matches('W/"x", W/"abc"', 'W/"abc"')
+        assert responses.etag_matches("*", 'W/"abc"')
+        assert not responses.etag_matches('"abd"', 'W/"abc"')
+        assert not responses.etag_matches("", 'W/"abc"')
+
+
+async def test_middleware_flushes_headers_before_pathsend():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.pathsend", "path": "/tmp/x"})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")], "extensions": {"http.response.pathsend": {}}}
+    await responses.ResponseMiddleware(app)(scope, None, send)
+    assert [m["type"] for m in sent] == ["http.response.start", "http.response.pathsend"]
@@ -1,8 +1,10 @@
 """Tests for runtime._select_batch message batching logic."""
 
+from datetime import datetime, timezone
+
 import pytest
 from delegate.mailbox import Message
-from delegate.runtime import _select_batch
+from delegate.runtime import _select_batch, _inbox_settled
 
 
 class TestSelectBatch:
@@ -65,3 +67,77 @@ class TestSelectBatch:
         batch = _select_batch(msgs)
         assert len(batch) == 1
         assert batch[0].task_id is None
+
+    def test_token_budget_limits_batch(self):
+        """Batch stops before the message that would exceed the token budget."""
+        msgs = [
+            Message(sender="alice", recipient="bob", time=f"2026-02-11T10:0{i}:00Z", body="x" * 400, task_id=1)
+            for i in range(10)
+        ]
+        # Each message is ~116 estimated tokens.
+        batch = _select_batch(msgs, token_budget=300)
+        assert len(batch) == 2
+        assert [m.time for m in batch] == [msgs[0].time, msgs[1].time]
+
+    def test_token_budget_always_includes_first_message(self):
+        """A single oversized message is still selected on its own."""
+        msgs = [
+            Message(sender="alice", recipient="bob", time="2026-02-11T10:00:00Z", body="x" * 100_000, task_id=1),
+            Message(sender="alice", recipient="bob", time="2026-02-11T10:01:00Z", body="short", task_id=1),
+        ]
+        batch = _select_batch(msgs)
+        assert len(batch) == 1
+        assert batch[0].time == "2026-02-11T10:00:00Z"
+
+    def test_burst_of_short_messages_fits_one_batch(self):
+        """Fifteen short review comments are coalesced into one batch."""
+        msgs = [
+            Message(sender="alice", recipient="bob", time=f"2026-02-11T10:{i:02d}:00Z", body=f"nit {i}", task_id=1)
+            for i in range(15)
+        ]
+        batch = _select_batch(msgs)
+        assert len(batch) == 15
+
+    def test_token_budget_does_not_skip_within_sender(self):
+        """An over-budget message ends the batch rather than being skipped."""
+        msgs = [
+            Message(sender="alice", recipient="bob", time="2026-02-11T10:00:00Z", body="a", task_id=1),
+            Message(sender="alice", recipient="bob", time="2026-02-11T10:01:00Z", body="x" * 10_000, task_id=1),
+            Message(sender="alice", recipient="bob", time="2026-02-11T10:02:00Z", body="c", task_id=1),
+        ]
+        batch = _select_batch(msgs, token_budget=500)
+        assert [m.body for m in batch] == ["a"]
+
+
+class TestInboxSettled:
+    """Test the dispatch debounce used by the daemon."""
+
+    NOW = datetime(2026, 2, 11, 10, 0, 30, tzinfo=timezone.utc)
+
+    def test_waits_while_burst_is_arriving(self):
+        assert not _inbox_settled(
+            "2026-02-11T10:00:29.000000Z", "2026-02-11T10:00:29.500000Z",
+            now=self.NOW, debounce=2.0, max_wait=10.0,
+        )
+
+    def test_ready_once_inbox_is_quiet(self):
+        assert _inbox_settled(
+            "2026-02-11T10:00:20.000000Z", "2026-02-11T10:00:27.000000Z",
+            now=self.NOW, debounce=2.0, max_wait=60.0,
+        )
+
+    def test_max_wait_caps_the_delay(self):
+        """A steady trickle cannot hold the oldest message back forever."""
+        assert _inbox_settled(
+            "2026-02-11T10:00:00.000000Z", "2026-02-11T10:00:29.900000Z",
+            now=self.NOW, debounce=2.0, max_wait=10.0,
+        )
+
+    def test_zero_debounce_dispatches_immediately(self):
+        assert _inbox_settled(
+            "2026-02-11T10:00:30.000000Z", "2026-02-11T10:00:30.000000Z",
+            now=self.NOW, debounce=0,
+        )
+
+    def test_unparseable_timestamps_do_not_block(self):
+        assert _inbox_settled("garbage", "garbage", now=self.NOW)
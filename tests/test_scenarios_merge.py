@@ -433,8 +433,8 @@ class TestMergeScenarios:
         Merge the task. Test the happy path: both repos merge successfully,
         main moves forward in both.
 
-        Note: Current merge.py implementation merges repos sequentially without
-        rollback. This test verifies the happy path behavior.
+        Rollback and concurrency are covered by TestMultiRepoMerge in
+        test_merge.py. This test verifies the happy path behavior.
         """
         mock_run_pre_merge.return_value = (True, "Tests passed")
 
@@ -0,0 +1,132 @@
+"""Tests for delegate/shared_index.py and the indexed shared files listing."""
+
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from delegate.paths import shared_dir
+from delegate.shared_index import SharedIndex, get_index
+from delegate.web import create_app
+
+TEAM = "testteam"
+
+
+@pytest.fixture
+def shared(tmp_team):
+    base = shared_dir(tmp_team, TEAM)
+    base.mkdir(exist_ok=True)
+    (base / "specs").mkdir()
+    (base / "specs" / "api.md").write_text("x" * 10_000)
+    (base / "specs" / "ui.md").write_text("x" * 10)
+    (base / "notes.md").write_text("x" * 50)
+    (base / "api-notes.txt").write_text("x" * 5)
+    os.utime(base / "notes.md", (1_000_000, 1_000_000))
+    return base
+
+
+class TestSharedIndex:
+    def test_rebuild_and_list(self, shared):
+        index = SharedIndex(shared, TEAM)
+        index.rebuild()
+        names = [e["name"] for e in index.query()["files"]]
+        assert names == ["specs", "api-notes.txt", "notes.md"]
+
+    def test_recursive_search(self, shared):
+        index = SharedIndex(shared, TEAM)
+        index.rebuild()
+        page = index.query(recursive=True, q="API")
+        assert {e["path"] for e in page["files"]} == {"specs/api.md", "api-notes.txt"}
+
+    def test_sort_and_paginate(self, shared):
+        index = SharedIndex(shared, TEAM)
+        index.rebuild()
+        first = index.query(recursive=True, sort="size", limit=2)
+        assert [e["path"] for e in first["files"]][0] == "specs/api.md"
+        assert first["total"] == 5
+        assert first["next_offset"] == 2
+        rest = index.query(recursive=True, sort="size", limit=10, offset=2)
+        assert rest["next_offset"] is None
+        assert len(rest["files"]) == 3
+
+    def test_mtime_sort_oldest_first(self, shared):
+        index = SharedIndex(shared, TEAM)
+        index.rebuild()
+        page = index.query(sort="mtime", order="asc")
+        assert page["files"][0]["name"] == "notes.md"
+        assert "mtime" not in page["files"][0]
+
+    def test_bad_sort(self, shared):
+        index = SharedIndex(shared, TEAM)
+        with pytest.raises(ValueError):
+            index.query(sort="owner")
+
+    def test_apply_changes(self, shared):
+        index = SharedIndex(shared, TEAM)
+        index.rebuild()
+        (shared / "new.md").write_text("hi")
+        (shared / "notes.md").write_text("changed")
+        for p in (shared / "specs").iterdir():
+            p.unlink()
+        (shared / "specs").rmdir()
+
+        changes = index.apply([shared / "new.md", shared / "notes.md", shared / "specs"])
+        assert changes == [
+            {"op": "added", "path": "new.md"},
+            {"op": "modified", "path": "notes.md"},
+            {"op": "deleted", "path": "specs"},
+        ]
+        assert "specs/api.md" not in index.entries
+        assert index.entries["notes.md"]["size"] == len("changed")
+
+    def test_apply_scans_moved_in_directory(self, shared):
+        index = SharedIndex(shared, TEAM)
+        index.rebuild()
+        (shared / "guides" / "deep").mkdir(parents=True)
+        (shared / "guides" / "deep" / "x.md").write_text("x")
+        index.apply([shared / "guides"])
+        assert "guides/deep/x.md" in index.entries
+
+    def test_watcher_picks_up_new_files(self, shared, tmp_team):
+        index = get_index(tmp_team, TEAM)
+        if not index.watching:
+            pytest.skip("watchfiles not available")
+        (shared / "late.md").write_text("x")
+        deadline = time.monotonic() + 5
+        while "late.md" not in index.entries and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert "late.md" in index.entries
+
+    def test_dead_watcher_is_restarted(self, shared, tmp_team, monkeypatch):
+        from delegate import shared_index
+
+        if shared_index.watchfiles is None:
+            pytest.skip("watchfiles not available")
+        index = SharedIndex(shared, TEAM)
+        monkeypatch.setattr(index, "apply", lambda paths: 1 / 0)
+        index.start_watching()
+        thread = index._thread
+        (shared / "boom.md").write_text("x")
+        thread.join(timeout=5)
+        assert not thread.is_alive() and not index.watching
+
+        monkeypatch.undo()
+        assert index.has_dir("specs")
+        assert index.watching and index._thread is not thread
+        index.stop()
+
+
+class TestListEndpoint:
+    def test_recursive_query_params(self, shared, tmp_team):
+        client = TestClient(create_app(hc_home=tmp_team))
+        resp = client.get(f"/teams/{TEAM}/files", params={"recursive": "true", "q": "md", "limit": 2})
+        data = resp.json()
+        assert resp.status_code == 200
+        assert data["total"] == 3
+        assert len(data["files"]) == 2
+        assert data["next_offset"] == 2
+
+    def test_bad_sort_is_400(self, shared, tmp_team):
+        client = TestClient(create_app(hc_home=tmp_team))
+        assert client.get(f"/teams/{TEAM}/files", params={"sort": "owner"}).status_code == 400
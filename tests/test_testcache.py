@@ -0,0 +1,134 @@
+"""Tests for delegate/testcache.py — cached pre-merge test passes."""
+
+import pytest
+import yaml
+
+from delegate import testcache
+from delegate.chat import get_task_activity
+from delegate.config import set_pre_merge_script
+from delegate.db import get_connection
+from delegate.merge import merge_task, MergeFailureReason, _run_pre_merge
+
+from tests.gitutil import (
+    SAMPLE_TEAM, git, make_feature_branch, make_in_approval_task, register_repo_with_symlink,
+    setup_git_repo,
+)
+
+
+@pytest.fixture
+def repo(hc_home, tmp_path):
+    repo = setup_git_repo(tmp_path)
+    register_repo_with_symlink(hc_home, "myrepo", repo)
+    return repo
+
+
+class Counter:
+    def __init__(self, ok=True):
+        self.calls = 0
+        self.ok = ok
+
+    def __call__(self):
+        self.calls += 1
+        return self.ok, "3 passed"
+
+
+class TestRunCached:
+    def test_second_run_is_a_hit(self, hc_home, repo):
+        run = Counter()
+        first = testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        second = testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert first == (True, "3 passed", False)
+        assert second[0] and second[2]
+        assert second[1].startswith(testcache.CACHED_PASS)
+        assert "3 passed" in second[1]
+        assert run.calls == 1
+
+    def test_key_includes_command_tree_and_env(self, hc_home, repo, monkeypatch):
+        run = Counter()
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make check", run)
+        monkeypatch.setenv("VIRTUAL_ENV", "/elsewhere")
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert run.calls == 3
+
+    def test_failures_are_not_cached(self, hc_home, repo):
+        run = Counter(ok=False)
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert run.calls == 2
+
+    def test_dirty_worktree_is_not_cached(self, hc_home, repo):
+        (repo / "scratch.txt").write_text("wip\n")
+        run = Counter()
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert run.calls == 2
+
+    def test_expired_entries_are_ignored(self, hc_home, repo):
+        run = Counter()
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        conn = get_connection(hc_home, SAMPLE_TEAM)
+        conn.execute("UPDATE test_results SET created_at = '2000-01-01T00:00:00+00:00'")
+        conn.commit()
+        conn.close()
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert run.calls == 2
+
+    def test_ttl_zero_disables(self, hc_home, repo):
+        path = hc_home / "teams" / SAMPLE_TEAM / "repos.yaml"
+        data = yaml.safe_load(path.read_text())
+        data["myrepo"]["test_cache_ttl_hours"] = 0
+        path.write_text(yaml.dump(data))
+        run = Counter()
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert run.calls == 2
+
+    def test_invalidate(self, hc_home, repo):
+        run = Counter()
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert testcache.invalidate(hc_home, SAMPLE_TEAM, repo="other") == 0
+        assert testcache.invalidate(hc_home, SAMPLE_TEAM, repo="myrepo") == 1
+        testcache.run_cached(hc_home, SAMPLE_TEAM, "myrepo", repo, "make test", run)
+        assert run.calls == 2
+
+
+class TestPreMerge:
+    def test_script_runs_once_per_tree(self, hc_home, repo, tmp_path):
+        counter = tmp_path / "runs"
+        set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", f"echo run >> {counter}")
+        for _ in range(2):
+            ok, _ = _run_pre_merge(str(repo), hc_home=hc_home, team=SAMPLE_TEAM, repo_name="myrepo")
+            assert ok
+        assert counter.read_text() == "run\n"
+
+    def test_editing_a_script_outside_the_repo_misses(self, hc_home, repo, tmp_path):
+        counter = tmp_path / "runs"
+        script = tmp_path / "check.sh"
+        script.write_text(f"#!/bin/sh\necho run >> {counter}\n")
+        script.chmod(0o755)
+        set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", f"{script} --strict")
+        for _ in range(2):
+            assert _run_pre_merge(str(repo), hc_home=hc_home, team=SAMPLE_TEAM, repo_name="myrepo")[0]
+        assert counter.read_text() == "run\n"
+
+        script.write_text(f"#!/bin/sh\necho edited >> {counter}\n")
+        assert _run_pre_merge(str(repo), hc_home=hc_home, team=SAMPLE_TEAM, repo_name="myrepo")[0]
+        assert counter.read_text() == "run\nedited\n"
+
+    def test_retry_after_dirty_main_uses_cached_pass(self, hc_home, repo, tmp_path):
+        counter = tmp_path / "runs"
+        set_pre_merge_script(hc_home, SAMPLE_TEAM, "myrepo", f"echo run >> {counter}")
+        make_feature_branch(repo, "alice/T0001")
+        task = make_in_approval_task(hc_home, repo="myrepo", branch="alice/T0001", merging=True)
+
+        (repo / "README.md").write_text("user's uncommitted work\n")
+        first = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert first.reason == MergeFailureReason.DIRTY_MAIN
+
+        git(repo, "checkout", "README.md")
+        second = merge_task(hc_home, SAMPLE_TEAM, task["id"])
+        assert second.success, second.message
+        assert counter.read_text() == "run\n"
+        events = [e["content"] for e in get_task_activity(hc_home, SAMPLE_TEAM, task["id"])]
+        assert any("cached pass (myrepo)" in e for e in events)
@@ -0,0 +1,221 @@
+"""Tests for delegate/testselect.py — change-aware test selection."""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+from delegate import testselect
+from delegate.chat import get_task_activity
+from delegate.config import get_test_selection
+
+from tests.gitutil import SAMPLE_TEAM, commit, git, register_repo_with_symlink, setup_git_repo
+
+
+def _enable(hc_home, **settings):
+    path = hc_home / "teams" / SAMPLE_TEAM / "repos.yaml"
+    data = yaml.safe_load(path.read_text())
+    data["myrepo"]["test_selection"] = {"enabled": True, **settings}
+    path.write_text(yaml.dump(data))
+
+
+@pytest.fixture
+def repo(hc_home, tmp_path):
+    """A small package: app.core <- app.api, each with its own test."""
+    repo = setup_git_repo(tmp_path)
+    commit(repo, {
+        "app/__init__.py": "",
+        "app/core.py": "def add(a, b):\n    return a + b\n",
+        "app/api.py": "from .core import add\n\ndef total(xs):\n    return sum(xs)\n",
+        "app/orphan.py": "X = 1\n",
+        "tests/test_core.py": "from app.core import add\n\ndef test_add():\n    assert add(1, 2) == 3\n",
+        "tests/test_api.py": "from app import api\n\ndef test_total():\n    assert api.total([1, 2]) == 3\n",
+    }, "package")
+    register_repo_with_symlink(hc_home, "myrepo", repo)
+    git(repo, "checkout", "-q", "-b", "feature")
+    return repo
+
+
+CFG = {"full_every": 0, "ignore": ["*.md", "docs/**"], "map": {}, "command": None}
+
+
+class TestSelect:
+    def test_transitive_importers_are_selected(self, repo):
+        commit(repo, {"app/core.py": "def add(a, b):\n    return b + a\n"})
+        selection = testselect.select(repo, CFG)
+        assert selection.changed == ["app/core.py"]
+        assert selection.targets == ["tests/test_api.py", "tests/test_core.py"]
+        assert not selection.full
+        assert selection.total_tests == 2
+
+    def test_leaf_change_selects_only_its_tests(self, repo):
+        commit(repo, {"app/api.py": "from .core import add\n\ndef total(xs):\n    return sum(xs) + 0\n"})
+        assert testselect.select(repo, CFG).targets == ["tests/test_api.py"]
+
+    def test_changed_test_runs_itself(self, repo):
+        commit(repo, {"tests/test_new.py": "def test_x():\n    pass\n"})
+        assert testselect.select(repo, CFG).targets == ["tests/test_new.py"]
+
+    def test_ignored_files_need_nothing(self, repo):
+        commit(repo, {"README.md": "# Changed\n", "docs/guide.txt": "hi\n"})
+        selection = testselect.select(repo, CFG)
+        assert selection.targets == [] and not selection.full
+
+    def test_untested_module_is_uncertain(self, repo):
+        commit(repo, {"app/orphan.py": "X = 2\n"})
+        selection = testselect.select(repo, CFG)
+        assert selection.full and selection.uncertain == ["app/orphan.py"]
+
+    def test_global_and_unknown_files_are_uncertain(self, repo):
+        commit(repo, {"tests/conftest.py": "", "data/schema.json": "{}"})
+        assert sorted(testselect.select(repo, CFG).uncertain) == ["data/schema.json", "tests/conftest.py"]
+
+    def test_map_globs(self, repo):
+        commit(repo, {"data/schema.json": "{}"})
+        cfg = {**CFG, "map": {"data/*.json": ["tests/test_api.py"]}}
+        selection = testselect.select(repo, cfg)
+        assert selection.targets == ["tests/test_api.py"] and not selection.full
+
+    def test_deleted_module_is_uncertain(self, repo):
+        git(repo, "rm", "-q", "app/orphan.py")
+        git(repo, "commit", "-m", "drop")
+        assert testselect.select(repo, CFG).uncertain == ["app/orphan.py"]
+
+    def test_uncommitted_changes_count(self, repo):
+        (repo / "app/api.py").write_text("def total(xs):\n    return 0\n")
+        assert testselect.select(repo, CFG).targets == ["tests/test_api.py"]
+
+
+class TestConfig:
+    def test_disabled_by_default(self, hc_home, repo):
+        assert get_test_selection(hc_home, SAMPLE_TEAM, "myrepo") is None
+
+    def test_defaults(self, hc_home, repo):
+        _enable(hc_home)
+        cfg = get_test_selection(hc_home, SAMPLE_TEAM, "myrepo")
+        assert cfg["full_every"] == 10
+        assert "*.md" in cfg["ignore"]
+
+
+class Runs:
+    """Records which commands ran; every run passes unless told otherwise."""
+
+    def __init__(self, fail=()):
+        self.commands = []
+        self.fail = set(fail)
+
+    def runner(self, command):
+        def run():
+            self.commands.append(command)
+            return command not in self.fail, f"ran {command}"
+        return run
+
+    def subset(self, targets):
+        command = "pytest " + " ".join(targets)
+        return command, self.runner(command)
+
+
+def _run(hc_home, repo, runs, task_id=None):
+    return testselect.run_selected(
+        hc_home, SAMPLE_TEAM, "myrepo", repo,
+        command="pytest", run=runs.runner("pytest"), subset=runs.subset, task_id=task_id,
+    )
+
+
+class TestRunSelected:
+    def test_disabled_runs_full_suite(self, hc_home, repo):
+        runs = Runs()
+        assert _run(hc_home, repo, runs) == (True, "ran pytest")
+        assert runs.commands == ["pytest"]
+
+    def test_subset_only_then_full_on_cadence(self, hc_home, repo):
+        _enable(hc_home, full_every=2)
+        runs = Runs()
+        commit(repo, {"app/api.py": "def total(xs):\n    return 0\n"})
+        ok, output = _run(hc_home, repo, runs)
+        assert ok and "Selected tests passed" in output
+        assert runs.commands == ["pytest tests/test_api.py"]
+
+        commit(repo, {"app/api.py": "def total(xs):\n    return 1\n"})
+        _run(hc_home, repo, runs)
+        assert runs.commands[1:] == ["pytest tests/test_api.py", "pytest"]
+
+        commit(repo, {"app/api.py": "def total(xs):\n    return 2\n"})
+        _run(hc_home, repo, runs)
+        assert runs.commands[3:] == ["pytest tests/test_api.py"]  # counter reset
+
+    def test_subset_failure_fails_fast(self, hc_home, repo):
+        _enable(hc_home)
+        runs = Runs(fail={"pytest tests/test_api.py"})
+        commit(repo, {"app/api.py": "def total(xs):\n    return 0\n", "tests/conftest.py": ""})
+        ok, _ = _run(hc_home, repo, runs)
+        assert not ok
+        assert runs.commands == ["pytest tests/test_api.py"]  # full suite never started
+
+    def test_uncertain_runs_full_suite(self, hc_home, repo):
+        _enable(hc_home, full_every=0)
+        runs = Runs()
+        commit(repo, {"app/orphan.py": "X = 3\n"})
+        assert _run(hc_home, repo, runs)[0]
+        assert runs.commands == ["pytest"]
+
+    def test_nothing_affected_skips_tests(self, hc_home, repo):
+        _enable(hc_home)
+        runs = Runs()
+        commit(repo, {"README.md": "# Docs only\n"})
+        ok, output = _run(hc_home, repo, runs)
+        assert ok and "No tests affected" in output
+        assert runs.commands == []
+
+    def test_decisions_are_logged_to_the_task(self, hc_home, repo):
+        from delegate.task import create_task
+
+        task = create_task(hc_home, SAMPLE_TEAM, title="Change api", assignee="alice")
+        _enable(hc_home, full_every=0)
+        commit(repo, {"app/api.py": "def total(xs):\n    return 0\n"})
+        _run(hc_home, repo, Runs(), task_id=task["id"])
+        events = [e["content"] for e in get_task_activity(hc_home, SAMPLE_TEAM, task["id"])]
+        assert any("test selection (myrepo)" in e and "1/2 test file(s)" in e and "skipped" in e
+                   for e in events)
+
+    def test_command_template(self, hc_home, repo):
+        _enable(hc_home, full_every=0, command=f"{sys.executable} -m pytest -q {{targets}}")
+        commit(repo, {"app/api.py": "def total(xs):\n    return sum(xs)\n# touched\n"})
+        ok, output = testselect.run_selected(
+            hc_home, SAMPLE_TEAM, "myrepo", repo, command="full", run=Runs().runner("full"),
+        )
+        assert ok, output
+        assert "1 passed" in output
+
+    def test_command_template_quotes_targets(self, hc_home, repo):
+        _enable(hc_home, full_every=0, command=f"{sys.executable} -m pytest -q {{targets}}")
+        commit(repo, {"tests/test_x;touch injected.py": "def test_x():\n    pass\n"})
+        ok, output = testselect.run_selected(
+            hc_home, SAMPLE_TEAM, "myrepo", repo, command="full", run=Runs().runner("full"),
+        )
+        assert ok, output
+        assert not (repo / "injected.py").exists()
+
+    def test_qa_subset_keeps_targets_with_spaces_whole(self, hc_home, repo, monkeypatch):
+        from delegate.qa import run_tests
+
+        monkeypatch.setenv("PATH", f"{os.path.dirname(sys.executable)}{os.pathsep}{os.environ['PATH']}")
+        _enable(hc_home, full_every=0)
+        commit(repo, {"tests/test_with space.py": "def test_x():\n    pass\n"})
+        result = run_tests(repo, hc_home=hc_home, team=SAMPLE_TEAM, repo_name="myrepo")
+        assert result.approved, result.output
+        assert "1 passed" in result.output
+
+
+class TestPreMergeIntegration:
+    def test_autodetected_pytest_runs_selected_files(self, hc_home, repo, monkeypatch):
+        from delegate import merge
+
+        calls = []
+        monkeypatch.setattr(merge, "_run_test_cmd", lambda cmd, wt: (calls.append(cmd), (True, "ok"))[1])
+        _enable(hc_home, full_every=0)
+        commit(repo, {"app/api.py": "def total(xs):\n    return 0\n"})
+        ok, _ = merge._run_pre_merge(str(repo), hc_home=hc_home, team=SAMPLE_TEAM, repo_name="myrepo")
+        assert ok
+        assert calls == [["python", "-m", "pytest", "-x", "-q", "tests/test_api.py"]]
@@ -0,0 +1,122 @@
+"""Tests for delegate/testshard.py — sharded parallel pytest runs."""
+
+import sys
+import time
+
+import pytest
+import yaml
+
+from delegate import testshard
+from delegate.config import get_test_shards
+
+from tests.gitutil import SAMPLE_TEAM, register_repo_with_symlink, setup_git_repo
+
+PYTEST = [sys.executable, "-m", "pytest", "-q"]
+
+
+@pytest.fixture
+def suite(tmp_path):
+    root = tmp_path / "suite"
+    (root / "tests").mkdir(parents=True)
+    for name in ("a", "b", "c", "d"):
+        (root / "tests" / f"test_{name}.py").write_text(f"def test_{name}():\n    assert True\n")
+    return root
+
+
+class TestBalance:
+    def test_longest_first_onto_least_loaded(self):
+        durations = {"a": 10.0, "b": 6.0, "c": 5.0, "d": 1.0}
+        groups = testshard.balance(["a", "b", "c", "d"], durations, 2)
+        assert sorted(map(sorted, groups)) == [["a", "d"], ["b", "c"]]
+
+    def test_unknown_files_count_as_average(self):
+        groups = testshard.balance(["a", "b", "new"], {"a": 4.0, "b": 2.0}, 2)
+        assert sorted(map(sorted, groups)) == [["a"], ["b", "new"]]
+
+    def test_never_more_shards_than_files(self):
+        assert len(testshard.balance(["a", "b"], {}, 8)) == 2
+
+    def test_parse_durations(self):
+        lines = [
+            "0.50s call     tests/test_a.py::test_x\n",
+            "0.25s setup    tests/test_a.py::TestY::test_z\n",
+            "1.00s call     tests/test_b.py::test_y\n",
+            "(3 durations < 0.005s hidden.)\n",
+        ]
+        assert testshard.parse_durations(lines) == {"tests/test_a.py": 0.75, "tests/test_b.py": 1.0}
+
+
+class TestRunSharded:
+    def test_collect(self, suite):
+        files = testshard.collect(PYTEST, suite)
+        assert sorted(files) == [f"tests/test_{n}.py" for n in "abcd"]
+
+    def test_all_shards_pass(self, suite):
+        streamed = []
+        ok, output = testshard.run_sharded(PYTEST, suite, shards=2, stream=streamed.append)
+        assert ok, output
+        assert output.startswith("4 test files passed in 2 shards")
+        assert any(line.startswith("[shard 1/2] ") for line in streamed)
+        assert any(line.startswith("[shard 2/2] ") for line in streamed)
+
+    def test_first_failure_stops_other_shards(self, suite):
+        (suite / "tests" / "test_a.py").write_text("def test_a():\n    assert False\n")
+        (suite / "tests" / "test_b.py").write_text("import time\n\ndef test_b():\n    time.sleep(60)\n")
+        started = time.monotonic()
+        ok, output = testshard.run_sharded(PYTEST, suite, shards=2)
+        assert not ok
+        assert time.monotonic() - started < 30
+        assert "failed; other shards stopped" in output
+        assert "assert False" in output
+
+    def test_targets_limit_the_run(self, suite):
+        ok, output = testshard.run_sharded(
+            PYTEST, suite, shards=4, targets=["tests/test_a.py", "tests/test_b.py"],
+        )
+        assert ok and output.startswith("2 test files passed in 2 shards")
+
+    def test_single_file_runs_unsharded(self, suite):
+        ok, output = testshard.run_sharded(PYTEST, suite, shards=4, targets=["tests/test_a.py"])
+        assert ok and "shard" not in output
+
+    def test_durations_are_recorded(self, hc_home, suite):
+        (suite / "tests" / "test_a.py").write_text("import time\n\ndef test_a():\n    time.sleep(0.3)\n")
+        ok, _ = testshard.run_sharded(
+            PYTEST, suite, shards=2, hc_home=hc_home, team=SAMPLE_TEAM, repo="myrepo",
+        )
+        assert ok
+        durations = testshard.load_durations(hc_home, SAMPLE_TEAM, "myrepo")
+        assert set(durations) == {f"tests/test_{n}.py" for n in "abcd"}
+        assert durations["tests/test_a.py"] >= 0.3
+
+
+class TestConfig:
+    def _set(self, hc_home, value):
+        path = hc_home / "teams" / SAMPLE_TEAM / "repos.yaml"
+        data = yaml.safe_load(path.read_text())
+        data["myrepo"]["test_shards"] = value
+        path.write_text(yaml.dump(data))
+
+    def test_shards(self, hc_home, tmp_path, monkeypatch):
+        register_repo_with_symlink(hc_home, "myrepo", setup_git_repo(tmp_path))
+        assert get_test_shards(hc_home, SAMPLE_TEAM, "myrepo") == 1
+        self._set(hc_home, 4)
+        assert get_test_shards(hc_home, SAMPLE_TEAM, "myrepo") == 4
+        monkeypatch.setattr("os.cpu_count", lambda: 32)
+        self._set(hc_home, "auto")
+        assert get_test_shards(hc_home, SAMPLE_TEAM, "myrepo") == 32
+
+    def test_pre_merge_uses_shards(self, hc_home, tmp_path, monkeypatch):
+        from delegate import merge
+
+        repo = setup_git_repo(tmp_path)
+        (repo / "tests").mkdir()
+        register_repo_with_symlink(hc_home, "myrepo", repo)
+        self._set(hc_home, 3)
+        calls = []
+        monkeypatch.setattr(
+            testshard, "run_sharded", lambda cmd, wt, **kw: (calls.append((cmd, kw["shards"])), (True, "ok"))[1],
+        )
+        ok, _ = merge._run_pre_merge(str(repo), hc_home=hc_home, team=SAMPLE_TEAM, repo_name="myrepo")
+        assert ok
+        assert calls == [(["python", "-m", "pytest", "-x", "-q"], 3)]
@@ -286,3 +286,97 @@ class TestServeEndpoint:
         # JSON should be downloaded, not shown inline
         assert "attachment" in serve_resp.headers["content-disposition"]
         assert "data" in serve_resp.headers["content-disposition"]
+
+    def test_serve_range_request(self, client, tmp_team):
+        """Range requests get 206 with just the requested bytes."""
+        files = {"files": ("test.png", io.BytesIO(PNG_1x1), "image/png")}
+        url = client.post(f"/teams/{TEAM}/uploads", files=files).json()["uploaded"][0]["url"]
+
+        resp = client.get(url, headers={"Range": "bytes=0-7"})
+        assert resp.status_code == 206
+        assert resp.content == PNG_1x1[:8]
+        assert resp.headers["content-range"] == f"bytes 0-7/{len(PNG_1x1)}"
+        assert resp.headers["x-content-type-options"] == "nosniff"
+
+    def test_serve_conditional_get(self, client, tmp_team):
+        """ETag and Last-Modified validators return 304 when unchanged."""
+        files = {"files": ("test.png", io.BytesIO(PNG_1x1), "image/png")}
+        url = client.post(f"/teams/{TEAM}/uploads", files=files).json()["uploaded"][0]["url"]
+
+        first = client.get(url)
+        assert first.headers["accept-ranges"] == "bytes"
+        etag = first.headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        since = first.headers["last-modified"]
+        assert client.get(url, headers={"If-Modified-Since": since}).status_code == 304
+
+
+class TestServeRawFile:
+    def test_raw_file_streams_with_range(self, client, tmp_team):
+        target = tmp_team / "teams" / TEAM / "shared" / "page.html"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("<html>hello</html>")
+
+        resp = client.get(f"/teams/{TEAM}/files/raw", params={"path": str(target)})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/html")
+        assert resp.text == "<html>hello</html>"
+
+        part = client.get(
+            f"/teams/{TEAM}/files/raw", params={"path": str(target)}, headers={"Range": "bytes=6-10"},
+        )
+        assert part.status_code == 206
+        assert part.text == "hello"
+
+
+# ---------------------------------------------------------------------------
+# Streaming writes + content-hash dedupe
+# ---------------------------------------------------------------------------
+
+
+class TestUploadWriter:
+    def test_identical_uploads_share_one_object(self, client, tmp_team):
+        from delegate.paths import team_dir
+
+        first = client.post(f"/teams/{TEAM}/uploads", files={"files": ("a.png", io.BytesIO(PNG_1x1), "image/png")})
+        second = client.post(f"/teams/{TEAM}/uploads", files={"files": ("b.png", io.BytesIO(PNG_1x1), "image/png")})
+        a, b = first.json()["uploaded"][0], second.json()["uploaded"][0]
+
+        assert a["url"] != b["url"]
+        assert a["sha256"] == b["sha256"]
+        uploads = team_dir(tmp_team, TEAM)
+        path_a, path_b = uploads / a["stored_path"], uploads / b["stored_path"]
+        assert path_a.stat().st_ino == path_b.stat().st_ino
+        assert client.get(b["url"]).content == PNG_1x1
+
+    def test_rejected_file_rolls_back_earlier_files(self, client, tmp_team):
+        from delegate.paths import team_dir
+
+        files = [
+            ("files", ("ok.png", io.BytesIO(PNG_1x1), "image/png")),
+            ("files", ("fake.jpg", io.BytesIO(PNG_1x1), "image/jpeg")),
+        ]
+        resp = client.post(f"/teams/{TEAM}/uploads", files=files)
+        assert resp.status_code == 400
+
+        uploads = team_dir(tmp_team, TEAM) / "uploads"
+        leftovers = [p for p in uploads.rglob("*") if p.is_file()]
+        assert leftovers == []
+
+    def test_size_limit_enforced_while_streaming(self, tmp_path):
+        from delegate.uploads import UploadRejected, UploadWriter
+
+        writer = UploadWriter(tmp_path, "notes.txt", max_size=10)
+        writer.write(b"12345")
+        with pytest.raises(UploadRejected, match=r"too large: 11 bytes received so far \(max 10\)"):
+            writer.write(b"678901")
+        writer.discard()
+        assert list((tmp_path / ".tmp").iterdir()) == []
+
+    def test_magic_bytes_checked_from_first_chunk(self, tmp_path):
+        from delegate.uploads import HEADER_BYTES, UploadRejected, UploadWriter
+
+        writer = UploadWriter(tmp_path, "photo.png")
+        with pytest.raises(UploadRejected):
+            writer.write(b"not a png" * HEADER_BYTES)
+        writer.discard()
@@ -0,0 +1,129 @@
+"""Tests for delegate/worklog.py — segmented worklog store."""
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+from delegate import worklog
+from delegate.paths import agent_dir
+from delegate.web import create_app
+
+TEAM = "testteam"
+
+
+@pytest.fixture
+def ad(tmp_team):
+    return agent_dir(tmp_team, TEAM, "alice")
+
+
+class TestAppend:
+    def test_turn_numbers_increase(self, ad):
+        assert worklog.next_turn_number(ad) == 1
+        assert worklog.append(ad, "first") == 1
+        assert worklog.append(ad, "second", task_id=7) == 2
+        assert worklog.next_turn_number(ad) == 3
+
+    def test_torn_index_tail_is_skipped(self, ad):
+        worklog.append(ad, "first")
+        worklog.append(ad, "second")
+        with open(worklog.worklog_dir(ad) / "index.jsonl", "a") as f:
+            f.write('{"turn":3,"seg')  # crash mid-append
+        assert worklog.next_turn_number(ad) == 3
+        assert worklog.append(ad, "third") == 3
+        assert worklog.next_turn_number(ad) == 4
+        assert worklog.read_entry(ad, 3) == "third"
+
+    def test_read_entry(self, ad):
+        worklog.append(ad, "hello")
+        n = worklog.append(ad, "world ✓")
+        assert worklog.read_entry(ad, n) == "world ✓"
+        assert worklog.read_entry(ad, 99) is None
+
+    def test_counter_continues_after_legacy_files(self, ad):
+        logs = ad / "logs"
+        logs.mkdir(parents=True, exist_ok=True)
+        (logs / "4.worklog.md").write_text("old")
+        assert worklog.append(ad, "new") == 5
+
+
+class TestSegments:
+    def test_seals_and_compresses_full_segment(self, ad, monkeypatch):
+        monkeypatch.setattr(worklog, "SEGMENT_MAX_BYTES", 100)
+        for i in range(5):
+            worklog.append(ad, f"entry-{i}-" + "x" * 60)
+        wd = worklog.worklog_dir(ad)
+        cold = sorted(wd.glob("*.seg.gz"))
+        assert cold, "expected at least one sealed segment"
+        with gzip.open(cold[0], "rb") as f:
+            assert f.read().startswith(b"entry-0-")
+        # Every entry is still readable, hot or cold.
+        for i in range(5):
+            assert worklog.read_entry(ad, i + 1).startswith(f"entry-{i}-")
+
+    def test_retention_drops_old_segments(self, ad, monkeypatch):
+        monkeypatch.setattr(worklog, "SEGMENT_MAX_BYTES", 100)
+        for i in range(8):
+            worklog.append(ad, f"entry-{i}-" + "x" * 60, max_segments=2)
+        wd = worklog.worklog_dir(ad)
+        assert len(list(wd.glob("*.seg.gz"))) <= 2
+        assert worklog.read_entry(ad, 1) is None
+        assert worklog.read_entry(ad, 8).startswith("entry-7-")
+        # The counter survives pruning.
+        assert worklog.next_turn_number(ad) == 9
+
+
+class TestListEntries:
+    def test_pagination_newest_first(self, ad):
+        for i in range(5):
+            worklog.append(ad, f"log {i + 1}", task_id=3)
+        page, cursor = worklog.list_entries(ad, limit=2)
+        assert [e["turn"] for e in page] == [5, 4]
+        assert page[0]["content"] == "log 5"
+        assert page[0]["task_id"] == 3
+        assert page[0]["filename"] == "5.worklog.md"
+        page, cursor = worklog.list_entries(ad, limit=2, before=cursor)
+        assert [e["turn"] for e in page] == [3, 2]
+        page, cursor = worklog.list_entries(ad, limit=2, before=cursor)
+        assert [e["turn"] for e in page] == [1]
+        assert cursor is None
+
+    def test_legacy_files_follow_store_entries(self, ad):
+        logs = ad / "logs"
+        logs.mkdir(parents=True, exist_ok=True)
+        (logs / "1.worklog.md").write_text("legacy one")
+        (logs / "2.worklog.md").write_text("legacy two")
+        worklog.append(ad, "stored")
+        page, cursor = worklog.list_entries(ad, limit=10)
+        assert [e["turn"] for e in page] == [3, 2, 1]
+        assert page[1]["content"] == "legacy two"
+        assert cursor is None
+
+    def test_content_trimmed_to_tail(self, ad):
+        worklog.append(ad, "a" * 100 + "END")
+        page, _ = worklog.list_entries(ad, max_bytes=10)
+        assert page[0]["content"].endswith("END")
+        assert len(page[0]["content"]) == 10
+
+
+class TestLogsEndpoint:
+    def test_paginated_logs(self, tmp_team, ad):
+        for i in range(3):
+            worklog.append(ad, f"log {i + 1}")
+        client = TestClient(create_app(hc_home=tmp_team))
+        resp = client.get(f"/teams/{TEAM}/agents/alice/logs", params={"limit": 2})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [s["content"] for s in data["sessions"]] == ["log 3", "log 2"]
+        resp = client.get(
+            f"/teams/{TEAM}/agents/alice/logs",
+            params={"limit": 2, "before": data["next_before"]},
+        )
+        data = resp.json()
+        assert [s["content"] for s in data["sessions"]] == ["log 1"]
+        assert data["next_before"] is None
+
+    def test_unknown_agent_404(self, tmp_team):
+        client = TestClient(create_app(hc_home=tmp_team))
+        resp = client.get(f"/teams/{TEAM}/agents/nobody/logs")
+        assert resp.status_code == 404
@@ -0,0 +1,96 @@
+"""Tests for delegate/worktree_pool.py — pre-warmed worktrees."""
+
+import pytest
+import yaml
+
+from delegate.config import get_worktree_pool
+from delegate.merge import _create_temp_worktree
+from delegate.repo import register_repo, create_task_worktree
+from delegate import worktree_pool
+from delegate.worktree_pool import claim, drain, pool_dir, replenish
+
+from tests.gitutil import SAMPLE_TEAM, commit, git, setup_git_repo
+
+
+@pytest.fixture
+def repo(tmp_path, hc_home):
+    repo = setup_git_repo(tmp_path)
+    register_repo(hc_home, SAMPLE_TEAM, str(repo))
+    yield repo
+    worktree_pool._last_check.clear()
+
+
+def _set_pool(hc_home, repo, **cfg):
+    path = hc_home / "teams" / SAMPLE_TEAM / "repos.yaml"
+    data = yaml.safe_load(path.read_text())
+    data[repo.name]["worktree_pool"] = cfg
+    path.write_text(yaml.dump(data))
+
+
+class TestReplenish:
+    def test_fills_to_size(self, hc_home, repo):
+        stats = replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        assert stats["created"] == 2
+        entries = list(pool_dir(hc_home, SAMPLE_TEAM, repo.name).iterdir())
+        assert len(entries) == 2
+        assert all((e / "README.md").exists() for e in entries)
+
+    def test_advances_to_new_main(self, hc_home, repo):
+        replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        sha = commit(repo, {"new.py": "x\n"})
+        stats = replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        assert stats == {"ready": 2, "created": 0, "advanced": 2, "removed": 0}
+        for entry in pool_dir(hc_home, SAMPLE_TEAM, repo.name).iterdir():
+            assert git(entry, "rev-parse", "HEAD") == sha
+            assert (entry / "new.py").exists()
+
+    def test_disk_budget_limits_pool(self, hc_home, repo):
+        commit(repo, {"big.bin": "x" * (1024 * 1024)})
+        _set_pool(hc_home, repo, size=5, max_mb=3)
+        stats = replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        assert stats["ready"] == 2
+
+    def test_shrinks_when_disabled(self, hc_home, repo):
+        replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        _set_pool(hc_home, repo, size=0)
+        assert get_worktree_pool(hc_home, SAMPLE_TEAM, repo.name)["size"] == 0
+        stats = replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        assert stats["removed"] == 2
+        assert drain(hc_home, SAMPLE_TEAM, repo.name) == 0
+
+
+class TestClaim:
+    def test_empty_pool_returns_false(self, hc_home, repo, tmp_path):
+        dest = tmp_path / "wt"
+        assert not claim(hc_home, SAMPLE_TEAM, repo.name, dest, branch="b", start="main")
+        assert not dest.exists()
+
+    def test_task_worktree_uses_pool(self, hc_home, repo):
+        replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        wt = create_task_worktree(hc_home, SAMPLE_TEAM, repo.name, 1, branch="feature/T0001")
+        assert git(wt, "rev-parse", "--abbrev-ref", "HEAD") == "feature/T0001"
+        assert git(wt, "rev-parse", "HEAD") == git(repo, "rev-parse", "main")
+        assert len(list(pool_dir(hc_home, SAMPLE_TEAM, repo.name).iterdir())) == 1
+        assert str(wt) in git(repo, "worktree", "list")
+
+    def test_merge_worktree_uses_pool(self, hc_home, repo, tmp_path):
+        git(repo, "checkout", "-q", "-b", "feature/x")
+        tip = commit(repo, {"feature.py": "x\n"})
+        git(repo, "checkout", "-q", "main")
+        replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+
+        wt = tmp_path / "merge" / "T0001"
+        temp_branch, _ = _create_temp_worktree(
+            str(repo), "feature/x", wt, pool=(hc_home, SAMPLE_TEAM, repo.name),
+        )
+        assert git(wt, "rev-parse", "HEAD") == tip
+        assert (wt / "feature.py").exists()
+        assert git(wt, "rev-parse", "--abbrev-ref", "HEAD") == temp_branch
+        assert len(list(pool_dir(hc_home, SAMPLE_TEAM, repo.name).iterdir())) == 1
+
+    def test_bad_start_falls_back_cleanly(self, hc_home, repo, tmp_path):
+        replenish(hc_home, SAMPLE_TEAM, repo.name, fetch=False)
+        dest = tmp_path / "wt"
+        assert not claim(hc_home, SAMPLE_TEAM, repo.name, dest, branch="b", start="no-such-ref")
+        assert not dest.exists()
+        assert str(dest) not in git(repo, "worktree", "list")